@@ -11,7 +11,11 @@ from typing import TYPE_CHECKING, Any
 from deepagents import create_deep_agent
 from deepagents.backends import CompositeBackend, LocalShellBackend
 from deepagents.backends.filesystem import FilesystemBackend
-from deepagents.middleware import MemoryMiddleware, SkillsMiddleware
+from deepagents.middleware import (
+    MemoryMiddleware,
+    PromptCacheBreakpointMiddleware,
+    SkillsMiddleware,
+)
 from langgraph.checkpoint.memory import InMemorySaver
 
 if TYPE_CHECKING:
@@ -231,8 +235,12 @@ def _format_edit_file_description(
     args = tool_call["args"]
     file_path = args.get("file_path", "unknown")
     replace_all = bool(args.get("replace_all", False))
+    edit_count = 1 + len(args.get("edits") or [])
 
-    scope = "all occurrences" if replace_all else "single occurrence"
+    if edit_count > 1:
+        scope = f"{edit_count} edits"
+    else:
+        scope = "all occurrences" if replace_all else "single occurrence"
     return f"File: {file_path}\nAction: Replace text ({scope})"
 
 
@@ -490,6 +498,11 @@ def create_cli_agent(
             )
         )
 
+    # Memory and skills change rarely, so close their prompt cache tier before
+    # the local context, which is refreshed after every summarization
+    if enable_memory or enable_skills:
+        agent_middleware.append(PromptCacheBreakpointMiddleware(tier="context"))
+
     # CONDITIONAL SETUP: Local vs Remote Sandbox
     if sandbox is None:
         # ========== LOCAL MODE ==========
@@ -577,5 +590,6 @@ def create_cli_agent(
         interrupt_on=interrupt_on,
         checkpointer=final_checkpointer,
         subagents=custom_subagents or None,
+        system_prompt_layout="tiered",
     ).with_config(config)
     return agent, composite_backend
@@ -118,6 +118,34 @@ def _format_token_count(count: int) -> str:
     return str(count)
 
 
+def _format_tool_stats(stats: dict[str, dict[str, Any]]) -> str:
+    """Format per-tool tracing totals as a table, slowest tool first.
+
+    Args:
+        stats: The `tool_stats` state value, keyed by tool name.
+
+    Returns:
+        Plain-text table with one row per tool and a totals row.
+    """
+    header = (
+        f"{'Tool':<18}{'Calls':>6}{'Errors':>7}{'Evicted':>8}"
+        f"{'Total':>9}{'Backend':>9}{'Other':>9}{'Result':>8}{'Context':>8}"
+    )
+    ordered = sorted(stats.items(), key=lambda item: item[1]["duration"], reverse=True)
+    totals = {key: sum(tool[key] for tool in stats.values()) for key in ordered[0][1]}
+    rows = [header]
+    for name, tool in [*ordered, ("total", totals)]:
+        overhead = tool["duration"] - tool["backend_duration"]
+        rows.append(
+            f"{name[:17]:<18}{tool['calls']:>6}{tool['errors']:>7}"
+            f"{tool['evictions']:>8}{tool['duration']:>8.2f}s"
+            f"{tool['backend_duration']:>8.2f}s{overhead:>8.2f}s"
+            f"{_format_token_count(int(tool['result_tokens'])):>8}"
+            f"{_format_token_count(int(tool['context_tokens'])):>8}"
+        )
+    return "\n".join(rows)
+
+
 def _write_iterm_escape(sequence: str) -> None:
     """Write an iTerm2 escape sequence to stderr.
 
@@ -1117,6 +1145,31 @@ class DeepAgentsApp(App):
         link.stylize(f"link {url}", 0)
         await self._mount_message(AppMessage(link))
 
+    async def _handle_stats_command(self, command: str) -> None:
+        """Show per-tool latency and result size totals for the current thread.
+
+        Args:
+            command: The raw command text (displayed as user message).
+        """
+        await self._mount_message(UserMessage(command))
+        if not self._agent or not self._session_state:
+            await self._mount_message(AppMessage("No active session."))
+            return
+        config: RunnableConfig = {
+            "configurable": {"thread_id": self._session_state.thread_id}
+        }
+        try:
+            state = await self._agent.aget_state(config)
+        except Exception:
+            logger.exception("Failed to load tool stats for thread")
+            await self._mount_message(AppMessage("Failed to load tool stats."))
+            return
+        stats = (state.values or {}).get("tool_stats") if state else None
+        if not stats:
+            await self._mount_message(AppMessage("No tool calls yet"))
+            return
+        await self._mount_message(AppMessage(_format_tool_stats(stats)))
+
     async def _handle_command(self, command: str) -> None:
         """Handle a slash command.
 
@@ -1131,7 +1184,8 @@ class DeepAgentsApp(App):
             await self._mount_message(UserMessage(command))
             help_text = Text(
                 "Commands: /quit, /clear, /model [--default], /remember, "
-                "/tokens, /threads, /trace, /changelog, /docs, /feedback, /help\n\n"
+                "/tokens, /stats, /threads, /trace, /changelog, /docs, /feedback, "
+                "/help\n\n"
                 "Interactive Features:\n"
                 "  Enter           Submit your message\n"
                 "  Ctrl+J          Insert newline\n"
@@ -1200,6 +1254,8 @@ class DeepAgentsApp(App):
             await self._show_thread_selector()
         elif cmd == "/trace":
             await self._handle_trace_command(command)
+        elif cmd == "/stats":
+            await self._handle_stats_command(command)
         elif cmd == "/tokens":
             await self._mount_message(UserMessage(command))
             if self._token_tracker and self._token_tracker.current_context > 0:
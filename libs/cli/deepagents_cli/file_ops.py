@@ -8,14 +8,14 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Literal
 
-from deepagents.backends.utils import perform_string_replacement
+from deepagents.backends.utils import perform_string_replacements
 
 from deepagents_cli.config import settings
 
 logger = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
-    from deepagents.backends.protocol import BackendProtocol
+    from deepagents.backends.protocol import BackendProtocol, EditOperation
 
 FileOpStatus = Literal["pending", "success", "error"]
 
@@ -168,6 +168,34 @@ def format_display_path(path_str: str | None) -> str:
         return str(path_str)
 
 
+def edit_operations(args: dict[str, Any]) -> list[EditOperation]:
+    """Collect the replacements requested by an `edit_file` tool call.
+
+    Args:
+        args: The `edit_file` tool call arguments.
+
+    Returns:
+        The `old_string`/`new_string` replacement followed by any batched `edits`.
+    """
+    edits: list[EditOperation] = [
+        (
+            str(args.get("old_string", "")),
+            str(args.get("new_string", "")),
+            bool(args.get("replace_all")),
+        )
+    ]
+    edits.extend(
+        (
+            str(edit.get("old_string", "")),
+            str(edit.get("new_string", "")),
+            bool(edit.get("replace_all")),
+        )
+        for edit in args.get("edits") or []
+        if isinstance(edit, dict)
+    )
+    return edits
+
+
 def build_approval_preview(
     tool_name: str,
     args: dict[str, Any],
@@ -226,12 +254,8 @@ def build_approval_preview(
                 details=[f"File: {path_str}", "Action: Replace text"],
                 error="Unable to read current file contents.",
             )
-        old_string = str(args.get("old_string", ""))
-        new_string = str(args.get("new_string", ""))
-        replace_all = bool(args.get("replace_all"))
-        replacement = perform_string_replacement(
-            before, old_string, new_string, replace_all
-        )
+        edits = edit_operations(args)
+        replacement = perform_string_replacements(before, edits)
         if isinstance(replacement, str):
             return ApprovalPreview(
                 title=f"Update {display_path}",
@@ -253,7 +277,10 @@ def build_approval_preview(
                 for line in diff.splitlines()
                 if line.startswith("-") and not line.startswith("---")
             )
-        action = "all occurrences" if replace_all else "single occurrence"
+        if len(edits) > 1:
+            action = f"{len(edits)} edits"
+        else:
+            action = "all occurrences" if edits[0][2] else "single occurrence"
         details = [
             f"File: {path_str}",
             f"Action: Replace text ({action})",
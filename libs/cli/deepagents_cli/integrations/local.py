@@ -0,0 +1,95 @@
+"""Local subprocess sandbox provider for testing sandbox code without a remote API."""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from deepagents.backends.local_shell import LocalShellBackend
+
+from deepagents_cli.integrations.sandbox_provider import (
+    SandboxNotFoundError,
+    SandboxProvider,
+)
+
+if TYPE_CHECKING:
+    from deepagents.backends.protocol import SandboxBackendProtocol
+
+
+class LocalSubprocessProvider(SandboxProvider):
+    """Sandbox provider that runs each sandbox in its own local temporary directory.
+
+    Commands run in a local shell with the sandbox directory as their working
+    directory. There is no isolation from the host: this provider exists for tests
+    and benchmarks of sandbox lifecycle code such as `SandboxPool`.
+    """
+
+    def __init__(self, *, base_dir: str | Path | None = None) -> None:
+        """Initialize the local provider.
+
+        Args:
+            base_dir: Directory under which sandbox directories are created.
+
+                Defaults to the system temporary directory.
+        """
+        self._base_dir = Path(base_dir) if base_dir is not None else None
+        self._sandboxes: dict[str, LocalShellBackend] = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        """Number of sandboxes created by this provider."""
+
+    def get_or_create(
+        self,
+        *,
+        sandbox_id: str | None = None,
+        **kwargs: Any,  # noqa: ARG002  # Required by SandboxFactory interface
+    ) -> SandboxBackendProtocol:
+        """Get an existing local sandbox or create a new one.
+
+        Args:
+            sandbox_id: Id of a sandbox previously created by this provider.
+            **kwargs: Ignored.
+
+        Returns:
+            LocalShellBackend rooted at the sandbox directory.
+
+        Raises:
+            SandboxNotFoundError: If `sandbox_id` is not a sandbox of this provider.
+        """
+        with self._lock:
+            if sandbox_id is not None:
+                if sandbox_id not in self._sandboxes:
+                    msg = f"Local sandbox not found: {sandbox_id}"
+                    raise SandboxNotFoundError(msg)
+                return self._sandboxes[sandbox_id]
+
+            root_dir = tempfile.mkdtemp(
+                prefix="deepagents-sandbox-", dir=self._base_dir
+            )
+            backend = LocalShellBackend(
+                root_dir=root_dir, virtual_mode=False, inherit_env=True
+            )
+            self._sandboxes[backend.id] = backend
+            self.created += 1
+            return backend
+
+    def delete(self, *, sandbox_id: str, **kwargs: Any) -> None:  # noqa: ARG002  # Required by SandboxFactory interface
+        """Delete a local sandbox and its directory.
+
+        Args:
+            sandbox_id: Sandbox id to delete.
+            **kwargs: Ignored.
+        """
+        with self._lock:
+            backend = self._sandboxes.pop(sandbox_id, None)
+        if backend is not None:
+            shutil.rmtree(backend.cwd, ignore_errors=True)
+
+    @property
+    def sandbox_ids(self) -> list[str]:
+        """Ids of the sandboxes that currently exist."""
+        with self._lock:
+            return list(self._sandboxes)
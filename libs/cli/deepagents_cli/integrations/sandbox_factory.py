@@ -16,6 +16,7 @@ if TYPE_CHECKING:
 
     from deepagents.backends.protocol import SandboxBackendProtocol
 
+    from deepagents_cli.integrations.sandbox_pool import SandboxPool
     from deepagents_cli.integrations.sandbox_provider import SandboxProvider
 
 
@@ -56,6 +57,39 @@ def _run_sandbox_setup(backend: SandboxBackendProtocol, setup_script_path: str)
     console.print(f"[green]{get_glyphs().checkmark} Setup complete[/green]")
 
 
+def _sync_project_dir(
+    backend: SandboxBackendProtocol, sync_dir: str, remote_dir: str
+) -> None:
+    """Push a local directory into the sandbox, sending only changed files.
+
+    Args:
+        backend: Sandbox backend instance
+        sync_dir: Local directory to push
+        remote_dir: Destination directory in the sandbox
+
+    Raises:
+        ValueError: If `sync_dir` is not a directory.
+        RuntimeError: If some files could not be transferred.
+    """
+    from deepagents.backends.directory_sync import DirectorySync
+
+    if not Path(sync_dir).is_dir():
+        msg = f"Sync directory not found: {sync_dir}"
+        raise ValueError(msg)
+
+    console.print(f"[dim]Syncing {sync_dir} to {remote_dir}...[/dim]")
+    result = DirectorySync(backend, sync_dir, remote_dir).push()
+    if result.errors:
+        failed = ", ".join(sorted(result.errors)[:5])
+        msg = f"Failed to sync {len(result.errors)} file(s): {failed}"
+        raise RuntimeError(msg)
+
+    console.print(
+        f"[green]{get_glyphs().checkmark} Synced {len(result.uploaded)} changed "
+        f"file(s), {result.unchanged} unchanged[/green]"
+    )
+
+
 _PROVIDER_TO_WORKING_DIR = {
     "daytona": "/home/daytona",
     "langsmith": "/tmp",  # noqa: S108  # LangSmith sandbox working directory
@@ -70,6 +104,8 @@ def create_sandbox(
     *,
     sandbox_id: str | None = None,
     setup_script_path: str | None = None,
+    pool: SandboxPool | None = None,
+    sync_dir: str | None = None,
 ) -> Generator[SandboxBackendProtocol, None, None]:
     """Create or connect to a sandbox of the specified provider.
 
@@ -79,10 +115,29 @@ def create_sandbox(
         provider: Sandbox provider ("daytona", "langsmith", "modal", "runloop")
         sandbox_id: Optional existing sandbox ID to reuse
         setup_script_path: Optional path to setup script to run after sandbox starts
+        pool: Optional pool to lease a pre-warmed sandbox from instead of creating
+            one. The pool runs its own setup script, so `setup_script_path` is
+            ignored. Not used when `sandbox_id` is given.
+        sync_dir: Optional local directory pushed into the sandbox working
+            directory after setup. Only files whose content differs from the
+            sandbox copy are transferred, so reconnecting to an existing sandbox
+            is cheap.
 
     Yields:
         SandboxBackendProtocol instance
     """
+    if pool is not None and sandbox_id is None:
+        with pool.lease() as backend:
+            console.print(
+                f"[green]{get_glyphs().checkmark} {provider.capitalize()} sandbox "
+                f"leased from pool: {backend.id}[/green]"
+            )
+            if sync_dir:
+                remote_dir = pool.working_dir or get_default_working_dir(provider)
+                _sync_project_dir(backend, sync_dir, remote_dir)
+            yield backend
+        return
+
     # Get provider instance
     provider_obj = _get_provider(provider)
 
@@ -103,6 +158,8 @@ def create_sandbox(
         _run_sandbox_setup(backend, setup_script_path)
 
     try:
+        if sync_dir:
+            _sync_project_dir(backend, sync_dir, get_default_working_dir(provider))
         yield backend
     finally:
         if should_cleanup:
@@ -0,0 +1,340 @@
+"""Pool of pre-warmed sandboxes that are reused across sessions.
+
+Creating a remote sandbox and running the setup script usually takes far longer
+than a short non-interactive task. `SandboxPool` keeps sandboxes that already ran
+the setup script and leases one per session. When a lease ends, the working
+directory is restored to the snapshot taken right after setup and the sandbox
+goes back to the pool. Sandboxes that stay idle longer than `idle_timeout` are
+deleted.
+
+The CLI commands run one session per process and don't use a pool. It is meant
+for hosts that serve many sessions from one process and pass the pool to
+`create_sandbox`:
+
+```python
+pool = SandboxPool(
+    ModalProvider(),
+    setup_script_path="setup.sh",
+    size=2,
+    working_dir=get_default_working_dir("modal"),
+)
+pool.warm()
+
+with create_sandbox("modal", pool=pool) as backend:
+    backend.execute("make test")
+
+pool.close()
+```
+
+Only the working directory is reset. Changes elsewhere in the sandbox (installed
+packages, files in the home directory, background processes) outlive the lease.
+"""
+
+from __future__ import annotations
+
+import logging
+import shlex
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from deepagents_cli.integrations.sandbox_factory import _run_sandbox_setup
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+    from deepagents.backends.protocol import SandboxBackendProtocol
+
+    from deepagents_cli.integrations.sandbox_provider import SandboxProvider
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IDLE_TIMEOUT = 600.0
+"""Seconds an unused pooled sandbox is kept before it is deleted."""
+
+_BASELINE_PREFIX = ".deepagents-pool-"
+
+
+@dataclass
+class _PooledSandbox:
+    backend: SandboxBackendProtocol
+    working_dir: str
+    baseline: str
+    """Path of the tar archive holding the working directory after setup."""
+    idle_since: float
+
+
+def _snapshot_command(working_dir: str, baseline: str) -> str:
+    wd, tar = shlex.quote(working_dir), shlex.quote(baseline)
+    return f"mkdir -p {wd} && tar -C {wd} --exclude='./{_BASELINE_PREFIX}*' -cf {tar} ."
+
+
+def _reset_command(working_dir: str, baseline: str) -> str:
+    wd, tar = shlex.quote(working_dir), shlex.quote(baseline)
+    # The archive lives outside the working directory, except when the working
+    # directory is the temp dir itself, so it is excluded from the wipe as well
+    return (
+        f"cd / && "
+        f"find {wd} -mindepth 1 -maxdepth 1 ! -name '{_BASELINE_PREFIX}*' "
+        f"-exec rm -rf {{}} + && "
+        f"tar -C {wd} -xpf {tar}"
+    )
+
+
+def _is_healthy(backend: SandboxBackendProtocol) -> bool:
+    try:
+        return backend.execute("true").exit_code == 0
+    except Exception:  # noqa: BLE001  # Any failure means the sandbox can't be reused
+        return False
+
+
+class SandboxPool:
+    """Pool of pre-warmed sandboxes for one provider and setup script.
+
+    Thread-safe: leases may be taken from several threads at once.
+    """
+
+    def __init__(
+        self,
+        provider: SandboxProvider,
+        *,
+        size: int = 1,
+        setup_script_path: str | None = None,
+        working_dir: str | None = None,
+        idle_timeout: float | None = DEFAULT_IDLE_TIMEOUT,
+    ) -> None:
+        """Initialize the pool. No sandbox is created until `warm` or `acquire`.
+
+        Args:
+            provider: Provider that creates and deletes the sandboxes.
+            size: Number of idle sandboxes `warm` keeps ready. Released sandboxes
+                beyond this number are deleted.
+            setup_script_path: Setup script run once on each new sandbox.
+            working_dir: Directory restored when a sandbox is released.
+
+                Defaults to the directory commands start in.
+            idle_timeout: Seconds an idle sandbox is kept before `reap_idle`
+                deletes it. `None` keeps idle sandboxes until `close`.
+
+        Raises:
+            ValueError: If `size` is negative.
+        """
+        if size < 0:
+            msg = f"size must be non-negative, got {size}"
+            raise ValueError(msg)
+        self.provider = provider
+        self.size = size
+        self.setup_script_path = setup_script_path
+        self.working_dir = working_dir
+        self.idle_timeout = idle_timeout
+        self._idle: list[_PooledSandbox] = []
+        self._leased: dict[str, _PooledSandbox] = {}
+        self._pending = 0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    @property
+    def idle_count(self) -> int:
+        """Number of sandboxes ready to be leased."""
+        with self._lock:
+            return len(self._idle)
+
+    @property
+    def leased_count(self) -> int:
+        """Number of sandboxes currently leased."""
+        with self._lock:
+            return len(self._leased)
+
+    def _prepare(
+        self, backend: SandboxBackendProtocol, baseline: str
+    ) -> _PooledSandbox:
+        """Run the setup script and snapshot the working directory of a new sandbox.
+
+        Args:
+            backend: The new sandbox.
+            baseline: Path the snapshot archive is written to.
+
+        Returns:
+            The pool entry for the sandbox.
+
+        Raises:
+            RuntimeError: If the working directory cannot be snapshotted.
+        """
+        if self.setup_script_path:
+            _run_sandbox_setup(backend, self.setup_script_path)
+        working_dir = self.working_dir
+        if working_dir is None:
+            working_dir = backend.execute("pwd").output.strip()
+        result = backend.execute(_snapshot_command(working_dir, baseline))
+        if result.exit_code != 0:
+            msg = f"Failed to snapshot sandbox working directory: {result.output}"
+            raise RuntimeError(msg)
+        return _PooledSandbox(
+            backend=backend,
+            working_dir=working_dir,
+            baseline=baseline,
+            idle_since=time.monotonic(),
+        )
+
+    def _create(self) -> _PooledSandbox:
+        backend = self.provider.get_or_create()
+        baseline = f"/tmp/{_BASELINE_PREFIX}{uuid.uuid4().hex}.tar"  # noqa: S108  # Path inside the sandbox
+        try:
+            return self._prepare(backend, baseline)
+        except BaseException:
+            self._delete(backend, baseline)
+            raise
+
+    def _delete(self, backend: SandboxBackendProtocol, baseline: str) -> None:
+        # Remote sandboxes take the archive with them, but sandboxes that share
+        # the host filesystem (e.g. `LocalSubprocessProvider`) would leave it
+        try:
+            backend.execute(f"rm -f {shlex.quote(baseline)}")
+        except Exception:
+            logger.debug(
+                "Failed to remove snapshot of pooled sandbox %s",
+                backend.id,
+                exc_info=True,
+            )
+        try:
+            self.provider.delete(sandbox_id=backend.id)
+        except Exception:
+            logger.warning(
+                "Failed to delete pooled sandbox %s", backend.id, exc_info=True
+            )
+
+    def warm(self) -> None:
+        """Create sandboxes until `size` idle sandboxes are ready.
+
+        Sandboxes are created concurrently. Creation failures are logged and
+        leave the pool short.
+        """
+        self.reap_idle()
+        with self._lock:
+            missing = self.size - len(self._idle) - self._pending
+            if self._closed or missing <= 0:
+                return
+            self._pending += missing
+
+        def create_one() -> None:
+            try:
+                entry = self._create()
+            except Exception:
+                logger.warning("Failed to warm pooled sandbox", exc_info=True)
+                with self._lock:
+                    self._pending -= 1
+                return
+            with self._lock:
+                self._pending -= 1
+                keep = not self._closed
+                if keep:
+                    self._idle.append(entry)
+            if not keep:
+                self._delete(entry.backend, entry.baseline)
+
+        with ThreadPoolExecutor(max_workers=missing) as executor:
+            for _ in range(missing):
+                executor.submit(create_one)
+
+    def acquire(self) -> SandboxBackendProtocol:
+        """Lease a sandbox, creating one if none is idle.
+
+        Returns:
+            A sandbox backend. Pass it to `release` when done.
+
+        Raises:
+            RuntimeError: If the pool is closed.
+        """
+        self.reap_idle()
+        while True:
+            with self._lock:
+                if self._closed:
+                    msg = "Sandbox pool is closed"
+                    raise RuntimeError(msg)
+                entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                entry = self._create()
+            elif not _is_healthy(entry.backend):
+                self._delete(entry.backend, entry.baseline)
+                continue
+            with self._lock:
+                self._leased[entry.backend.id] = entry
+            return entry.backend
+
+    def release(self, backend: SandboxBackendProtocol) -> None:
+        """Return a leased sandbox to the pool.
+
+        The working directory is restored to its post-setup snapshot. The sandbox
+        is deleted instead if the reset fails or the pool is already full.
+
+        Args:
+            backend: Sandbox returned by `acquire`.
+
+        Raises:
+            ValueError: If `backend` is not leased from this pool.
+        """
+        with self._lock:
+            entry = self._leased.pop(backend.id, None)
+        if entry is None:
+            msg = f"Sandbox {backend.id} is not leased from this pool"
+            raise ValueError(msg)
+
+        try:
+            reset = backend.execute(_reset_command(entry.working_dir, entry.baseline))
+            reusable = reset.exit_code == 0
+        except Exception:  # noqa: BLE001  # A sandbox that can't be reset is discarded
+            reusable = False
+
+        with self._lock:
+            keep = reusable and not self._closed and len(self._idle) < self.size
+            if keep:
+                entry.idle_since = time.monotonic()
+                self._idle.append(entry)
+        if not keep:
+            self._delete(backend, entry.baseline)
+
+    @contextmanager
+    def lease(self) -> Generator[SandboxBackendProtocol, None, None]:
+        """Lease a sandbox for the duration of a `with` block.
+
+        Yields:
+            A sandbox backend, released back to the pool on exit.
+        """
+        backend = self.acquire()
+        try:
+            yield backend
+        finally:
+            self.release(backend)
+
+    def reap_idle(self) -> int:
+        """Delete sandboxes that have been idle longer than `idle_timeout`.
+
+        Returns:
+            Number of deleted sandboxes.
+        """
+        if self.idle_timeout is None:
+            return 0
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            expired = [entry for entry in self._idle if entry.idle_since < cutoff]
+            self._idle = [entry for entry in self._idle if entry.idle_since >= cutoff]
+        for entry in expired:
+            self._delete(entry.backend, entry.baseline)
+        return len(expired)
+
+    def close(self) -> None:
+        """Delete all idle sandboxes. Leased sandboxes are deleted on release."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            self._delete(entry.backend, entry.baseline)
+
+
+__all__ = [
+    "SandboxPool",
+]
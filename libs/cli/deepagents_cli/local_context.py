@@ -19,6 +19,7 @@ from typing import (
     runtime_checkable,
 )
 
+from deepagents.middleware._utils import append_to_system_message  # noqa: PLC2701
 from langchain.agents.middleware.types import (
     AgentMiddleware,
     AgentState,
@@ -461,7 +462,10 @@ class LocalContextMiddleware(AgentMiddleware):
 
     @staticmethod
     def _get_modified_request(request: ModelRequest) -> ModelRequest | None:
-        """Append local context to the system prompt if available.
+        """Append local context to the system message if available.
+
+        The context is added as a new content block, so cache breakpoints set on
+        the earlier blocks of the system message are kept.
 
         Args:
             request: The model request to potentially modify.
@@ -475,9 +479,10 @@ class LocalContextMiddleware(AgentMiddleware):
         if not local_context:
             return None
 
-        system_prompt = request.system_prompt or ""
-        new_prompt = system_prompt + "\n\n" + local_context
-        return request.override(system_prompt=new_prompt)
+        new_system_message = append_to_system_message(
+            request.system_message, local_context
+        )
+        return request.override(system_message=new_system_message)
 
     def wrap_model_call(
         self,
@@ -389,6 +389,12 @@ def parse_args() -> argparse.Namespace:
         metavar="PATH",
         help="Path to setup script to run in sandbox after creation",
     )
+    parser.add_argument(
+        "--sandbox-sync",
+        metavar="DIR",
+        help="Local directory to push into the sandbox working directory after "
+        "setup. Only files that changed since the last push are transferred.",
+    )
     parser.add_argument(
         "--shell-allow-list",
         metavar="LIST",
@@ -432,6 +438,7 @@ async def run_textual_cli_async(
     sandbox_type: str = "none",  # str (not None) to match argparse choices
     sandbox_id: str | None = None,
     sandbox_setup: str | None = None,
+    sandbox_sync: str | None = None,
     model_name: str | None = None,
     model_params: dict[str, Any] | None = None,
     thread_id: str | None = None,
@@ -448,6 +455,8 @@ async def run_textual_cli_async(
         sandbox_id: Optional existing sandbox ID to reuse
         sandbox_setup: Optional path to setup script to run in the sandbox
             after creation.
+        sandbox_sync: Optional local directory to push into the sandbox
+            working directory after setup.
         model_name: Optional model name to use
         model_params: Extra kwargs from `--model-params` to pass to the model.
 
@@ -513,6 +522,7 @@ async def run_textual_cli_async(
                     sandbox_type,
                     sandbox_id=sandbox_id,
                     setup_script_path=sandbox_setup,
+                    sync_dir=sandbox_sync,
                 )
                 sandbox_backend = sandbox_cm.__enter__()  # noqa: PLC2801  # Context manager used without `with` for long-lived sandbox lifecycle
             except (ImportError, ValueError, RuntimeError, NotImplementedError) as e:
@@ -877,6 +887,7 @@ def cli_main() -> None:
                     sandbox_type=args.sandbox,
                     sandbox_id=args.sandbox_id,
                     sandbox_setup=getattr(args, "sandbox_setup", None),
+                    sandbox_sync=getattr(args, "sandbox_sync", None),
                     quiet=args.quiet,
                     stream=not args.no_stream,
                 )
@@ -971,6 +982,7 @@ def cli_main() -> None:
                         sandbox_type=args.sandbox,
                         sandbox_id=args.sandbox_id,
                         sandbox_setup=getattr(args, "sandbox_setup", None),
+                        sandbox_sync=getattr(args, "sandbox_sync", None),
                         model_name=getattr(args, "model", None),
                         model_params=model_params,
                         thread_id=thread_id,
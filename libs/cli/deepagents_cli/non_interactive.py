@@ -529,6 +529,7 @@ async def run_non_interactive(
     sandbox_type: str = "none",  # str (not None) to match argparse choices
     sandbox_id: str | None = None,
     sandbox_setup: str | None = None,
+    sandbox_sync: str | None = None,
     *,
     quiet: bool = False,
     stream: bool = True,
@@ -557,6 +558,8 @@ async def run_non_interactive(
         sandbox_id: Optional existing sandbox ID to reuse.
         sandbox_setup: Optional path to setup script to run in the sandbox
             after creation.
+        sandbox_sync: Optional local directory to push into the sandbox
+            working directory after setup.
         quiet: When `True`, all console output (headers, status messages,
             tool notifications, HITL decisions, errors) is redirected to
             stderr so that only the agent's response text appears on stdout.
@@ -612,6 +615,7 @@ async def run_non_interactive(
                 sandbox_type,
                 sandbox_id=sandbox_id,
                 setup_script_path=sandbox_setup,
+                sync_dir=sandbox_sync,
             )
             sandbox_backend = exit_stack.enter_context(sandbox_cm)
         except (ImportError, ValueError, RuntimeError) as e:
@@ -101,6 +101,7 @@ SLASH_COMMANDS: list[tuple[str, str]] = [
     ("/model", "Switch model, show selector, or set default (--default)"),
     ("/remember", "Update memory and skills from conversation"),
     ("/quit", "Exit app"),
+    ("/stats", "Per-tool latency and result sizes"),
     ("/tokens", "Token usage"),
     ("/threads", "Browse and resume previous threads"),
     ("/trace", "Open current thread in LangSmith"),
@@ -5,6 +5,7 @@ from __future__ import annotations
 import difflib
 from typing import TYPE_CHECKING, Any
 
+from deepagents_cli.file_ops import edit_operations
 from deepagents_cli.widgets.tool_widgets import (
     EditFileApprovalWidget,
     GenericApprovalWidget,
@@ -65,11 +66,16 @@ class EditFileRenderer(ToolRenderer):
         tool_args: dict[str, Any],
     ) -> tuple[type[ToolApprovalWidget], dict[str, Any]]:
         file_path = tool_args.get("file_path", "")
-        old_string = tool_args.get("old_string", "")
-        new_string = tool_args.get("new_string", "")
-
-        # Generate unified diff
-        diff_lines = EditFileRenderer._generate_diff(old_string, new_string)
+        edits = edit_operations(tool_args)
+
+        # Generate one unified diff hunk per edit
+        diff_lines = [
+            line
+            for old, new, _ in edits
+            for line in EditFileRenderer._generate_diff(old, new)
+        ]
+        old_string = "\n".join(old for old, _, _ in edits)
+        new_string = "\n".join(new for _, new, _ in edits)
 
         data = {
             "file_path": file_path,
@@ -509,6 +509,59 @@ class TestCreateCliAgentSkillsSources:
         assert sources[1] == str(skills_dir)
 
 
+class TestCreateCliAgentPromptLayout:
+    """Test that `create_cli_agent` orders the system prompt for prompt caching."""
+
+    def test_uses_tiered_layout_with_context_breakpoint(self, tmp_path: Path) -> None:
+        """Memory and skills should be closed by a breakpoint before local context."""
+        agent_dir = tmp_path / "agent"
+        agent_dir.mkdir()
+        skills_dir = tmp_path / "skills"
+        skills_dir.mkdir()
+
+        mock_settings = Mock()
+        mock_settings.ensure_agent_dir.return_value = agent_dir
+        mock_settings.ensure_user_skills_dir.return_value = skills_dir
+        mock_settings.get_project_skills_dir.return_value = None
+        mock_settings.get_built_in_skills_dir.return_value = (
+            Settings.get_built_in_skills_dir()
+        )
+        mock_settings.get_user_agent_md_path.return_value = agent_dir / "AGENTS.md"
+        mock_settings.get_project_agent_md_path.return_value = []
+        mock_settings.get_user_agents_dir.return_value = tmp_path / "agents"
+        mock_settings.get_project_agents_dir.return_value = None
+        mock_settings.model_name = None
+        mock_settings.model_provider = None
+        mock_settings.model_context_limit = None
+        mock_settings.project_root = None
+
+        mock_agent = Mock()
+        mock_agent.with_config.return_value = mock_agent
+
+        with (
+            patch("deepagents_cli.agent.settings", mock_settings),
+            patch("deepagents_cli.agent.SkillsMiddleware"),
+            patch("deepagents_cli.agent.MemoryMiddleware"),
+            patch(
+                "deepagents_cli.agent.create_deep_agent",
+                return_value=mock_agent,
+            ) as create,
+        ):
+            create_cli_agent(
+                model="fake-model",
+                assistant_id="test",
+                enable_memory=True,
+                enable_skills=True,
+                enable_shell=True,
+            )
+
+        kwargs = create.call_args.kwargs
+        assert kwargs["system_prompt_layout"] == "tiered"
+        names = [type(m).__name__ for m in kwargs["middleware"]]
+        breakpoint_index = names.index("PromptCacheBreakpointMiddleware")
+        assert names[breakpoint_index + 1] == "LocalContextMiddleware"
+
+
 class TestCreateCliAgentMemorySources:
     """Test that `create_cli_agent` wires project AGENTS.md into memory sources."""
 
@@ -21,6 +21,7 @@ from deepagents_cli.app import (
     DeepAgentsApp,
     QueuedMessage,
     TextualSessionState,
+    _format_tool_stats,
     _write_iterm_escape,
 )
 from deepagents_cli.widgets.chat_input import ChatInput
@@ -661,6 +662,93 @@ class TestTraceCommand:
             assert any("No active session" in str(w._content) for w in app_msgs)
 
 
+class TestStatsCommand:
+    """Test /stats slash command."""
+
+    STATS: ClassVar[dict[str, dict[str, float]]] = {
+        "read_file": {
+            "calls": 3,
+            "errors": 1,
+            "evictions": 0,
+            "duration": 0.5,
+            "backend_duration": 0.4,
+            "result_chars": 8000,
+            "result_tokens": 2000,
+            "context_tokens": 2000,
+        },
+        "execute": {
+            "calls": 1,
+            "errors": 0,
+            "evictions": 1,
+            "duration": 2.0,
+            "backend_duration": 1.5,
+            "result_chars": 200000,
+            "result_tokens": 50000,
+            "context_tokens": 600,
+        },
+    }
+
+    def test_format_orders_by_duration_and_adds_totals(self) -> None:
+        """Slowest tools come first, followed by a totals row."""
+        lines = _format_tool_stats(self.STATS).splitlines()
+
+        assert lines[0].startswith("Tool")
+        assert [line.split()[0] for line in lines[1:]] == [
+            "execute",
+            "read_file",
+            "total",
+        ]
+        assert lines[1].split()[1:] == [
+            "1",
+            "0",
+            "1",
+            "2.00s",
+            "1.50s",
+            "0.50s",
+            "50.0K",
+            "600",
+        ]
+        assert lines[3].split()[1:5] == ["4", "1", "1", "2.50s"]
+
+    @pytest.mark.asyncio
+    async def test_stats_shows_table_for_thread(self) -> None:
+        """Should read tool_stats from the thread state and render the table."""
+        app = DeepAgentsApp()
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            app._session_state = TextualSessionState(thread_id="test-thread-123")
+            agent = MagicMock()
+            agent.aget_state = AsyncMock(
+                return_value=MagicMock(values={"tool_stats": self.STATS})
+            )
+            app._agent = agent
+
+            await app._handle_command("/stats")
+            await pilot.pause()
+
+            config = agent.aget_state.call_args.args[0]
+            assert config["configurable"]["thread_id"] == "test-thread-123"
+            app_msgs = app.query(AppMessage)
+            assert any("read_file" in str(w._content) for w in app_msgs)
+
+    @pytest.mark.asyncio
+    async def test_stats_without_tool_calls(self) -> None:
+        """Should say so when the thread has no traced tool calls."""
+        app = DeepAgentsApp()
+        async with app.run_test() as pilot:
+            await pilot.pause()
+            app._session_state = TextualSessionState()
+            agent = MagicMock()
+            agent.aget_state = AsyncMock(return_value=MagicMock(values={}))
+            app._agent = agent
+
+            await app._handle_stats_command("/stats")
+            await pilot.pause()
+
+            app_msgs = app.query(AppMessage)
+            assert any("No tool calls yet" in str(w._content) for w in app_msgs)
+
+
 class TestRunAgentTaskImageTracker:
     """Tests image tracker wiring from app into textual execution."""
 
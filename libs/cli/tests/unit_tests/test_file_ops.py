@@ -118,3 +118,29 @@ def test_build_approval_preview_generates_diff(tmp_path: Path) -> None:
     assert preview is not None
     assert preview.diff is not None
     assert "+gamma" in preview.diff
+
+
+def test_build_approval_preview_applies_batched_edits(tmp_path: Path) -> None:
+    target = tmp_path / "notes.txt"
+    target.write_text("alpha\nbeta\n")
+    args = {
+        "file_path": str(target),
+        "old_string": "alpha",
+        "new_string": "one",
+        "edits": [{"old_string": "beta", "new_string": "two"}],
+    }
+
+    preview = build_approval_preview("edit_file", args, assistant_id=None)
+
+    assert preview is not None
+    assert preview.diff is not None
+    assert "+one" in preview.diff
+    assert "+two" in preview.diff
+    assert "Action: Replace text (2 edits)" in preview.details
+
+    args["edits"] = [{"old_string": "missing", "new_string": "two"}]
+    failed = build_approval_preview("edit_file", args, assistant_id=None)
+
+    assert failed is not None
+    assert failed.error is not None
+    assert "Edit 2 of 2 failed" in failed.error
@@ -10,6 +10,7 @@ if TYPE_CHECKING:
     from pathlib import Path
 
 import pytest
+from langchain_core.messages import SystemMessage
 
 from deepagents_cli.local_context import (
     DETECT_CONTEXT_SCRIPT,
@@ -61,6 +62,12 @@ SAMPLE_CONTEXT = (
     "**Runtimes**: Python 3.12.4, Node 20.11.0\n"
 )
 
+BASE_BLOCK = {
+    "type": "text",
+    "text": "Base system prompt",
+    "cache_control": {"type": "ephemeral", "ttl": "5m"},
+}
+
 SAMPLE_CONTEXT_NO_GIT = (
     "## Local Context\n\n"
     "**Current Directory**: `/home/user/project`\n\n"
@@ -182,12 +189,12 @@ class TestLocalContextMiddleware:
         assert "**Git**:" not in ctx
 
     def test_wrap_model_call_with_local_context(self) -> None:
-        """Test that wrap_model_call appends local context to system prompt."""
+        """Test that wrap_model_call appends local context, keeping breakpoints."""
         backend = _make_backend()
         middleware = LocalContextMiddleware(backend=backend)
 
         request = Mock()
-        request.system_prompt = "Base system prompt"
+        request.system_message = SystemMessage(content_blocks=[BASE_BLOCK])
         request.state = {"local_context": SAMPLE_CONTEXT}
 
         overridden_request = Mock()
@@ -198,10 +205,9 @@ class TestLocalContextMiddleware:
         result = middleware.wrap_model_call(request, handler)
 
         request.override.assert_called_once()
-        call_args = request.override.call_args[1]
-        assert "system_prompt" in call_args
-        assert "Base system prompt" in call_args["system_prompt"]
-        assert "Current branch `main`" in call_args["system_prompt"]
+        system_message = request.override.call_args[1]["system_message"]
+        assert system_message.content_blocks[0] == BASE_BLOCK
+        assert "Current branch `main`" in system_message.content_blocks[1]["text"]
 
         handler.assert_called_once_with(overridden_request)
         assert result == "response"
@@ -225,12 +231,12 @@ class TestLocalContextMiddleware:
 
     @pytest.mark.asyncio
     async def test_awrap_model_call_with_local_context(self) -> None:
-        """Test that awrap_model_call appends local context to system prompt."""
+        """Test that awrap_model_call appends local context, keeping breakpoints."""
         backend = _make_backend()
         middleware = LocalContextMiddleware(backend=backend)
 
         request = Mock()
-        request.system_prompt = "Base system prompt"
+        request.system_message = SystemMessage(content_blocks=[BASE_BLOCK])
         request.state = {"local_context": SAMPLE_CONTEXT}
 
         overridden_request = Mock()
@@ -241,10 +247,9 @@ class TestLocalContextMiddleware:
         result = await middleware.awrap_model_call(request, handler)
 
         request.override.assert_called_once()
-        call_args = request.override.call_args[1]
-        assert "system_prompt" in call_args
-        assert "Base system prompt" in call_args["system_prompt"]
-        assert "Current branch `main`" in call_args["system_prompt"]
+        system_message = request.override.call_args[1]["system_message"]
+        assert system_message.content_blocks[0] == BASE_BLOCK
+        assert "Current branch `main`" in system_message.content_blocks[1]["text"]
 
         handler.assert_called_once_with(overridden_request)
         assert result == "async response"
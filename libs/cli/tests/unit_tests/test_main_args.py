@@ -125,6 +125,13 @@ class TestNonInteractiveArgument:
             assert parsed.sandbox == "modal"
             assert parsed.sandbox_setup == "/path/to/setup.sh"
 
+    def test_combined_with_sandbox_sync(self, mock_argv: MockArgvType) -> None:
+        """Test -n works alongside --sandbox and --sandbox-sync."""
+        with mock_argv("-n", "run task", "--sandbox", "modal", "--sandbox-sync", "."):
+            parsed = parse_args()
+            assert parsed.sandbox == "modal"
+            assert parsed.sandbox_sync == "."
+
 
 class TestNoStreamArgument:
     """Tests for --no-stream argument parsing."""
@@ -228,8 +228,11 @@ class TestSandboxSetupForwarding:
             *,
             sandbox_id: str | None = None,  # noqa: ARG001 # match create_sandbox signature
             setup_script_path: str | None = None,
+            sync_dir: str | None = None,
         ) -> Generator[MagicMock, None, None]:
-            captured_kwargs.append({"setup_script_path": setup_script_path})
+            captured_kwargs.append(
+                {"setup_script_path": setup_script_path, "sync_dir": sync_dir}
+            )
             yield mock_backend
 
         with (
@@ -281,10 +284,12 @@ class TestSandboxSetupForwarding:
                 message="test task",
                 sandbox_type="modal",
                 sandbox_setup="/path/to/setup.sh",
+                sandbox_sync="/path/to/project",
             )
 
         assert len(captured_kwargs) == 1
         assert captured_kwargs[0]["setup_script_path"] == "/path/to/setup.sh"
+        assert captured_kwargs[0]["sync_dir"] == "/path/to/project"
 
 
 class TestQuietMode:
@@ -0,0 +1,135 @@
+"""Tests for the sandbox warm pool, using the local subprocess provider."""
+
+from collections.abc import Generator
+from pathlib import Path
+
+import pytest
+
+from deepagents_cli.integrations.local import LocalSubprocessProvider
+from deepagents_cli.integrations.sandbox_factory import create_sandbox
+from deepagents_cli.integrations.sandbox_pool import SandboxPool
+
+
+@pytest.fixture
+def provider(tmp_path: Path) -> Generator[LocalSubprocessProvider, None, None]:
+    provider = LocalSubprocessProvider(base_dir=tmp_path)
+    yield provider
+    for sandbox_id in provider.sandbox_ids:
+        provider.delete(sandbox_id=sandbox_id)
+
+
+@pytest.fixture
+def setup_script(tmp_path: Path) -> str:
+    script = tmp_path / "setup.sh"
+    script.write_text("echo ready > setup-marker.txt\n")
+    return str(script)
+
+
+class TestSandboxPool:
+    """Tests for SandboxPool."""
+
+    def test_warm_creates_and_sets_up_sandboxes(
+        self, provider: LocalSubprocessProvider, setup_script: str
+    ) -> None:
+        pool = SandboxPool(provider, size=2, setup_script_path=setup_script)
+
+        pool.warm()
+        pool.warm()
+
+        assert provider.created == 2
+        assert pool.idle_count == 2
+        with pool.lease() as backend:
+            assert backend.execute("cat setup-marker.txt").output.strip() == "ready"
+        assert provider.created == 2
+
+    def test_release_restores_working_directory(
+        self, provider: LocalSubprocessProvider, setup_script: str
+    ) -> None:
+        pool = SandboxPool(provider, size=1, setup_script_path=setup_script)
+
+        with pool.lease() as backend:
+            backend.execute("echo scratch > scratch.txt && rm setup-marker.txt")
+            first_id = backend.id
+        with pool.lease() as backend:
+            listing = backend.execute("ls -A").output.split()
+
+        assert backend.id == first_id
+        assert listing == ["setup-marker.txt"]
+        assert provider.created == 1
+
+    def test_concurrent_leases_get_distinct_sandboxes(
+        self, provider: LocalSubprocessProvider
+    ) -> None:
+        pool = SandboxPool(provider, size=1)
+
+        with pool.lease() as first, pool.lease() as second:
+            assert first.id != second.id
+            assert pool.leased_count == 2
+
+        # Only `size` sandboxes are kept after release
+        assert pool.idle_count == 1
+        assert len(provider.sandbox_ids) == 1
+
+    def test_unhealthy_sandbox_is_replaced(
+        self, provider: LocalSubprocessProvider
+    ) -> None:
+        pool = SandboxPool(provider, size=1)
+        pool.warm()
+        (stale_id,) = provider.sandbox_ids
+        provider.delete(sandbox_id=stale_id)
+
+        with pool.lease() as backend:
+            assert backend.id != stale_id
+
+    def test_reap_idle_deletes_expired_sandboxes(
+        self, provider: LocalSubprocessProvider
+    ) -> None:
+        pool = SandboxPool(provider, size=2, idle_timeout=0)
+        pool.warm()
+
+        assert pool.reap_idle() == 2
+        assert pool.idle_count == 0
+        assert provider.sandbox_ids == []
+
+    def test_close_deletes_idle_and_released_sandboxes(
+        self, provider: LocalSubprocessProvider
+    ) -> None:
+        pool = SandboxPool(provider, size=1)
+        pool.warm()
+        backend = pool.acquire()
+
+        pool.close()
+        assert len(provider.sandbox_ids) == 1
+        pool.release(backend)
+
+        assert provider.sandbox_ids == []
+        with pytest.raises(RuntimeError, match="closed"):
+            pool.acquire()
+
+    def test_deleted_sandboxes_leave_no_snapshot_behind(
+        self, provider: LocalSubprocessProvider
+    ) -> None:
+        pool = SandboxPool(provider, size=1)
+        with pool.lease(), pool.lease():
+            baselines = [Path(entry.baseline) for entry in pool._leased.values()]
+            assert all(baseline.exists() for baseline in baselines)
+
+        # Only the sandbox kept in the pool still has its snapshot
+        assert sum(baseline.exists() for baseline in baselines) == 1
+        pool.close()
+
+        assert provider.sandbox_ids == []
+        assert not any(baseline.exists() for baseline in baselines)
+
+    def test_create_sandbox_leases_from_pool(
+        self, provider: LocalSubprocessProvider
+    ) -> None:
+        pool = SandboxPool(provider, size=1)
+        pool.warm()
+
+        with create_sandbox("modal", pool=pool) as backend:
+            assert pool.leased_count == 1
+            assert backend.execute("echo hi").output.strip() == "hi"
+
+        assert pool.idle_count == 1
+        assert provider.created == 1
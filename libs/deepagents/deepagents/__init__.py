@@ -1,10 +1,31 @@
-"""Deep Agents package."""
+"""Deep Agents package.
 
+Public names are imported on first use, so `import deepagents` does not load LangChain
+or any model provider package.
+"""
+
+from typing import TYPE_CHECKING
+
+from deepagents._lazy_imports import lazy_exports
 from deepagents._version import __version__
-from deepagents.graph import create_deep_agent
-from deepagents.middleware.filesystem import FilesystemMiddleware
-from deepagents.middleware.memory import MemoryMiddleware
-from deepagents.middleware.subagents import CompiledSubAgent, SubAgent, SubAgentMiddleware
+
+if TYPE_CHECKING:
+    from deepagents.graph import create_deep_agent
+    from deepagents.middleware.filesystem import FilesystemMiddleware
+    from deepagents.middleware.memory import MemoryMiddleware
+    from deepagents.middleware.subagents import CompiledSubAgent, SubAgent, SubAgentMiddleware
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "CompiledSubAgent": "deepagents.middleware.subagents",
+        "FilesystemMiddleware": "deepagents.middleware.filesystem",
+        "MemoryMiddleware": "deepagents.middleware.memory",
+        "SubAgent": "deepagents.middleware.subagents",
+        "SubAgentMiddleware": "deepagents.middleware.subagents",
+        "create_deep_agent": "deepagents.graph",
+    },
+)
 
 __all__ = [
     "CompiledSubAgent",
@@ -0,0 +1,107 @@
+"""Structural fingerprints for agent specs.
+
+A fingerprint is a hashable value that is equal for two specs that build equivalent
+agents, so compiled graphs can be reused across `create_deep_agent` calls:
+
+- Primitives and containers compare by value.
+- Chat models compare by class and field values (model name, credentials, temperature, ...).
+- Messages (e.g. a `SystemMessage` prompt) compare by class and field values.
+- `functools.partial` objects compare by function identity and bound arguments.
+- Middleware that deepagents builds itself (its own classes and the LangChain middleware it
+  adds to every agent) compare by class and configuration. The tools they generate and their
+  internal memoization caches are derived from that configuration and are ignored.
+- Anything else compares by identity: custom middleware, tools, functions (e.g. backend
+  factories), backends, checkpointers and stores. Callers may keep per-session state in
+  these, so two instances are never assumed to be interchangeable.
+"""
+
+import functools
+import threading
+from collections.abc import Hashable, Mapping
+
+from langchain.agents.middleware.types import AgentMiddleware
+from langchain_core.language_models import BaseLanguageModel
+from langchain_core.messages import BaseMessage
+from pydantic import SecretBytes, SecretStr
+
+from deepagents.middleware.system_prompt import SystemPromptCache
+
+_MAX_DEPTH = 8
+
+# Per-instance caches that don't affect how a middleware behaves
+_MEMO_TYPES: tuple[type, ...] = (SystemPromptCache, type(threading.Lock()), type(threading.RLock()))
+
+# Middleware attributes derived from the rest of their configuration
+_DERIVED_MIDDLEWARE_ATTRS = frozenset({"tools"})
+
+# Modules of middleware whose behavior is fully determined by their configuration
+_VALUE_MIDDLEWARE_MODULES = frozenset(
+    {
+        "langchain.agents.middleware.human_in_the_loop",
+        "langchain.agents.middleware.summarization",
+        "langchain.agents.middleware.todo",
+        "langchain_anthropic.middleware.prompt_caching",
+    }
+)
+
+
+def _compares_by_value(middleware: AgentMiddleware) -> bool:
+    """Whether `middleware` is one deepagents builds itself, rather than a custom class."""
+    module = type(middleware).__module__
+    return module.startswith("deepagents.") or module in _VALUE_MIDDLEWARE_MODULES
+
+
+class _Identity:
+    """Compare the wrapped object by identity. Holds a reference so the id stays unique."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: object) -> None:
+        self.value = value
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _Identity) and other.value is self.value
+
+    def __hash__(self) -> int:
+        return id(self.value)
+
+
+def fingerprint(value: object) -> Hashable:
+    """Return a hashable fingerprint of `value`.
+
+    Args:
+        value: Spec value to fingerprint (model, tools, middleware, prompts, ...).
+
+    Returns:
+        A hashable value. Equal fingerprints mean the values configure equivalent agents.
+    """
+    return _fingerprint(value, 0)
+
+
+def _fingerprint(value: object, depth: int) -> Hashable:  # noqa: PLR0911  # One branch per kind of value
+    if value is None or isinstance(value, (str, bytes, int, float, bool, type, SecretStr, SecretBytes)):
+        return value
+    if depth >= _MAX_DEPTH:
+        return _Identity(value)
+    depth += 1
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(_fingerprint(item, depth) for item in value))
+    if isinstance(value, (set, frozenset)):
+        return ("set", frozenset(_fingerprint(item, depth) for item in value))
+    if isinstance(value, Mapping):
+        items = ((_fingerprint(k, depth), _fingerprint(v, depth)) for k, v in value.items())
+        return ("mapping", tuple(sorted(items, key=repr)))
+    if isinstance(value, functools.partial):
+        return ("partial", _fingerprint(value.func, depth), _fingerprint(value.args, depth), _fingerprint(value.keywords, depth))
+    if isinstance(value, BaseMessage):
+        return ("message", type(value), _fingerprint(value.model_dump(), depth))
+    if isinstance(value, BaseLanguageModel):
+        fields = {name: getattr(value, name) for name in type(value).model_fields}
+        return ("model", type(value), _fingerprint(fields, depth))
+    if isinstance(value, AgentMiddleware) and _compares_by_value(value):
+        config = {key: attr for key, attr in vars(value).items() if key not in _DERIVED_MIDDLEWARE_ATTRS and not isinstance(attr, _MEMO_TYPES)}
+        return ("middleware", type(value), _fingerprint(config, depth))
+    return _Identity(value)
+
+
+__all__ = ["fingerprint"]
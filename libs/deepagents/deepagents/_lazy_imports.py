@@ -0,0 +1,45 @@
+"""Lazy public names for package `__init__` modules.
+
+Packages declare which submodule each public name comes from, and the submodule is
+imported on first attribute access. `import deepagents` then stays cheap: LangChain,
+LangGraph and provider packages load only when something that needs them is used.
+
+```python
+__getattr__, __dir__ = lazy_exports(__name__, {"create_deep_agent": "deepagents.graph"})
+```
+"""
+
+import sys
+from collections.abc import Callable, Mapping
+from importlib import import_module
+from typing import Any
+
+
+def lazy_exports(package: str, exports: Mapping[str, str]) -> tuple[Callable[[str], Any], Callable[[], list[str]]]:
+    """Build module `__getattr__` and `__dir__` functions resolving `exports` on demand.
+
+    Args:
+        package: Name of the package the functions are installed in (its `__name__`).
+        exports: Public name to the module it is imported from.
+
+    Returns:
+        The `__getattr__` and `__dir__` functions for the package.
+    """
+
+    def __getattr__(name: str) -> Any:  # noqa: ANN401, N807  # Module attributes of any type
+        module = exports.get(name)
+        if module is None:
+            msg = f"module {package!r} has no attribute {name!r}"
+            raise AttributeError(msg)
+        value = getattr(import_module(module), name)
+        # Cache on the package so later lookups skip `__getattr__`
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> list[str]:  # noqa: N807  # Module `__dir__`
+        return sorted({*vars(sys.modules[package]), *exports})
+
+    return __getattr__, __dir__
+
+
+__all__ = ["lazy_exports"]
@@ -1,14 +1,38 @@
-"""Memory backends for pluggable file storage."""
+"""Memory backends for pluggable file storage.
 
-from deepagents.backends.composite import CompositeBackend
-from deepagents.backends.filesystem import FilesystemBackend
-from deepagents.backends.local_shell import DEFAULT_EXECUTE_TIMEOUT, LocalShellBackend
-from deepagents.backends.protocol import BackendProtocol
-from deepagents.backends.state import StateBackend
-from deepagents.backends.store import (
-    BackendContext,
-    NamespaceFactory,
-    StoreBackend,
+Backends are imported on first use, so importing one backend does not load the others.
+"""
+
+from typing import TYPE_CHECKING
+
+from deepagents._lazy_imports import lazy_exports
+
+if TYPE_CHECKING:
+    from deepagents.backends.composite import CompositeBackend
+    from deepagents.backends.filesystem import FilesystemBackend
+    from deepagents.backends.local_shell import DEFAULT_EXECUTE_TIMEOUT, LocalShellBackend, ShellSession
+    from deepagents.backends.protocol import BackendProtocol
+    from deepagents.backends.state import StateBackend
+    from deepagents.backends.store import (
+        BackendContext,
+        NamespaceFactory,
+        StoreBackend,
+    )
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "DEFAULT_EXECUTE_TIMEOUT": "deepagents.backends.local_shell",
+        "BackendContext": "deepagents.backends.store",
+        "BackendProtocol": "deepagents.backends.protocol",
+        "CompositeBackend": "deepagents.backends.composite",
+        "FilesystemBackend": "deepagents.backends.filesystem",
+        "LocalShellBackend": "deepagents.backends.local_shell",
+        "NamespaceFactory": "deepagents.backends.store",
+        "ShellSession": "deepagents.backends.local_shell",
+        "StateBackend": "deepagents.backends.state",
+        "StoreBackend": "deepagents.backends.store",
+    },
 )
 
 __all__ = [
@@ -19,6 +43,7 @@ __all__ = [
     "FilesystemBackend",
     "LocalShellBackend",
     "NamespaceFactory",
+    "ShellSession",
     "StateBackend",
     "StoreBackend",
 ]
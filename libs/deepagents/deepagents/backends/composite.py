@@ -19,10 +19,12 @@ Examples:
 """
 
 from collections import defaultdict
+from collections.abc import Sequence
 from typing import cast
 
 from deepagents.backends.protocol import (
     BackendProtocol,
+    EditOperation,
     EditResult,
     ExecuteResponse,
     FileDownloadResponse,
@@ -502,6 +504,54 @@ class CompositeBackend(BackendProtocol):
                 pass
         return res
 
+    def edit_many(
+        self,
+        file_path: str,
+        edits: Sequence[EditOperation],
+    ) -> EditResult:
+        """Apply several string replacements to a file, routing to appropriate backend.
+
+        Args:
+            file_path: Absolute file path.
+            edits: `(old_string, new_string, replace_all)` tuples, applied in order.
+
+        Returns:
+            Success message or Command object, or error message on failure.
+        """
+        backend, stripped_key = self._get_backend_and_key(file_path)
+        res = backend.edit_many(stripped_key, edits)
+        if res.files_update:
+            try:
+                runtime = getattr(self.default, "runtime", None)
+                if runtime is not None:
+                    state = runtime.state
+                    files = state.get("files", {})
+                    files.update(res.files_update)
+                    state["files"] = files
+            except Exception:  # noqa: BLE001, S110  # Intentional for best-effort state sync
+                pass
+        return res
+
+    async def aedit_many(
+        self,
+        file_path: str,
+        edits: Sequence[EditOperation],
+    ) -> EditResult:
+        """Async version of edit_many."""
+        backend, stripped_key = self._get_backend_and_key(file_path)
+        res = await backend.aedit_many(stripped_key, edits)
+        if res.files_update:
+            try:
+                runtime = getattr(self.default, "runtime", None)
+                if runtime is not None:
+                    state = runtime.state
+                    files = state.get("files", {})
+                    files.update(res.files_update)
+                    state["files"] = files
+            except Exception:  # noqa: BLE001, S110  # Intentional for best-effort state sync
+                pass
+        return res
+
     def execute(
         self,
         command: str,
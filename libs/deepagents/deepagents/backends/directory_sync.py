@@ -0,0 +1,293 @@
+"""Incremental, content-hash based sync of a local directory into a sandbox.
+
+`DirectorySync` pushes a local project into a sandbox directory and only transfers
+what changed since the last push:
+
+1. The local tree is hashed. Hashes are cached by size and modification time, so
+   repeated pushes from the same process only re-hash edited files.
+2. One `execute` call sends the local manifest to the sandbox, which compares it
+   with its own files and replies with a compact bitmap of the files that differ.
+   Manifests too large for a command line are uploaded as a file first.
+   The sandbox also caches its hashes by size and modification time. A file whose
+   permission bits changed is sent again so the sandbox copy gets the new mode.
+3. For large files that changed, chunks that are identical at the same offset in
+   the old remote copy are reused in the sandbox instead of being sent again.
+4. The differing files are sent with `SandboxTransfer`.
+
+```python
+from deepagents.backends.directory_sync import DirectorySync
+
+result = DirectorySync(sandbox, "./my-project", "/workspace").push()
+print(f"{len(result.uploaded)} uploaded, {result.unchanged} unchanged")
+```
+
+Re-entering a sandbox that already has the project costs a single `execute` call
+when nothing changed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fnmatch
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from deepagents.backends.transfer import _READ_REQUEST, SandboxTransfer, TransferResult, _file_mode, _Source
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from deepagents.backends.protocol import SandboxBackendProtocol
+
+DEFAULT_EXCLUDE = (".git", "__pycache__", "node_modules", ".venv", ".mypy_cache", ".pytest_cache", ".ruff_cache", ".DS_Store")
+"""File and directory name patterns skipped on both sides by default."""
+
+_DIFF_SCRIPT = (
+    _READ_REQUEST
+    + r"""
+import fnmatch, hashlib, stat
+
+root, exclude, chunk_size = req['root'], req['exclude'], req['chunk_size']
+
+def excluded(name):
+    return any(fnmatch.fnmatch(name, pattern) for pattern in exclude)
+
+def digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+try:
+    with open(req['cache']) as f:
+        cache = json.load(f)
+except (OSError, ValueError):
+    cache = {}
+
+remote, fresh = {}, {}
+os.makedirs(root, exist_ok=True)
+for dirpath, dirnames, filenames in os.walk(root):
+    dirnames[:] = [d for d in dirnames if not excluded(d)]
+    for name in filenames:
+        if excluded(name):
+            continue
+        path = os.path.join(dirpath, name)
+        rel = os.path.relpath(path, root).replace(os.sep, '/')
+        try:
+            st = os.stat(path)
+            key = [st.st_size, st.st_mtime_ns]
+            cached = cache.get(rel)
+            sha = cached[2] if cached and cached[:2] == key else digest(path)
+        except OSError:
+            continue
+        remote[rel] = (sha, stat.S_IMODE(st.st_mode))
+        fresh[rel] = key + [sha]
+
+names = sorted(req['files'])
+bits, seeded = 0, 0
+for i, rel in enumerate(names):
+    info = req['files'][rel]
+    sha, mode = remote.get(rel, (None, None))
+    if sha == info['sha256'] and info.get('mode') in (None, mode):
+        continue
+    bits |= 1 << i
+    if rel in remote and info.get('chunks'):
+        os.makedirs(info['dir'], exist_ok=True)
+        with open(os.path.join(root, rel), 'rb') as f:
+            for index, expected in enumerate(info['chunks']):
+                block = f.read(chunk_size)
+                if not block:
+                    break
+                if hashlib.sha256(block).hexdigest() == expected:
+                    with open(os.path.join(info['dir'], str(index)), 'wb') as out:
+                        out.write(block)
+                    seeded += 1
+
+deleted = 0
+if req['delete']:
+    for rel in set(remote) - set(req['files']):
+        try:
+            os.remove(os.path.join(root, rel))
+            fresh.pop(rel, None)
+            deleted += 1
+        except OSError:
+            pass
+
+os.makedirs(os.path.dirname(req['cache']), exist_ok=True)
+with open(req['cache'], 'w') as f:
+    json.dump(fresh, f)
+print(json.dumps({'changed': format(bits, 'x'), 'deleted': deleted, 'seeded': seeded}))
+"""
+)
+
+
+@dataclass
+class SyncResult:
+    """Outcome of a `DirectorySync` push.
+
+    Attributes:
+        uploaded: Relative paths of the files that were transferred.
+        unchanged: Number of files that already matched in the sandbox.
+        deleted: Number of sandbox files removed because they no longer exist locally.
+        reused_chunks: Chunks of changed large files that were rebuilt from the old
+            copy in the sandbox instead of being sent.
+        errors: Transfer error code per relative path, for files that failed.
+    """
+
+    uploaded: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    deleted: int = 0
+    reused_chunks: int = 0
+    errors: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class _LocalFile:
+    size: int
+    mtime_ns: int
+    sha256: str
+    chunks: list[str]
+    mode: int | None
+
+
+class DirectorySync:
+    """Push a local directory into a sandbox, transferring only changed files.
+
+    Args:
+        backend: Sandbox to push into.
+        local_dir: Local directory to push.
+        remote_dir: Absolute destination directory in the sandbox.
+        exclude: Name patterns of files and directories to skip, matched with
+            `fnmatch` against each path component. Applied to both sides.
+        delete: Remove sandbox files under `remote_dir` that don't exist locally.
+        transfer: Transfer engine used for changed files. Defaults to a
+            `SandboxTransfer` with default settings.
+    """
+
+    def __init__(
+        self,
+        backend: SandboxBackendProtocol,
+        local_dir: str | Path,
+        remote_dir: str,
+        *,
+        exclude: Sequence[str] = DEFAULT_EXCLUDE,
+        delete: bool = False,
+        transfer: SandboxTransfer | None = None,
+    ) -> None:
+        """Initialize the sync."""
+        if not remote_dir.startswith("/"):
+            msg = f"remote_dir must be absolute, got {remote_dir!r}"
+            raise ValueError(msg)
+        self.backend = backend
+        self.local_dir = Path(local_dir)
+        self.remote_dir = remote_dir.rstrip("/") or "/"
+        self.exclude = tuple(exclude)
+        self.delete = delete
+        self.transfer = transfer or SandboxTransfer(backend)
+        self._local_cache: dict[str, _LocalFile] = {}
+
+    def _excluded(self, name: str) -> bool:
+        return any(fnmatch.fnmatch(name, pattern) for pattern in self.exclude)
+
+    def _remote_path(self, rel: str) -> str:
+        return f"{self.remote_dir.rstrip('/')}/{rel}"
+
+    def _scan(self) -> dict[str, _LocalFile]:
+        """Hash the local tree, reusing cached hashes of files whose size and mtime are unchanged."""
+        chunk_size = self.transfer.chunk_size
+        files: dict[str, _LocalFile] = {}
+        for dirpath, dirnames, filenames in os.walk(self.local_dir):
+            dirnames[:] = [d for d in dirnames if not self._excluded(d)]
+            for name in filenames:
+                if self._excluded(name):
+                    continue
+                path = Path(dirpath) / name
+                rel = path.relative_to(self.local_dir).as_posix()
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                cached = self._local_cache.get(rel)
+                if cached is not None and (cached.size, cached.mtime_ns) == (st.st_size, st.st_mtime_ns):
+                    # chmod does not touch the mtime, so the mode is read on every scan
+                    cached.mode = _file_mode(st)
+                    files[rel] = cached
+                    continue
+                source = _Source(index=0, path=rel, data=path)
+                try:
+                    source.hash(chunk_size, chunked=st.st_size > self.transfer.pack_threshold)
+                except OSError:
+                    continue
+                files[rel] = _LocalFile(
+                    size=st.st_size, mtime_ns=st.st_mtime_ns, sha256=source.sha256, chunks=source.chunk_hashes, mode=_file_mode(st)
+                )
+        self._local_cache = files
+        return files
+
+    def _diff_request(self, files: dict[str, _LocalFile]) -> dict[str, Any]:
+        manifest: dict[str, dict[str, Any]] = {}
+        for rel, info in files.items():
+            entry: dict[str, Any] = {"sha256": info.sha256, "mode": info.mode}
+            if info.chunks:
+                entry["chunks"] = info.chunks
+                entry["dir"] = self.transfer.chunk_dir(self._remote_path(rel), info.sha256)
+            manifest[rel] = entry
+        root_key = hashlib.sha256(self.remote_dir.encode()).hexdigest()[:16]
+        return {
+            "root": self.remote_dir,
+            "files": manifest,
+            "exclude": list(self.exclude),
+            "delete": self.delete,
+            "cache": f"{self.transfer.staging_dir}/sync-{root_key}.json",
+            "chunk_size": self.transfer.chunk_size,
+        }
+
+    def _changed(self, files: dict[str, _LocalFile], output: str) -> tuple[list[str], dict[str, Any]]:
+        try:
+            reply = json.loads(output.strip().splitlines()[-1])
+        except (IndexError, json.JSONDecodeError) as e:
+            msg = f"Directory sync failed: {output.strip() or 'no output'}"
+            raise RuntimeError(msg) from e
+        bits = int(reply["changed"], 16)
+        return [rel for i, rel in enumerate(sorted(files)) if bits >> i & 1], reply
+
+    def _result(self, files: dict[str, _LocalFile], changed: list[str], reply: dict[str, Any], results: list[TransferResult]) -> SyncResult:
+        result = SyncResult(unchanged=len(files) - len(changed), deleted=reply["deleted"])
+        for rel, transferred in zip(changed, results, strict=True):
+            result.reused_chunks += transferred.chunks_reused
+            if transferred.error is None:
+                result.uploaded.append(rel)
+            else:
+                result.errors[rel] = transferred.error
+                # Re-hash next time in case the file changed during the transfer
+                self._local_cache.pop(rel, None)
+        return result
+
+    def push(self) -> SyncResult:
+        """Push the local directory into the sandbox.
+
+        Returns:
+            What was transferred, skipped and deleted.
+
+        Raises:
+            RuntimeError: If the sandbox could not compare the manifests.
+        """
+        files = self._scan()
+        changed, reply = self._changed(files, self.transfer._run_remote(_DIFF_SCRIPT, self._diff_request(files), "diff"))
+        results = self.transfer.upload([(self._remote_path(rel), self.local_dir / rel) for rel in changed]) if changed else []
+        return self._result(files, changed, reply, results)
+
+    async def apush(self) -> SyncResult:
+        """Async version of push."""
+        files = await asyncio.to_thread(self._scan)
+        changed, reply = self._changed(files, await self.transfer._arun_remote(_DIFF_SCRIPT, self._diff_request(files), "diff"))
+        results = await self.transfer.aupload([(self._remote_path(rel), self.local_dir / rel) for rel in changed]) if changed else []
+        return self._result(files, changed, reply, results)
+
+
+__all__ = ["DEFAULT_EXCLUDE", "DirectorySync", "SyncResult"]
@@ -1,18 +1,25 @@
 """`FilesystemBackend`: Read and write files directly from the filesystem."""
 
+import contextlib
+import errno
 import json
 import logging
 import os
 import re
+import stat
 import subprocess
+import uuid
 import warnings
+from collections.abc import Sequence
 from datetime import datetime
 from pathlib import Path
+from typing import Literal
 
 import wcmatch.glob as wcglob
 
 from deepagents.backends.protocol import (
     BackendProtocol,
+    EditOperation,
     EditResult,
     FileDownloadResponse,
     FileInfo,
@@ -23,11 +30,22 @@ from deepagents.backends.protocol import (
 from deepagents.backends.utils import (
     check_empty_content,
     format_content_with_line_numbers,
-    perform_string_replacement,
+    perform_string_replacements,
 )
 
 logger = logging.getLogger(__name__)
 
+Durability = Literal["none", "file", "dir"]
+"""How far `FilesystemBackend` goes to make a completed write survive a crash.
+
+- `"none"`: rely on the OS to flush the data. A crash can lose recent writes,
+    but never leaves a partially written file.
+- `"file"`: flush the file contents to disk (`fdatasync`) before it replaces the old file.
+- `"dir"`: also `fsync` the parent directory, so the rename itself is durable.
+"""
+
+_fdatasync = getattr(os, "fdatasync", os.fsync)
+
 
 class FilesystemBackend(BackendProtocol):
     """Backend that reads and writes files directly from the filesystem.
@@ -82,6 +100,7 @@ class FilesystemBackend(BackendProtocol):
         root_dir: str | Path | None = None,
         virtual_mode: bool | None = None,  # noqa: FBT001
         max_file_size_mb: int = 10,
+        durability: Durability = "none",
     ) -> None:
         """Initialize filesystem backend.
 
@@ -115,6 +134,13 @@ class FilesystemBackend(BackendProtocol):
                 grep's Python fallback search.
 
                 Files exceeding this limit are skipped during search. Defaults to 10 MB.
+            durability: How far writes go to survive a crash or power loss.
+
+                Writes are always atomic: content goes to a temporary file in the
+                same directory, which then replaces the target with `os.replace`, so
+                readers never see a partially written file. `"file"` also flushes the
+                data to disk before the rename, and `"dir"` additionally syncs the
+                parent directory. Each level is slower than the previous one.
         """
         self.cwd = Path(root_dir).resolve() if root_dir else Path.cwd()
         if virtual_mode is None:
@@ -131,6 +157,50 @@ class FilesystemBackend(BackendProtocol):
             virtual_mode = False
         self.virtual_mode = virtual_mode
         self.max_file_size_bytes = max_file_size_mb * 1024 * 1024
+        if durability not in {"none", "file", "dir"}:
+            msg = f"durability must be 'none', 'file' or 'dir', got {durability!r}"
+            raise ValueError(msg)
+        self.durability = durability
+
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        """Replace `path` with `data` through a temporary file in the same directory.
+
+        The permission bits of an existing file are kept. Symlinks are never
+        followed or replaced.
+
+        Raises:
+            OSError: If `path` is a symlink or the write fails. The target is
+                left untouched in that case.
+        """
+        try:
+            existing = path.lstat()
+        except FileNotFoundError:
+            existing = None
+        if existing is not None and stat.S_ISLNK(existing.st_mode):
+            raise OSError(errno.ELOOP, "Refusing to write through a symlink", str(path))
+
+        tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex[:12]}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_NOFOLLOW", 0), 0o644)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                if self.durability != "none":
+                    f.flush()
+                    _fdatasync(f.fileno())
+            if existing is not None:
+                tmp_path.chmod(stat.S_IMODE(existing.st_mode))
+            tmp_path.replace(path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                tmp_path.unlink()
+            raise
+
+        if self.durability == "dir" and os.name != "nt":
+            dir_fd = os.open(path.parent, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
 
     def _resolve_path(self, key: str) -> Path:
         """Resolve a file path with security checks.
@@ -357,13 +427,7 @@ class FilesystemBackend(BackendProtocol):
             # Create parent directories if needed
             resolved_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Prefer O_NOFOLLOW to avoid writing through symlinks
-            flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
-            if hasattr(os, "O_NOFOLLOW"):
-                flags |= os.O_NOFOLLOW
-            fd = os.open(resolved_path, flags, 0o644)
-            with os.fdopen(fd, "w", encoding="utf-8") as f:
-                f.write(content)
+            self._write_atomic(resolved_path, content.encode("utf-8"))
 
             return WriteResult(path=file_path, files_update=None)
         except (OSError, UnicodeEncodeError) as e:
@@ -390,6 +454,26 @@ class FilesystemBackend(BackendProtocol):
                 message if file not found or replacement fails. External storage sets
                 `files_update=None`.
         """
+        return self.edit_many(file_path, [(old_string, new_string, replace_all)])
+
+    def edit_many(
+        self,
+        file_path: str,
+        edits: Sequence[EditOperation],
+    ) -> EditResult:
+        """Apply several string replacements to a file with one read and one write.
+
+        The whole batch is validated in memory first, so the file is left
+        untouched if any edit fails.
+
+        Args:
+            file_path: Path to the file to edit.
+            edits: `(old_string, new_string, replace_all)` tuples, applied in order.
+
+        Returns:
+            `EditResult` with path and total occurrence count on success, or error
+                message if file not found or any replacement fails.
+        """
         resolved_path = self._resolve_path(file_path)
 
         if not resolved_path.exists() or not resolved_path.is_file():
@@ -401,20 +485,14 @@ class FilesystemBackend(BackendProtocol):
             with os.fdopen(fd, "r", encoding="utf-8") as f:
                 content = f.read()
 
-            result = perform_string_replacement(content, old_string, new_string, replace_all)
+            result = perform_string_replacements(content, edits)
 
             if isinstance(result, str):
                 return EditResult(error=result)
 
             new_content, occurrences = result
 
-            # Write securely
-            flags = os.O_WRONLY | os.O_TRUNC
-            if hasattr(os, "O_NOFOLLOW"):
-                flags |= os.O_NOFOLLOW
-            fd = os.open(resolved_path, flags)
-            with os.fdopen(fd, "w", encoding="utf-8") as f:
-                f.write(new_content)
+            self._write_atomic(resolved_path, new_content.encode("utf-8"))
 
             return EditResult(path=file_path, files_update=None, occurrences=int(occurrences))
         except (OSError, UnicodeDecodeError, UnicodeEncodeError) as e:
@@ -671,12 +749,7 @@ class FilesystemBackend(BackendProtocol):
                 # Create parent directories if needed
                 resolved_path.parent.mkdir(parents=True, exist_ok=True)
 
-                flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
-                if hasattr(os, "O_NOFOLLOW"):
-                    flags |= os.O_NOFOLLOW
-                fd = os.open(resolved_path, flags, 0o644)
-                with os.fdopen(fd, "wb") as f:
-                    f.write(content)
+                self._write_atomic(resolved_path, content)
 
                 responses.append(FileUploadResponse(path=path, error=None))
             except FileNotFoundError:
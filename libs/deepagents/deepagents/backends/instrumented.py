@@ -0,0 +1,560 @@
+"""Latency, byte and error metrics for backend operations.
+
+`instrument` wraps a backend so every file operation and command reports a
+`BackendOperation` event to one or more sinks:
+
+```python
+from deepagents.backends import CompositeBackend, StateBackend, StoreBackend
+from deepagents.backends.instrumented import InMemoryStats, JsonLogSink, instrument
+
+stats = InMemoryStats()
+backend = instrument(
+    CompositeBackend(default=StateBackend(runtime), routes={"/memories/": StoreBackend(runtime)}),
+    sinks=[stats, JsonLogSink()],
+)
+...
+for row in stats.summary():
+    print(row["operation"], row["route"], row["count"], row["p95"])
+```
+
+Sinks:
+
+- `InMemoryStats`: aggregates counts, bytes, errors, cache hits and a latency
+    histogram per backend, route and operation.
+- `MeterSink`: records into OpenTelemetry-style instruments created from any
+    meter exposing `create_histogram` and `create_counter`. OpenTelemetry itself
+    is not a dependency.
+- `JsonLogSink`: logs one JSON line per operation.
+
+Custom sinks subclass `MetricsSink`. Backends that serve a call from a cache can
+call `mark_cache_hit` so the event records it. Caches that sit above a backend and
+skip the call entirely, such as `SkillsRegistry` and `SubAgentResultCache`, report
+the call they served with `record_cache_hit`.
+"""
+
+from __future__ import annotations
+
+import abc
+import bisect
+import json
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from deepagents.backends.composite import CompositeBackend, _route_for_path
+from deepagents.backends.protocol import (
+    BackendProtocol,
+    EditOperation,
+    EditResult,
+    ExecuteResponse,
+    FileDownloadResponse,
+    FileInfo,
+    FileUploadResponse,
+    GrepMatch,
+    SandboxBackendProtocol,
+    WriteResult,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Sequence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+"""Upper bounds in seconds of the latency histogram buckets. A final bucket holds everything slower."""
+
+
+@dataclass(frozen=True)
+class BackendOperation:
+    """One completed backend call.
+
+    Attributes:
+        operation: Operation name without the async prefix, such as `"read"` or `"execute"`.
+        backend: Label of the instrumented backend.
+        route: Route prefix of the `CompositeBackend` route that served the call,
+            or `None` for the default backend and for non-composite backends.
+        duration: Wall-clock time of the call in seconds.
+        bytes_in: Bytes sent to the backend (written content, edit strings, commands, uploads).
+        bytes_out: Bytes returned by the backend (read content, command output, downloads).
+        error: Error reported by the backend, the exception type if it raised, or `None`.
+        cache_hit: `True` if the backend marked the call as served from a cache.
+    """
+
+    operation: str
+    backend: str
+    route: str | None
+    duration: float
+    bytes_in: int = 0
+    bytes_out: int = 0
+    error: str | None = None
+    cache_hit: bool = False
+
+
+class MetricsSink(abc.ABC):
+    """Destination for `BackendOperation` events."""
+
+    @abc.abstractmethod
+    def record(self, event: BackendOperation) -> None:
+        """Record one operation. Called synchronously after every instrumented call."""
+
+
+@dataclass
+class OperationStats:
+    """Aggregated metrics for one backend, route and operation."""
+
+    count: int = 0
+    errors: int = 0
+    cache_hits: int = 0
+    bytes_in: int = 0
+    bytes_out: int = 0
+    total_duration: float = 0.0
+    max_duration: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(DEFAULT_LATENCY_BUCKETS) + 1))
+
+    def quantile(self, q: float) -> float:
+        """Estimate a latency quantile from the histogram.
+
+        Args:
+            q: Quantile between 0 and 1.
+
+        Returns:
+            Upper bound of the bucket holding the quantile, capped at the slowest
+            observed call. 0.0 when nothing was recorded.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, bucket in zip((*DEFAULT_LATENCY_BUCKETS, self.max_duration), self.buckets, strict=True):
+            seen += bucket
+            if seen >= rank:
+                return min(bound, self.max_duration)
+        return self.max_duration
+
+
+class InMemoryStats(MetricsSink):
+    """In-process aggregation of backend metrics. Thread-safe."""
+
+    def __init__(self) -> None:
+        """Initialize empty stats."""
+        self._stats: dict[tuple[str, str | None, str], OperationStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, event: BackendOperation) -> None:
+        """Add an operation to the aggregates."""
+        key = (event.backend, event.route, event.operation)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = OperationStats()
+            stats.count += 1
+            stats.errors += event.error is not None
+            stats.cache_hits += event.cache_hit
+            stats.bytes_in += event.bytes_in
+            stats.bytes_out += event.bytes_out
+            stats.total_duration += event.duration
+            stats.max_duration = max(stats.max_duration, event.duration)
+            stats.buckets[bisect.bisect_left(DEFAULT_LATENCY_BUCKETS, event.duration)] += 1
+
+    def snapshot(self) -> dict[tuple[str, str | None, str], OperationStats]:
+        """Return a copy of the aggregates keyed by `(backend, route, operation)`."""
+        with self._lock:
+            return {key: OperationStats(**{**asdict(stats), "buckets": list(stats.buckets)}) for key, stats in self._stats.items()}
+
+    def summary(self) -> list[dict[str, Any]]:
+        """Return one JSON-serializable row per backend, route and operation, slowest total first."""
+        rows = [
+            {
+                "backend": backend,
+                "route": route,
+                "operation": operation,
+                "count": stats.count,
+                "errors": stats.errors,
+                "cache_hits": stats.cache_hits,
+                "bytes_in": stats.bytes_in,
+                "bytes_out": stats.bytes_out,
+                "total": stats.total_duration,
+                "mean": stats.total_duration / stats.count,
+                "p50": stats.quantile(0.5),
+                "p95": stats.quantile(0.95),
+                "max": stats.max_duration,
+            }
+            for (backend, route, operation), stats in self.snapshot().items()
+        ]
+        return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+    def reset(self) -> None:
+        """Drop all aggregates."""
+        with self._lock:
+            self._stats.clear()
+
+
+class MeterSink(MetricsSink):
+    """Record operations into OpenTelemetry-style instruments.
+
+    Works with an `opentelemetry.metrics.Meter` or any object with the same
+    `create_histogram(name, unit=..., description=...)` and
+    `create_counter(name, unit=..., description=...)` methods.
+
+    Instruments, all with `backend`, `route` and `operation` attributes:
+
+    - `{prefix}.duration` (histogram, seconds)
+    - `{prefix}.bytes_in` / `{prefix}.bytes_out` (counters, bytes)
+    - `{prefix}.errors` (counter, with an extra `error` attribute)
+    - `{prefix}.cache_hits` (counter)
+    """
+
+    def __init__(self, meter: Any, *, prefix: str = "deepagents.backend") -> None:  # noqa: ANN401  # Duck-typed OpenTelemetry meter
+        """Create the instruments on `meter`."""
+        self._duration = meter.create_histogram(f"{prefix}.duration", unit="s", description="Backend operation latency")
+        self._bytes_in = meter.create_counter(f"{prefix}.bytes_in", unit="By", description="Bytes sent to the backend")
+        self._bytes_out = meter.create_counter(f"{prefix}.bytes_out", unit="By", description="Bytes returned by the backend")
+        self._errors = meter.create_counter(f"{prefix}.errors", unit="1", description="Failed backend operations")
+        self._cache_hits = meter.create_counter(f"{prefix}.cache_hits", unit="1", description="Backend operations served from a cache")
+
+    def record(self, event: BackendOperation) -> None:
+        """Record the operation on each instrument."""
+        attributes = {"backend": event.backend, "route": event.route or "", "operation": event.operation}
+        self._duration.record(event.duration, attributes=attributes)
+        if event.bytes_in:
+            self._bytes_in.add(event.bytes_in, attributes=attributes)
+        if event.bytes_out:
+            self._bytes_out.add(event.bytes_out, attributes=attributes)
+        if event.error is not None:
+            self._errors.add(1, attributes={**attributes, "error": event.error})
+        if event.cache_hit:
+            self._cache_hits.add(1, attributes=attributes)
+
+
+class JsonLogSink(MetricsSink):
+    """Log each operation as a single JSON line."""
+
+    def __init__(self, log: logging.Logger | None = None, *, level: int = logging.INFO) -> None:
+        """Initialize the sink.
+
+        Args:
+            log: Logger to write to. Defaults to this module's logger.
+            level: Log level of the records.
+        """
+        self._logger = log or logger
+        self._level = level
+
+    def record(self, event: BackendOperation) -> None:
+        """Log the operation."""
+        if self._logger.isEnabledFor(self._level):
+            self._logger.log(self._level, json.dumps(asdict(event), separators=(",", ":")))
+
+
+_cache_hit: ContextVar[list[bool] | None] = ContextVar("deepagents_backend_cache_hit", default=None)
+
+
+def mark_cache_hit() -> None:
+    """Mark the backend call currently being instrumented as served from a cache.
+
+    Call it from inside a backend method. Does nothing when the call is not instrumented.
+    """
+    flag = _cache_hit.get()
+    if flag is not None:
+        flag[0] = True
+
+
+def record_cache_hit(backend: BackendProtocol | None, operation: str, path: str | None = None) -> None:
+    """Report a call that a cache above `backend` served without calling it.
+
+    Emits a zero-duration `BackendOperation` with `cache_hit=True` when `backend` is
+    instrumented, and does nothing otherwise.
+
+    Args:
+        backend: Backend the call would have gone to.
+        operation: Name of the operation the cache served.
+        path: Path of the call, used to attribute it to a `CompositeBackend` route.
+    """
+    if isinstance(backend, InstrumentedBackend):
+        backend._emit(BackendOperation(operation, backend.name, backend._route(path), 0.0, cache_hit=True))
+
+
+def _size(text: str) -> int:
+    return len(text.encode("utf-8", errors="replace"))
+
+
+def _result_error(result: object) -> str | None:
+    if isinstance(result, (WriteResult, EditResult)):
+        return result.error
+    if isinstance(result, str):
+        # read and grep_raw report failures as strings
+        return result if result.startswith("Error") else None
+    if isinstance(result, list):
+        errors = [item.error for item in result if isinstance(item, (FileUploadResponse, FileDownloadResponse)) and item.error]
+        return errors[0] if errors else None
+    return None
+
+
+def _grep_size(result: list[GrepMatch] | str) -> int:
+    if isinstance(result, str):
+        return 0
+    return sum(_size(match["text"]) for match in result)
+
+
+class InstrumentedBackend(BackendProtocol):
+    """Backend wrapper that reports every operation to metrics sinks.
+
+    Use `instrument` to create one; it picks `InstrumentedSandbox` when the
+    wrapped backend can execute commands. Attributes not defined here, such as
+    `runtime` or `sorted_routes`, are read from the wrapped backend.
+
+    Args:
+        backend: Backend to instrument.
+        sinks: Sinks receiving one `BackendOperation` per call.
+        name: Label reported as `BackendOperation.backend`. Defaults to the
+            class name of the wrapped backend.
+    """
+
+    def __init__(self, backend: BackendProtocol, *, sinks: Sequence[MetricsSink], name: str | None = None) -> None:
+        """Initialize the wrapper."""
+        self.backend = backend
+        self.sinks = list(sinks)
+        self.name = name or type(backend).__name__
+
+    def __getattr__(self, name: str) -> Any:  # noqa: ANN401  # Transparent proxy
+        """Read attributes not defined on the wrapper from the wrapped backend."""
+        if name == "backend":
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    def _route(self, path: str | None) -> str | None:
+        if path is None or not isinstance(self.backend, CompositeBackend):
+            return None
+        return _route_for_path(default=self.backend.default, sorted_routes=self.backend.sorted_routes, path=path)[2]
+
+    def _emit(self, event: BackendOperation) -> None:
+        for sink in self.sinks:
+            try:
+                sink.record(event)
+            except Exception:
+                logger.exception("Metrics sink %r failed", sink)
+
+    def _call(
+        self,
+        operation: str,
+        path: str | None,
+        call: Callable[[], Any],
+        *,
+        bytes_in: int = 0,
+        bytes_out: Callable[[Any], int] | None = None,
+    ) -> Any:  # noqa: ANN401  # Returns whatever the wrapped call returns
+        flag = [False]
+        token = _cache_hit.set(flag)
+        start = time.perf_counter()
+        try:
+            result = call()
+        except Exception as e:
+            self._emit(BackendOperation(operation, self.name, self._route(path), time.perf_counter() - start, bytes_in, error=type(e).__name__))
+            raise
+        finally:
+            _cache_hit.reset(token)
+        duration = time.perf_counter() - start
+        size = bytes_out(result) if bytes_out is not None else 0
+        self._emit(BackendOperation(operation, self.name, self._route(path), duration, bytes_in, size, _result_error(result), flag[0]))
+        return result
+
+    async def _acall(
+        self,
+        operation: str,
+        path: str | None,
+        call: Callable[[], Awaitable[Any]],
+        *,
+        bytes_in: int = 0,
+        bytes_out: Callable[[Any], int] | None = None,
+    ) -> Any:  # noqa: ANN401  # Returns whatever the wrapped call returns
+        flag = [False]
+        token = _cache_hit.set(flag)
+        start = time.perf_counter()
+        try:
+            result = await call()
+        except Exception as e:
+            self._emit(BackendOperation(operation, self.name, self._route(path), time.perf_counter() - start, bytes_in, error=type(e).__name__))
+            raise
+        finally:
+            _cache_hit.reset(token)
+        duration = time.perf_counter() - start
+        size = bytes_out(result) if bytes_out is not None else 0
+        self._emit(BackendOperation(operation, self.name, self._route(path), duration, bytes_in, size, _result_error(result), flag[0]))
+        return result
+
+    def ls_info(self, path: str) -> list[FileInfo]:
+        """List directory contents."""
+        return self._call("ls_info", path, lambda: self.backend.ls_info(path))
+
+    async def als_info(self, path: str) -> list[FileInfo]:
+        """Async version of ls_info."""
+        return await self._acall("ls_info", path, lambda: self.backend.als_info(path))
+
+    def read(self, file_path: str, offset: int = 0, limit: int = 2000) -> str:
+        """Read file content."""
+        return self._call("read", file_path, lambda: self.backend.read(file_path, offset, limit), bytes_out=_size)
+
+    async def aread(self, file_path: str, offset: int = 0, limit: int = 2000) -> str:
+        """Async version of read."""
+        return await self._acall("read", file_path, lambda: self.backend.aread(file_path, offset, limit), bytes_out=_size)
+
+    def grep_raw(self, pattern: str, path: str | None = None, glob: str | None = None) -> list[GrepMatch] | str:
+        """Search file contents for a literal pattern."""
+        return self._call("grep_raw", path, lambda: self.backend.grep_raw(pattern, path, glob), bytes_out=_grep_size)
+
+    async def agrep_raw(self, pattern: str, path: str | None = None, glob: str | None = None) -> list[GrepMatch] | str:
+        """Async version of grep_raw."""
+        return await self._acall("grep_raw", path, lambda: self.backend.agrep_raw(pattern, path, glob), bytes_out=_grep_size)
+
+    def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
+        """Find files matching a glob pattern."""
+        return self._call("glob_info", path, lambda: self.backend.glob_info(pattern, path))
+
+    async def aglob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
+        """Async version of glob_info."""
+        return await self._acall("glob_info", path, lambda: self.backend.aglob_info(pattern, path))
+
+    def write(self, file_path: str, content: str) -> WriteResult:
+        """Create a new file."""
+        return self._call("write", file_path, lambda: self.backend.write(file_path, content), bytes_in=_size(content))
+
+    async def awrite(self, file_path: str, content: str) -> WriteResult:
+        """Async version of write."""
+        return await self._acall("write", file_path, lambda: self.backend.awrite(file_path, content), bytes_in=_size(content))
+
+    def edit(
+        self,
+        file_path: str,
+        old_string: str,
+        new_string: str,
+        replace_all: bool = False,  # noqa: FBT001, FBT002
+    ) -> EditResult:
+        """Replace text in a file."""
+        size = _size(old_string) + _size(new_string)
+        return self._call("edit", file_path, lambda: self.backend.edit(file_path, old_string, new_string, replace_all), bytes_in=size)
+
+    async def aedit(
+        self,
+        file_path: str,
+        old_string: str,
+        new_string: str,
+        replace_all: bool = False,  # noqa: FBT001, FBT002
+    ) -> EditResult:
+        """Async version of edit."""
+        size = _size(old_string) + _size(new_string)
+        return await self._acall("edit", file_path, lambda: self.backend.aedit(file_path, old_string, new_string, replace_all), bytes_in=size)
+
+    def edit_many(self, file_path: str, edits: Sequence[EditOperation]) -> EditResult:
+        """Apply several replacements to a file."""
+        size = sum(_size(old) + _size(new) for old, new, _ in edits)
+        return self._call("edit_many", file_path, lambda: self.backend.edit_many(file_path, edits), bytes_in=size)
+
+    async def aedit_many(self, file_path: str, edits: Sequence[EditOperation]) -> EditResult:
+        """Async version of edit_many."""
+        size = sum(_size(old) + _size(new) for old, new, _ in edits)
+        return await self._acall("edit_many", file_path, lambda: self.backend.aedit_many(file_path, edits), bytes_in=size)
+
+    @staticmethod
+    def _batch_path(paths: list[str]) -> str | None:
+        # A batch is attributed to a route only when it has a single path
+        return paths[0] if len(paths) == 1 else None
+
+    def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        """Upload files."""
+        path = self._batch_path([path for path, _ in files])
+        size = sum(len(content) for _, content in files)
+        return self._call("upload_files", path, lambda: self.backend.upload_files(files), bytes_in=size)
+
+    async def aupload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        """Async version of upload_files."""
+        path = self._batch_path([path for path, _ in files])
+        size = sum(len(content) for _, content in files)
+        return await self._acall("upload_files", path, lambda: self.backend.aupload_files(files), bytes_in=size)
+
+    @staticmethod
+    def _download_size(responses: list[FileDownloadResponse]) -> int:
+        return sum(len(response.content) for response in responses if response.content is not None)
+
+    def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        """Download files."""
+        return self._call("download_files", self._batch_path(paths), lambda: self.backend.download_files(paths), bytes_out=self._download_size)
+
+    async def adownload_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        """Async version of download_files."""
+        return await self._acall(
+            "download_files", self._batch_path(paths), lambda: self.backend.adownload_files(paths), bytes_out=self._download_size
+        )
+
+
+class InstrumentedSandbox(InstrumentedBackend, SandboxBackendProtocol):
+    """`InstrumentedBackend` for backends that can execute commands.
+
+    Also reports `execute` calls. Command exit codes are not treated as errors.
+    `timeout` is only forwarded when set, so sandboxes without per-command
+    timeout support keep working.
+    """
+
+    @property
+    def id(self) -> str:
+        """ID of the wrapped sandbox."""
+        return self.backend.id
+
+    def execute(self, command: str, *, timeout: int | None = None) -> ExecuteResponse:
+        """Execute a command in the wrapped sandbox."""
+        backend: Any = self.backend
+        return self._call(
+            "execute",
+            None,
+            lambda: backend.execute(command) if timeout is None else backend.execute(command, timeout=timeout),
+            bytes_in=_size(command),
+            bytes_out=lambda response: _size(response.output),
+        )
+
+    async def aexecute(self, command: str, *, timeout: int | None = None) -> ExecuteResponse:  # noqa: ASYNC109  # Forwarded to the wrapped backend
+        """Async version of execute."""
+        backend: Any = self.backend
+        return await self._acall(
+            "execute",
+            None,
+            lambda: backend.aexecute(command) if timeout is None else backend.aexecute(command, timeout=timeout),
+            bytes_in=_size(command),
+            bytes_out=lambda response: _size(response.output),
+        )
+
+
+def instrument(backend: BackendProtocol, *, sinks: Sequence[MetricsSink], name: str | None = None) -> InstrumentedBackend:
+    """Wrap a backend so its operations are reported to metrics sinks.
+
+    Args:
+        backend: Backend to instrument.
+        sinks: Sinks receiving one `BackendOperation` per call.
+        name: Label reported for the backend. Defaults to its class name.
+
+    Returns:
+        An `InstrumentedSandbox` when `backend` can execute commands (directly,
+        or through the default backend of a `CompositeBackend`), otherwise an
+        `InstrumentedBackend`.
+    """
+    executes = isinstance(backend, SandboxBackendProtocol) or (
+        isinstance(backend, CompositeBackend) and isinstance(backend.default, SandboxBackendProtocol)
+    )
+    cls = InstrumentedSandbox if executes else InstrumentedBackend
+    return cls(backend, sinks=sinks, name=name)
+
+
+__all__ = [
+    "DEFAULT_LATENCY_BUCKETS",
+    "BackendOperation",
+    "InMemoryStats",
+    "InstrumentedBackend",
+    "InstrumentedSandbox",
+    "JsonLogSink",
+    "MeterSink",
+    "MetricsSink",
+    "OperationStats",
+    "instrument",
+    "mark_cache_hit",
+    "record_cache_hit",
+]
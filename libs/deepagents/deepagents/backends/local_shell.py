@@ -7,22 +7,470 @@ on the host machine with full system access.
 
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import os
+import queue
+import select
+import shlex
+import shutil
+import signal
 import subprocess
+import threading
+import time
 import uuid
 import warnings
-from typing import TYPE_CHECKING
+import weakref
+from typing import IO, TYPE_CHECKING
 
 from deepagents.backends.filesystem import FilesystemBackend
 from deepagents.backends.protocol import ExecuteResponse, SandboxBackendProtocol
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
     from pathlib import Path
 
 
 DEFAULT_EXECUTE_TIMEOUT = 120
 """Default timeout in seconds for shell command execution."""
 
+_READ_CHUNK_SIZE = 64 * 1024
+
+# How long to keep draining pipes after a timed out command is killed. Background
+# processes it started may still hold the pipes open.
+_DRAIN_GRACE_SECONDS = 1.0
+
+_EXIT_POLL_SECONDS = 0.1
+
+
+class _OutputCapture:
+    """Bounded capture of one output stream.
+
+    Keeps the first and last `limit // 2` bytes and counts the rest, so memory
+    stays bounded however much a command prints.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self._head_limit = limit // 2
+        self._tail_limit = limit - self._head_limit
+        self._head = bytearray()
+        self._tail = bytearray()
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def write(self, chunk: bytes) -> None:
+        with self._lock:
+            self.total += len(chunk)
+            if len(self._head) < self._head_limit:
+                take = self._head_limit - len(self._head)
+                self._head += chunk[:take]
+                chunk = chunk[take:]
+            self._tail += chunk
+            # Trim lazily so the amortized cost of dropping bytes stays linear
+            if len(self._tail) > 2 * self._tail_limit:
+                del self._tail[: len(self._tail) - self._tail_limit]
+
+    def snapshot(self) -> _OutputCapture:
+        """Return a copy that later writes don't change, for formatting."""
+        copy = _OutputCapture(self._head_limit + self._tail_limit)
+        with self._lock:
+            copy._head = bytearray(self._head)
+            copy._tail = bytearray(self._tail)
+            copy.total = self.total
+        return copy
+
+    def render(self, budget: int) -> tuple[str, str, int]:
+        """Return the head and tail that fit in `budget` bytes and the number of bytes dropped."""
+        data = bytes(self._head + self._tail)
+        if self.total <= budget:
+            return _decode(data), "", 0
+        # The retained head and tail each hold at least half of any budget up to `limit`
+        head_size = budget // 2
+        tail_size = budget - head_size
+        return _decode(data[:head_size]), _decode(data[len(data) - tail_size :]), self.total - budget
+
+
+def _decode(data: bytes) -> str:
+    return data.decode("utf-8", errors="replace").replace("\r\n", "\n")
+
+
+def _drain(pipe: IO[bytes], capture: _OutputCapture, stop: threading.Event) -> None:
+    """Read `pipe` to EOF, or until `stop` is set, so the child never blocks on a full pipe."""
+    with contextlib.suppress(OSError, ValueError):
+        if os.name != "posix":
+            # Pipes can't be polled on Windows; read until EOF
+            while chunk := pipe.read1(_READ_CHUNK_SIZE):  # ty: ignore[unresolved-attribute]
+                capture.write(chunk)
+            return
+        fd = pipe.fileno()
+        while not stop.is_set():
+            ready, _, _ = select.select([fd], [], [], _EXIT_POLL_SECONDS)
+            if not ready:
+                continue
+            chunk = os.read(fd, _READ_CHUNK_SIZE)
+            if not chunk:
+                return
+            capture.write(chunk)
+
+
+async def _adrain(stream: asyncio.StreamReader, capture: _OutputCapture) -> None:
+    """Async version of `_drain`."""
+    while chunk := await stream.read(_READ_CHUNK_SIZE):
+        capture.write(chunk)
+
+
+def _wait_for_exit(process: subprocess.Popen[bytes], stdout: _OutputCapture, stderr: _OutputCapture, time_limit: float) -> int | None:
+    """Drain the output pipes of `process` until it exits, killing it after `time_limit` seconds.
+
+    Returns:
+        The exit code, or `None` if the command timed out.
+    """
+    stop = threading.Event()
+    pipes = ((process.stdout, stdout), (process.stderr, stderr))
+    # Drain both pipes concurrently; reading one at a time can deadlock when the other fills up
+    readers = [threading.Thread(target=_drain, args=(pipe, capture, stop), daemon=True) for pipe, capture in pipes]
+    for reader in readers:
+        reader.start()
+    try:
+        returncode = process.wait(timeout=time_limit)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+        returncode = None
+    finally:
+        # Pipes stay open while background processes started by the command are running
+        drain_deadline = time.monotonic() + _DRAIN_GRACE_SECONDS
+        for reader in readers:
+            reader.join(max(0.0, drain_deadline - time.monotonic()))
+        stop.set()
+        for reader, (pipe, _) in zip(readers, pipes, strict=True):
+            reader.join(2 * _EXIT_POLL_SECONDS)
+            if not reader.is_alive():
+                # Close our end even if background processes still hold the other one
+                pipe.close()  # ty: ignore[possibly-missing-attribute]
+    return returncode
+
+
+def _output_pipe() -> tuple[IO[bytes], int]:
+    """Return the read end of a new pipe as an unbuffered file object, and its write end."""
+    read_fd, write_fd = os.pipe()
+    return os.fdopen(read_fd, "rb", buffering=0), write_fd
+
+
+async def _aconnect(pipe: IO[bytes], capture: _OutputCapture) -> tuple[asyncio.BaseTransport, asyncio.Future[None]]:
+    """Start draining `pipe` into `capture` on the event loop."""
+    stream = asyncio.StreamReader(limit=_READ_CHUNK_SIZE)
+    transport, _ = await asyncio.get_running_loop().connect_read_pipe(lambda: asyncio.StreamReaderProtocol(stream), pipe)
+    return transport, asyncio.ensure_future(_adrain(stream, capture))
+
+
+async def _await_exit(
+    process: asyncio.subprocess.Process,
+    outputs: Sequence[tuple[IO[bytes], _OutputCapture]],
+    time_limit: float,
+) -> int | None:
+    """Drain the output pipes of `process` until it exits, killing it after `time_limit` seconds.
+
+    Args:
+        process: The running command.
+        outputs: Read end of each output pipe of the command and the capture it is drained into.
+            The pipes are closed on return.
+        time_limit: Seconds to wait for the command.
+
+    Returns:
+        The exit code, or `None` if the command timed out.
+    """
+    transports: list[asyncio.BaseTransport] = []
+    readers: set[asyncio.Future[None]] = set()
+    timed_out = False
+    try:
+        for pipe, capture in outputs:
+            transport, reader = await _aconnect(pipe, capture)
+            transports.append(transport)
+            readers.add(reader)
+        # The pipes aren't owned by `process`, so this waits for the exit only, not for
+        # background processes started by the command to close them
+        try:
+            await asyncio.wait_for(process.wait(), timeout=time_limit)
+        except TimeoutError:
+            timed_out = True
+            process.kill()
+        await asyncio.wait(readers, timeout=_DRAIN_GRACE_SECONDS)
+    finally:
+        for reader in readers:
+            reader.cancel()
+        # Release pipes still held open by background processes
+        for transport in transports:
+            transport.close()
+        for pipe, _ in outputs:
+            pipe.close()
+        if process.returncode is None:
+            # The caller was cancelled or reading failed
+            with contextlib.suppress(ProcessLookupError):
+                process.kill()
+    if timed_out:
+        return None
+    return await process.wait()
+
+
+def _truncation_notice(dropped: int) -> str:
+    return f"... Output truncated, {dropped} bytes dropped ..."
+
+
+def _format_output(stdout: _OutputCapture, stderr: _OutputCapture, returncode: int, max_output_bytes: int) -> ExecuteResponse:
+    """Combine captured stdout and stderr into an `ExecuteResponse`.
+
+    When the output exceeds `max_output_bytes`, the beginning and end of each
+    stream are kept and the number of dropped bytes is reported in their place.
+    """
+    stderr_budget = min(stderr.total, max(max_output_bytes // 2, max_output_bytes - stdout.total))
+    stdout_budget = min(stdout.total, max_output_bytes - stderr_budget)
+
+    # Combine stdout and stderr
+    # Prefix each stderr line with [stderr] for clear attribution.
+    # Example: "hello\n[stderr] error: file not found"  # noqa: ERA001
+    output_parts = []
+    dropped = 0
+    head, tail, stdout_dropped = stdout.render(stdout_budget)
+    if stdout_dropped:
+        output_parts.append(f"{head}\n{_truncation_notice(stdout_dropped)}\n{tail}")
+    elif head:
+        output_parts.append(head)
+    dropped += stdout_dropped
+
+    head, tail, stderr_dropped = stderr.render(stderr_budget)
+    if stderr_dropped:
+        output_parts.extend(f"[stderr] {line}" for line in head.rstrip("\n").split("\n") if line)
+        output_parts.append(_truncation_notice(stderr_dropped))
+        output_parts.extend(f"[stderr] {line}" for line in tail.strip("\n").split("\n") if line)
+    elif head.strip():
+        output_parts.extend(f"[stderr] {line}" for line in head.strip().split("\n"))
+    dropped += stderr_dropped
+
+    output = "\n".join(output_parts) if output_parts else "<no output>"
+
+    # Add exit code info if non-zero
+    if returncode != 0:
+        output = f"{output.rstrip()}\n\nExit code: {returncode}"
+
+    return ExecuteResponse(
+        output=output,
+        exit_code=returncode,
+        truncated=dropped > 0,
+    )
+
+
+class _SentinelScanner:
+    """Split one output stream of a `ShellSession` at the sentinel ending a command."""
+
+    def __init__(self, sentinel: bytes, capture: _OutputCapture) -> None:
+        self._sentinel = sentinel
+        self._capture = capture
+        self._pending = b""
+        self._trailer: bytes | None = None
+
+    @property
+    def done(self) -> bool:
+        return self._trailer is not None and b"\n" in self._trailer
+
+    @property
+    def trailer(self) -> bytes:
+        """Text the shell printed after the sentinel on the same line."""
+        return (self._trailer or b"").split(b"\n", 1)[0]
+
+    def feed(self, chunk: bytes) -> None:
+        if self._trailer is not None:
+            self._trailer += chunk
+            return
+        data = self._pending + chunk
+        index = data.find(self._sentinel)
+        if index >= 0:
+            self._capture.write(data[:index])
+            self._trailer = data[index + len(self._sentinel) :]
+            self._pending = b""
+            return
+        # Hold back a possible partial sentinel at the end of the chunk
+        keep = len(self._sentinel) - 1
+        self._capture.write(data[: len(data) - keep])
+        self._pending = data[len(data) - keep :]
+
+    def flush(self) -> None:
+        """Write held back bytes to the capture when the stream ended without a sentinel."""
+        self._capture.write(self._pending)
+        self._pending = b""
+
+
+def _pump(pipe: IO[bytes], index: int, events: queue.SimpleQueue[tuple[int, bytes | None]]) -> None:
+    """Forward chunks read from `pipe` to `events`, then `None` at EOF."""
+    try:
+        with contextlib.suppress(OSError, ValueError):
+            while chunk := pipe.read1(_READ_CHUNK_SIZE):  # ty: ignore[unresolved-attribute]
+                events.put((index, chunk))
+    finally:
+        events.put((index, None))
+
+
+def _kill_process_tree(process: subprocess.Popen[bytes]) -> None:
+    if process.poll() is not None:
+        return
+    with contextlib.suppress(OSError):
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    process.wait()
+
+
+class ShellSession:
+    """A long-lived shell that runs commands one at a time.
+
+    Shell state such as the working directory, environment variables and activated
+    virtualenvs carries over from one command to the next, and commands don't pay
+    for starting a new shell. After each command the shell prints a random sentinel
+    with the exit code on stdout and stderr, which marks the end of its output.
+
+    A command that exceeds its timeout kills the shell and everything it started.
+    The next command then starts a fresh shell, as it does after a command that made
+    the shell exit, and its output starts with a note that the state was reset.
+
+    Commands read from `/dev/null`; output printed by background processes after a
+    command finished is attributed to the next command.
+
+    Args:
+        cwd: Working directory the shell starts in.
+        env: Environment of the shell.
+        max_output_bytes: Maximum number of bytes of output kept per command.
+        argv: Shell to run. Defaults to `bash --noprofile --norc`, or `/bin/sh`
+            when bash is not installed.
+    """
+
+    def __init__(
+        self,
+        *,
+        cwd: str | None = None,
+        env: dict[str, str] | None = None,
+        max_output_bytes: int = 100_000,
+        argv: Sequence[str] | None = None,
+    ) -> None:
+        """Initialize the session. The shell is started by the first command."""
+        if argv is None:
+            bash = shutil.which("bash", path=(env or os.environ).get("PATH", os.defpath))
+            argv = [bash, "--noprofile", "--norc"] if bash else ["/bin/sh"]
+        self._argv = list(argv)
+        self._cwd = cwd
+        self._env = env
+        self._max_output_bytes = max_output_bytes
+        self._process: subprocess.Popen[bytes] | None = None
+        self._events: queue.SimpleQueue[tuple[int, bytes | None]] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+
+    @property
+    def alive(self) -> bool:
+        """Whether the shell process is running."""
+        return self._process is not None and self._process.poll() is None
+
+    def _start(self) -> subprocess.Popen[bytes]:
+        process = subprocess.Popen(  # noqa: S603  # Runs the configured shell, commands are written to its stdin
+            self._argv,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=self._cwd,
+            env=self._env,
+            # Own process group so a timeout kills everything the shell started
+            start_new_session=os.name == "posix",
+        )
+        events: queue.SimpleQueue[tuple[int, bytes | None]] = queue.SimpleQueue()
+        for index, pipe in enumerate((process.stdout, process.stderr)):
+            threading.Thread(target=_pump, args=(pipe, index, events), daemon=True).start()
+        weakref.finalize(self, _kill_process_tree, process)
+        self._process = process
+        self._events = events
+        return process
+
+    def run(self, command: str, *, timeout: float) -> ExecuteResponse:
+        """Run `command` in the session.
+
+        Args:
+            command: Shell command to run.
+            timeout: Maximum time in seconds to wait for the command.
+
+        Returns:
+            `ExecuteResponse` with the combined output and exit code of the command.
+
+        Raises:
+            subprocess.TimeoutExpired: If the command did not finish in time. The shell
+                has been killed and the next command starts a new one.
+        """
+        with self._lock:
+            restarted = self._process is not None and not self.alive
+            process = self._process if self._process is not None and not restarted else self._start()
+
+            sentinel = f"__deepagents_{uuid.uuid4().hex}__"
+            script = f"eval {shlex.quote(command)} < /dev/null\nprintf '%s %d\\n' {sentinel} \"$?\"\nprintf '%s\\n' {sentinel} >&2\n"
+            stdout = _OutputCapture(self._max_output_bytes)
+            stderr = _OutputCapture(self._max_output_bytes)
+            scanners = [_SentinelScanner(sentinel.encode(), stdout), _SentinelScanner(sentinel.encode(), stderr)]
+            try:
+                process.stdin.write(script.encode())  # ty: ignore[possibly-missing-attribute]
+                process.stdin.flush()  # ty: ignore[possibly-missing-attribute]
+            except OSError:
+                pass  # The shell already exited; its pipes report EOF below
+
+            if not self._read_output(scanners, time.monotonic() + timeout):
+                _kill_process_tree(process)
+                raise subprocess.TimeoutExpired(command, timeout)
+
+            shell_exited = not scanners[0].done
+            if shell_exited:
+                for scanner in scanners:
+                    scanner.flush()
+                returncode = process.wait()
+            else:
+                try:
+                    returncode = int(scanners[0].trailer.split()[0])
+                except (IndexError, ValueError):
+                    returncode = 1
+
+        response = _format_output(stdout, stderr, returncode, self._max_output_bytes)
+        if restarted:
+            response.output = f"[Shell session restarted; the working directory and environment were reset]\n{response.output}"
+        if shell_exited:
+            response.output = f"{response.output}\n\n[Shell session ended; the next command starts a new session]"
+        return response
+
+    def _read_output(self, scanners: list[_SentinelScanner], deadline: float) -> bool:
+        """Feed output to `scanners` until both saw the sentinel or the shell closed its pipes.
+
+        Returns:
+            `False` if `deadline` passed first.
+        """
+        ended = [False, False]
+        while not all(scanner.done or stream_ended for scanner, stream_ended in zip(scanners, ended, strict=True)):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            try:
+                index, chunk = self._events.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if chunk is None:
+                ended[index] = True
+            else:
+                scanners[index].feed(chunk)
+        return True
+
+    def restart(self) -> None:
+        """Kill the shell so the next command starts with a fresh one."""
+        with self._lock:
+            if self._process is not None:
+                _kill_process_tree(self._process)
+                self._process = None
+
+    def close(self) -> None:
+        """Kill the shell and everything it started."""
+        self.restart()
+
 
 class LocalShellBackend(FilesystemBackend, SandboxBackendProtocol):
     """Filesystem backend with unrestricted local shell command execution.
@@ -110,6 +558,7 @@ class LocalShellBackend(FilesystemBackend, SandboxBackendProtocol):
         max_output_bytes: int = 100_000,
         env: dict[str, str] | None = None,
         inherit_env: bool = False,
+        persistent_shell: bool = False,
     ) -> None:
         """Initialize local shell backend with filesystem access.
 
@@ -151,6 +600,9 @@ class LocalShellBackend(FilesystemBackend, SandboxBackendProtocol):
             max_output_bytes: Maximum number of bytes to capture from command output.
                 Output exceeding this limit will be truncated. Defaults to 100,000 bytes.
 
+                Output is streamed: only the beginning and end of each stream are kept
+                in memory, and the response reports how many bytes were dropped in between.
+
             env: Environment variables for shell commands. If None, starts with an empty
                 environment (unless `inherit_env=True`).
 
@@ -158,6 +610,14 @@ class LocalShellBackend(FilesystemBackend, SandboxBackendProtocol):
                 When False (default), only variables in `env` dict are available.
                 When True, inherits all `os.environ` variables and applies `env` overrides.
 
+            persistent_shell: Run commands in one long-lived `ShellSession` instead of a
+                new shell per command.
+
+                `cd`, exported variables and activated virtualenvs carry over between
+                commands, and small commands avoid the shell startup cost. Commands run
+                one at a time. A timed out command kills the session, and the next
+                command starts a new one.
+
         Raises:
             ValueError: If timeout is not positive.
         """
@@ -198,6 +658,8 @@ class LocalShellBackend(FilesystemBackend, SandboxBackendProtocol):
         else:
             self._env = env if env is not None else {}
 
+        self._session = ShellSession(cwd=str(self.cwd), env=self._env, max_output_bytes=max_output_bytes) if persistent_shell else None
+
         # Generate unique sandbox ID
         self._sandbox_id = f"local-{uuid.uuid4().hex[:8]}"
 
@@ -220,7 +682,7 @@ class LocalShellBackend(FilesystemBackend, SandboxBackendProtocol):
 
         !!! danger "Unrestricted Execution"
 
-            Commands are executed directly on your host system using `subprocess.run()`
+            Commands are executed directly on your host system using `subprocess.Popen()`
             with `shell=True`. There is **no sandboxing, isolation, or security
             restrictions**. The command runs with your user's full permissions and can:
 
@@ -254,7 +716,9 @@ class LocalShellBackend(FilesystemBackend, SandboxBackendProtocol):
             ExecuteResponse containing:
                 - output: Combined stdout and stderr (stderr lines prefixed with [stderr])
                 - exit_code: Process exit code (0 for success, non-zero for failure)
-                - truncated: True if output was truncated due to size limits
+                - truncated: True if output was truncated due to size limits. The
+                    beginning and end of the output are kept and the number of
+                    dropped bytes is reported in between.
 
         Raises:
             ValueError: If per-command timeout is not positive.
@@ -295,65 +759,133 @@ class LocalShellBackend(FilesystemBackend, SandboxBackendProtocol):
             msg = f"timeout must be positive, got {effective_timeout}"
             raise ValueError(msg)
 
+        if self._session is not None:
+            return self._execute_in_session(self._session, command, effective_timeout, custom_timeout=timeout is not None)
+
+        stdout = _OutputCapture(self._max_output_bytes)
+        stderr = _OutputCapture(self._max_output_bytes)
         try:
-            result = subprocess.run(  # noqa: S602
+            process = subprocess.Popen(  # noqa: S602
                 command,
-                check=False,
                 shell=True,  # Intentional: designed for LLM-controlled shell execution
-                capture_output=True,
-                text=True,
-                timeout=effective_timeout,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 env=self._env,
                 cwd=str(self.cwd),  # Use the root_dir from FilesystemBackend
             )
+            returncode = _wait_for_exit(process, stdout, stderr, effective_timeout)
+            if returncode is None:
+                return self._timeout_response(effective_timeout, custom=timeout is not None)
+            return _format_output(stdout.snapshot(), stderr.snapshot(), returncode, self._max_output_bytes)
 
-            # Combine stdout and stderr
-            # Prefix each stderr line with [stderr] for clear attribution.
-            # Example: "hello\n[stderr] error: file not found"  # noqa: ERA001
-            output_parts = []
-            if result.stdout:
-                output_parts.append(result.stdout)
-            if result.stderr:
-                stderr_lines = result.stderr.strip().split("\n")
-                output_parts.extend(f"[stderr] {line}" for line in stderr_lines)
-
-            output = "\n".join(output_parts) if output_parts else "<no output>"
-
-            # Check for truncation
-            truncated = False
-            if len(output) > self._max_output_bytes:
-                output = output[: self._max_output_bytes]
-                output += f"\n\n... Output truncated at {self._max_output_bytes} bytes."
-                truncated = True
+        except Exception as e:  # noqa: BLE001
+            # Broad exception catch is intentional: we want to catch all execution errors
+            # and return a consistent ExecuteResponse rather than propagating exceptions
+            return ExecuteResponse(
+                output=f"Error executing command ({type(e).__name__}): {e}",
+                exit_code=1,
+                truncated=False,
+            )
 
-            # Add exit code info if non-zero
-            if result.returncode != 0:
-                output = f"{output.rstrip()}\n\nExit code: {result.returncode}"
+    async def aexecute(
+        self,
+        command: str,
+        *,
+        # ASYNC109 - timeout is part of the SandboxBackendProtocol signature
+        timeout: int | None = None,  # noqa: ASYNC109
+    ) -> ExecuteResponse:
+        """Async version of `execute`.
 
+        Runs the command with `asyncio.create_subprocess_shell`, so waiting on it
+        does not occupy a worker thread. On Windows, whose anonymous pipes can't be
+        read asynchronously, `execute` runs in a worker thread instead.
+        """
+        if not command or not isinstance(command, str):
             return ExecuteResponse(
-                output=output,
-                exit_code=result.returncode,
-                truncated=truncated,
+                output="Error: Command must be a non-empty string.",
+                exit_code=1,
+                truncated=False,
             )
 
-        except subprocess.TimeoutExpired:
-            if timeout is not None:
-                msg = f"Error: Command timed out after {effective_timeout} seconds (custom timeout). The command may be stuck or require more time."
-            else:
-                msg = f"Error: Command timed out after {effective_timeout} seconds. For long-running commands, re-run using the timeout parameter."
+        effective_timeout = timeout if timeout is not None else self._default_timeout
+        if effective_timeout <= 0:
+            msg = f"timeout must be positive, got {effective_timeout}"
+            raise ValueError(msg)
+
+        if self._session is not None:
+            # The session runs one command at a time; wait for it in a worker thread
+            return await asyncio.to_thread(self.execute, command, timeout=timeout)
+
+        if os.name != "posix":
+            return await asyncio.to_thread(self.execute, command, timeout=timeout)
+
+        stdout = _OutputCapture(self._max_output_bytes)
+        stderr = _OutputCapture(self._max_output_bytes)
+        try:
+            # Our own pipes rather than `PIPE`, so they can be closed through public API
+            # while background processes started by the command still hold them open
+            stdout_read, stdout_write = _output_pipe()
+            stderr_read, stderr_write = _output_pipe()
+            outputs = ((stdout_read, stdout), (stderr_read, stderr))
+            try:
+                process = await asyncio.create_subprocess_shell(
+                    command,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=stdout_write,
+                    stderr=stderr_write,
+                    env=self._env,
+                    cwd=str(self.cwd),
+                )
+            except BaseException:
+                for pipe, _ in outputs:
+                    pipe.close()
+                raise
+            finally:
+                # The child has its own copies of the write ends
+                os.close(stdout_write)
+                os.close(stderr_write)
+            returncode = await _await_exit(process, outputs, effective_timeout)
+            if returncode is None:
+                return self._timeout_response(effective_timeout, custom=timeout is not None)
+            return _format_output(stdout, stderr, returncode, self._max_output_bytes)
+
+        except Exception as e:  # noqa: BLE001
+            # Same contract as `execute`: report failures in the response
             return ExecuteResponse(
-                output=msg,
-                exit_code=124,  # Standard timeout exit code
+                output=f"Error executing command ({type(e).__name__}): {e}",
+                exit_code=1,
                 truncated=False,
             )
-        except Exception as e:  # noqa: BLE001
-            # Broad exception catch is intentional: we want to catch all execution errors
-            # and return a consistent ExecuteResponse rather than propagating exceptions
+
+    def _execute_in_session(self, session: ShellSession, command: str, effective_timeout: float, *, custom_timeout: bool) -> ExecuteResponse:
+        try:
+            return session.run(command, timeout=effective_timeout)
+        except subprocess.TimeoutExpired:
+            return self._timeout_response(effective_timeout, custom=custom_timeout)
+        except Exception as e:  # noqa: BLE001  # Same contract as `execute`
             return ExecuteResponse(
                 output=f"Error executing command ({type(e).__name__}): {e}",
                 exit_code=1,
                 truncated=False,
             )
 
+    def close(self) -> None:
+        """Stop the persistent shell session, if any."""
+        if self._session is not None:
+            self._session.close()
+
+    @staticmethod
+    def _timeout_response(effective_timeout: float, *, custom: bool) -> ExecuteResponse:
+        if custom:
+            msg = f"Error: Command timed out after {effective_timeout} seconds (custom timeout). The command may be stuck or require more time."
+        else:
+            msg = f"Error: Command timed out after {effective_timeout} seconds. For long-running commands, re-run using the timeout parameter."
+        return ExecuteResponse(
+            output=msg,
+            exit_code=124,  # Standard timeout exit code
+            truncated=False,
+        )
+
 
-__all__ = ["DEFAULT_EXECUTE_TIMEOUT", "LocalShellBackend"]
+__all__ = ["DEFAULT_EXECUTE_TIMEOUT", "LocalShellBackend", "ShellSession"]
@@ -9,14 +9,16 @@ import abc
 import asyncio
 import inspect
 import logging
-from collections.abc import Callable
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass
 from functools import lru_cache
-from typing import Any, Literal, NotRequired, TypeAlias
+from typing import TYPE_CHECKING, Any, Literal, NotRequired, TypeAlias
 
-from langchain.tools import ToolRuntime
 from typing_extensions import TypedDict
 
+if TYPE_CHECKING:
+    from langchain.tools import ToolRuntime
+
 logger = logging.getLogger(__name__)
 
 FileOperationError = Literal[
@@ -111,6 +113,10 @@ class GrepMatch(TypedDict):
     text: str
 
 
+EditOperation: TypeAlias = tuple[str, str, bool]
+"""One replacement in an `edit_many` batch: `(old_string, new_string, replace_all)`."""
+
+
 @dataclass
 class WriteResult:
     """Result from backend write operations.
@@ -366,6 +372,48 @@ class BackendProtocol(abc.ABC):  # noqa: B024
         """Async version of edit."""
         return await asyncio.to_thread(self.edit, file_path, old_string, new_string, replace_all)
 
+    def edit_many(
+        self,
+        file_path: str,
+        edits: Sequence[EditOperation],
+    ) -> EditResult:
+        """Apply several exact string replacements to one file in a single operation.
+
+        Edits are applied in order, each one to the result of the previous one,
+        with the same matching rules as `edit`. Built-in backends validate the
+        whole batch before writing, so either every edit is applied or none is.
+
+        The default implementation calls `edit` once per entry and stops at the
+        first failure, leaving earlier edits applied. Backends should override
+        it to read and write the file once and apply the batch atomically.
+
+        Args:
+            file_path: Absolute path to the file to edit. Must start with '/'.
+            edits: `(old_string, new_string, replace_all)` tuples, applied in order.
+
+        Returns:
+            EditResult with the total number of replacements across all edits.
+        """
+        if not edits:
+            return EditResult(error="Error: No edits provided")
+        occurrences = 0
+        result = EditResult()
+        for old_string, new_string, replace_all in edits:
+            result = self.edit(file_path, old_string, new_string, replace_all)
+            if result.error:
+                return result
+            occurrences += result.occurrences or 0
+        result.occurrences = occurrences
+        return result
+
+    async def aedit_many(
+        self,
+        file_path: str,
+        edits: Sequence[EditOperation],
+    ) -> EditResult:
+        """Async version of edit_many."""
+        return await asyncio.to_thread(self.edit_many, file_path, edits)
+
     def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
         """Upload multiple files to the sandbox.
 
@@ -513,5 +561,5 @@ def execute_accepts_timeout(cls: type[SandboxBackendProtocol]) -> bool:
         return "timeout" in sig.parameters
 
 
-BackendFactory: TypeAlias = Callable[[ToolRuntime], BackendProtocol]
+BackendFactory: TypeAlias = Callable[["ToolRuntime"], BackendProtocol]
 BACKEND_TYPES = BackendProtocol | BackendFactory
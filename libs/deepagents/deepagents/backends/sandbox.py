@@ -2,19 +2,25 @@
 
 This module provides a base class that implements all SandboxBackendProtocol
 methods using shell commands executed via execute(). Concrete implementations
-only need to implement the execute() method.
+only need to implement the execute() method, or aexecute() when subclassing
+AsyncBaseSandbox for sandboxes with an async client.
 
 It also defines the BaseSandbox implementation used by the CLI sandboxes.
 """
 
 from __future__ import annotations
 
+import asyncio
 import base64
 import json
 import shlex
+import threading
 from abc import ABC, abstractmethod
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any, TypeVar
 
 from deepagents.backends.protocol import (
+    EditOperation,
     EditResult,
     ExecuteResponse,
     FileDownloadResponse,
@@ -25,6 +31,11 @@ from deepagents.backends.protocol import (
     WriteResult,
 )
 
+if TYPE_CHECKING:
+    from collections.abc import Coroutine, Sequence
+
+_T = TypeVar("_T")
+
 _GLOB_COMMAND_TEMPLATE = """python3 -c "
 import glob
 import os
@@ -91,9 +102,10 @@ with open(file_path, 'w') as f:
 __DEEPAGENTS_EOF__"""
 
 # Use heredoc to pass edit parameters via stdin to avoid ARG_MAX limits.
-# Stdin format: base64-encoded JSON with {"path": str, "old": str, "new": str}.
+# Stdin format: base64-encoded JSON with {"path": str, "edits": [[old, new, replace_all], ...]}.
 # JSON bundles all parameters; base64 ensures safe transport of arbitrary content
 # (special chars, newlines, etc.) through the heredoc without escaping issues.
+# A batch of edits costs a single interpreter start and one read and write of the file.
 _EDIT_COMMAND_TEMPLATE = """python3 -c "
 import sys
 import base64
@@ -110,8 +122,7 @@ try:
     payload = base64.b64decode(payload_b64).decode('utf-8')
     data = json.loads(payload)
     file_path = data['path']
-    old = data['old']
-    new = data['new']
+    edits = data['edits']
 except Exception as e:
     print(f'Error: Failed to decode edit payload: {{e}}', file=sys.stderr)
     sys.exit(4)
@@ -124,26 +135,25 @@ if not os.path.isfile(file_path):
 with open(file_path, 'r') as f:
     text = f.read()
 
-# Count occurrences
-count = text.count(old)
-
-# Exit with error codes if issues found
-if count == 0:
-    sys.exit(1)  # String not found
-elif count > 1 and not {replace_all}:
-    sys.exit(2)  # Multiple occurrences without replace_all
-
-# Perform replacement
-if {replace_all}:
-    result = text.replace(old, new)
-else:
-    result = text.replace(old, new, 1)
+# Apply every edit in memory first, so a failing edit leaves the file untouched.
+# On failure the index of the failing edit is printed.
+total = 0
+for index, (old, new, replace_all) in enumerate(edits):
+    count = text.count(old)
+    if count == 0:
+        print(index)
+        sys.exit(1)  # String not found
+    if count > 1 and not replace_all:
+        print(index)
+        sys.exit(2)  # Multiple occurrences without replace_all
+    text = text.replace(old, new) if replace_all else text.replace(old, new, 1)
+    total += count
 
 # Write back to file
 with open(file_path, 'w') as f:
-    f.write(result)
+    f.write(text)
 
-print(count)
+print(total)
 " <<'__DEEPAGENTS_EOF__'
 {payload_b64}
 __DEEPAGENTS_EOF__"""
@@ -201,11 +211,193 @@ for i, line in enumerate(selected_lines):
 __DEEPAGENTS_EOF__"""
 
 
+_LS_COMMAND_TEMPLATE = """python3 -c "
+import os
+import json
+import base64
+
+path = base64.b64decode('{path_b64}').decode('utf-8')
+
+try:
+    with os.scandir(path) as it:
+        for entry in it:
+            result = {{
+                'path': os.path.join(path, entry.name),
+                'is_dir': entry.is_dir(follow_symlinks=False)
+            }}
+            print(json.dumps(result))
+except FileNotFoundError:
+    pass
+except PermissionError:
+    pass
+" 2>/dev/null"""
+
+
+def _b64(value: str) -> str:
+    return base64.b64encode(value.encode("utf-8")).decode("ascii")
+
+
+# Each file operation is split into a command builder and a parser for the command's
+# result, so `BaseSandbox` can run it through either `execute` or `aexecute`.
+
+
+def _ls_command(path: str) -> str:
+    return _LS_COMMAND_TEMPLATE.format(path_b64=_b64(path))
+
+
+def _parse_ls(result: ExecuteResponse) -> list[FileInfo]:
+    file_infos: list[FileInfo] = []
+    for line in result.output.strip().split("\n"):
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+            file_infos.append({"path": data["path"], "is_dir": data["is_dir"]})
+        except json.JSONDecodeError:
+            continue
+    return file_infos
+
+
+def _read_command(file_path: str, offset: int, limit: int) -> str:
+    payload = json.dumps({"path": file_path, "offset": int(offset), "limit": int(limit)})
+    return _READ_COMMAND_TEMPLATE.format(payload_b64=_b64(payload))
+
+
+def _parse_read(result: ExecuteResponse, file_path: str) -> str:
+    output = result.output.rstrip()
+    if result.exit_code != 0 or "Error: File not found" in output:
+        return f"Error: File '{file_path}' not found"
+    return output
+
+
+def _write_command(file_path: str, content: str) -> str:
+    # Create JSON payload with file path and base64-encoded content
+    # This avoids shell injection via file_path and ARG_MAX limits on content
+    payload = json.dumps({"path": file_path, "content": _b64(content)})
+    # Single atomic check + write command
+    return _WRITE_COMMAND_TEMPLATE.format(payload_b64=_b64(payload))
+
+
+def _parse_write(result: ExecuteResponse, file_path: str) -> WriteResult:
+    # Check for errors (exit code or error message in output)
+    if result.exit_code != 0 or "Error:" in result.output:
+        error_msg = result.output.strip() or f"Failed to write file '{file_path}'"
+        return WriteResult(error=error_msg)
+    # External storage - no files_update needed
+    return WriteResult(path=file_path, files_update=None)
+
+
+def _edit_command(file_path: str, edits: Sequence[EditOperation]) -> str:
+    # Create JSON payload with file path and the edits
+    # This avoids shell injection via file_path and ARG_MAX limits on strings
+    payload = json.dumps({"path": file_path, "edits": [list(edit) for edit in edits]})
+    return _EDIT_COMMAND_TEMPLATE.format(payload_b64=_b64(payload))
+
+
+def _parse_edit(result: ExecuteResponse, file_path: str, edits: Sequence[EditOperation]) -> EditResult:
+    exit_code = result.exit_code
+    output = result.output.strip()
+
+    if exit_code in {1, 2}:
+        first_line = output.split("\n", 1)[0].strip()
+        index = int(first_line) if first_line.isdigit() and int(first_line) < len(edits) else 0
+        old_string = edits[index][0]
+        if exit_code == 1:
+            reason = f"String not found in file: '{old_string}'"
+        else:
+            reason = f"String '{old_string}' appears multiple times. Use replace_all=True to replace all occurrences."
+        if len(edits) > 1:
+            return EditResult(error=f"Error: Edit {index + 1} of {len(edits)} failed, no edits were applied. {reason}")
+        return EditResult(error=f"Error: {reason}")
+
+    # Map exit codes to error messages
+    error_messages = {
+        3: f"Error: File '{file_path}' not found",
+        4: f"Error: Failed to decode edit payload: {output}",
+    }
+    if exit_code in error_messages:
+        return EditResult(error=error_messages[exit_code])
+    if exit_code != 0:
+        return EditResult(error=f"Error editing file (exit code {exit_code}): {output or 'Unknown error'}")
+
+    count = int(output)
+    # External storage - no files_update needed
+    return EditResult(path=file_path, files_update=None, occurrences=count)
+
+
+def _grep_command(pattern: str, path: str | None, glob: str | None) -> str:
+    search_path = shlex.quote(path or ".")
+
+    # Build grep command to get structured output
+    grep_opts = "-rHnF"  # recursive, with filename, with line number, fixed-strings (literal)
+
+    # Add glob pattern if specified
+    glob_pattern = ""
+    if glob:
+        glob_pattern = f"--include='{glob}'"
+
+    # Escape pattern for shell
+    pattern_escaped = shlex.quote(pattern)
+
+    return f"grep {grep_opts} {glob_pattern} -e {pattern_escaped} {search_path} 2>/dev/null || true"
+
+
+def _parse_grep(result: ExecuteResponse) -> list[GrepMatch]:
+    output = result.output.rstrip()
+    if not output:
+        return []
+
+    # Parse grep output into GrepMatch objects
+    matches: list[GrepMatch] = []
+    for line in output.split("\n"):
+        # Format is: path:line_number:text
+        parts = line.split(":", 2)
+        if len(parts) >= 3:  # noqa: PLR2004  # Grep output field count
+            matches.append(
+                {
+                    "path": parts[0],
+                    "line": int(parts[1]),
+                    "text": parts[2],
+                }
+            )
+    return matches
+
+
+def _glob_command(pattern: str, path: str) -> str:
+    # Encode pattern and path as base64 to avoid escaping issues
+    return _GLOB_COMMAND_TEMPLATE.format(path_b64=_b64(path), pattern_b64=_b64(pattern))
+
+
+def _parse_glob(result: ExecuteResponse) -> list[FileInfo]:
+    output = result.output.strip()
+    if not output:
+        return []
+
+    # Parse JSON output into FileInfo dicts
+    file_infos: list[FileInfo] = []
+    for line in output.split("\n"):
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        info: FileInfo = {"path": data["path"], "is_dir": data["is_dir"]}
+        if "size" in data and "mtime" in data:
+            info["size"] = int(data["size"])
+            info["modified_at"] = datetime.fromtimestamp(data["mtime"], tz=UTC).isoformat()
+        file_infos.append(info)
+    return file_infos
+
+
 class BaseSandbox(SandboxBackendProtocol, ABC):
     """Base sandbox implementation with execute() as abstract method.
 
     This class provides default implementations for all protocol methods
     using shell commands. Subclasses only need to implement execute().
+
+    The async file operations run their commands through `aexecute()`, so a
+    subclass that also implements a native `aexecute()` gets non-blocking file
+    operations without any further work. See `AsyncBaseSandbox` for sandboxes
+    whose client is async-only.
     """
 
     @abstractmethod
@@ -229,41 +421,11 @@ class BaseSandbox(SandboxBackendProtocol, ABC):
 
     def ls_info(self, path: str) -> list[FileInfo]:
         """Structured listing with file metadata using os.scandir."""
-        path_b64 = base64.b64encode(path.encode("utf-8")).decode("ascii")
-        cmd = f"""python3 -c "
-import os
-import json
-import base64
+        return _parse_ls(self.execute(_ls_command(path)))
 
-path = base64.b64decode('{path_b64}').decode('utf-8')
-
-try:
-    with os.scandir(path) as it:
-        for entry in it:
-            result = {{
-                'path': os.path.join(path, entry.name),
-                'is_dir': entry.is_dir(follow_symlinks=False)
-            }}
-            print(json.dumps(result))
-except FileNotFoundError:
-    pass
-except PermissionError:
-    pass
-" 2>/dev/null"""
-
-        result = self.execute(cmd)
-
-        file_infos: list[FileInfo] = []
-        for line in result.output.strip().split("\n"):
-            if not line:
-                continue
-            try:
-                data = json.loads(line)
-                file_infos.append({"path": data["path"], "is_dir": data["is_dir"]})
-            except json.JSONDecodeError:
-                continue
-
-        return file_infos
+    async def als_info(self, path: str) -> list[FileInfo]:
+        """Async version of ls_info."""
+        return _parse_ls(await self.aexecute(_ls_command(path)))
 
     def read(
         self,
@@ -272,24 +434,16 @@ except PermissionError:
         limit: int = 2000,
     ) -> str:
         """Read file content with line numbers using a single shell command."""
-        payload = json.dumps(
-            {
-                "path": file_path,
-                "offset": int(offset),
-                "limit": int(limit),
-            }
-        )
-        payload_b64 = base64.b64encode(payload.encode("utf-8")).decode("ascii")
-        cmd = _READ_COMMAND_TEMPLATE.format(payload_b64=payload_b64)
-        result = self.execute(cmd)
-
-        output = result.output.rstrip()
-        exit_code = result.exit_code
-
-        if exit_code != 0 or "Error: File not found" in output:
-            return f"Error: File '{file_path}' not found"
+        return _parse_read(self.execute(_read_command(file_path, offset, limit)), file_path)
 
-        return output
+    async def aread(
+        self,
+        file_path: str,
+        offset: int = 0,
+        limit: int = 2000,
+    ) -> str:
+        """Async version of read."""
+        return _parse_read(await self.aexecute(_read_command(file_path, offset, limit)), file_path)
 
     def write(
         self,
@@ -297,23 +451,15 @@ except PermissionError:
         content: str,
     ) -> WriteResult:
         """Create a new file. Returns WriteResult; error populated on failure."""
-        # Create JSON payload with file path and base64-encoded content
-        # This avoids shell injection via file_path and ARG_MAX limits on content
-        content_b64 = base64.b64encode(content.encode("utf-8")).decode("ascii")
-        payload = json.dumps({"path": file_path, "content": content_b64})
-        payload_b64 = base64.b64encode(payload.encode("utf-8")).decode("ascii")
-
-        # Single atomic check + write command
-        cmd = _WRITE_COMMAND_TEMPLATE.format(payload_b64=payload_b64)
-        result = self.execute(cmd)
-
-        # Check for errors (exit code or error message in output)
-        if result.exit_code != 0 or "Error:" in result.output:
-            error_msg = result.output.strip() or f"Failed to write file '{file_path}'"
-            return WriteResult(error=error_msg)
+        return _parse_write(self.execute(_write_command(file_path, content)), file_path)
 
-        # External storage - no files_update needed
-        return WriteResult(path=file_path, files_update=None)
+    async def awrite(
+        self,
+        file_path: str,
+        content: str,
+    ) -> WriteResult:
+        """Async version of write."""
+        return _parse_write(await self.aexecute(_write_command(file_path, content)), file_path)
 
     def edit(
         self,
@@ -323,33 +469,37 @@ except PermissionError:
         replace_all: bool = False,  # noqa: FBT001, FBT002
     ) -> EditResult:
         """Edit a file by replacing string occurrences. Returns EditResult."""
-        # Create JSON payload with file path, old string, and new string
-        # This avoids shell injection via file_path and ARG_MAX limits on strings
-        payload = json.dumps({"path": file_path, "old": old_string, "new": new_string})
-        payload_b64 = base64.b64encode(payload.encode("utf-8")).decode("ascii")
-
-        # Use template for string replacement
-        cmd = _EDIT_COMMAND_TEMPLATE.format(payload_b64=payload_b64, replace_all=replace_all)
-        result = self.execute(cmd)
-
-        exit_code = result.exit_code
-        output = result.output.strip()
-
-        # Map exit codes to error messages
-        error_messages = {
-            1: f"Error: String not found in file: '{old_string}'",
-            2: f"Error: String '{old_string}' appears multiple times. Use replace_all=True to replace all occurrences.",
-            3: f"Error: File '{file_path}' not found",
-            4: f"Error: Failed to decode edit payload: {output}",
-        }
-        if exit_code in error_messages:
-            return EditResult(error=error_messages[exit_code])
-        if exit_code != 0:
-            return EditResult(error=f"Error editing file (exit code {exit_code}): {output or 'Unknown error'}")
-
-        count = int(output)
-        # External storage - no files_update needed
-        return EditResult(path=file_path, files_update=None, occurrences=count)
+        return self.edit_many(file_path, [(old_string, new_string, replace_all)])
+
+    async def aedit(
+        self,
+        file_path: str,
+        old_string: str,
+        new_string: str,
+        replace_all: bool = False,  # noqa: FBT001, FBT002
+    ) -> EditResult:
+        """Async version of edit."""
+        return await self.aedit_many(file_path, [(old_string, new_string, replace_all)])
+
+    def edit_many(
+        self,
+        file_path: str,
+        edits: Sequence[EditOperation],
+    ) -> EditResult:
+        """Apply several string replacements to a file in one command. Returns EditResult."""
+        if not edits:
+            return EditResult(error="Error: No edits provided")
+        return _parse_edit(self.execute(_edit_command(file_path, edits)), file_path, edits)
+
+    async def aedit_many(
+        self,
+        file_path: str,
+        edits: Sequence[EditOperation],
+    ) -> EditResult:
+        """Async version of edit_many."""
+        if not edits:
+            return EditResult(error="Error: No edits provided")
+        return _parse_edit(await self.aexecute(_edit_command(file_path, edits)), file_path, edits)
 
     def grep_raw(
         self,
@@ -358,70 +508,24 @@ except PermissionError:
         glob: str | None = None,
     ) -> list[GrepMatch] | str:
         """Structured search results or error string for invalid input."""
-        search_path = shlex.quote(path or ".")
-
-        # Build grep command to get structured output
-        grep_opts = "-rHnF"  # recursive, with filename, with line number, fixed-strings (literal)
-
-        # Add glob pattern if specified
-        glob_pattern = ""
-        if glob:
-            glob_pattern = f"--include='{glob}'"
-
-        # Escape pattern for shell
-        pattern_escaped = shlex.quote(pattern)
-
-        cmd = f"grep {grep_opts} {glob_pattern} -e {pattern_escaped} {search_path} 2>/dev/null || true"
-        result = self.execute(cmd)
-
-        output = result.output.rstrip()
-        if not output:
-            return []
-
-        # Parse grep output into GrepMatch objects
-        matches: list[GrepMatch] = []
-        for line in output.split("\n"):
-            # Format is: path:line_number:text
-            parts = line.split(":", 2)
-            if len(parts) >= 3:  # noqa: PLR2004  # Grep output field count
-                matches.append(
-                    {
-                        "path": parts[0],
-                        "line": int(parts[1]),
-                        "text": parts[2],
-                    }
-                )
-
-        return matches
+        return _parse_grep(self.execute(_grep_command(pattern, path, glob)))
+
+    async def agrep_raw(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob: str | None = None,
+    ) -> list[GrepMatch] | str:
+        """Async version of grep_raw."""
+        return _parse_grep(await self.aexecute(_grep_command(pattern, path, glob)))
 
     def glob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
         """Structured glob matching returning FileInfo dicts."""
-        # Encode pattern and path as base64 to avoid escaping issues
-        pattern_b64 = base64.b64encode(pattern.encode("utf-8")).decode("ascii")
-        path_b64 = base64.b64encode(path.encode("utf-8")).decode("ascii")
-
-        cmd = _GLOB_COMMAND_TEMPLATE.format(path_b64=path_b64, pattern_b64=pattern_b64)
-        result = self.execute(cmd)
-
-        output = result.output.strip()
-        if not output:
-            return []
-
-        # Parse JSON output into FileInfo dicts
-        file_infos: list[FileInfo] = []
-        for line in output.split("\n"):
-            try:
-                data = json.loads(line)
-                file_infos.append(
-                    {
-                        "path": data["path"],
-                        "is_dir": data["is_dir"],
-                    }
-                )
-            except json.JSONDecodeError:
-                continue
-
-        return file_infos
+        return _parse_glob(self.execute(_glob_command(pattern, path)))
+
+    async def aglob_info(self, pattern: str, path: str = "/") -> list[FileInfo]:
+        """Async version of glob_info."""
+        return _parse_glob(await self.aexecute(_glob_command(pattern, path)))
 
     @property
     @abstractmethod
@@ -443,3 +547,106 @@ except PermissionError:
         Implementations must support partial success - catch exceptions per-file
         and return errors in FileDownloadResponse objects rather than raising.
         """
+
+
+class _BackgroundLoop:
+    """Event loop running in a daemon thread, used to call coroutines from sync code.
+
+    A single long-lived loop is shared so async SDK clients, whose connection pools
+    are bound to the loop they were first used on, keep working across sync calls.
+    """
+
+    def __init__(self) -> None:
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lock = threading.Lock()
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="deepagents-sandbox-loop", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def run(self, coro: Coroutine[Any, Any, _T]) -> _T:
+        """Run `coro` on the background loop and block until it completes."""
+        loop = self._get_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            coro.close()
+            msg = "Sync sandbox methods cannot be called from the sandbox event loop; use the async methods instead."
+            raise RuntimeError(msg)
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+_background_loop = _BackgroundLoop()
+
+
+class AsyncBaseSandbox(BaseSandbox):
+    """Base sandbox implementation with aexecute() as the primitive.
+
+    For sandboxes backed by an async client. Subclasses implement `aexecute()`,
+    `aupload_files()`, `adownload_files()` and `id`; all async file operations
+    then run without a thread hop, so many concurrent tool calls only cost
+    coroutines instead of worker threads.
+
+    The sync methods are derived from the async ones by running them on a shared
+    background event loop.
+    """
+
+    @abstractmethod
+    async def aexecute(
+        self,
+        command: str,
+        *,
+        # ASYNC109 - timeout is a semantic parameter forwarded to the sandbox
+        # client, not an asyncio.timeout() contract.
+        timeout: int | None = None,  # noqa: ASYNC109
+    ) -> ExecuteResponse:
+        """Execute a command in the sandbox and return ExecuteResponse.
+
+        Args:
+            command: Full shell command string to execute.
+            timeout: Maximum time in seconds to wait for the command to complete.
+
+                If None, uses the backend's default timeout.
+
+        Returns:
+            ExecuteResponse with combined output, exit code, and truncation flag.
+        """
+
+    @abstractmethod
+    async def aupload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        """Upload multiple files to the sandbox.
+
+        Implementations must support partial success - catch exceptions per-file
+        and return errors in FileUploadResponse objects rather than raising.
+        """
+
+    @abstractmethod
+    async def adownload_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        """Download multiple files from the sandbox.
+
+        Implementations must support partial success - catch exceptions per-file
+        and return errors in FileDownloadResponse objects rather than raising.
+        """
+
+    def execute(
+        self,
+        command: str,
+        *,
+        timeout: int | None = None,
+    ) -> ExecuteResponse:
+        """Sync version of aexecute."""
+        return _background_loop.run(self.aexecute(command, timeout=timeout))
+
+    def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        """Sync version of aupload_files."""
+        return _background_loop.run(self.aupload_files(files))
+
+    def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        """Sync version of adownload_files."""
+        return _background_loop.run(self.adownload_files(paths))
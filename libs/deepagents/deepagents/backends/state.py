@@ -1,9 +1,11 @@
 """StateBackend: Store files in LangGraph agent state (ephemeral)."""
 
+from collections.abc import Sequence
 from typing import TYPE_CHECKING
 
 from deepagents.backends.protocol import (
     BackendProtocol,
+    EditOperation,
     EditResult,
     FileDownloadResponse,
     FileInfo,
@@ -17,7 +19,7 @@ from deepagents.backends.utils import (
     file_data_to_string,
     format_read_response,
     grep_matches_from_files,
-    perform_string_replacement,
+    perform_string_replacements,
     update_file_data,
 )
 
@@ -142,6 +144,17 @@ class StateBackend(BackendProtocol):
 
         Returns EditResult with files_update and occurrences.
         """
+        return self.edit_many(file_path, [(old_string, new_string, replace_all)])
+
+    def edit_many(
+        self,
+        file_path: str,
+        edits: Sequence[EditOperation],
+    ) -> EditResult:
+        """Apply several string replacements to a file, all or nothing.
+
+        Returns EditResult with files_update and the total occurrences.
+        """
         files = self.runtime.state.get("files", {})
         file_data = files.get(file_path)
 
@@ -149,7 +162,7 @@ class StateBackend(BackendProtocol):
             return EditResult(error=f"Error: File '{file_path}' not found")
 
         content = file_data_to_string(file_data)
-        result = perform_string_replacement(content, old_string, new_string, replace_all)
+        result = perform_string_replacements(content, edits)
 
         if isinstance(result, str):
             return EditResult(error=result)
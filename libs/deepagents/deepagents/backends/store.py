@@ -2,7 +2,7 @@
 
 import re
 import warnings
-from collections.abc import Callable
+from collections.abc import Callable, Sequence
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any, Generic
 
@@ -15,6 +15,7 @@ from langgraph.typing import ContextT, StateT
 
 from deepagents.backends.protocol import (
     BackendProtocol,
+    EditOperation,
     EditResult,
     FileDownloadResponse,
     FileInfo,
@@ -28,7 +29,7 @@ from deepagents.backends.utils import (
     file_data_to_string,
     format_read_response,
     grep_matches_from_files,
-    perform_string_replacement,
+    perform_string_replacements,
     update_file_data,
 )
 
@@ -454,6 +455,17 @@ class StoreBackend(BackendProtocol):
     ) -> EditResult:
         """Edit a file by replacing string occurrences.
 
+        Returns EditResult. External storage sets files_update=None.
+        """
+        return self.edit_many(file_path, [(old_string, new_string, replace_all)])
+
+    def edit_many(
+        self,
+        file_path: str,
+        edits: Sequence[EditOperation],
+    ) -> EditResult:
+        """Apply several string replacements to a file with one read and one write.
+
         Returns EditResult. External storage sets files_update=None.
         """
         store = self._get_store()
@@ -470,7 +482,7 @@ class StoreBackend(BackendProtocol):
             return EditResult(error=f"Error: {e}")
 
         content = file_data_to_string(file_data)
-        result = perform_string_replacement(content, old_string, new_string, replace_all)
+        result = perform_string_replacements(content, edits)
 
         if isinstance(result, str):
             return EditResult(error=result)
@@ -494,6 +506,14 @@ class StoreBackend(BackendProtocol):
 
         This avoids sync calls in async context by using store.aget/aput directly.
         """
+        return await self.aedit_many(file_path, [(old_string, new_string, replace_all)])
+
+    async def aedit_many(
+        self,
+        file_path: str,
+        edits: Sequence[EditOperation],
+    ) -> EditResult:
+        """Async version of edit_many using native store async methods."""
         store = self._get_store()
         namespace = self._get_namespace()
 
@@ -508,7 +528,7 @@ class StoreBackend(BackendProtocol):
             return EditResult(error=f"Error: {e}")
 
         content = file_data_to_string(file_data)
-        result = perform_string_replacement(content, old_string, new_string, replace_all)
+        result = perform_string_replacements(content, edits)
 
         if isinstance(result, str):
             return EditResult(error=result)
@@ -0,0 +1,715 @@
+"""Chunked, concurrent and resumable file transfer for sandbox backends.
+
+`upload_files`/`download_files` on a sandbox move each file whole, one request at a
+time. `SandboxTransfer` builds on those two methods plus `execute` to move many or
+large files efficiently:
+
+- Small files are packed into tar archives, so hundreds of files cost a handful of
+  requests instead of one each.
+- Large files are split into chunks that are streamed from disk and moved
+  concurrently, with at most `max_concurrency` requests in flight.
+- Every file is verified against its SHA-256 checksum after the transfer.
+- Files uploaded from local paths keep their permission bits, so executable
+  scripts stay executable in the sandbox.
+- Uploaded chunks are staged in the sandbox under a name derived from the
+  destination and the content hash. If an upload fails part way, calling
+  `upload` again with the same content only sends the missing chunks.
+
+```python
+from pathlib import Path
+
+from deepagents.backends.transfer import SandboxTransfer
+
+transfer = SandboxTransfer(sandbox)
+results = transfer.upload([("/workspace/data.bin", Path("data.bin")), ("/workspace/notes.md", b"# Notes")])
+assert all(result.error is None for result in results)
+```
+
+Staging and verification run as a Python script in the sandbox, so the sandbox needs
+`python3` like the rest of `BaseSandbox`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import os
+import shlex
+import stat
+import tarfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Literal
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Sequence
+    from pathlib import Path
+
+    from deepagents.backends.protocol import FileOperationError, SandboxBackendProtocol
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+"""Size of each chunk of a large file, and the maximum size of a tar archive of small files."""
+
+DEFAULT_PACK_THRESHOLD = 256 * 1024
+"""Files up to this size are packed into tar archives instead of being chunked."""
+
+DEFAULT_STAGING_DIR = "/tmp/.deepagents-transfer"  # noqa: S108  # Path inside the sandbox
+"""Directory in the sandbox where chunks and archives are staged."""
+
+TransferError = Literal["checksum_mismatch", "incomplete"]
+"""Transfer-specific error codes.
+
+- checksum_mismatch: The transferred content does not match its SHA-256 checksum.
+- incomplete: Some chunks could not be transferred, or the sandbox could not put the
+  file in place. Uploads can be resumed by calling `upload` again with the same content.
+"""
+
+_INLINE_REQUEST_LIMIT = 64 * 1024
+"""Largest encoded request embedded in the command itself.
+
+Linux caps a single argument at 128 KiB, so larger requests are uploaded as a file
+that the script reads and removes.
+"""
+
+_READ_REQUEST = r"""
+import base64, json, os, sys
+
+if len(sys.argv) > 1:
+    with open(sys.argv[1], 'rb') as f:
+        req = json.load(f)
+    os.remove(sys.argv[1])
+else:
+    req = json.loads(base64.b64decode(sys.stdin.read().strip()).decode('utf-8'))
+"""
+
+_REMOTE_SCRIPT = (
+    _READ_REQUEST
+    + r"""
+import hashlib, shutil, tarfile
+
+def digest(path):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+def error(exc):
+    if isinstance(exc, FileNotFoundError):
+        return 'file_not_found'
+    if isinstance(exc, IsADirectoryError):
+        return 'is_directory'
+    if isinstance(exc, PermissionError):
+        return 'permission_denied'
+    return 'invalid_path'
+
+def write(path, blocks, expected, mode=None):
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    tmp = path + '.deepagents-part'
+    h = hashlib.sha256()
+    with open(tmp, 'wb') as out:
+        for block in blocks:
+            h.update(block)
+            out.write(block)
+    if h.hexdigest() != expected:
+        os.remove(tmp)
+        return 'checksum_mismatch'
+    if mode is not None:
+        os.chmod(tmp, mode)
+    os.replace(tmp, path)
+    return None
+
+def parts(directory, count):
+    for i in range(count):
+        with open(os.path.join(directory, str(i)), 'rb') as part:
+            yield from iter(lambda: part.read(1 << 20), b'')
+
+def prepare():
+    os.makedirs(req['staging'], exist_ok=True)
+    existing = {}
+    for directory in req['dirs']:
+        os.makedirs(directory, exist_ok=True)
+        existing[directory] = {name: digest(os.path.join(directory, name)) for name in os.listdir(directory)}
+    return existing
+
+def commit():
+    failed = {}
+    for archive in req['archives']:
+        with tarfile.open(archive) as tar:
+            for member in tar:
+                path = '/' + member.name
+                src = tar.extractfile(member)
+                try:
+                    err = write(path, iter(lambda: src.read(1 << 20), b''), req['hashes'][path], req['modes'].get(path))
+                except OSError as exc:
+                    err = error(exc)
+                if err:
+                    failed[path] = err
+        os.remove(archive)
+    for item in req['assemble']:
+        path, directory = item['path'], item['dir']
+        if not all(os.path.exists(os.path.join(directory, str(i))) for i in range(item['count'])):
+            failed[path] = 'incomplete'
+            continue
+        try:
+            err = write(path, parts(directory, item['count']), item['sha256'], item.get('mode'))
+        except OSError as exc:
+            err = error(exc)
+        if err:
+            failed[path] = err
+        if err != 'incomplete':
+            shutil.rmtree(directory, ignore_errors=True)
+    return failed
+
+def stage():
+    os.makedirs(req['staging'], exist_ok=True)
+    files, archives, splits = {}, [], {}
+    batch, batch_size = [], 0
+
+    def flush():
+        if batch:
+            name = os.path.join(req['staging'], str(len(archives)) + '.tar')
+            with tarfile.open(name, 'w') as tar:
+                for path in batch:
+                    tar.add(path, arcname=path.lstrip('/'), recursive=False)
+            archives.append({'path': name, 'members': list(batch)})
+
+    for path in req['paths']:
+        try:
+            if os.path.isdir(path):
+                raise IsADirectoryError(path)
+            size = os.path.getsize(path)
+            files[path] = {'size': size, 'sha256': digest(path)}
+        except OSError as exc:
+            files[path] = {'error': error(exc)}
+            continue
+        if size > req['pack_threshold']:
+            directory = os.path.join(req['staging'], str(len(splits)))
+            os.makedirs(directory)
+            hashes = []
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(req['chunk_size']), b''):
+                    part = os.path.join(directory, str(len(hashes)))
+                    with open(part, 'wb') as out:
+                        out.write(block)
+                    hashes.append(hashlib.sha256(block).hexdigest())
+            splits[path] = {'dir': directory, 'hashes': hashes}
+            continue
+        if batch and batch_size + size > req['chunk_size']:
+            flush()
+            batch, batch_size = [], 0
+        batch.append(path)
+        batch_size += size
+    flush()
+    with open(os.path.join(req['staging'], 'manifest.json'), 'w') as out:
+        json.dump({'files': files, 'archives': archives, 'splits': splits}, out)
+    return {}
+
+print(json.dumps({'prepare': prepare, 'commit': commit, 'stage': stage}[req['op']]()))
+"""
+)
+
+
+def _remote_command(script: str, payload: dict[str, Any], staging_dir: str) -> tuple[str, tuple[str, bytes] | None]:
+    """Return the command that runs `script` on `payload`, and the request file to upload first, if any."""
+    data = json.dumps(payload).encode("utf-8")
+    payload_b64 = base64.b64encode(data).decode("ascii")
+    if len(payload_b64) <= _INLINE_REQUEST_LIMIT:
+        return f"python3 -c {shlex.quote(script)} <<'__DEEPAGENTS_EOF__'\n{payload_b64}\n__DEEPAGENTS_EOF__", None
+    path = f"{staging_dir}/request-{uuid.uuid4().hex}.json"
+    return f"python3 -c {shlex.quote(script)} {shlex.quote(path)}", (path, data)
+
+
+def _file_mode(st: os.stat_result) -> int | None:
+    """Return the permission bits to restore in the sandbox, or `None` on Windows, which has no POSIX modes."""
+    if os.name == "nt":
+        return None
+    return stat.S_IMODE(st.st_mode)
+
+
+def _parse_remote(output: str, op: str) -> dict[str, Any]:
+    try:
+        return json.loads(output.strip().splitlines()[-1])
+    except (IndexError, json.JSONDecodeError) as e:
+        msg = f"Sandbox transfer step '{op}' failed: {output.strip() or 'no output'}"
+        raise RuntimeError(msg) from e
+
+
+@dataclass
+class TransferResult:
+    """Result of transferring a single file.
+
+    Attributes:
+        path: Path of the file in the sandbox.
+        error: Error code on failure, `None` on success.
+        content: Downloaded content. Always `None` for uploads.
+        chunks_reused: Number of chunks that were already staged from an earlier,
+            interrupted upload and were not sent again.
+    """
+
+    path: str
+    error: FileOperationError | TransferError | None = None
+    content: bytes | None = None
+    chunks_reused: int = 0
+
+
+@dataclass
+class _Source:
+    """A file to upload, with its content read lazily from memory or disk."""
+
+    index: int
+    path: str
+    data: bytes | Path
+    size: int = 0
+    sha256: str = ""
+    chunk_hashes: list[str] = field(default_factory=list)
+    mode: int | None = None
+    """Permission bits to restore in the sandbox. `None` leaves the sandbox default."""
+
+    def stat(self) -> int:
+        """Return the content size, recording the permission bits of a local file."""
+        if isinstance(self.data, bytes):
+            return len(self.data)
+        st = self.data.stat()
+        self.mode = _file_mode(st)
+        return st.st_size
+
+    def read(self, offset: int, length: int) -> bytes:
+        if isinstance(self.data, bytes):
+            return self.data[offset : offset + length]
+        with self.data.open("rb") as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def hash(self, chunk_size: int, *, chunked: bool) -> None:
+        total = hashlib.sha256()
+        self.chunk_hashes = []
+        offset = 0
+        while True:
+            chunk = self.read(offset, chunk_size)
+            if not chunk and offset:
+                break
+            total.update(chunk)
+            if chunked:
+                self.chunk_hashes.append(hashlib.sha256(chunk).hexdigest())
+            offset += len(chunk)
+            if len(chunk) < chunk_size:
+                break
+        self.size = offset
+        self.sha256 = total.hexdigest()
+
+
+@dataclass
+class _UploadPlan:
+    results: list[TransferResult]
+    archives: list[tuple[str, list[_Source]]]
+    large: list[tuple[_Source, str]]
+    """Large files with their staging directory."""
+
+
+@dataclass
+class _Job:
+    """A single upload or download request, retried on failure."""
+
+    remote: str
+    source: _Source | None = None
+    offset: int = 0
+    length: int = 0
+    members: list[_Source] = field(default_factory=list)
+    expected: str | None = None
+    """Checksum of a downloaded chunk."""
+    data: bytes | None = None
+    ok: bool = False
+
+
+class SandboxTransfer:
+    """Transfer engine for moving many or large files in and out of a sandbox.
+
+    Args:
+        backend: Sandbox to transfer files to and from.
+        chunk_size: Size of each chunk of a large file, and the maximum size of a tar
+            archive of small files.
+        pack_threshold: Files up to this size are packed into tar archives.
+        max_concurrency: Maximum number of requests in flight.
+        retries: Number of times a failed request is retried.
+        staging_dir: Directory in the sandbox where chunks and archives are staged.
+    """
+
+    def __init__(
+        self,
+        backend: SandboxBackendProtocol,
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        pack_threshold: int = DEFAULT_PACK_THRESHOLD,
+        max_concurrency: int = 8,
+        retries: int = 2,
+        staging_dir: str = DEFAULT_STAGING_DIR,
+    ) -> None:
+        """Initialize the transfer engine."""
+        if chunk_size <= 0 or max_concurrency <= 0:
+            msg = "chunk_size and max_concurrency must be positive"
+            raise ValueError(msg)
+        self.backend = backend
+        self.chunk_size = chunk_size
+        self.pack_threshold = min(pack_threshold, chunk_size)
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.staging_dir = staging_dir.rstrip("/")
+
+    def chunk_dir(self, path: str, sha256: str) -> str:
+        """Return the staging directory for the chunks of a large upload.
+
+        Chunk `i` of the upload is staged as `{chunk_dir}/{i}`. Chunks already staged
+        there with a matching hash are not sent again, so callers that can
+        reconstruct some chunks inside the sandbox may place them here up front.
+
+        Args:
+            path: Destination path of the file in the sandbox.
+            sha256: SHA-256 of the file content.
+
+        Returns:
+            Path of the staging directory in the sandbox.
+        """
+        key = hashlib.sha256(f"{path}\0{sha256}".encode()).hexdigest()[:32]
+        return f"{self.staging_dir}/{key}"
+
+    # Planning, shared by the sync and async paths
+
+    def _plan_upload(self, files: Sequence[tuple[str, bytes | Path]]) -> _UploadPlan:
+        results = [TransferResult(path=path) for path, _ in files]
+        small: list[_Source] = []
+        large: list[tuple[_Source, str]] = []
+        for index, (path, data) in enumerate(files):
+            if not path.startswith("/"):
+                results[index].error = "invalid_path"
+                continue
+            source = _Source(index=index, path=path, data=data)
+            try:
+                size = source.stat()
+                source.hash(self.chunk_size, chunked=size > self.pack_threshold)
+            except FileNotFoundError:
+                results[index].error = "file_not_found"
+                continue
+            except IsADirectoryError:
+                results[index].error = "is_directory"
+                continue
+            except PermissionError:
+                results[index].error = "permission_denied"
+                continue
+            if source.size > self.pack_threshold:
+                large.append((source, self.chunk_dir(path, source.sha256)))
+            else:
+                small.append(source)
+
+        archives: list[tuple[str, list[_Source]]] = []
+        batch: list[_Source] = []
+        batch_size = 0
+        for source in small:
+            if batch and batch_size + source.size > self.chunk_size:
+                archives.append((f"{self.staging_dir}/{uuid.uuid4().hex}.tar", batch))
+                batch, batch_size = [], 0
+            batch.append(source)
+            batch_size += source.size
+        if batch:
+            archives.append((f"{self.staging_dir}/{uuid.uuid4().hex}.tar", batch))
+        return _UploadPlan(results=results, archives=archives, large=large)
+
+    def _upload_jobs(self, plan: _UploadPlan, existing: dict[str, dict[str, str]]) -> list[_Job]:
+        jobs = [_Job(remote=remote, members=members) for remote, members in plan.archives]
+        for source, directory in plan.large:
+            staged = existing.get(directory, {})
+            for i, chunk_hash in enumerate(source.chunk_hashes):
+                if staged.get(str(i)) == chunk_hash:
+                    plan.results[source.index].chunks_reused += 1
+                    continue
+                jobs.append(_Job(remote=f"{directory}/{i}", source=source, offset=i * self.chunk_size, length=self.chunk_size))
+        return jobs
+
+    @staticmethod
+    def _job_payload(job: _Job) -> bytes:
+        if job.source is not None:
+            return job.source.read(job.offset, job.length)
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w") as tar:
+            for member in job.members:
+                content = member.read(0, member.size)
+                info = tarfile.TarInfo(member.path.lstrip("/"))
+                info.size = len(content)
+                if member.mode is not None:
+                    info.mode = member.mode
+                tar.addfile(info, io.BytesIO(content))
+        return buffer.getvalue()
+
+    def _commit_request(self, plan: _UploadPlan, jobs: list[_Job]) -> dict[str, Any] | None:
+        failed_remotes = {job.remote for job in jobs if not job.ok}
+        archives: list[str] = []
+        hashes: dict[str, str] = {}
+        modes: dict[str, int] = {}
+        for remote, members in plan.archives:
+            if remote in failed_remotes:
+                for member in members:
+                    plan.results[member.index].error = "incomplete"
+                continue
+            archives.append(remote)
+            hashes.update({member.path: member.sha256 for member in members})
+            modes.update({member.path: member.mode for member in members if member.mode is not None})
+        assemble = []
+        for source, directory in plan.large:
+            if any(remote.startswith(f"{directory}/") for remote in failed_remotes):
+                plan.results[source.index].error = "incomplete"
+                continue
+            assemble.append({"path": source.path, "dir": directory, "count": len(source.chunk_hashes), "sha256": source.sha256, "mode": source.mode})
+        if not archives and not assemble:
+            return None
+        return {"op": "commit", "archives": archives, "hashes": hashes, "modes": modes, "assemble": assemble}
+
+    @staticmethod
+    def _apply_failures(results: list[TransferResult], failed: dict[str, Any]) -> None:
+        for result in results:
+            if result.error is None and result.path in failed:
+                result.error = failed[result.path]
+
+    @staticmethod
+    def _commit_failed(results: list[TransferResult]) -> None:
+        """Mark the files of a commit step that did not run as incomplete; their chunks stay staged."""
+        for result in results:
+            if result.error is None:
+                result.error = "incomplete"
+
+    def _stage_request(self, paths: list[str], run_dir: str) -> dict[str, Any]:
+        return {"op": "stage", "paths": paths, "staging": run_dir, "chunk_size": self.chunk_size, "pack_threshold": self.pack_threshold}
+
+    def _prepare_request(self, plan: _UploadPlan) -> dict[str, Any]:
+        return {"op": "prepare", "staging": self.staging_dir, "dirs": [directory for _, directory in plan.large]}
+
+    @staticmethod
+    def _download_jobs(manifest: dict[str, Any]) -> list[_Job]:
+        jobs = [_Job(remote=archive["path"]) for archive in manifest["archives"]]
+        for split in manifest["splits"].values():
+            jobs.extend(_Job(remote=f"{split['dir']}/{i}", expected=chunk_hash) for i, chunk_hash in enumerate(split["hashes"]))
+        return jobs
+
+    @staticmethod
+    def _check_download(job: _Job, content: bytes | None) -> bool:
+        if content is None:
+            return False
+        if job.expected is not None and hashlib.sha256(content).hexdigest() != job.expected:
+            return False
+        job.data = content
+        return True
+
+    @staticmethod
+    def _assemble_downloads(results: list[TransferResult], manifest: dict[str, Any], jobs: list[_Job]) -> None:
+        by_remote = {job.remote: job for job in jobs}
+        contents: dict[str, bytes | None] = {}
+        for archive in manifest["archives"]:
+            data = by_remote[archive["path"]].data
+            if data is None:
+                contents.update(dict.fromkeys(archive["members"]))
+                continue
+            with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+                for member in tar:
+                    extracted = tar.extractfile(member)
+                    contents["/" + member.name] = extracted.read() if extracted is not None else b""
+        for path, split in manifest["splits"].items():
+            chunks = [by_remote[f"{split['dir']}/{i}"].data for i in range(len(split["hashes"]))]
+            contents[path] = None if any(chunk is None for chunk in chunks) else b"".join(chunks)  # ty: ignore[no-matching-overload]
+
+        for result in results:
+            if result.error is not None:
+                continue
+            info = manifest["files"].get(result.path, {})
+            if "error" in info:
+                result.error = info["error"]
+                continue
+            content = contents.get(result.path)
+            if content is None:
+                result.error = "incomplete"
+            elif hashlib.sha256(content).hexdigest() != info["sha256"]:
+                result.error = "checksum_mismatch"
+            else:
+                result.content = content
+
+    # Sync API
+
+    def _run_remote(self, script: str, payload: dict[str, Any], op: str) -> str:
+        """Run a script in the sandbox on `payload` and return its output.
+
+        Raises:
+            RuntimeError: If a request too large for the command line could not be uploaded.
+        """
+        command, request = _remote_command(script, payload, self.staging_dir)
+        if request is not None:
+            error = self.backend.upload_files([request])[0].error
+            if error is not None:
+                # The staging directory may not exist yet
+                self.backend.execute(f"mkdir -p {shlex.quote(self.staging_dir)}")
+                error = self.backend.upload_files([request])[0].error
+            if error is not None:
+                msg = f"Sandbox transfer step '{op}' failed: request could not be uploaded: {error}"
+                raise RuntimeError(msg)
+        return self.backend.execute(command).output
+
+    def _run_jobs(self, jobs: list[_Job], attempt: Callable[[_Job], bool]) -> None:
+        def run(job: _Job) -> None:
+            for _ in range(self.retries + 1):
+                try:
+                    job.ok = attempt(job)
+                except Exception:  # noqa: BLE001  # Failed requests are retried, then reported per file
+                    job.ok = False
+                if job.ok:
+                    return
+
+        if not jobs:
+            return
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(jobs))) as executor:
+            list(executor.map(run, jobs))
+
+    def upload(self, files: Sequence[tuple[str, bytes | Path]]) -> list[TransferResult]:
+        """Upload files into the sandbox.
+
+        Args:
+            files: `(sandbox_path, content)` pairs. Content is either bytes or a local
+                file path that is read in chunks.
+
+        Returns:
+            One `TransferResult` per input file, in input order.
+        """
+        plan = self._plan_upload(files)
+        if not plan.archives and not plan.large:
+            return plan.results
+        prepared = self._run_remote(_REMOTE_SCRIPT, self._prepare_request(plan), "prepare")
+        jobs = self._upload_jobs(plan, _parse_remote(prepared, "prepare"))
+
+        def attempt(job: _Job) -> bool:
+            return self.backend.upload_files([(job.remote, self._job_payload(job))])[0].error is None
+
+        self._run_jobs(jobs, attempt)
+        request = self._commit_request(plan, jobs)
+        if request is not None:
+            try:
+                self._apply_failures(plan.results, _parse_remote(self._run_remote(_REMOTE_SCRIPT, request, "commit"), "commit"))
+            except RuntimeError:
+                self._commit_failed(plan.results)
+        return plan.results
+
+    def download(self, paths: Sequence[str]) -> list[TransferResult]:
+        """Download files from the sandbox.
+
+        Args:
+            paths: Paths of the files in the sandbox.
+
+        Returns:
+            One `TransferResult` per input path, in input order, with `content` set on
+            success.
+        """
+        results = [TransferResult(path=path, error=None if path.startswith("/") else "invalid_path") for path in paths]
+        valid = [result.path for result in results if result.error is None]
+        if not valid:
+            return results
+        run_dir = f"{self.staging_dir}/{uuid.uuid4().hex}"
+        try:
+            _parse_remote(self._run_remote(_REMOTE_SCRIPT, self._stage_request(valid, run_dir), "stage"), "stage")
+            manifest_response = self.backend.download_files([f"{run_dir}/manifest.json"])[0]
+            if manifest_response.content is None:
+                msg = f"Sandbox transfer manifest could not be downloaded: {manifest_response.error}"
+                raise RuntimeError(msg)
+            manifest = json.loads(manifest_response.content)
+            jobs = self._download_jobs(manifest)
+            self._run_jobs(jobs, lambda job: self._check_download(job, self.backend.download_files([job.remote])[0].content))
+            self._assemble_downloads(results, manifest, jobs)
+        finally:
+            self.backend.execute(f"rm -rf {shlex.quote(run_dir)}")
+        return results
+
+    # Async API
+
+    async def _arun_remote(self, script: str, payload: dict[str, Any], op: str) -> str:
+        """Async version of _run_remote."""
+        command, request = _remote_command(script, payload, self.staging_dir)
+        if request is not None:
+            error = (await self.backend.aupload_files([request]))[0].error
+            if error is not None:
+                await self.backend.aexecute(f"mkdir -p {shlex.quote(self.staging_dir)}")
+                error = (await self.backend.aupload_files([request]))[0].error
+            if error is not None:
+                msg = f"Sandbox transfer step '{op}' failed: request could not be uploaded: {error}"
+                raise RuntimeError(msg)
+        return (await self.backend.aexecute(command)).output
+
+    async def _arun_jobs(self, jobs: list[_Job], attempt: Callable[[_Job], Awaitable[bool]]) -> None:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(job: _Job) -> None:
+            async with semaphore:
+                for _ in range(self.retries + 1):
+                    try:
+                        job.ok = await attempt(job)
+                    except Exception:  # noqa: BLE001  # Failed requests are retried, then reported per file
+                        job.ok = False
+                    if job.ok:
+                        return
+
+        await asyncio.gather(*(run(job) for job in jobs))
+
+    async def aupload(self, files: Sequence[tuple[str, bytes | Path]]) -> list[TransferResult]:
+        """Async version of upload."""
+        plan = await asyncio.to_thread(self._plan_upload, files)
+        if not plan.archives and not plan.large:
+            return plan.results
+        prepared = await self._arun_remote(_REMOTE_SCRIPT, self._prepare_request(plan), "prepare")
+        jobs = self._upload_jobs(plan, _parse_remote(prepared, "prepare"))
+
+        async def attempt(job: _Job) -> bool:
+            payload = await asyncio.to_thread(self._job_payload, job)
+            return (await self.backend.aupload_files([(job.remote, payload)]))[0].error is None
+
+        await self._arun_jobs(jobs, attempt)
+        request = self._commit_request(plan, jobs)
+        if request is not None:
+            try:
+                self._apply_failures(plan.results, _parse_remote(await self._arun_remote(_REMOTE_SCRIPT, request, "commit"), "commit"))
+            except RuntimeError:
+                self._commit_failed(plan.results)
+        return plan.results
+
+    async def adownload(self, paths: Sequence[str]) -> list[TransferResult]:
+        """Async version of download."""
+        results = [TransferResult(path=path, error=None if path.startswith("/") else "invalid_path") for path in paths]
+        valid = [result.path for result in results if result.error is None]
+        if not valid:
+            return results
+        run_dir = f"{self.staging_dir}/{uuid.uuid4().hex}"
+        try:
+            _parse_remote(await self._arun_remote(_REMOTE_SCRIPT, self._stage_request(valid, run_dir), "stage"), "stage")
+            manifest_response = (await self.backend.adownload_files([f"{run_dir}/manifest.json"]))[0]
+            if manifest_response.content is None:
+                msg = f"Sandbox transfer manifest could not be downloaded: {manifest_response.error}"
+                raise RuntimeError(msg)
+            manifest = json.loads(manifest_response.content)
+            jobs = self._download_jobs(manifest)
+
+            async def attempt(job: _Job) -> bool:
+                return self._check_download(job, (await self.backend.adownload_files([job.remote]))[0].content)
+
+            await self._arun_jobs(jobs, attempt)
+            self._assemble_downloads(results, manifest, jobs)
+        finally:
+            await self.backend.aexecute(f"rm -rf {shlex.quote(run_dir)}")
+        return results
+
+
+__all__ = [
+    "DEFAULT_CHUNK_SIZE",
+    "DEFAULT_PACK_THRESHOLD",
+    "DEFAULT_STAGING_DIR",
+    "SandboxTransfer",
+    "TransferError",
+    "TransferResult",
+]
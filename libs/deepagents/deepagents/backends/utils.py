@@ -14,7 +14,8 @@ from typing import Any, Literal, overload
 
 import wcmatch.glob as wcglob
 
-from deepagents.backends.protocol import FileInfo as _FileInfo, GrepMatch as _GrepMatch
+from deepagents.backends.protocol import EditOperation as _EditOperation, FileInfo as _FileInfo, GrepMatch as _GrepMatch
+from deepagents.tokens import CachedTokenEstimator, get_default_token_estimator
 
 EMPTY_CONTENT_WARNING = "System reminder: File exists but has empty contents"
 MAX_LINE_LENGTH = 5000
@@ -210,24 +211,66 @@ def perform_string_replacement(
     return new_content, occurrences
 
 
+def perform_string_replacements(
+    content: str,
+    edits: Sequence[_EditOperation],
+) -> tuple[str, int] | str:
+    """Apply a batch of string replacements in order, all or nothing.
+
+    Each edit is validated against the result of the previous one. A batch with
+    a single edit behaves exactly like `perform_string_replacement`.
+
+    Args:
+        content: Original content
+        edits: `(old_string, new_string, replace_all)` tuples to apply in order
+
+    Returns:
+        Tuple of (new_content, total_occurrences) on success, or error message string
+    """
+    if not edits:
+        return "Error: No edits provided"
+    total = 0
+    for index, (old_string, new_string, replace_all) in enumerate(edits):
+        result = perform_string_replacement(content, old_string, new_string, replace_all)
+        if isinstance(result, str):
+            if len(edits) == 1:
+                return result
+            reason = result.removeprefix("Error: ")
+            return f"Error: Edit {index + 1} of {len(edits)} failed, no edits were applied. {reason}"
+        content, occurrences = result
+        total += occurrences
+    return content, total
+
+
 @overload
-def truncate_if_too_long(result: list[str]) -> list[str]: ...
+def truncate_if_too_long(result: list[str], *, token_estimator: CachedTokenEstimator | None = None) -> list[str]: ...
 
 
 @overload
-def truncate_if_too_long(result: str) -> str: ...
+def truncate_if_too_long(result: str, *, token_estimator: CachedTokenEstimator | None = None) -> str: ...
+
+
+def truncate_if_too_long(result: list[str] | str, *, token_estimator: CachedTokenEstimator | None = None) -> list[str] | str:
+    """Truncate list or string result if it exceeds the token limit.
 
+    Args:
+        result: Tool output as a list of entries or a single string.
+        token_estimator: Estimator used to measure the result.
+
+            Defaults to the process-wide default estimator (4 chars/token unless replaced).
 
-def truncate_if_too_long(result: list[str] | str) -> list[str] | str:
-    """Truncate list or string result if it exceeds token limit (rough estimate: 4 chars/token)."""
+    Returns:
+        The result, truncated with `TRUNCATION_GUIDANCE` appended if it was too long.
+    """
+    estimator = token_estimator or get_default_token_estimator()
     if isinstance(result, list):
-        total_chars = sum(len(item) for item in result)
-        if total_chars > TOOL_RESULT_TOKEN_LIMIT * 4:
-            return result[: len(result) * TOOL_RESULT_TOKEN_LIMIT * 4 // total_chars] + [TRUNCATION_GUIDANCE]  # noqa: RUF005  # Concatenation preferred for clarity
+        tokens = estimator("".join(result))
+        if tokens > TOOL_RESULT_TOKEN_LIMIT:
+            return result[: len(result) * TOOL_RESULT_TOKEN_LIMIT // tokens] + [TRUNCATION_GUIDANCE]  # noqa: RUF005  # Concatenation preferred for clarity
         return result
     # string
-    if len(result) > TOOL_RESULT_TOKEN_LIMIT * 4:
-        return result[: TOOL_RESULT_TOKEN_LIMIT * 4] + "\n" + TRUNCATION_GUIDANCE
+    if estimator(result) > TOOL_RESULT_TOKEN_LIMIT:
+        return result[: estimator.max_chars(result, TOOL_RESULT_TOKEN_LIMIT)] + "\n" + TRUNCATION_GUIDANCE
     return result
 
 
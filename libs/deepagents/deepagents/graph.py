@@ -1,15 +1,18 @@
 """Deep Agents come with planning, filesystem, and subagents."""
 
-from collections.abc import Callable, Sequence
-from typing import Any
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Sequence
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Literal
 
 from langchain.agents import create_agent
 from langchain.agents.middleware import HumanInTheLoopMiddleware, InterruptOnConfig, TodoListMiddleware
 from langchain.agents.middleware.types import AgentMiddleware
 from langchain.agents.structured_output import ResponseFormat
 from langchain.chat_models import init_chat_model
-from langchain_anthropic import ChatAnthropic
-from langchain_anthropic.middleware import AnthropicPromptCachingMiddleware
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import SystemMessage
 from langchain_core.tools import BaseTool
@@ -18,12 +21,15 @@ from langgraph.graph.state import CompiledStateGraph
 from langgraph.store.base import BaseStore
 from langgraph.types import Checkpointer
 
+from deepagents._fingerprint import fingerprint
 from deepagents.backends import StateBackend
 from deepagents.backends.protocol import BackendFactory, BackendProtocol
 from deepagents.middleware.filesystem import FilesystemMiddleware
 from deepagents.middleware.memory import MemoryMiddleware
 from deepagents.middleware.patch_tool_calls import PatchToolCallsMiddleware
-from deepagents.middleware.skills import SkillsMiddleware
+from deepagents.middleware.prompt_caching import PromptCacheBreakpointMiddleware, PromptCacheUsageMiddleware
+from deepagents.middleware.skills import SkillsMiddleware, SkillsRegistry
+from deepagents.middleware.subagent_scheduler import SubAgentScheduler
 from deepagents.middleware.subagents import (
     GENERAL_PURPOSE_SUBAGENT,
     CompiledSubAgent,
@@ -32,6 +38,11 @@ from deepagents.middleware.subagents import (
 )
 from deepagents.middleware.summarization import SummarizationMiddleware, _compute_summarization_defaults
 
+if TYPE_CHECKING:
+    from langchain_anthropic import ChatAnthropic
+
+logger = logging.getLogger(__name__)
+
 BASE_AGENT_PROMPT = """You are a Deep Agent, an AI assistant that helps users accomplish tasks using tools. You respond with text and tool calls. The user can see your responses and tool outputs in real time.
 
 ## Core Behavior
@@ -67,19 +78,61 @@ Keep working until the task is fully complete. Don't stop partway and explain wh
 For longer tasks, provide brief progress updates at reasonable intervals — a concise sentence recapping what you've done and what's next."""  # noqa: E501
 
 
-def get_default_model() -> ChatAnthropic:
+def get_default_model() -> "ChatAnthropic":
     """Get the default model for deep agents.
 
     Returns:
         `ChatAnthropic` instance configured with Claude Sonnet 4.5.
     """
+    from langchain_anthropic import ChatAnthropic  # noqa: PLC0415  # Provider package loads only when a model is created
+
     return ChatAnthropic(
         model_name="claude-sonnet-4-5-20250929",
         max_tokens=20000,
     )
 
 
-def create_deep_agent(  # noqa: C901, PLR0912  # Complex graph assembly logic with many conditional branches
+@dataclass(frozen=True)
+class GraphCacheInfo:
+    """Statistics of the `create_deep_agent` graph cache.
+
+    Attributes:
+        hits: Calls that returned a previously compiled graph.
+        misses: Calls that built a new graph.
+        size: Number of graphs currently cached.
+        build_seconds: Total seconds spent building graphs.
+        last_build_seconds: Seconds spent building the most recent graph.
+    """
+
+    hits: int
+    misses: int
+    size: int
+    build_seconds: float
+    last_build_seconds: float
+
+
+_COMPILED_AGENTS: OrderedDict[Hashable, CompiledStateGraph] = OrderedDict()
+"""Compiled deep agent graphs keyed by the fingerprint of their `create_deep_agent` arguments."""
+
+_COMPILED_AGENTS_MAX = 64
+_COMPILED_AGENTS_LOCK = threading.Lock()
+_graph_cache_stats = {"hits": 0, "misses": 0, "build_seconds": 0.0, "last_build_seconds": 0.0}
+
+
+def graph_cache_info() -> GraphCacheInfo:
+    """Return hit, miss and construction time statistics of the graph cache."""
+    with _COMPILED_AGENTS_LOCK:
+        return GraphCacheInfo(size=len(_COMPILED_AGENTS), **_graph_cache_stats)  # ty: ignore[invalid-argument-type]
+
+
+def clear_graph_cache() -> None:
+    """Drop all cached graphs and reset the statistics."""
+    with _COMPILED_AGENTS_LOCK:
+        _COMPILED_AGENTS.clear()
+        _graph_cache_stats.update(hits=0, misses=0, build_seconds=0.0, last_build_seconds=0.0)
+
+
+def create_deep_agent(  # noqa: C901, PLR0912, PLR0915  # Complex graph assembly logic with many conditional branches
     model: str | BaseChatModel | None = None,
     tools: Sequence[BaseTool | Callable | dict[str, Any]] | None = None,
     *,
@@ -97,6 +150,10 @@ def create_deep_agent(  # noqa: C901, PLR0912  # Complex graph assembly logic wi
     debug: bool = False,
     name: str | None = None,
     cache: BaseCache | None = None,
+    system_prompt_layout: Literal["stack", "tiered"] = "stack",
+    subagent_scheduler: SubAgentScheduler | None = None,
+    skills_registry: SkillsRegistry | None = None,
+    reuse_graph: bool = False,
 ) -> CompiledStateGraph:
     """Create a deep agent.
 
@@ -169,10 +226,76 @@ def create_deep_agent(  # noqa: C901, PLR0912  # Complex graph assembly logic wi
         debug: Whether to enable debug mode. Passed through to `create_agent`.
         name: The name of the agent. Passed through to `create_agent`.
         cache: The cache to use for the agent. Passed through to `create_agent`.
+        system_prompt_layout: How the system prompt sections are ordered.
+
+            `"stack"` appends sections in middleware order (memory and skills before the
+            filesystem and subagent instructions).
+
+            `"tiered"` orders sections by how often they change, so provider prompt caching
+            keeps hitting: the static base prompt and tool instructions first, then memory and
+            skills, then sections added by `middleware` (e.g. volatile local context). With
+            Anthropic models a cache breakpoint is placed after each of the first two tiers.
+
+            In both layouts, cache reads and writes of every model call are emitted as
+            `prompt_cache_usage` custom stream events and summed in the `prompt_cache_usage`
+            state key.
+        subagent_scheduler: Optional `SubAgentScheduler` bounding how many subagents run
+            concurrently when the model emits several `task` calls, with priority
+            ordering of queued runs and per-model rate limits for subagent model calls.
+        skills_registry: Optional `SkillsRegistry` shared by the main agent and all subagents.
+
+            When set, skills are revalidated before every turn so added, edited and removed
+            skills take effect in running threads, and only changed `SKILL.md` files are parsed.
+        reuse_graph: Whether to return the graph compiled by an earlier call with equivalent arguments.
+
+            Off by default. Models, prompts and other plain values are compared by value.
+            Everything the caller supplies as an object (custom middleware, tools, backends
+            and backend factories, checkpointers, stores) is compared by identity, so
+            sessions share a graph only when they pass the very same instances. The cache
+            keeps up to 64 graphs together with those objects alive, so enable this only
+            when they are long-lived (e.g. a module-level checkpointer and backend factory)
+            rather than created per session. Compiled subagent graphs are shared the same
+            way. See `graph_cache_info` for hit rates and construction times.
 
     Returns:
         A configured deep agent.
     """
+    start = time.perf_counter()
+    key: Hashable = None
+    if reuse_graph:
+        key = fingerprint(
+            {
+                "model": model,
+                "tools": tools,
+                "system_prompt": system_prompt,
+                "middleware": middleware,
+                "subagents": subagents,
+                "skills": skills,
+                "memory": memory,
+                "response_format": response_format,
+                "context_schema": context_schema,
+                "checkpointer": checkpointer,
+                "store": store,
+                "backend": backend,
+                "interrupt_on": interrupt_on,
+                "debug": debug,
+                "name": name,
+                "cache": cache,
+                "system_prompt_layout": system_prompt_layout,
+                "subagent_scheduler": subagent_scheduler,
+                "skills_registry": skills_registry,
+            }
+        )
+        with _COMPILED_AGENTS_LOCK:
+            graph = _COMPILED_AGENTS.get(key)
+            if graph is not None:
+                _COMPILED_AGENTS.move_to_end(key)
+                _graph_cache_stats["hits"] += 1
+                return graph
+
+    # Deferred so `import deepagents` doesn't load the Anthropic SDK
+    from langchain_anthropic.middleware import AnthropicPromptCachingMiddleware  # noqa: PLC0415
+
     if model is None:
         model = get_default_model()
     elif isinstance(model, str):
@@ -208,7 +331,7 @@ def create_deep_agent(  # noqa: C901, PLR0912  # Complex graph assembly logic wi
         PatchToolCallsMiddleware(),
     ]
     if skills is not None:
-        gp_middleware.append(SkillsMiddleware(backend=backend, sources=skills))
+        gp_middleware.append(SkillsMiddleware(backend=backend, sources=skills, registry=skills_registry))
     if interrupt_on is not None:
         gp_middleware.append(HumanInTheLoopMiddleware(interrupt_on=interrupt_on))
 
@@ -249,7 +372,7 @@ def create_deep_agent(  # noqa: C901, PLR0912  # Complex graph assembly logic wi
             ]
             subagent_skills = spec.get("skills")
             if subagent_skills:
-                subagent_middleware.append(SkillsMiddleware(backend=backend, sources=subagent_skills))
+                subagent_middleware.append(SkillsMiddleware(backend=backend, sources=subagent_skills, registry=skills_registry))
             subagent_middleware.extend(spec.get("middleware", []))
 
             processed_spec: SubAgent = {  # ty: ignore[missing-typed-dict-key]
@@ -264,20 +387,36 @@ def create_deep_agent(  # noqa: C901, PLR0912  # Complex graph assembly logic wi
     all_subagents: list[SubAgent | CompiledSubAgent] = [general_purpose_spec, *processed_subagents]
 
     # Build main agent middleware stack
+    context_middleware: list[AgentMiddleware[Any, Any, Any]] = []
+    if memory is not None:
+        context_middleware.append(MemoryMiddleware(backend=backend, sources=memory))
+    if skills is not None:
+        context_middleware.append(SkillsMiddleware(backend=backend, sources=skills, registry=skills_registry))
+    static_middleware: list[AgentMiddleware[Any, Any, Any]] = [
+        FilesystemMiddleware(backend=backend),
+        SubAgentMiddleware(
+            backend=backend,
+            subagents=all_subagents,
+            scheduler=subagent_scheduler,
+            reuse_graphs=reuse_graph,
+        ),
+    ]
+
     deepagent_middleware: list[AgentMiddleware[Any, Any, Any]] = [
         TodoListMiddleware(),
     ]
-    if memory is not None:
-        deepagent_middleware.append(MemoryMiddleware(backend=backend, sources=memory))
-    if skills is not None:
-        deepagent_middleware.append(SkillsMiddleware(backend=backend, sources=skills))
+    if system_prompt_layout == "tiered":
+        # Static instructions, then slowly-changing memory/skills, then user middleware
+        deepagent_middleware.extend(static_middleware)
+        deepagent_middleware.append(PromptCacheBreakpointMiddleware(tier="static"))
+        if context_middleware:
+            deepagent_middleware.extend(context_middleware)
+            deepagent_middleware.append(PromptCacheBreakpointMiddleware(tier="context"))
+    else:
+        deepagent_middleware.extend(context_middleware)
+        deepagent_middleware.extend(static_middleware)
     deepagent_middleware.extend(
         [
-            FilesystemMiddleware(backend=backend),
-            SubAgentMiddleware(
-                backend=backend,
-                subagents=all_subagents,
-            ),
             SummarizationMiddleware(
                 model=model,
                 backend=backend,
@@ -288,6 +427,7 @@ def create_deep_agent(  # noqa: C901, PLR0912  # Complex graph assembly logic wi
             ),
             AnthropicPromptCachingMiddleware(unsupported_model_behavior="ignore"),
             PatchToolCallsMiddleware(),
+            PromptCacheUsageMiddleware(),
         ]
     )
 
@@ -305,7 +445,7 @@ def create_deep_agent(  # noqa: C901, PLR0912  # Complex graph assembly logic wi
         # String: simple concatenation
         final_system_prompt = system_prompt + "\n\n" + BASE_AGENT_PROMPT
 
-    return create_agent(
+    graph = create_agent(
         model,
         system_prompt=final_system_prompt,
         tools=tools,
@@ -318,3 +458,17 @@ def create_deep_agent(  # noqa: C901, PLR0912  # Complex graph assembly logic wi
         name=name,
         cache=cache,
     ).with_config({"recursion_limit": 1000})
+
+    build_seconds = time.perf_counter() - start
+    logger.debug("Built deep agent graph in %.1f ms", build_seconds * 1000)
+    with _COMPILED_AGENTS_LOCK:
+        _graph_cache_stats["misses"] += 1
+        _graph_cache_stats["build_seconds"] += build_seconds
+        _graph_cache_stats["last_build_seconds"] = build_seconds
+        if reuse_graph:
+            # Another thread may have built the same graph meanwhile; keep the first one
+            graph = _COMPILED_AGENTS.setdefault(key, graph)
+            _COMPILED_AGENTS.move_to_end(key)
+            if len(_COMPILED_AGENTS) > _COMPILED_AGENTS_MAX:
+                _COMPILED_AGENTS.popitem(last=False)
+    return graph
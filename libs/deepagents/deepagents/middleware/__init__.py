@@ -1,17 +1,51 @@
-"""Middleware for the agent."""
+"""Middleware for the agent.
 
-from deepagents.middleware.filesystem import FilesystemMiddleware
-from deepagents.middleware.memory import MemoryMiddleware
-from deepagents.middleware.skills import SkillsMiddleware
-from deepagents.middleware.subagents import CompiledSubAgent, SubAgent, SubAgentMiddleware
-from deepagents.middleware.summarization import SummarizationMiddleware
+Middleware classes are imported on first use, so importing one does not load the others.
+"""
+
+from typing import TYPE_CHECKING
+
+from deepagents._lazy_imports import lazy_exports
+
+if TYPE_CHECKING:
+    from deepagents.middleware.filesystem import FilesystemMiddleware
+    from deepagents.middleware.memory import MemoryMiddleware
+    from deepagents.middleware.prompt_caching import PromptCacheBreakpointMiddleware, PromptCacheUsageMiddleware
+    from deepagents.middleware.skills import SkillsMiddleware, SkillsRegistry
+    from deepagents.middleware.subagent_cache import SubAgentResultCache
+    from deepagents.middleware.subagent_scheduler import SubAgentScheduler
+    from deepagents.middleware.subagents import CompiledSubAgent, SubAgent, SubAgentMiddleware
+    from deepagents.middleware.summarization import SummarizationMiddleware
+
+__getattr__, __dir__ = lazy_exports(
+    __name__,
+    {
+        "CompiledSubAgent": "deepagents.middleware.subagents",
+        "FilesystemMiddleware": "deepagents.middleware.filesystem",
+        "MemoryMiddleware": "deepagents.middleware.memory",
+        "PromptCacheBreakpointMiddleware": "deepagents.middleware.prompt_caching",
+        "PromptCacheUsageMiddleware": "deepagents.middleware.prompt_caching",
+        "SkillsMiddleware": "deepagents.middleware.skills",
+        "SkillsRegistry": "deepagents.middleware.skills",
+        "SubAgent": "deepagents.middleware.subagents",
+        "SubAgentMiddleware": "deepagents.middleware.subagents",
+        "SubAgentResultCache": "deepagents.middleware.subagent_cache",
+        "SubAgentScheduler": "deepagents.middleware.subagent_scheduler",
+        "SummarizationMiddleware": "deepagents.middleware.summarization",
+    },
+)
 
 __all__ = [
     "CompiledSubAgent",
     "FilesystemMiddleware",
     "MemoryMiddleware",
+    "PromptCacheBreakpointMiddleware",
+    "PromptCacheUsageMiddleware",
     "SkillsMiddleware",
+    "SkillsRegistry",
     "SubAgent",
     "SubAgentMiddleware",
+    "SubAgentResultCache",
+    "SubAgentScheduler",
     "SummarizationMiddleware",
 ]
@@ -4,8 +4,10 @@
 import asyncio
 import base64
 import concurrent.futures
+import hashlib
 from collections.abc import Awaitable, Callable
 from pathlib import Path
+from types import CodeType
 from typing import Annotated, Any, Literal, NotRequired, cast
 
 from langchain.agents.middleware.types import (
@@ -14,13 +16,16 @@ from langchain.agents.middleware.types import (
     ContextT,
     ModelRequest,
     ModelResponse,
+    PrivateStateAttr,
     ResponseT,
 )
 from langchain.tools import ToolRuntime
 from langchain.tools.tool_node import ToolCallRequest
-from langchain_core.messages import ToolMessage
+from langchain_core.messages import AIMessage, ToolMessage
 from langchain_core.messages.content import create_image_block
 from langchain_core.tools import BaseTool, StructuredTool
+from langchain_core.tools.base import ArgsSchema
+from langgraph.runtime import Runtime
 from langgraph.types import Command
 from typing_extensions import TypedDict
 
@@ -29,6 +34,7 @@ from deepagents.backends.composite import CompositeBackend
 from deepagents.backends.protocol import (
     BACKEND_TYPES as BACKEND_TYPES,  # Re-export type here for backwards compatibility
     BackendProtocol,
+    EditOperation,
     EditResult,
     SandboxBackendProtocol,
     WriteResult,
@@ -42,6 +48,20 @@ from deepagents.backends.utils import (
     validate_path,
 )
 from deepagents.middleware._utils import append_to_system_message
+from deepagents.middleware.tool_stats import (
+    ToolStats,
+    _tool_stats_reducer,
+    current_trace,
+    finish_trace,
+    tool_stats_update,
+    trace_tool_call,
+    traced_backend,
+)
+from deepagents.tokens import (
+    NUM_CHARS_PER_TOKEN as NUM_CHARS_PER_TOKEN,  # Re-export for backwards compatibility
+    CachedTokenEstimator,
+    get_default_token_estimator,
+)
 
 EMPTY_CONTENT_WARNING = "System reminder: File exists but has empty contents"
 GLOB_TIMEOUT = 20.0  # seconds
@@ -68,10 +88,9 @@ READ_FILE_TRUNCATION_MSG = (
     "For other formats, you can use appropriate formatting tools to split long lines.]"
 )
 
-# Approximate number of characters per token for truncation calculations.
-# Using 4 chars per token as a conservative approximation (actual ratio varies by content)
-# This errs on the high side to avoid premature eviction of content that might fit
-NUM_CHARS_PER_TOKEN = 4
+
+# Directory where large tool results are evicted to
+LARGE_TOOL_RESULTS_DIR = "/large_tool_results"
 
 
 class FileData(TypedDict):
@@ -123,12 +142,65 @@ def _file_data_reducer(left: dict[str, FileData] | None, right: dict[str, FileDa
     return result
 
 
+def _aliases_reducer(left: dict[str, str] | None, right: dict[str, str | None]) -> dict[str, str]:
+    """Merge tool call aliases, treating `None` values as deletions.
+
+    Args:
+        left: Existing aliases mapping tool call ids to content-addressed paths.
+        right: Alias updates. Entries with `None` values are removed.
+
+    Returns:
+        Merged aliases dictionary.
+    """
+    result = dict(left or {})
+    for key, value in right.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = value
+    return result
+
+
 class FilesystemState(AgentState):
     """State for the filesystem middleware."""
 
     files: Annotated[NotRequired[dict[str, FileData]], _file_data_reducer]
     """Files in the filesystem."""
 
+    large_tool_result_aliases: NotRequired[Annotated[dict[str, str], PrivateStateAttr, _aliases_reducer]]
+    """Tool call ids mapped to the content-addressed path holding their evicted result."""
+
+    tool_stats: NotRequired[Annotated[dict[str, ToolStats], _tool_stats_reducer]]
+    """Per-tool latency and result size totals for the thread, keyed by tool name."""
+
+
+class FileEdit(TypedDict):
+    """An additional replacement passed to the `edit_file` tool in `edits`."""
+
+    old_string: str
+    """The exact text to find and replace."""
+
+    new_string: str
+    """The text to replace old_string with."""
+
+    replace_all: NotRequired[bool]
+    """Replace every occurrence instead of requiring a unique match."""
+
+
+def _edit_file_result(res: EditResult, tool_call_id: str | None) -> Command | str:
+    """Turn an edit result into the `edit_file` tool response."""
+    if res.error:
+        return res.error
+    message = f"Successfully replaced {res.occurrences} instance(s) of the string in '{res.path}'"
+    if res.files_update is not None:
+        return Command(update={"files": res.files_update, "messages": [ToolMessage(content=message, tool_call_id=tool_call_id)]})
+    return message
+
+
+def _edit_operations(old_string: str, new_string: str, replace_all: bool, edits: list[FileEdit]) -> list[EditOperation]:  # noqa: FBT001
+    """Flatten the `edit_file` arguments into `(old_string, new_string, replace_all)` tuples."""
+    return [(old_string, new_string, replace_all)] + [(edit["old_string"], edit["new_string"], edit.get("replace_all", False)) for edit in edits]
+
 
 LIST_FILES_TOOL_DESCRIPTION = """Lists all files in a directory.
 
@@ -165,6 +237,7 @@ Usage:
 - You must read the file before editing. This tool will error if you attempt an edit without reading the file first.
 - When editing, preserve the exact indentation (tabs/spaces) from the read output. Never include line number prefixes in old_string or new_string.
 - ALWAYS prefer editing existing files over creating new ones.
+- To make several changes to the same file in one call, pass the additional replacements in `edits`. They are applied in order after old_string/new_string, and if any of them fails the file is left unchanged.
 - Only use emojis if the user explicitly requests it."""
 
 
@@ -332,6 +405,64 @@ Here is a preview showing the head and tail of the result (lines of the form `..
 """
 
 
+_TOOL_ARGS_SCHEMAS: dict[CodeType, ArgsSchema] = {}
+"""Inferred tool argument schemas keyed by the tool function's code object."""
+
+
+def _structured_tool(
+    *,
+    name: str,
+    description: str,
+    func: Callable[..., Any],
+    coroutine: Callable[..., Awaitable[Any]],
+) -> StructuredTool:
+    """Create a tool, inferring its argument schema only once per tool function.
+
+    Every middleware instance defines its own tool closures, but closures share their
+    code object and therefore their signature. Inferring the pydantic schema dominates
+    tool creation, so it is reused across instances.
+    """
+    args_schema = _TOOL_ARGS_SCHEMAS.get(func.__code__)
+    tool = StructuredTool.from_function(name=name, description=description, func=func, coroutine=coroutine, args_schema=args_schema)
+    if args_schema is None and tool.args_schema is not None:
+        _TOOL_ARGS_SCHEMAS[func.__code__] = tool.args_schema
+    return tool
+
+
+def _stringify_tool_content(content: str | list[str | dict]) -> str:
+    """Convert ToolMessage content to the string that gets size-checked and evicted."""
+    # Special case: single text block - extract text directly for readability
+    if isinstance(content, list) and len(content) == 1 and isinstance(content[0], dict) and content[0].get("type") == "text" and "text" in content[0]:
+        return str(content[0]["text"])
+    if isinstance(content, str):
+        return content
+    # Multiple blocks or non-text content - stringify entire structure
+    return str(content)
+
+
+def _stream_writer(request: ToolCallRequest) -> Callable[[Any], None] | None:
+    """Return the custom stream writer of a tool call, if it has one."""
+    return getattr(request.runtime, "stream_writer", None)
+
+
+def _blob_exists(backend: BackendProtocol, path: str) -> bool:
+    """Check whether `path` already exists in the backend."""
+    try:
+        responses = backend.download_files([path])
+    except NotImplementedError:
+        return False
+    return bool(responses) and responses[0].error is None
+
+
+async def _ablob_exists(backend: BackendProtocol, path: str) -> bool:
+    """Async version of `_blob_exists`."""
+    try:
+        responses = await backend.adownload_files([path])
+    except NotImplementedError:
+        return False
+    return bool(responses) and responses[0].error is None
+
+
 def _create_content_preview(content_str: str, *, head_lines: int = 5, tail_lines: int = 5) -> str:
     """Create a preview of content showing head and tail with truncation marker.
 
@@ -361,6 +492,19 @@ def _create_content_preview(content_str: str, *, head_lines: int = 5, tail_lines
     return head_sample + truncation_notice + tail_sample
 
 
+def _mentioned_paths(state: FilesystemState, paths: set[str]) -> set[str]:
+    """Return the paths in `paths` mentioned by a message of `state` or by its current summary."""
+    if not paths:
+        return set()
+    messages: list[Any] = list(state.get("messages", []))
+    event = cast("dict[str, Any]", state).get("_summarization_event")
+    if event is not None:
+        messages.append(event["summary_message"])
+    texts = [str(message.content) for message in messages]
+    texts.extend(str(message.tool_calls) for message in messages if isinstance(message, AIMessage) and message.tool_calls)
+    return {path for path in paths if any(path in text for text in texts)}
+
+
 class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]):
     """Middleware for providing filesystem and optional execution tools to an agent.
 
@@ -390,6 +534,9 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
 
             When exceeded, writes the result using the configured backend and replaces it
             with a truncated preview and file reference.
+        token_estimator: Estimator used to measure tool results against token limits.
+        dedupe_large_tool_results: Store evicted tool results by content hash so identical
+            results are written once and shared between tool calls.
 
     Example:
         ```python
@@ -422,6 +569,8 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
         custom_tool_descriptions: dict[str, str] | None = None,
         tool_token_limit_before_evict: int | None = 20000,
         max_execute_timeout: int = 3600,
+        dedupe_large_tool_results: bool = False,
+        token_estimator: CachedTokenEstimator | None = None,
     ) -> None:
         """Initialize the filesystem middleware.
 
@@ -436,6 +585,17 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
 
                 Defaults to 3600 seconds (1 hour). Any per-command timeout
                 exceeding this value will be rejected with an error message.
+            dedupe_large_tool_results: Whether to store evicted tool results by content hash.
+
+                When enabled, results are written to `/large_tool_results/sha256_{digest}`
+                and each tool call is recorded as an alias of that file. Identical results
+                are only written once, and files that nothing in the conversation refers
+                to any more are removed from state at the end of the run.
+            token_estimator: Estimator used for eviction, `read_file` truncation, and
+                truncation of `ls`/`glob`/`grep` results.
+
+                Defaults to the process-wide estimator from
+                `deepagents.tokens.get_default_token_estimator()`.
 
         Raises:
             ValueError: If `max_execute_timeout` is not positive.
@@ -451,6 +611,8 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
         self._custom_tool_descriptions = custom_tool_descriptions or {}
         self._tool_token_limit_before_evict = tool_token_limit_before_evict
         self._max_execute_timeout = max_execute_timeout
+        self._dedupe_large_tool_results = dedupe_large_tool_results
+        self._token_estimator = token_estimator or get_default_token_estimator()
 
         self.tools = [
             self._create_ls_tool(),
@@ -462,18 +624,18 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
             self._create_execute_tool(),
         ]
 
-    def _get_backend(self, runtime: ToolRuntime[Any, Any]) -> BackendProtocol:
+    def _get_backend(self, runtime: ToolRuntime[Any, Any], *, traced: bool = True) -> BackendProtocol:
         """Get the resolved backend instance from backend or factory.
 
         Args:
             runtime: The tool runtime context.
+            traced: Time backend operations into the active tool trace, if any.
 
         Returns:
             Resolved backend instance.
         """
-        if callable(self.backend):
-            return self.backend(runtime)
-        return self.backend
+        backend = self.backend(runtime) if callable(self.backend) else self.backend
+        return traced_backend(backend) if traced else backend
 
     def _create_ls_tool(self) -> BaseTool:
         """Create the ls (list files) tool."""
@@ -491,7 +653,7 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
                 return f"Error: {e}"
             infos = resolved_backend.ls_info(validated_path)
             paths = [fi.get("path", "") for fi in infos]
-            result = truncate_if_too_long(paths)
+            result = truncate_if_too_long(paths, token_estimator=self._token_estimator)
             return str(result)
 
         async def async_ls(
@@ -506,10 +668,10 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
                 return f"Error: {e}"
             infos = await resolved_backend.als_info(validated_path)
             paths = [fi.get("path", "") for fi in infos]
-            result = truncate_if_too_long(paths)
+            result = truncate_if_too_long(paths, token_estimator=self._token_estimator)
             return str(result)
 
-        return StructuredTool.from_function(
+        return _structured_tool(
             name="ls",
             description=tool_description,
             func=sync_ls,
@@ -561,10 +723,10 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
                 result = "".join(lines)
 
             # Check if result exceeds token threshold and truncate if necessary
-            if token_limit and len(result) >= NUM_CHARS_PER_TOKEN * token_limit:
+            if token_limit and self._token_estimator(result) >= token_limit:
                 # Calculate truncation message length to ensure final result stays under threshold
                 truncation_msg = READ_FILE_TRUNCATION_MSG.format(file_path=validated_path)
-                max_content_length = NUM_CHARS_PER_TOKEN * token_limit - len(truncation_msg)
+                max_content_length = self._token_estimator.max_chars(result, token_limit) - len(truncation_msg)
                 result = result[:max_content_length]
                 result += truncation_msg
 
@@ -610,16 +772,16 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
                 result = "".join(lines)
 
             # Check if result exceeds token threshold and truncate if necessary
-            if token_limit and len(result) >= NUM_CHARS_PER_TOKEN * token_limit:
+            if token_limit and self._token_estimator(result) >= token_limit:
                 # Calculate truncation message length to ensure final result stays under threshold
                 truncation_msg = READ_FILE_TRUNCATION_MSG.format(file_path=validated_path)
-                max_content_length = NUM_CHARS_PER_TOKEN * token_limit - len(truncation_msg)
+                max_content_length = self._token_estimator.max_chars(result, token_limit) - len(truncation_msg)
                 result = result[:max_content_length]
                 result += truncation_msg
 
             return result
 
-        return StructuredTool.from_function(
+        return _structured_tool(
             name="read_file",
             description=tool_description,
             func=sync_read_file,
@@ -688,7 +850,7 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
                 )
             return f"Updated file {res.path}"
 
-        return StructuredTool.from_function(
+        return _structured_tool(
             name="write_file",
             description=tool_description,
             func=sync_write_file,
@@ -706,6 +868,10 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
             runtime: ToolRuntime[None, FilesystemState],
             *,
             replace_all: Annotated[bool, "If True, replace all occurrences of old_string. If False (default), old_string must be unique."] = False,
+            edits: Annotated[
+                list[FileEdit] | None,
+                "Additional replacements applied in order after old_string/new_string. The file is left unchanged if any of them fails.",
+            ] = None,
         ) -> Command | str:
             """Synchronous wrapper for edit_file tool."""
             resolved_backend = self._get_backend(runtime)
@@ -713,22 +879,11 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
                 validated_path = validate_path(file_path)
             except ValueError as e:
                 return f"Error: {e}"
-            res: EditResult = resolved_backend.edit(validated_path, old_string, new_string, replace_all=replace_all)
-            if res.error:
-                return res.error
-            if res.files_update is not None:
-                return Command(
-                    update={
-                        "files": res.files_update,
-                        "messages": [
-                            ToolMessage(
-                                content=f"Successfully replaced {res.occurrences} instance(s) of the string in '{res.path}'",
-                                tool_call_id=runtime.tool_call_id,
-                            )
-                        ],
-                    }
-                )
-            return f"Successfully replaced {res.occurrences} instance(s) of the string in '{res.path}'"
+            if edits:
+                res: EditResult = resolved_backend.edit_many(validated_path, _edit_operations(old_string, new_string, replace_all, edits))
+            else:
+                res = resolved_backend.edit(validated_path, old_string, new_string, replace_all=replace_all)
+            return _edit_file_result(res, runtime.tool_call_id)
 
         async def async_edit_file(
             file_path: Annotated[str, "Absolute path to the file to edit. Must be absolute, not relative."],
@@ -737,6 +892,10 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
             runtime: ToolRuntime[None, FilesystemState],
             *,
             replace_all: Annotated[bool, "If True, replace all occurrences of old_string. If False (default), old_string must be unique."] = False,
+            edits: Annotated[
+                list[FileEdit] | None,
+                "Additional replacements applied in order after old_string/new_string. The file is left unchanged if any of them fails.",
+            ] = None,
         ) -> Command | str:
             """Asynchronous wrapper for edit_file tool."""
             resolved_backend = self._get_backend(runtime)
@@ -744,24 +903,13 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
                 validated_path = validate_path(file_path)
             except ValueError as e:
                 return f"Error: {e}"
-            res: EditResult = await resolved_backend.aedit(validated_path, old_string, new_string, replace_all=replace_all)
-            if res.error:
-                return res.error
-            if res.files_update is not None:
-                return Command(
-                    update={
-                        "files": res.files_update,
-                        "messages": [
-                            ToolMessage(
-                                content=f"Successfully replaced {res.occurrences} instance(s) of the string in '{res.path}'",
-                                tool_call_id=runtime.tool_call_id,
-                            )
-                        ],
-                    }
-                )
-            return f"Successfully replaced {res.occurrences} instance(s) of the string in '{res.path}'"
+            if edits:
+                res: EditResult = await resolved_backend.aedit_many(validated_path, _edit_operations(old_string, new_string, replace_all, edits))
+            else:
+                res = await resolved_backend.aedit(validated_path, old_string, new_string, replace_all=replace_all)
+            return _edit_file_result(res, runtime.tool_call_id)
 
-        return StructuredTool.from_function(
+        return _structured_tool(
             name="edit_file",
             description=tool_description,
             func=sync_edit_file,
@@ -790,7 +938,7 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
                 except concurrent.futures.TimeoutError:
                     return f"Error: glob timed out after {GLOB_TIMEOUT}s. Try a more specific pattern or a narrower path."
             paths = [fi.get("path", "") for fi in infos]
-            result = truncate_if_too_long(paths)
+            result = truncate_if_too_long(paths, token_estimator=self._token_estimator)
             return str(result)
 
         async def async_glob(
@@ -812,10 +960,10 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
             except TimeoutError:
                 return f"Error: glob timed out after {GLOB_TIMEOUT}s. Try a more specific pattern or a narrower path."
             paths = [fi.get("path", "") for fi in infos]
-            result = truncate_if_too_long(paths)
+            result = truncate_if_too_long(paths, token_estimator=self._token_estimator)
             return str(result)
 
-        return StructuredTool.from_function(
+        return _structured_tool(
             name="glob",
             description=tool_description,
             func=sync_glob,
@@ -842,7 +990,7 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
             if isinstance(raw, str):
                 return raw
             formatted = format_grep_matches(raw, output_mode)
-            return truncate_if_too_long(formatted)
+            return truncate_if_too_long(formatted, token_estimator=self._token_estimator)
 
         async def async_grep(
             pattern: Annotated[str, "Text pattern to search for (literal string, not regex)."],
@@ -860,9 +1008,9 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
             if isinstance(raw, str):
                 return raw
             formatted = format_grep_matches(raw, output_mode)
-            return truncate_if_too_long(formatted)
+            return truncate_if_too_long(formatted, token_estimator=self._token_estimator)
 
-        return StructuredTool.from_function(
+        return _structured_tool(
             name="grep",
             description=tool_description,
             func=sync_grep,
@@ -887,7 +1035,7 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
                 if timeout > self._max_execute_timeout:
                     return f"Error: timeout {timeout}s exceeds maximum allowed ({self._max_execute_timeout}s)."
 
-            resolved_backend = self._get_backend(runtime)
+            resolved_backend = self._get_backend(runtime, traced=False)
 
             # Runtime check - fail gracefully if not supported
             if not _supports_execution(resolved_backend):
@@ -906,6 +1054,7 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
                     "timeout overrides. Update your sandbox package to the "
                     "latest version, or omit the timeout parameter."
                 )
+            executable = cast("SandboxBackendProtocol", traced_backend(executable))
             try:
                 result = executable.execute(command, timeout=timeout) if timeout is not None else executable.execute(command)
             except NotImplementedError as e:
@@ -942,7 +1091,7 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
                 if timeout > self._max_execute_timeout:
                     return f"Error: timeout {timeout}s exceeds maximum allowed ({self._max_execute_timeout}s)."
 
-            resolved_backend = self._get_backend(runtime)
+            resolved_backend = self._get_backend(runtime, traced=False)
 
             # Runtime check - fail gracefully if not supported
             if not _supports_execution(resolved_backend):
@@ -960,6 +1109,7 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
                     "timeout overrides. Update your sandbox package to the "
                     "latest version, or omit the timeout parameter."
                 )
+            executable = cast("SandboxBackendProtocol", traced_backend(executable))
             try:
                 result = await executable.aexecute(command, timeout=timeout) if timeout is not None else await executable.aexecute(command)
             except NotImplementedError as e:
@@ -980,7 +1130,7 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
 
             return "".join(parts)
 
-        return StructuredTool.from_function(
+        return _structured_tool(
             name="execute",
             description=tool_description,
             func=sync_execute,
@@ -1083,24 +1233,83 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
 
         return await handler(request)
 
+    def _large_tool_result_path(self, message: ToolMessage, content_str: str) -> str:
+        """Return the path under which an evicted tool result is stored.
+
+        With deduplication enabled the path is derived from the content hash so
+        identical results share a single file; otherwise it is keyed by tool call id.
+        """
+        if self._dedupe_large_tool_results:
+            digest = hashlib.sha256(content_str.encode("utf-8")).hexdigest()
+            return f"{LARGE_TOOL_RESULTS_DIR}/sha256_{digest}"
+        return f"{LARGE_TOOL_RESULTS_DIR}/{sanitize_tool_call_id(message.tool_call_id)}"
+
+    def _known_large_tool_results(self, runtime: ToolRuntime) -> set[str]:
+        """Collect content-addressed paths already stored for this thread."""
+        if not self._dedupe_large_tool_results:
+            return set()
+        state = runtime.state or {}
+        known = {path for path in state.get("files", {}) if path.startswith(f"{LARGE_TOOL_RESULTS_DIR}/sha256_")}
+        known.update(state.get("large_tool_result_aliases", {}).values())
+        return known
+
+    def _build_evicted_message(self, message: ToolMessage, content_str: str, file_path: str) -> ToolMessage:
+        """Replace a large ToolMessage with a preview that references the evicted file."""
+        trace = current_trace()
+        if trace is not None:
+            trace.evicted = True
+        # Create preview showing head and tail of the result
+        content_sample = _create_content_preview(content_str)
+        replacement_text = TOO_LARGE_TOOL_MSG.format(
+            tool_call_id=message.tool_call_id,
+            file_path=file_path,
+            content_sample=content_sample,
+        )
+
+        # Always return as plain string after eviction
+        return ToolMessage(
+            content=replacement_text,
+            tool_call_id=message.tool_call_id,
+            name=message.name,
+            id=message.id,
+            artifact=message.artifact,
+            status=message.status,
+            additional_kwargs=dict(message.additional_kwargs),
+            response_metadata=dict(message.response_metadata),
+        )
+
+    def _eviction_update(self, message: ToolMessage, file_path: str, files_update: dict[str, FileData] | None) -> dict[str, Any] | None:
+        """Build the state update produced by evicting `message` to `file_path`."""
+        update: dict[str, Any] = {}
+        if files_update is not None:
+            update["files"] = files_update
+        if self._dedupe_large_tool_results:
+            update["large_tool_result_aliases"] = {message.tool_call_id: file_path}
+        return update or None
+
     def _process_large_message(
         self,
         message: ToolMessage,
         resolved_backend: BackendProtocol,
-    ) -> tuple[ToolMessage, dict[str, FileData] | None]:
+        known_paths: set[str] | None = None,
+    ) -> tuple[ToolMessage, dict[str, Any] | None]:
         """Process a large ToolMessage by evicting its content to filesystem.
 
         Args:
             message: The ToolMessage with large content to evict.
             resolved_backend: The filesystem backend to write the content to.
+            known_paths: Content-addressed paths already stored for this thread.
+                Only used when deduplication is enabled; newly written paths are added to it.
 
         Returns:
-            A tuple of (processed_message, files_update):
+            A tuple of (processed_message, state_update):
             - processed_message: New ToolMessage with truncated content and file reference
-            - files_update: Dict of file updates to apply to state, or None if eviction failed
+            - state_update: State update to apply (`files` and, with deduplication,
+              `large_tool_result_aliases`), or None if nothing needs to change
 
         Note:
-            The entire content is converted to string, written to /large_tool_results/{tool_call_id},
+            The entire content is converted to string, written to /large_tool_results/{tool_call_id}
+            (or /large_tool_results/sha256_{digest} when deduplication is enabled),
             and replaced with a truncated preview plus file reference. The replacement is always
             returned as a plain string for consistency, regardless of original content type.
 
@@ -1112,59 +1321,34 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
         if not self._tool_token_limit_before_evict:
             return message, None
 
-        # Convert content to string once for both size check and eviction
-        # Special case: single text block - extract text directly for readability
-        if (
-            isinstance(message.content, list)
-            and len(message.content) == 1
-            and isinstance(message.content[0], dict)
-            and message.content[0].get("type") == "text"
-            and "text" in message.content[0]
-        ):
-            content_str = str(message.content[0]["text"])
-        elif isinstance(message.content, str):
-            content_str = message.content
-        else:
-            # Multiple blocks or non-text content - stringify entire structure
-            content_str = str(message.content)
+        content_str = _stringify_tool_content(message.content)
 
         # Check if content exceeds eviction threshold
-        if len(content_str) <= NUM_CHARS_PER_TOKEN * self._tool_token_limit_before_evict:
+        if self._token_estimator(content_str) <= self._tool_token_limit_before_evict:
             return message, None
 
+        file_path = self._large_tool_result_path(message, content_str)
+        if known_paths is not None and file_path in known_paths:
+            # Identical content was already evicted in this thread; only record the alias
+            return self._build_evicted_message(message, content_str, file_path), self._eviction_update(message, file_path, None)
+
         # Write content to filesystem
-        sanitized_id = sanitize_tool_call_id(message.tool_call_id)
-        file_path = f"/large_tool_results/{sanitized_id}"
         result = resolved_backend.write(file_path, content_str)
-        if result.error:
+        # A content-addressed file that already exists holds exactly this content
+        if result.error and (not self._dedupe_large_tool_results or not _blob_exists(resolved_backend, file_path)):
             return message, None
+        if known_paths is not None:
+            known_paths.add(file_path)
 
-        # Create preview showing head and tail of the result
-        content_sample = _create_content_preview(content_str)
-        replacement_text = TOO_LARGE_TOOL_MSG.format(
-            tool_call_id=message.tool_call_id,
-            file_path=file_path,
-            content_sample=content_sample,
-        )
-
-        # Always return as plain string after eviction
-        processed_message = ToolMessage(
-            content=replacement_text,
-            tool_call_id=message.tool_call_id,
-            name=message.name,
-            id=message.id,
-            artifact=message.artifact,
-            status=message.status,
-            additional_kwargs=dict(message.additional_kwargs),
-            response_metadata=dict(message.response_metadata),
-        )
-        return processed_message, result.files_update
+        processed_message = self._build_evicted_message(message, content_str, file_path)
+        return processed_message, self._eviction_update(message, file_path, result.files_update)
 
     async def _aprocess_large_message(
         self,
         message: ToolMessage,
         resolved_backend: BackendProtocol,
-    ) -> tuple[ToolMessage, dict[str, FileData] | None]:
+        known_paths: set[str] | None = None,
+    ) -> tuple[ToolMessage, dict[str, Any] | None]:
         """Async version of _process_large_message.
 
         Uses async backend methods to avoid sync calls in async context.
@@ -1174,52 +1358,26 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
         if not self._tool_token_limit_before_evict:
             return message, None
 
-        # Convert content to string once for both size check and eviction
-        # Special case: single text block - extract text directly for readability
-        if (
-            isinstance(message.content, list)
-            and len(message.content) == 1
-            and isinstance(message.content[0], dict)
-            and message.content[0].get("type") == "text"
-            and "text" in message.content[0]
-        ):
-            content_str = str(message.content[0]["text"])
-        elif isinstance(message.content, str):
-            content_str = message.content
-        else:
-            # Multiple blocks or non-text content - stringify entire structure
-            content_str = str(message.content)
+        content_str = _stringify_tool_content(message.content)
 
-        if len(content_str) <= NUM_CHARS_PER_TOKEN * self._tool_token_limit_before_evict:
+        if self._token_estimator(content_str) <= self._tool_token_limit_before_evict:
             return message, None
 
+        file_path = self._large_tool_result_path(message, content_str)
+        if known_paths is not None and file_path in known_paths:
+            # Identical content was already evicted in this thread; only record the alias
+            return self._build_evicted_message(message, content_str, file_path), self._eviction_update(message, file_path, None)
+
         # Write content to filesystem using async method
-        sanitized_id = sanitize_tool_call_id(message.tool_call_id)
-        file_path = f"/large_tool_results/{sanitized_id}"
         result = await resolved_backend.awrite(file_path, content_str)
-        if result.error:
+        # A content-addressed file that already exists holds exactly this content
+        if result.error and (not self._dedupe_large_tool_results or not await _ablob_exists(resolved_backend, file_path)):
             return message, None
+        if known_paths is not None:
+            known_paths.add(file_path)
 
-        # Create preview showing head and tail of the result
-        content_sample = _create_content_preview(content_str)
-        replacement_text = TOO_LARGE_TOOL_MSG.format(
-            tool_call_id=message.tool_call_id,
-            file_path=file_path,
-            content_sample=content_sample,
-        )
-
-        # Always return as plain string after eviction
-        processed_message = ToolMessage(
-            content=replacement_text,
-            tool_call_id=message.tool_call_id,
-            name=message.name,
-            id=message.id,
-            artifact=message.artifact,
-            status=message.status,
-            additional_kwargs=dict(message.additional_kwargs),
-            response_metadata=dict(message.response_metadata),
-        )
-        return processed_message, result.files_update
+        processed_message = self._build_evicted_message(message, content_str, file_path)
+        return processed_message, self._eviction_update(message, file_path, result.files_update)
 
     def _intercept_large_tool_result(self, tool_result: ToolMessage | Command, runtime: ToolRuntime) -> ToolMessage | Command:
         """Intercept and process large tool results before they're added to state.
@@ -1237,22 +1395,15 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
             multiple messages. Large content is automatically offloaded to filesystem
             to prevent context window overflow.
         """
+        known_paths = self._known_large_tool_results(runtime)
         if isinstance(tool_result, ToolMessage):
             resolved_backend = self._get_backend(runtime)
-            processed_message, files_update = self._process_large_message(
+            processed_message, state_update = self._process_large_message(
                 tool_result,
                 resolved_backend,
+                known_paths,
             )
-            return (
-                Command(
-                    update={
-                        "files": files_update,
-                        "messages": [processed_message],
-                    }
-                )
-                if files_update is not None
-                else processed_message
-            )
+            return Command(update={**state_update, "messages": [processed_message]}) if state_update is not None else processed_message
 
         if isinstance(tool_result, Command):
             update = tool_result.update
@@ -1260,6 +1411,7 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
                 return tool_result
             command_messages = update.get("messages", [])
             accumulated_file_updates = dict(update.get("files", {}))
+            accumulated_aliases: dict[str, str] = {}
             resolved_backend = self._get_backend(runtime)
             processed_messages = []
             for message in command_messages:
@@ -1267,14 +1419,19 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
                     processed_messages.append(message)
                     continue
 
-                processed_message, files_update = self._process_large_message(
+                processed_message, state_update = self._process_large_message(
                     message,
                     resolved_backend,
+                    known_paths,
                 )
                 processed_messages.append(processed_message)
-                if files_update is not None:
-                    accumulated_file_updates.update(files_update)
-            return Command(update={**update, "messages": processed_messages, "files": accumulated_file_updates})
+                if state_update is not None:
+                    accumulated_file_updates.update(state_update.get("files", {}))
+                    accumulated_aliases.update(state_update.get("large_tool_result_aliases", {}))
+            new_update = {**update, "messages": processed_messages, "files": accumulated_file_updates}
+            if accumulated_aliases:
+                new_update["large_tool_result_aliases"] = {**update.get("large_tool_result_aliases", {}), **accumulated_aliases}
+            return Command(update=new_update)
         msg = f"Unreachable code reached in _intercept_large_tool_result: for tool_result of type {type(tool_result)}"
         raise AssertionError(msg)
 
@@ -1284,22 +1441,15 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
         Uses async backend methods to avoid sync calls in async context.
         See _intercept_large_tool_result for full documentation.
         """
+        known_paths = self._known_large_tool_results(runtime)
         if isinstance(tool_result, ToolMessage):
             resolved_backend = self._get_backend(runtime)
-            processed_message, files_update = await self._aprocess_large_message(
+            processed_message, state_update = await self._aprocess_large_message(
                 tool_result,
                 resolved_backend,
+                known_paths,
             )
-            return (
-                Command(
-                    update={
-                        "files": files_update,
-                        "messages": [processed_message],
-                    }
-                )
-                if files_update is not None
-                else processed_message
-            )
+            return Command(update={**state_update, "messages": [processed_message]}) if state_update is not None else processed_message
 
         if isinstance(tool_result, Command):
             update = tool_result.update
@@ -1307,6 +1457,7 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
                 return tool_result
             command_messages = update.get("messages", [])
             accumulated_file_updates = dict(update.get("files", {}))
+            accumulated_aliases: dict[str, str] = {}
             resolved_backend = self._get_backend(runtime)
             processed_messages = []
             for message in command_messages:
@@ -1314,17 +1465,89 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
                     processed_messages.append(message)
                     continue
 
-                processed_message, files_update = await self._aprocess_large_message(
+                processed_message, state_update = await self._aprocess_large_message(
                     message,
                     resolved_backend,
+                    known_paths,
                 )
                 processed_messages.append(processed_message)
-                if files_update is not None:
-                    accumulated_file_updates.update(files_update)
-            return Command(update={**update, "messages": processed_messages, "files": accumulated_file_updates})
+                if state_update is not None:
+                    accumulated_file_updates.update(state_update.get("files", {}))
+                    accumulated_aliases.update(state_update.get("large_tool_result_aliases", {}))
+            new_update = {**update, "messages": processed_messages, "files": accumulated_file_updates}
+            if accumulated_aliases:
+                new_update["large_tool_result_aliases"] = {**update.get("large_tool_result_aliases", {}), **accumulated_aliases}
+            return Command(update=new_update)
         msg = f"Unreachable code reached in _aintercept_large_tool_result: for tool_result of type {type(tool_result)}"
         raise AssertionError(msg)
 
+    def before_model(self, state: FilesystemState, runtime: Runtime) -> dict[str, Any] | None:  # noqa: ARG002
+        """Add the traces of the tool results since the last model call to `tool_stats`.
+
+        Args:
+            state: The agent state before the model call.
+            runtime: The runtime context.
+
+        Returns:
+            State update adding to the per-tool totals, or None if there are no new traces.
+        """
+        tool_stats = tool_stats_update(state.get("messages", []))
+        return {"tool_stats": tool_stats} if tool_stats is not None else None
+
+    def after_agent(self, state: FilesystemState, runtime: Runtime) -> dict[str, Any] | None:  # noqa: ARG002
+        """Release deduplicated tool results that are no longer referenced.
+
+        A content-addressed file is released once no tool message of the conversation
+        refers to it and no other message mentions its path. Summaries (including the
+        summary of the current summarization event) keep the files they mention, so the
+        model can still read them after the original tool messages are gone. Released
+        files are deleted from state; files stored in external backends are not removed
+        since the backend protocol has no delete operation.
+
+        Tool results the run ended on, without a model call after them, are also added
+        to `tool_stats`.
+
+        Args:
+            state: The final agent state for this run.
+            runtime: The runtime context.
+
+        Returns:
+            State update removing dead aliases and files and adding trailing tool traces,
+            or None if nothing changed.
+        """
+        tool_stats = tool_stats_update(state.get("messages", []))
+        update = self._release_large_tool_results(state) or {}
+        if tool_stats is not None:
+            update["tool_stats"] = tool_stats
+        return update or None
+
+    def _release_large_tool_results(self, state: FilesystemState) -> dict[str, Any] | None:
+        """Build the state update dropping dead deduplication aliases and their files."""
+        if not self._dedupe_large_tool_results:
+            return None
+        aliases = state.get("large_tool_result_aliases") or {}
+        if not aliases:
+            return None
+
+        live_ids = {message.tool_call_id for message in state.get("messages", []) if isinstance(message, ToolMessage)}
+        dead_ids = [tool_call_id for tool_call_id in aliases if tool_call_id not in live_ids]
+        if not dead_ids:
+            return None
+
+        # Reference count: a file stays as long as at least one live alias points to it
+        live_paths = {path for tool_call_id, path in aliases.items() if tool_call_id in live_ids}
+        dead_paths = {aliases[tool_call_id] for tool_call_id in dead_ids} - live_paths
+        # Summaries and other messages may still point the model at a file whose tool call is gone
+        referenced = _mentioned_paths(state, dead_paths)
+        released_ids = [tool_call_id for tool_call_id in dead_ids if aliases[tool_call_id] not in referenced]
+        if not released_ids:
+            return None
+        update: dict[str, Any] = {"large_tool_result_aliases": dict.fromkeys(released_ids)}
+        stale_files = [path for path in dead_paths - referenced if path in state.get("files", {})]
+        if stale_files:
+            update["files"] = dict.fromkeys(stale_files)
+        return update
+
     def wrap_tool_call(
         self,
         request: ToolCallRequest,
@@ -1332,6 +1555,8 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
     ) -> ToolMessage | Command:
         """Check the size of the tool call result and evict to filesystem if too large.
 
+        Every call is traced: see `deepagents.middleware.tool_stats`.
+
         Args:
             request: The tool call request being processed.
             handler: The handler function to call with the modified request.
@@ -1339,11 +1564,13 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
         Returns:
             The raw ToolMessage, or a pseudo tool message with the ToolResult in state.
         """
-        if self._tool_token_limit_before_evict is None or request.tool_call["name"] in TOOLS_EXCLUDED_FROM_EVICTION:
-            return handler(request)
-
-        tool_result = handler(request)
-        return self._intercept_large_tool_result(tool_result, request.runtime)
+        with trace_tool_call(request.tool_call["name"], request.tool_call.get("id")) as trace:
+            tool_result = handler(request)
+            result = tool_result
+            if self._tool_token_limit_before_evict is not None and request.tool_call["name"] not in TOOLS_EXCLUDED_FROM_EVICTION:
+                result = self._intercept_large_tool_result(tool_result, request.runtime)
+            finish_trace(trace, tool_result, result, self._token_estimator, _stream_writer(request))
+        return result
 
     async def awrap_tool_call(
         self,
@@ -1352,6 +1579,8 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
     ) -> ToolMessage | Command:
         """(async)Check the size of the tool call result and evict to filesystem if too large.
 
+        Every call is traced: see `deepagents.middleware.tool_stats`.
+
         Args:
             request: The tool call request being processed.
             handler: The handler function to call with the modified request.
@@ -1359,8 +1588,10 @@ class FilesystemMiddleware(AgentMiddleware[FilesystemState, ContextT, ResponseT]
         Returns:
             The raw ToolMessage, or a pseudo tool message with the ToolResult in state.
         """
-        if self._tool_token_limit_before_evict is None or request.tool_call["name"] in TOOLS_EXCLUDED_FROM_EVICTION:
-            return await handler(request)
-
-        tool_result = await handler(request)
-        return await self._aintercept_large_tool_result(tool_result, request.runtime)
+        with trace_tool_call(request.tool_call["name"], request.tool_call.get("id")) as trace:
+            tool_result = await handler(request)
+            result = tool_result
+            if self._tool_token_limit_before_evict is not None and request.tool_call["name"] not in TOOLS_EXCLUDED_FROM_EVICTION:
+                result = await self._aintercept_large_tool_result(tool_result, request.runtime)
+            finish_trace(trace, tool_result, result, self._token_estimator, _stream_writer(request))
+        return result
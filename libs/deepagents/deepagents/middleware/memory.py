@@ -73,6 +73,7 @@ from langchain.agents.middleware.types import (
 from langchain.tools import ToolRuntime
 
 from deepagents.middleware._utils import append_to_system_message
+from deepagents.middleware.system_prompt import SystemPromptCache
 
 logger = logging.getLogger(__name__)
 
@@ -190,6 +191,7 @@ class MemoryMiddleware(AgentMiddleware[MemoryState, ContextT, ResponseT]):
         """
         self._backend = backend
         self.sources = sources
+        self._prompt_cache = SystemPromptCache()
 
     def _get_backend(self, state: MemoryState, runtime: Runtime, config: RunnableConfig) -> BackendProtocol:
         """Resolve backend from instance or factory.
@@ -313,7 +315,7 @@ class MemoryMiddleware(AgentMiddleware[MemoryState, ContextT, ResponseT]):
             Modified request with memory injected into system message.
         """
         contents = request.state.get("memory_contents", {})
-        agent_memory = self._format_agent_memory(contents)
+        agent_memory = self._prompt_cache.section(contents, lambda: self._format_agent_memory(contents))
 
         new_system_message = append_to_system_message(request.system_message, agent_memory)
 
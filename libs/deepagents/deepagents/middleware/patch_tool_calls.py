@@ -1,44 +1,95 @@
 """Middleware to patch dangling tool calls in the messages history."""
 
-from typing import Any
+import uuid
+from typing import Annotated, Any, NotRequired
 
 from langchain.agents.middleware import AgentMiddleware, AgentState
-from langchain_core.messages import ToolMessage
+from langchain.agents.middleware.types import PrivateStateAttr
+from langchain_core.messages import AnyMessage, ToolMessage
 from langgraph.runtime import Runtime
 from langgraph.types import Overwrite
+from typing_extensions import TypedDict
+
+
+class PatchWatermark(TypedDict):
+    """Position up to which the messages history is known to have no dangling tool calls."""
+
+    index: int
+    """Number of messages already checked."""
+
+    message_id: str | None
+    """ID of the last checked message, used to detect a rewritten history."""
+
+
+class PatchToolCallsState(AgentState):
+    """State for the patch tool calls middleware."""
+
+    _patch_tool_calls_watermark: NotRequired[Annotated[PatchWatermark, PrivateStateAttr]]
+    """Private field storing how much of the history has already been checked."""
+
+
+def _resume_index(messages: list[AnyMessage], watermark: PatchWatermark | None) -> int:
+    """Return the index to resume checking from, or 0 if the history was rewritten."""
+    if watermark is None:
+        return 0
+    index = watermark["index"]
+    if 0 < index <= len(messages) and messages[index - 1].id == watermark["message_id"]:
+        return index
+    return 0
+
+
+def _cancelled_tool_message(tool_call: dict[str, Any]) -> ToolMessage:
+    return ToolMessage(
+        content=f"Tool call {tool_call['name']} with id {tool_call['id']} was cancelled - another message came in before it could be completed.",
+        name=tool_call["name"],
+        tool_call_id=tool_call["id"],
+        # `Overwrite` bypasses the reducer that assigns message ids; the watermark needs one
+        id=str(uuid.uuid4()),
+    )
 
 
 class PatchToolCallsMiddleware(AgentMiddleware):
-    """Middleware to patch dangling tool calls in the messages history."""
+    """Middleware to patch dangling tool calls in the messages history.
+
+    Only messages added since the previous run are checked. Everything before the
+    watermark kept in private state has already been patched.
+    """
 
-    def before_agent(self, state: AgentState, runtime: Runtime[Any]) -> dict[str, Any] | None:  # noqa: ARG002
-        """Before the agent runs, handle dangling tool calls from any AIMessage."""
+    state_schema = PatchToolCallsState
+
+    def before_agent(self, state: PatchToolCallsState, runtime: Runtime[Any]) -> dict[str, Any] | None:  # noqa: ARG002
+        """Before the agent runs, handle dangling tool calls from any AIMessage.
+
+        Returns:
+            `None` if no new messages were added, a watermark update if none of them
+                has a dangling tool call, or an update overwriting the messages with
+                cancellation `ToolMessage`s inserted after each dangling tool call.
+        """
         messages = state["messages"]
-        if not messages or len(messages) == 0:
+        start = _resume_index(messages, state.get("_patch_tool_calls_watermark"))
+        if start == len(messages):
             return None
 
-        patched_messages = []
-        # Iterate over the messages and add any dangling tool calls
-        for i, msg in enumerate(messages):
-            patched_messages.append(msg)
-            if msg.type == "ai" and msg.tool_calls:
-                for tool_call in msg.tool_calls:
-                    corresponding_tool_msg = next(
-                        (msg for msg in messages[i:] if msg.type == "tool" and msg.tool_call_id == tool_call["id"]),  # ty: ignore[possibly-missing-attribute]
-                        None,
-                    )
-                    if corresponding_tool_msg is None:
-                        # We have a dangling tool call which needs a ToolMessage
-                        tool_msg = (
-                            f"Tool call {tool_call['name']} with id {tool_call['id']} was "
-                            "cancelled - another message came in before it could be completed."
-                        )
-                        patched_messages.append(
-                            ToolMessage(
-                                content=tool_msg,
-                                name=tool_call["name"],
-                                tool_call_id=tool_call["id"],
-                            )
-                        )
-
-        return {"messages": Overwrite(patched_messages)}
+        # Walk backwards so `answered` holds the ids of tool messages that follow the current message
+        answered: set[str] = set()
+        dangling: dict[int, list[ToolMessage]] = {}
+        for i in range(len(messages) - 1, start - 1, -1):
+            msg = messages[i]
+            if msg.type == "tool":
+                answered.add(msg.tool_call_id)  # ty: ignore[unresolved-attribute]
+            elif msg.type == "ai" and msg.tool_calls:  # ty: ignore[unresolved-attribute]
+                missing = [_cancelled_tool_message(tool_call) for tool_call in msg.tool_calls if tool_call["id"] not in answered]  # ty: ignore[unresolved-attribute]
+                if missing:
+                    dangling[i] = missing
+
+        watermark = PatchWatermark(index=len(messages), message_id=messages[-1].id)
+        if not dangling:
+            return {"_patch_tool_calls_watermark": watermark}
+
+        patched_messages: list[AnyMessage] = list(messages[:start])
+        for i in range(start, len(messages)):
+            patched_messages.append(messages[i])
+            patched_messages.extend(dangling.get(i, ()))
+        watermark["index"] = len(patched_messages)
+        watermark["message_id"] = patched_messages[-1].id
+        return {"messages": Overwrite(patched_messages), "_patch_tool_calls_watermark": watermark}
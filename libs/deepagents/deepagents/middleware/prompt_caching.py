@@ -0,0 +1,207 @@
+"""Middleware for prompt-cache-friendly system prompts and cache usage reporting.
+
+Anthropic caches the request prefix up to each `cache_control` breakpoint. When
+sections of the system prompt change at different rates, placing a breakpoint after
+each tier (static instructions, then memory and skills, then volatile context) keeps
+the earlier tiers cached when a later one changes.
+
+`PromptCacheBreakpointMiddleware` marks the end of a tier. Place it in the middleware
+stack directly after the middleware that append the tier's sections:
+
+```python
+from langchain.agents import create_agent
+
+from deepagents.middleware import FilesystemMiddleware, MemoryMiddleware, SubAgentMiddleware
+from deepagents.middleware.prompt_caching import PromptCacheBreakpointMiddleware, PromptCacheUsageMiddleware
+
+agent = create_agent(
+    model="claude-sonnet-4-5-20250929",
+    middleware=[
+        FilesystemMiddleware(),
+        PromptCacheBreakpointMiddleware(tier="static"),
+        MemoryMiddleware(backend=backend, sources=["/memory/AGENTS.md"]),
+        PromptCacheBreakpointMiddleware(tier="context"),
+        PromptCacheUsageMiddleware(),
+    ],
+)
+```
+
+`PromptCacheUsageMiddleware` reports cache reads and writes for every model call.
+"""
+
+import sys
+from collections.abc import Awaitable, Callable
+from typing import Annotated, Any, Literal, NotRequired
+
+from langchain.agents.middleware.types import (
+    AgentMiddleware,
+    AgentState,
+    ContextT,
+    ModelRequest,
+    ModelResponse,
+    ResponseT,
+)
+from langchain_core.messages import AIMessage, SystemMessage
+from langgraph.runtime import Runtime
+from typing_extensions import TypedDict
+
+
+def _is_anthropic_model(model: object) -> bool:
+    """Whether `model` is a `ChatAnthropic`, without importing `langchain_anthropic` if nothing else has."""
+    module = sys.modules.get("langchain_anthropic")
+    return module is not None and isinstance(model, module.ChatAnthropic)
+
+
+def _with_cache_breakpoint(system_message: SystemMessage | None, cache_control: dict[str, str]) -> SystemMessage | None:
+    """Return the system message with `cache_control` set on its last text block."""
+    if system_message is None:
+        return None
+    blocks = list(system_message.content_blocks)
+    if not blocks or blocks[-1].get("type") != "text" or "cache_control" in blocks[-1]:
+        return system_message
+    blocks[-1] = {**blocks[-1], "cache_control": cache_control}  # ty: ignore[invalid-assignment]
+    return SystemMessage(content_blocks=blocks)
+
+
+class PromptCacheBreakpointMiddleware(AgentMiddleware):
+    """Place a prompt cache breakpoint after the system prompt sections added so far.
+
+    Only applies to Anthropic chat models; other models receive the request unchanged.
+
+    Args:
+        tier: Name of the tier this breakpoint closes. Used to give each instance a
+            unique middleware name.
+        ttl: Cache lifetime for the breakpoint.
+    """
+
+    def __init__(self, *, tier: str, ttl: Literal["5m", "1h"] = "5m") -> None:
+        """Initialize the breakpoint middleware."""
+        self.tier = tier
+        self._cache_control = {"type": "ephemeral", "ttl": ttl}
+
+    @property
+    def name(self) -> str:
+        """Unique name per tier so several breakpoints can share one agent."""
+        return f"{self.__class__.__name__}[{self.tier}]"
+
+    def _apply(self, request: ModelRequest[ContextT]) -> ModelRequest[ContextT]:
+        if not _is_anthropic_model(request.model) or request.system_message is None:
+            return request
+        return request.override(system_message=_with_cache_breakpoint(request.system_message, self._cache_control))
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest[ContextT],
+        handler: Callable[[ModelRequest[ContextT]], ModelResponse[ResponseT]],
+    ) -> ModelResponse[ResponseT]:
+        """Mark the end of the current system prompt tier as a cache breakpoint.
+
+        Args:
+            request: The model request being processed.
+            handler: The handler function to call with the modified request.
+
+        Returns:
+            The model response from the handler.
+        """
+        return handler(self._apply(request))
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest[ContextT],
+        handler: Callable[[ModelRequest[ContextT]], Awaitable[ModelResponse[ResponseT]]],
+    ) -> ModelResponse[ResponseT]:
+        """(async) Mark the end of the current system prompt tier as a cache breakpoint.
+
+        Args:
+            request: The model request being processed.
+            handler: The handler function to call with the modified request.
+
+        Returns:
+            The model response from the handler.
+        """
+        return await handler(self._apply(request))
+
+
+class PromptCacheUsage(TypedDict):
+    """Cumulative prompt cache usage for a thread."""
+
+    model_calls: int
+    """Number of model calls with usage metadata."""
+
+    input_tokens: int
+    """Total input tokens, including cached tokens."""
+
+    cache_read_tokens: int
+    """Input tokens served from the prompt cache."""
+
+    cache_write_tokens: int
+    """Input tokens written to the prompt cache."""
+
+
+def _prompt_cache_usage_reducer(left: PromptCacheUsage | None, right: PromptCacheUsage) -> PromptCacheUsage:
+    """Add per-call usage to the running totals."""
+    if not left:
+        return right
+    return PromptCacheUsage(
+        model_calls=left["model_calls"] + right["model_calls"],
+        input_tokens=left["input_tokens"] + right["input_tokens"],
+        cache_read_tokens=left["cache_read_tokens"] + right["cache_read_tokens"],
+        cache_write_tokens=left["cache_write_tokens"] + right["cache_write_tokens"],
+    )
+
+
+class PromptCacheUsageState(AgentState):
+    """State for the prompt cache usage middleware."""
+
+    prompt_cache_usage: NotRequired[Annotated[PromptCacheUsage, _prompt_cache_usage_reducer]]
+    """Cumulative prompt cache usage across model calls."""
+
+
+class PromptCacheUsageMiddleware(AgentMiddleware[PromptCacheUsageState, ContextT, ResponseT]):
+    """Report prompt cache reads and writes for every model call.
+
+    After each model call, the cache usage from the response's `usage_metadata` is
+    emitted on the custom stream as a `prompt_cache_usage` event and added to the
+    `prompt_cache_usage` totals in state.
+
+    Example:
+        ```python
+        for chunk in agent.stream({"messages": [...]}, stream_mode="custom"):
+            if chunk.get("type") == "prompt_cache_usage":
+                print(chunk["cache_read_tokens"], chunk["cache_write_tokens"])
+        ```
+    """
+
+    state_schema = PromptCacheUsageState
+
+    def after_model(self, state: PromptCacheUsageState, runtime: Runtime[ContextT]) -> dict[str, Any] | None:
+        """Record cache usage of the latest model response.
+
+        Args:
+            state: The agent state after the model call.
+            runtime: The runtime context.
+
+        Returns:
+            State update adding this call's usage, or None if the response has no usage metadata.
+        """
+        messages = state["messages"]
+        if not messages or not isinstance(messages[-1], AIMessage) or messages[-1].usage_metadata is None:
+            return None
+        usage_metadata = messages[-1].usage_metadata
+        details = usage_metadata.get("input_token_details") or {}
+        usage = PromptCacheUsage(
+            model_calls=1,
+            input_tokens=usage_metadata.get("input_tokens", 0),
+            cache_read_tokens=details.get("cache_read") or 0,
+            cache_write_tokens=details.get("cache_creation") or 0,
+        )
+        if runtime.stream_writer is not None:
+            runtime.stream_writer({"type": "prompt_cache_usage", **usage})
+        return {"prompt_cache_usage": usage}
+
+
+__all__ = [
+    "PromptCacheBreakpointMiddleware",
+    "PromptCacheUsage",
+    "PromptCacheUsageMiddleware",
+]
@@ -92,6 +92,9 @@ from __future__ import annotations
 
 import logging
 import re
+import threading
+import time
+from collections import OrderedDict
 from pathlib import PurePosixPath
 from typing import TYPE_CHECKING, Annotated
 
@@ -104,7 +107,7 @@ if TYPE_CHECKING:
     from langchain_core.runnables import RunnableConfig
     from langgraph.runtime import Runtime
 
-    from deepagents.backends.protocol import BACKEND_TYPES, BackendProtocol
+    from deepagents.backends.protocol import BACKEND_TYPES, BackendProtocol, FileDownloadResponse, FileInfo
 
 from typing import NotRequired, TypedDict
 
@@ -118,7 +121,9 @@ from langchain.agents.middleware.types import (
 )
 from langgraph.prebuilt import ToolRuntime
 
+from deepagents.backends.instrumented import record_cache_hit
 from deepagents.middleware._utils import append_to_system_message
+from deepagents.middleware.system_prompt import SystemPromptCache
 
 logger = logging.getLogger(__name__)
 
@@ -400,6 +405,38 @@ def _format_skill_annotations(skill: SkillMetadata) -> str:
     return ", ".join(parts)
 
 
+def _parse_skill_download(response: FileDownloadResponse, skill_md_path: str, directory_name: str) -> SkillMetadata | None:
+    """Decode and parse a downloaded `SKILL.md` file.
+
+    Args:
+        response: Download response for the `SKILL.md` file.
+        skill_md_path: Path to the `SKILL.md` file.
+        directory_name: Name of the skill directory.
+
+    Returns:
+        `SkillMetadata`, or `None` if the file is missing or invalid.
+    """
+    if response.error:
+        # Skill doesn't have a SKILL.md, skip it
+        return None
+
+    if response.content is None:
+        logger.warning("Downloaded skill file %s has no content", skill_md_path)
+        return None
+
+    try:
+        content = response.content.decode("utf-8")
+    except UnicodeDecodeError as e:
+        logger.warning("Error decoding %s: %s", skill_md_path, e)
+        return None
+
+    return _parse_skill_metadata(
+        content=content,
+        skill_path=skill_md_path,
+        directory_name=directory_name,
+    )
+
+
 def _list_skills(backend: BackendProtocol, source_path: str) -> list[SkillMetadata]:
     """List all skills from a backend source.
 
@@ -450,29 +487,7 @@ def _list_skills(backend: BackendProtocol, source_path: str) -> list[SkillMetada
 
     # Parse each downloaded SKILL.md
     for (skill_dir_path, skill_md_path), response in zip(skill_md_paths, responses, strict=True):
-        if response.error:
-            # Skill doesn't have a SKILL.md, skip it
-            continue
-
-        if response.content is None:
-            logger.warning("Downloaded skill file %s has no content", skill_md_path)
-            continue
-
-        try:
-            content = response.content.decode("utf-8")
-        except UnicodeDecodeError as e:
-            logger.warning("Error decoding %s: %s", skill_md_path, e)
-            continue
-
-        # Extract directory name from path using PurePosixPath
-        directory_name = PurePosixPath(skill_dir_path).name
-
-        # Parse metadata
-        skill_metadata = _parse_skill_metadata(
-            content=content,
-            skill_path=skill_md_path,
-            directory_name=directory_name,
-        )
+        skill_metadata = _parse_skill_download(response, skill_md_path, PurePosixPath(skill_dir_path).name)
         if skill_metadata:
             skills.append(skill_metadata)
 
@@ -529,33 +544,213 @@ async def _alist_skills(backend: BackendProtocol, source_path: str) -> list[Skil
 
     # Parse each downloaded SKILL.md
     for (skill_dir_path, skill_md_path), response in zip(skill_md_paths, responses, strict=True):
-        if response.error:
-            # Skill doesn't have a SKILL.md, skip it
-            continue
+        skill_metadata = _parse_skill_download(response, skill_md_path, PurePosixPath(skill_dir_path).name)
+        if skill_metadata:
+            skills.append(skill_metadata)
+
+    return skills
+
+
+_SKILL_FILE_GLOB = "*/SKILL.md"
+
+_Validator = tuple[str, int]
+"""Modification time and size of a `SKILL.md` file."""
+
 
-        if response.content is None:
-            logger.warning("Downloaded skill file %s has no content", skill_md_path)
+def _skill_file_validators(source_path: str, infos: list[FileInfo]) -> dict[str, _Validator | None]:
+    """Map each `SKILL.md` directly below `source_path` to its validator.
+
+    Files without a modification time get a `None` validator and are re-parsed on
+    every revalidation.
+    """
+    source = PurePosixPath(source_path)
+    validators: dict[str, _Validator | None] = {}
+    for info in infos:
+        # Some backends return paths relative to the searched directory
+        path = source / info["path"]
+        if info.get("is_dir") or path.parent.parent != source:
             continue
+        modified_at = info.get("modified_at")
+        validators[str(path)] = (modified_at, info.get("size", 0)) if modified_at else None
+    return validators
+
+
+class SkillsRegistry:
+    """Cache of parsed skill metadata that detects added, edited and deleted skills.
 
+    The registry remembers each parsed `SKILL.md` together with its modification
+    time and size. Revalidating a source lists its `SKILL.md` files with a single
+    `glob_info` call and only downloads and parses files that are new or changed,
+    so skills edited mid-thread show up on the next turn at little cost.
+
+    Share one registry between the main agent and its subagents so each file is
+    parsed once. Skill files served from the registry are reported as cache hits of
+    `download_files` on an instrumented backend. Entries are kept per namespace: `SkillsMiddleware` uses the backend
+    instance it was given, or the thread for backend factories (whose storage may
+    differ per thread or tenant), so a shared registry never returns skills read
+    from another thread's or tenant's storage.
+
+    Example:
+        ```python
+        registry = SkillsRegistry(revalidate_interval=30)
+        agent = create_deep_agent(skills=["/skills/user/"], skills_registry=registry)
+        ```
+
+    Args:
+        revalidate_interval: Minimum seconds between revalidations of a source.
+
+            `0` revalidates on every turn and `None` never revalidates after the
+            first load.
+        max_namespaces: Maximum number of namespaces to keep entries for. The
+            least recently loaded namespace is dropped first, so per-thread
+            namespaces of finished threads don't accumulate.
+    """
+
+    def __init__(self, *, revalidate_interval: float | None = 0, max_namespaces: int = 256) -> None:
+        """Initialize the registry."""
+        if max_namespaces <= 0:
+            msg = f"max_namespaces must be positive, got {max_namespaces}"
+            raise ValueError(msg)
+        self.revalidate_interval = revalidate_interval
+        self.max_namespaces = max_namespaces
+        # Keyed by (namespace, source path)
+        self._entries: dict[tuple[str, str], dict[str, tuple[_Validator | None, SkillMetadata | None]]] = {}
+        self._checked_at: dict[tuple[str, str], float] = {}
+        # Namespaces in least recently loaded order
+        self._namespaces: OrderedDict[str, None] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _touch(self, namespace: str) -> None:
+        """Mark `namespace` as recently loaded and drop the entries of the least recently loaded ones."""
+        with self._lock:
+            self._namespaces[namespace] = None
+            self._namespaces.move_to_end(namespace)
+            while len(self._namespaces) > self.max_namespaces:
+                evicted, _ = self._namespaces.popitem(last=False)
+                for key in [key for key in self._entries if key[0] == evicted]:
+                    del self._entries[key]
+                for key in [key for key in self._checked_at if key[0] == evicted]:
+                    del self._checked_at[key]
+
+    def _cached(self, key: tuple[str, str]) -> list[SkillMetadata] | None:
+        """Return cached skills for a source, or `None` if it is due for revalidation."""
+        with self._lock:
+            checked_at = self._checked_at.get(key)
+            if checked_at is None:
+                return None
+            if self.revalidate_interval is not None and time.monotonic() - checked_at >= self.revalidate_interval:
+                return None
+            return self._skills(key)
+
+    def _skills(self, key: tuple[str, str]) -> list[SkillMetadata]:
+        entries = self._entries.get(key, {})
+        return [metadata for _, (_, metadata) in sorted(entries.items()) if metadata is not None]
+
+    def _stale(self, key: tuple[str, str], validators: dict[str, _Validator | None]) -> list[str]:
+        """Return the `SKILL.md` paths that are new or changed since the last load."""
+        with self._lock:
+            entries = self._entries.get(key, {})
+            return [path for path, validator in validators.items() if validator is None or path not in entries or entries[path][0] != validator]
+
+    def _update(
+        self,
+        key: tuple[str, str],
+        validators: dict[str, _Validator | None],
+        stale: list[str],
+        responses: list[FileDownloadResponse],
+    ) -> list[SkillMetadata]:
+        """Parse downloaded files and replace the cached entries of a source."""
+        parsed = {
+            path: _parse_skill_download(response, path, PurePosixPath(path).parent.name) for path, response in zip(stale, responses, strict=True)
+        }
+        with self._lock:
+            previous = self._entries.get(key, {})
+            entries = {
+                path: (validator, parsed[path] if path in parsed else previous[path][1])
+                for path, validator in validators.items()
+                if path in parsed or path in previous
+            }
+            # Don't resurrect a namespace that was evicted while this load ran
+            if key[0] in self._namespaces:
+                self._entries[key] = entries
+                self._checked_at[key] = time.monotonic()
+            return [metadata for _, (_, metadata) in sorted(entries.items()) if metadata is not None]
+
+    def _load_source(self, backend: BackendProtocol, namespace: str, source_path: str) -> list[SkillMetadata]:
+        key = (namespace, source_path)
+        cached = self._cached(key)
+        if cached is not None:
+            if cached:
+                record_cache_hit(backend, "download_files", source_path)
+            return cached
         try:
-            content = response.content.decode("utf-8")
-        except UnicodeDecodeError as e:
-            logger.warning("Error decoding %s: %s", skill_md_path, e)
-            continue
+            infos = backend.glob_info(_SKILL_FILE_GLOB, path=source_path)
+        except NotImplementedError:
+            return _list_skills(backend, source_path)
+        validators = _skill_file_validators(source_path, infos)
+        stale = self._stale(key, validators)
+        if len(stale) < len(validators):
+            record_cache_hit(backend, "download_files", source_path)
+        responses = backend.download_files(stale) if stale else []
+        return self._update(key, validators, stale, responses)
+
+    async def _aload_source(self, backend: BackendProtocol, namespace: str, source_path: str) -> list[SkillMetadata]:
+        key = (namespace, source_path)
+        cached = self._cached(key)
+        if cached is not None:
+            if cached:
+                record_cache_hit(backend, "download_files", source_path)
+            return cached
+        try:
+            infos = await backend.aglob_info(_SKILL_FILE_GLOB, path=source_path)
+        except NotImplementedError:
+            return await _alist_skills(backend, source_path)
+        validators = _skill_file_validators(source_path, infos)
+        stale = self._stale(key, validators)
+        if len(stale) < len(validators):
+            record_cache_hit(backend, "download_files", source_path)
+        responses = await backend.adownload_files(stale) if stale else []
+        return self._update(key, validators, stale, responses)
 
-        # Extract directory name from path using PurePosixPath
-        directory_name = PurePosixPath(skill_dir_path).name
+    def load(self, backend: BackendProtocol, sources: list[str], *, namespace: str = "") -> list[SkillMetadata]:
+        """Return the current skills of `sources`, re-parsing only changed files.
 
-        # Parse metadata
-        skill_metadata = _parse_skill_metadata(
-            content=content,
-            skill_path=skill_md_path,
-            directory_name=directory_name,
-        )
-        if skill_metadata:
-            skills.append(skill_metadata)
+        Later sources override earlier ones for skills with the same name.
 
-    return skills
+        Args:
+            backend: Backend the sources are read from.
+            sources: Skill source paths in priority order.
+            namespace: Storage the sources are read from. Loads with different
+                namespaces never share entries; use a distinct namespace for every
+                backend whose files may differ.
+
+        Returns:
+            Skill metadata from all sources.
+        """
+        self._touch(namespace)
+        all_skills: dict[str, SkillMetadata] = {}
+        for source_path in sources:
+            for skill in self._load_source(backend, namespace, source_path):
+                all_skills[skill["name"]] = skill
+        return list(all_skills.values())
+
+    async def aload(self, backend: BackendProtocol, sources: list[str], *, namespace: str = "") -> list[SkillMetadata]:
+        """Async version of `load`."""
+        self._touch(namespace)
+        all_skills: dict[str, SkillMetadata] = {}
+        for source_path in sources:
+            for skill in await self._aload_source(backend, namespace, source_path):
+                all_skills[skill["name"]] = skill
+        return list(all_skills.values())
+
+    def invalidate(self, source_path: str | None = None) -> None:
+        """Force the next load to revalidate `source_path`, or every source if `None`, in all namespaces."""
+        with self._lock:
+            if source_path is None:
+                self._checked_at.clear()
+                return
+            for key in [key for key in self._checked_at if key[1] == source_path]:
+                del self._checked_at[key]
 
 
 SKILLS_SYSTEM_PROMPT = """
@@ -628,11 +823,12 @@ class SkillsMiddleware(AgentMiddleware[SkillsState, ContextT, ResponseT]):
         sources: List of skill source paths.
 
             Source names are derived from the last path component.
+        registry: Optional `SkillsRegistry` used to pick up skill changes on every turn.
     """
 
     state_schema = SkillsState
 
-    def __init__(self, *, backend: BACKEND_TYPES, sources: list[str]) -> None:
+    def __init__(self, *, backend: BACKEND_TYPES, sources: list[str], registry: SkillsRegistry | None = None) -> None:
         """Initialize the skills middleware.
 
         Args:
@@ -642,10 +838,31 @@ class SkillsMiddleware(AgentMiddleware[SkillsState, ContextT, ResponseT]):
                 Use a factory for StateBackend: `lambda rt: StateBackend(rt)`
             sources: List of skill source paths (e.g.,
                 `['/skills/user/', '/skills/project/']`).
+            registry: Optional registry of parsed skills.
+
+                Without a registry, skills are loaded once per thread. With one,
+                they are revalidated before each turn and only changed `SKILL.md`
+                files are parsed again. With a backend factory, registry entries are
+                kept per thread, and runs without a `thread_id` load skills as if
+                there were no registry.
         """
         self._backend = backend
         self.sources = sources
+        self.registry = registry
         self.system_prompt_template = SKILLS_SYSTEM_PROMPT
+        self._prompt_cache = SystemPromptCache()
+
+    def _registry_namespace(self, config: RunnableConfig) -> str | None:
+        """Return the registry namespace of this middleware's storage, or `None` to bypass the registry.
+
+        A backend instance is the same storage for every thread. A factory may resolve
+        to different storage per thread or tenant (e.g. `StateBackend`), so its entries
+        are kept per thread; runs without a thread don't use the registry.
+        """
+        if not callable(self._backend):
+            return f"backend:{id(self._backend)}"
+        thread_id = config.get("configurable", {}).get("thread_id")
+        return None if thread_id is None else f"thread:{thread_id}"
 
     def _get_backend(self, state: SkillsState, runtime: Runtime, config: RunnableConfig) -> BackendProtocol:
         """Resolve backend from instance or factory.
@@ -706,6 +923,13 @@ class SkillsMiddleware(AgentMiddleware[SkillsState, ContextT, ResponseT]):
 
         return "\n".join(lines)
 
+    def _format_skills_section(self, skills: list[SkillMetadata]) -> str:
+        """Format the full skills section of the system prompt."""
+        return self.system_prompt_template.format(
+            skills_locations=self._format_skills_locations(),
+            skills_list=self._format_skills_list(skills),
+        )
+
     def modify_request(self, request: ModelRequest[ContextT]) -> ModelRequest[ContextT]:
         """Inject skills documentation into a model request's system message.
 
@@ -716,12 +940,9 @@ class SkillsMiddleware(AgentMiddleware[SkillsState, ContextT, ResponseT]):
             New model request with skills documentation injected into system message
         """
         skills_metadata = request.state.get("skills_metadata", [])
-        skills_locations = self._format_skills_locations()
-        skills_list = self._format_skills_list(skills_metadata)
-
-        skills_section = self.system_prompt_template.format(
-            skills_locations=skills_locations,
-            skills_list=skills_list,
+        skills_section = self._prompt_cache.section(
+            (self.system_prompt_template, skills_metadata),
+            lambda: self._format_skills_section(skills_metadata),
         )
 
         new_system_message = append_to_system_message(request.system_message, skills_section)
@@ -734,6 +955,8 @@ class SkillsMiddleware(AgentMiddleware[SkillsState, ContextT, ResponseT]):
         Loads skills once per session from all configured sources. If
         `skills_metadata` is already present in state (from a prior turn or
         checkpointed session), the load is skipped and `None` is returned.
+        With a `registry`, skills are revalidated on every turn instead and
+        state is only updated when they changed.
 
         Skills are loaded in source order with later sources overriding
         earlier ones if they contain skills with the same name (last one wins).
@@ -744,8 +967,16 @@ class SkillsMiddleware(AgentMiddleware[SkillsState, ContextT, ResponseT]):
             config: Runnable config.
 
         Returns:
-            State update with `skills_metadata` populated, or `None` if already present.
+            State update with `skills_metadata` populated, or `None` if already present or unchanged.
         """
+        namespace = self._registry_namespace(config) if self.registry is not None else None
+        if self.registry is not None and namespace is not None:
+            backend = self._get_backend(state, runtime, config)
+            skills = self.registry.load(backend, self.sources, namespace=namespace)
+            if skills == state.get("skills_metadata"):
+                return None
+            return SkillsStateUpdate(skills_metadata=skills)
+
         # Skip if skills_metadata is already present in state (even if empty)
         if "skills_metadata" in state:
             return None
@@ -770,6 +1001,8 @@ class SkillsMiddleware(AgentMiddleware[SkillsState, ContextT, ResponseT]):
         Loads skills once per session from all configured sources. If
         `skills_metadata` is already present in state (from a prior turn or
         checkpointed session), the load is skipped and `None` is returned.
+        With a `registry`, skills are revalidated on every turn instead and
+        state is only updated when they changed.
 
         Skills are loaded in source order with later sources overriding
         earlier ones if they contain skills with the same name (last one wins).
@@ -780,8 +1013,16 @@ class SkillsMiddleware(AgentMiddleware[SkillsState, ContextT, ResponseT]):
             config: Runnable config.
 
         Returns:
-            State update with `skills_metadata` populated, or `None` if already present.
+            State update with `skills_metadata` populated, or `None` if already present or unchanged.
         """
+        namespace = self._registry_namespace(config) if self.registry is not None else None
+        if self.registry is not None and namespace is not None:
+            backend = self._get_backend(state, runtime, config)
+            skills = await self.registry.aload(backend, self.sources, namespace=namespace)
+            if skills == state.get("skills_metadata"):
+                return None
+            return SkillsStateUpdate(skills_metadata=skills)
+
         # Skip if skills_metadata is already present in state (even if empty)
         if "skills_metadata" in state:
             return None
@@ -835,4 +1076,4 @@ class SkillsMiddleware(AgentMiddleware[SkillsState, ContextT, ResponseT]):
         return await handler(modified_request)
 
 
-__all__ = ["SkillMetadata", "SkillsMiddleware"]
+__all__ = ["SkillMetadata", "SkillsMiddleware", "SkillsRegistry"]
@@ -0,0 +1,283 @@
+"""Opt-in cache for subagent results.
+
+Retry loops often dispatch the exact same `task` call again, and the subagent then
+redoes the same research. `SubAgentResultCache` stores the final answer of a subagent
+run keyed by a scope (the thread by default), the subagent type and the normalized task
+description. Each entry also records a content hash of every file the subagent read with
+`read_file` and of every `ls`, `glob` and `grep` result it saw; the entry is only reused
+while all of those are unchanged.
+
+```python
+from langgraph.store.memory import InMemoryStore
+
+from deepagents.middleware import SubAgentMiddleware
+from deepagents.middleware.subagent_cache import SubAgentResultCache
+
+middleware = SubAgentMiddleware(
+    backend=backend,
+    subagents=[...],
+    result_cache=SubAgentResultCache(ttl=3600, store=InMemoryStore()),
+)
+```
+
+Only runs that call nothing but the read-only filesystem tools (`READ_ONLY_TOOLS`) are
+cached. Runs that change state, call any other tool, or report no progress (subagents
+that are not compiled graphs) are never cached. Pass
+`{"configurable": {"bypass_subagent_cache": True}}` in the run config to skip lookups;
+fresh results still refresh the cache.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from typing import TYPE_CHECKING, Any
+
+from langgraph.store.base import BaseStore
+from typing_extensions import TypedDict
+
+from deepagents.backends.protocol import BackendProtocol, FileDownloadResponse
+
+if TYPE_CHECKING:
+    from langchain.tools import ToolRuntime
+
+logger = logging.getLogger(__name__)
+
+BYPASS_CONFIG_KEY = "bypass_subagent_cache"
+"""`configurable` key that skips cache lookups for a run."""
+
+READ_ONLY_TOOLS = frozenset({"read_file", "ls", "glob", "grep"})
+"""Tools a subagent run may call and still be cached. Runs calling any other tool are not cached."""
+
+LISTING_TOOLS = frozenset({"ls", "glob", "grep"})
+"""Read-only tools whose results are hashed to validate cached runs."""
+
+CacheScope = Callable[["ToolRuntime"], str | None]
+"""Return the scope a `task` call's results may be shared within, or `None` to not cache it."""
+
+
+class CachedSubAgentResult(TypedDict):
+    """A cached subagent result."""
+
+    message: str
+    """Final message of the subagent run."""
+
+    file_hashes: dict[str, str | None]
+    """Content hash of each file the subagent read, `None` if it did not exist."""
+
+    listing_hashes: dict[str, str | None]
+    """Hash of the result of each `ls`, `glob` and `grep` call, keyed by `listing_call`."""
+
+    created_at: float
+    """Unix time the result was cached."""
+
+
+def _hash_download(response: FileDownloadResponse) -> str | None:
+    if response.error is not None or response.content is None:
+        return None
+    return hashlib.sha256(response.content).hexdigest()
+
+
+def file_hashes(backend: BackendProtocol, paths: Iterable[str]) -> dict[str, str | None]:
+    """Hash the current content of `paths` in `backend`.
+
+    Args:
+        backend: Backend the subagent reads files from.
+        paths: File paths to hash.
+
+    Returns:
+        Mapping of path to content hash, or `None` for files that can't be read.
+    """
+    paths = sorted(paths)
+    if not paths:
+        return {}
+    return {path: _hash_download(response) for path, response in zip(paths, backend.download_files(paths), strict=True)}
+
+
+async def afile_hashes(backend: BackendProtocol, paths: Iterable[str]) -> dict[str, str | None]:
+    """Async version of `file_hashes`."""
+    paths = sorted(paths)
+    if not paths:
+        return {}
+    return {path: _hash_download(response) for path, response in zip(paths, await backend.adownload_files(paths), strict=True)}
+
+
+def listing_call(name: str, args: dict[str, Any]) -> str | None:
+    """Return a key for an `ls`, `glob` or `grep` call, or `None` if its arguments are invalid.
+
+    Args:
+        name: Tool name.
+        args: Tool call arguments.
+
+    Returns:
+        JSON list of the tool name and the arguments that select its result.
+    """
+    if name == "ls":
+        call = [name, args.get("path")]
+    elif name == "glob":
+        call = [name, args.get("pattern"), args.get("path", "/")]
+    elif name == "grep":
+        call = [name, args.get("pattern"), args.get("path"), args.get("glob")]
+    else:
+        return None
+    if not all(value is None or isinstance(value, str) for value in call):
+        return None
+    return json.dumps(call)
+
+
+def _hash_listing(result: object) -> str:
+    return hashlib.sha256(json.dumps(result, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _list(backend: BackendProtocol, name: str, args: list[Any]) -> object:
+    if name == "ls":
+        return backend.ls_info(*args)
+    if name == "glob":
+        return backend.glob_info(*args)
+    return backend.grep_raw(*args)
+
+
+async def _alist(backend: BackendProtocol, name: str, args: list[Any]) -> object:
+    if name == "ls":
+        return await backend.als_info(*args)
+    if name == "glob":
+        return await backend.aglob_info(*args)
+    return await backend.agrep_raw(*args)
+
+
+def listing_hashes(backend: BackendProtocol, calls: Iterable[str]) -> dict[str, str | None]:
+    """Hash the current result of `ls`, `glob` and `grep` calls in `backend`.
+
+    Args:
+        backend: Backend the subagent listed and searched.
+        calls: Keys from `listing_call`.
+
+    Returns:
+        Mapping of call to result hash, or `None` for calls that fail.
+    """
+    hashes: dict[str, str | None] = {}
+    for call in sorted(calls):
+        name, *args = json.loads(call)
+        try:
+            hashes[call] = _hash_listing(_list(backend, name, args))
+        except Exception:  # A failing call is recorded and compared like any result
+            logger.debug("Failed to hash %s for the subagent cache", call, exc_info=True)
+            hashes[call] = None
+    return hashes
+
+
+async def alisting_hashes(backend: BackendProtocol, calls: Iterable[str]) -> dict[str, str | None]:
+    """Async version of `listing_hashes`."""
+    hashes: dict[str, str | None] = {}
+    for call in sorted(calls):
+        name, *args = json.loads(call)
+        try:
+            hashes[call] = _hash_listing(await _alist(backend, name, args))
+        except Exception:  # A failing call is recorded and compared like any result
+            logger.debug("Failed to hash %s for the subagent cache", call, exc_info=True)
+            hashes[call] = None
+    return hashes
+
+
+def _thread_scope(runtime: "ToolRuntime") -> str | None:
+    thread_id = (runtime.config or {}).get("configurable", {}).get("thread_id")
+    return None if thread_id is None else str(thread_id)
+
+
+class SubAgentResultCache:
+    """Cache of subagent results keyed by scope, subagent type and task description.
+
+    Args:
+        ttl: Seconds a result stays valid. `None` keeps results until evicted.
+        store: Optional LangGraph store for persistence across processes. Results are
+            kept in memory when not given.
+        namespace: Store namespace for cached results.
+        max_entries: Maximum number of results kept in memory when no store is given.
+        scope: Return the scope a `task` call's results are shared within, or `None`
+            to not cache the call.
+
+            Defaults to the `thread_id` of the run, so results are never shared across
+            threads (or across tenants of a `DeepAgentRuntime`, whose thread IDs are
+            tenant scoped) and runs without a thread are not cached. Pass e.g. the user
+            or tenant of the run to share results between its threads.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float | None = 3600,
+        store: BaseStore | None = None,
+        namespace: tuple[str, ...] = ("deepagents", "subagent_results"),
+        max_entries: int = 256,
+        scope: CacheScope | None = None,
+    ) -> None:
+        """Initialize the cache."""
+        self.ttl = ttl
+        self.scope = scope or _thread_scope
+        self.store = store
+        self.namespace = namespace
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, CachedSubAgentResult] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(subagent_type: str, description: str, scope: str = "") -> str:
+        """Return the cache key for a task, ignoring whitespace differences in the description."""
+        normalized = " ".join(description.split())
+        return hashlib.sha256(json.dumps([scope, subagent_type, normalized]).encode()).hexdigest()
+
+    def _fresh(self, entry: CachedSubAgentResult | None) -> CachedSubAgentResult | None:
+        if entry is None or (self.ttl is not None and time.time() - entry["created_at"] > self.ttl):
+            return None
+        return entry
+
+    def get(self, key: str) -> CachedSubAgentResult | None:
+        """Return the cached result for `key` if it exists and has not expired."""
+        if self.store is not None:
+            item = self.store.get(self.namespace, key)
+            return self._fresh(item.value if item is not None else None)  # ty: ignore[invalid-argument-type]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        return self._fresh(entry)
+
+    async def aget(self, key: str) -> CachedSubAgentResult | None:
+        """Async version of `get`."""
+        if self.store is not None:
+            item = await self.store.aget(self.namespace, key)
+            return self._fresh(item.value if item is not None else None)  # ty: ignore[invalid-argument-type]
+        return self.get(key)
+
+    def put(self, key: str, message: str, hashes: dict[str, str | None], listings: dict[str, str | None] | None = None) -> None:
+        """Cache the result of a subagent run.
+
+        Args:
+            key: Cache key from `key`.
+            message: Final message of the run.
+            hashes: Content hashes of the files the run read.
+            listings: Hashes of the `ls`, `glob` and `grep` results the run saw.
+        """
+        entry = CachedSubAgentResult(message=message, file_hashes=hashes, listing_hashes=listings or {}, created_at=time.time())
+        if self.store is not None:
+            self.store.put(self.namespace, key, dict(entry))
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    async def aput(self, key: str, message: str, hashes: dict[str, str | None], listings: dict[str, str | None] | None = None) -> None:
+        """Async version of `put`."""
+        if self.store is not None:
+            entry = CachedSubAgentResult(message=message, file_hashes=hashes, listing_hashes=listings or {}, created_at=time.time())
+            await self.store.aput(self.namespace, key, dict(entry))
+            return
+        self.put(key, message, hashes, listings)
+
+
+__all__ = ["READ_ONLY_TOOLS", "CacheScope", "CachedSubAgentResult", "SubAgentResultCache"]
@@ -0,0 +1,242 @@
+"""Bounded, priority-ordered scheduling of subagent runs.
+
+When the model emits several `task` tool calls in one turn, the tool node runs them
+concurrently. Without a bound, every subagent starts at once and all of them hit the
+same model provider together. `SubAgentScheduler` caps how many subagents run at the
+same time, starts queued runs in priority order, and applies per-model token-bucket
+rate limits to the model calls made inside subagents.
+
+```python
+from langchain_core.rate_limiters import InMemoryRateLimiter
+
+from deepagents import create_deep_agent
+from deepagents.middleware.subagent_scheduler import SubAgentScheduler
+
+scheduler = SubAgentScheduler(
+    max_concurrency=3,
+    rate_limits={"claude-sonnet-4-5-20250929": InMemoryRateLimiter(requests_per_second=2, max_bucket_size=4)},
+)
+agent = create_deep_agent(subagent_scheduler=scheduler)
+```
+
+Queued, running and finished subagent runs are reported as `subagent_task` custom
+stream events.
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator, Mapping
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any
+
+from langchain.agents.middleware.types import (
+    AgentMiddleware,
+    ContextT,
+    ModelRequest,
+    ModelResponse,
+    ResponseT,
+)
+from langchain_core.rate_limiters import BaseRateLimiter
+
+
+def _model_key(model: Any) -> str | None:  # noqa: ANN401  # Any chat model implementation
+    """Return the model name used to look up a rate limiter."""
+    for attr in ("model_name", "model", "model_id"):
+        value = getattr(model, attr, None)
+        if isinstance(value, str):
+            return value
+    return None
+
+
+class _Waiter:
+    """A queued run waiting for a free slot."""
+
+    __slots__ = ("cancelled", "event", "future", "granted", "loop")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop | None) -> None:
+        self.loop = loop
+        self.future: asyncio.Future[None] | None = loop.create_future() if loop is not None else None
+        self.event = threading.Event() if loop is None else None
+        self.granted = False
+        self.cancelled = False
+
+    def wake(self) -> None:
+        if self.event is not None:
+            self.event.set()
+        elif self.loop is not None and self.future is not None:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class SubAgentScheduler:
+    """Limit concurrent subagent runs and rate limit the model calls they make.
+
+    Runs that cannot start immediately wait in a queue and start in priority order
+    (higher `priority` first, then first come first served). A single scheduler can be
+    shared by several agents to apply one global limit.
+
+    Args:
+        max_concurrency: Maximum number of subagents running at the same time.
+            `None` means unbounded.
+        rate_limits: Token-bucket rate limiters keyed by model name (e.g.
+            `"claude-sonnet-4-5-20250929"`). Model calls made by subagents built by
+            `SubAgentMiddleware` acquire a token from the limiter for their model
+            before calling the provider.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int | None = None,
+        rate_limits: Mapping[str, BaseRateLimiter] | None = None,
+    ) -> None:
+        """Initialize the scheduler."""
+        if max_concurrency is not None and max_concurrency < 1:
+            msg = f"max_concurrency must be at least 1, got {max_concurrency}"
+            raise ValueError(msg)
+        self.max_concurrency = max_concurrency
+        self.rate_limits: dict[str, BaseRateLimiter] = dict(rate_limits or {})
+        self._lock = threading.Lock()
+        self._running = 0
+        self._queue: list[tuple[int, int, _Waiter]] = []
+        self._sequence = itertools.count()
+
+    @property
+    def running(self) -> int:
+        """Number of subagent runs currently holding a slot."""
+        return self._running
+
+    @property
+    def queued(self) -> int:
+        """Number of subagent runs waiting for a slot."""
+        with self._lock:
+            return sum(1 for _, _, waiter in self._queue if not waiter.cancelled)
+
+    def _try_acquire(self, priority: int, loop: asyncio.AbstractEventLoop | None) -> tuple[_Waiter | None, int]:
+        """Take a slot if one is free, otherwise enqueue a waiter.
+
+        Returns:
+            The waiter (or None if a slot was taken) and its 1-based queue position.
+        """
+        with self._lock:
+            if self.max_concurrency is None or (self._running < self.max_concurrency and not self._queue):
+                self._running += 1
+                return None, 0
+            waiter = _Waiter(loop)
+            entry = (-priority, next(self._sequence), waiter)
+            heapq.heappush(self._queue, entry)
+            position = sum(1 for other in self._queue if other[:2] <= entry[:2] and not other[2].cancelled)
+            return waiter, position
+
+    def _release(self) -> None:
+        """Free a slot and hand it to the highest-priority waiter."""
+        with self._lock:
+            self._running -= 1
+            while self._queue:
+                _, _, waiter = heapq.heappop(self._queue)
+                if waiter.cancelled:
+                    continue
+                waiter.granted = True
+                self._running += 1
+                waiter.wake()
+                break
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        """Withdraw a waiter that stopped waiting, releasing its slot if it was granted meanwhile."""
+        with self._lock:
+            granted = waiter.granted
+            waiter.cancelled = True
+        if granted:
+            self._release()
+
+    @contextmanager
+    def slot(self, *, priority: int = 0, on_queued: Callable[[int], None] | None = None) -> Iterator[None]:
+        """Hold a run slot for the duration of the block.
+
+        Args:
+            priority: Start priority while queued. Higher values start first.
+            on_queued: Called with the 1-based queue position if the run has to wait.
+        """
+        waiter, position = self._try_acquire(priority, None)
+        if waiter is not None:
+            if on_queued is not None:
+                on_queued(position)
+            try:
+                waiter.event.wait()  # ty: ignore[possibly-missing-attribute]
+            except BaseException:
+                self._abandon(waiter)
+                raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def aslot(self, *, priority: int = 0, on_queued: Callable[[int], None] | None = None) -> AsyncIterator[None]:
+        """(async) Hold a run slot for the duration of the block.
+
+        Args:
+            priority: Start priority while queued. Higher values start first.
+            on_queued: Called with the 1-based queue position if the run has to wait.
+        """
+        waiter, position = self._try_acquire(priority, asyncio.get_running_loop())
+        if waiter is not None:
+            if on_queued is not None:
+                on_queued(position)
+            try:
+                await waiter.future  # ty: ignore[invalid-await]
+            except BaseException:
+                self._abandon(waiter)
+                raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def get_rate_limiter(self, model: Any) -> BaseRateLimiter | None:  # noqa: ANN401  # Any chat model implementation
+        """Return the rate limiter configured for `model`, if any."""
+        if not self.rate_limits:
+            return None
+        key = _model_key(model)
+        return self.rate_limits.get(key) if key is not None else None
+
+    def rate_limit_middleware(self) -> AgentMiddleware:
+        """Return middleware that applies this scheduler's rate limits to model calls."""
+        return _ModelRateLimitMiddleware(self)
+
+
+class _ModelRateLimitMiddleware(AgentMiddleware):
+    """Acquire a token from the scheduler's rate limiter before each model call."""
+
+    def __init__(self, scheduler: SubAgentScheduler) -> None:
+        super().__init__()
+        self._scheduler = scheduler
+
+    def wrap_model_call(
+        self,
+        request: ModelRequest[ContextT],
+        handler: Callable[[ModelRequest[ContextT]], ModelResponse[ResponseT]],
+    ) -> ModelResponse[ResponseT]:
+        limiter = self._scheduler.get_rate_limiter(request.model)
+        if limiter is not None:
+            limiter.acquire(blocking=True)
+        return handler(request)
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest[ContextT],
+        handler: Callable[[ModelRequest[ContextT]], Awaitable[ModelResponse[ResponseT]]],
+    ) -> ModelResponse[ResponseT]:
+        limiter = self._scheduler.get_rate_limiter(request.model)
+        if limiter is not None:
+            await limiter.aacquire(blocking=True)
+        return await handler(request)
+
+
+__all__ = ["SubAgentScheduler"]
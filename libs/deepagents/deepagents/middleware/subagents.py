@@ -1,7 +1,12 @@
 """Middleware for providing subagents to an agent via a `task` tool."""
 
+import asyncio
+import functools
+import threading
+import time
 import warnings
-from collections.abc import Awaitable, Callable, Sequence
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable, Sequence
 from typing import Annotated, Any, NotRequired, TypedDict, Unpack, cast
 
 from langchain.agents import create_agent
@@ -10,13 +15,33 @@ from langchain.agents.middleware.types import AgentMiddleware, ContextT, ModelRe
 from langchain.chat_models import init_chat_model
 from langchain.tools import BaseTool, ToolRuntime
 from langchain_core.language_models import BaseChatModel
-from langchain_core.messages import HumanMessage, ToolMessage
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
 from langchain_core.runnables import Runnable
 from langchain_core.tools import StructuredTool
+from langgraph.pregel import Pregel
 from langgraph.types import Command
 
-from deepagents.backends.protocol import BackendFactory, BackendProtocol
+from deepagents._fingerprint import fingerprint
+from deepagents.backends.instrumented import record_cache_hit
+from deepagents.backends.protocol import BackendFactory, BackendProtocol, WriteResult
+from deepagents.backends.utils import sanitize_tool_call_id
 from deepagents.middleware._utils import append_to_system_message
+from deepagents.middleware.filesystem import _create_content_preview
+from deepagents.middleware.subagent_cache import (
+    BYPASS_CONFIG_KEY,
+    LISTING_TOOLS,
+    READ_ONLY_TOOLS,
+    CachedSubAgentResult,
+    SubAgentResultCache,
+    afile_hashes,
+    alisting_hashes,
+    file_hashes,
+    listing_call,
+    listing_hashes,
+)
+from deepagents.middleware.subagent_scheduler import SubAgentScheduler
+from deepagents.middleware.tool_stats import current_trace, traced_backend
+from deepagents.tokens import CachedTokenEstimator, get_default_token_estimator
 
 
 class SubAgent(TypedDict):
@@ -77,6 +102,17 @@ class SubAgent(TypedDict):
     skills: NotRequired[list[str]]
     """Skill source paths for SkillsMiddleware."""
 
+    priority: NotRequired[int]
+    """Start priority when a `SubAgentScheduler` queues runs. Higher values start first."""
+
+    state_keys: NotRequired[list[str]]
+    """Parent state keys passed to the subagent besides `messages`.
+
+    Defaults to every key except the ones private to the parent (todos, skills,
+    memory, ...). Restrict this to avoid handing large state such as `files` to
+    subagents that don't use it.
+    """
+
 
 class CompiledSubAgent(TypedDict):
     """A pre-compiled agent spec.
@@ -109,6 +145,17 @@ class CompiledSubAgent(TypedDict):
     This is required for the subagent to communicate results back to the main agent.
     """
 
+    priority: NotRequired[int]
+    """Start priority when a `SubAgentScheduler` queues runs. Higher values start first."""
+
+    state_keys: NotRequired[list[str]]
+    """Parent state keys passed to the subagent besides `messages`.
+
+    Defaults to every key except the ones private to the parent (todos, skills,
+    memory, ...). Restrict this to avoid handing large state such as `files` to
+    subagents that don't use it.
+    """
+
 
 DEFAULT_SUBAGENT_PROMPT = "In order to complete the objective that the user asks of you, you have access to a number of standard tools."
 
@@ -124,7 +171,31 @@ DEFAULT_SUBAGENT_PROMPT = "In order to complete the objective that the user asks
 #    be explicitly filtered from runtime.state when invoking a subagent to prevent parent state
 #    from leaking to child agents (e.g., the general-purpose subagent loads its own skills via
 #    SkillsMiddleware).
-_EXCLUDED_STATE_KEYS = {"messages", "todos", "structured_response", "skills_metadata", "memory_contents"}
+# 4. The large_tool_result_aliases key is private to the parent's FilesystemMiddleware. Passing it
+#    down would let the subagent's end-of-run cleanup delete evicted results the parent still uses.
+# 5. The prompt_cache_usage key holds running totals with an additive reducer, so passing it down
+#    and back would double count the parent's usage.
+# 6. The _patch_tool_calls_watermark key indexes into the parent's messages, which the subagent
+#    does not receive.
+# 7. The tool_stats key holds running totals with an additive reducer, like prompt_cache_usage.
+_EXCLUDED_STATE_KEYS = {
+    "messages",
+    "todos",
+    "structured_response",
+    "skills_metadata",
+    "memory_contents",
+    "large_tool_result_aliases",
+    "prompt_cache_usage",
+    "tool_stats",
+    "_patch_tool_calls_watermark",
+}
+
+SUBAGENT_RESULTS_DIR = "/subagent_results"
+"""Directory that subagent results above `result_token_limit` are saved to."""
+
+SUBAGENT_RESULT_FILE_MESSAGE = """The subagent's result was saved to {file_path}. Read the file for the full result. Preview of its head and tail:
+
+{preview}"""
 
 TASK_TOOL_DESCRIPTION = """Launch an ephemeral subagent to handle complex, multi-step independent tasks with isolated context windows.
 
@@ -280,7 +351,11 @@ class _SubagentSpec(TypedDict):
 
     name: str
     description: str
-    runnable: Runnable
+    runnable: NotRequired[Runnable]
+    build: NotRequired[Callable[[], Runnable]]
+    """Builds the runnable on first use when `runnable` is not given."""
+    priority: NotRequired[int]
+    state_keys: NotRequired[list[str] | None]
 
 
 def _get_subagents_legacy(
@@ -371,9 +446,216 @@ def _get_subagents_legacy(
     return specs
 
 
-def _build_task_tool(  # noqa: C901
+_COMPILED_SUBAGENTS: OrderedDict[Hashable, Runnable] = OrderedDict()
+"""Compiled subagent graphs keyed by the fingerprint of their `create_agent` arguments."""
+
+_COMPILED_SUBAGENTS_MAX = 128
+_COMPILED_SUBAGENTS_LOCK = threading.Lock()
+
+
+def _compile_subagent(key: Hashable, agent_kwargs: dict[str, Any]) -> Runnable:
+    """Return the compiled graph for a subagent spec, reusing an equivalent earlier compilation.
+
+    Args:
+        key: Fingerprint of `agent_kwargs`.
+        agent_kwargs: Keyword arguments for `create_agent`.
+
+    Returns:
+        The compiled subagent graph.
+    """
+    with _COMPILED_SUBAGENTS_LOCK:
+        graph = _COMPILED_SUBAGENTS.get(key)
+        if graph is not None:
+            _COMPILED_SUBAGENTS.move_to_end(key)
+            return graph
+    # Compiled outside the lock so unrelated subagents compile concurrently
+    graph = create_agent(**agent_kwargs)
+    with _COMPILED_SUBAGENTS_LOCK:
+        # Another thread may have compiled the same spec meanwhile; keep the first one
+        graph = _COMPILED_SUBAGENTS.setdefault(key, graph)
+        _COMPILED_SUBAGENTS.move_to_end(key)
+        if len(_COMPILED_SUBAGENTS) > _COMPILED_SUBAGENTS_MAX:
+            _COMPILED_SUBAGENTS.popitem(last=False)
+    return graph
+
+
+def _changed(before: Any, after: Any) -> bool:  # noqa: ANN401  # Arbitrary state values
+    """Whether a state value changed, checking identity before equality."""
+    return after is not before and after != before
+
+
+def _state_delta(subagent_state: dict[str, Any], result: dict[str, Any]) -> dict[str, Any]:
+    """Compute the parent state update from a subagent's final state.
+
+    Only keys the subagent changed are returned, so unchanged values are not written
+    back (and checkpointed) again. `files` is diffed per path: new and modified files
+    are returned, and files the subagent deleted are returned as `None` deletion markers
+    for the files reducer.
+
+    Args:
+        subagent_state: The state the subagent was invoked with.
+        result: The subagent's final state.
+
+    Returns:
+        The state update to apply to the parent, excluding `_EXCLUDED_STATE_KEYS`.
+    """
+    update: dict[str, Any] = {}
+    for key, value in result.items():
+        if key in _EXCLUDED_STATE_KEYS:
+            continue
+        before = subagent_state.get(key)
+        if key == "files" and isinstance(value, dict) and isinstance(before, dict):
+            files_delta: dict[str, Any] = {path: data for path, data in value.items() if _changed(before.get(path), data)}
+            files_delta.update({path: None for path in before if path not in value})
+            if files_delta:
+                update[key] = files_delta
+        elif key not in subagent_state or _changed(before, value):
+            update[key] = value
+    return update
+
+
+def _progress_events(update: Any) -> list[dict[str, Any]]:  # noqa: ANN401  # Stream chunks are untyped
+    """Translate one `updates` stream chunk of a subagent into progress events.
+
+    Args:
+        update: Mapping of node name to the state update that node returned.
+
+    Returns:
+        `text`, `tool_call`, `tool_result` and `todos` events, in order.
+    """
+    events: list[dict[str, Any]] = []
+    if not isinstance(update, dict):
+        return events
+    for node_update in update.values():
+        if not isinstance(node_update, dict):
+            continue
+        messages = node_update.get("messages")
+        for message in messages if isinstance(messages, list) else []:
+            if isinstance(message, AIMessage):
+                if message.text:
+                    events.append({"event": "text", "text": message.text})
+                events.extend(
+                    {"event": "tool_call", "name": call["name"], "args": call["args"], "call_id": call["id"]} for call in message.tool_calls
+                )
+            elif isinstance(message, ToolMessage):
+                events.append({"event": "tool_result", "name": message.name, "call_id": message.tool_call_id, "status": message.status})
+        if "todos" in node_update:
+            events.append({"event": "todos", "todos": node_update["todos"]})
+    return events
+
+
+def _split_stream_chunk(chunk: tuple) -> tuple[str, Any]:
+    """Return `(mode, payload)` of a multi-mode stream chunk, with or without a namespace."""
+    if len(chunk) == 2:  # noqa: PLR2004  # (mode, payload)
+        return chunk[0], chunk[1]
+    return chunk[1], chunk[2]
+
+
+def _final_state(latest: dict[str, Any] | None, interrupts: list[Any]) -> dict[str, Any]:
+    """Combine the last streamed values and interrupts the way `Pregel.invoke` does.
+
+    An interrupt before the first step streams no values, so `latest` may be `None`.
+    """
+    if latest is None:
+        return {"__interrupt__": interrupts}
+    return {**latest, "__interrupt__": interrupts} if interrupts else latest
+
+
+def _run_subagent(subagent: Runnable, state: dict[str, Any], on_progress: Callable[[dict[str, Any]], None]) -> dict[str, Any]:
+    """Invoke a subagent, reporting progress while it runs.
+
+    Compiled graphs are streamed so intermediate steps can be forwarded as they happen.
+    Other runnables are invoked directly.
+
+    Args:
+        subagent: The subagent runnable.
+        state: Input state for the subagent.
+        on_progress: Called with each progress event.
+
+    Returns:
+        The subagent's final state, as returned by `invoke`.
+    """
+    if not isinstance(subagent, Pregel):
+        return subagent.invoke(state)
+    latest: Any = None
+    interrupts: list[Any] = []
+    for chunk in subagent.stream(state, stream_mode=["updates", "values"]):
+        mode, payload = _split_stream_chunk(chunk)
+        if mode == "values":
+            latest = payload
+        elif isinstance(payload, dict) and payload.get("__interrupt__") is not None:
+            interrupts.extend(payload["__interrupt__"])
+        else:
+            for event in _progress_events(payload):
+                on_progress(event)
+    if latest is None and not interrupts:
+        # Nothing ran, so nothing is repeated by invoking instead
+        return subagent.invoke(state)
+    return _final_state(latest, interrupts)
+
+
+async def _arun_subagent(subagent: Runnable, state: dict[str, Any], on_progress: Callable[[dict[str, Any]], None]) -> dict[str, Any]:
+    """Async version of `_run_subagent`."""
+    if not isinstance(subagent, Pregel):
+        return await subagent.ainvoke(state)
+    latest: Any = None
+    interrupts: list[Any] = []
+    async for chunk in subagent.astream(state, stream_mode=["updates", "values"]):
+        mode, payload = _split_stream_chunk(chunk)
+        if mode == "values":
+            latest = payload
+        elif isinstance(payload, dict) and payload.get("__interrupt__") is not None:
+            interrupts.extend(payload["__interrupt__"])
+        else:
+            for event in _progress_events(payload):
+                on_progress(event)
+    if latest is None and not interrupts:
+        return await subagent.ainvoke(state)
+    return _final_state(latest, interrupts)
+
+
+class _RunRecorder:
+    """Collect the inputs a subagent run read and whether it only used read-only tools."""
+
+    def __init__(self) -> None:
+        self.read_paths: set[str] = set()
+        self.listings: set[str] = set()
+        self.observed = False
+        self.read_only = True
+
+    @property
+    def cacheable(self) -> bool:
+        """Whether the run reported its steps and called nothing but read-only tools."""
+        return self.observed and self.read_only
+
+    def record(self, event: dict[str, Any]) -> None:
+        self.observed = True
+        if event["event"] != "tool_call":
+            return
+        name, args = event["name"], event["args"]
+        if name not in READ_ONLY_TOOLS:
+            self.read_only = False
+        elif name in LISTING_TOOLS:
+            call = listing_call(name, args)
+            if call is None:
+                self.read_only = False
+            else:
+                self.listings.add(call)
+        elif isinstance(args.get("file_path"), str):
+            self.read_paths.add(args["file_path"])
+        else:
+            self.read_only = False
+
+
+def _build_task_tool(  # noqa: C901, PLR0915
     subagents: list[_SubagentSpec],
     task_description: str | None = None,
+    *,
+    scheduler: SubAgentScheduler | None = None,
+    backend: BackendProtocol | BackendFactory | None = None,
+    result_token_limit: int | None = None,
+    result_cache: SubAgentResultCache | None = None,
+    token_estimator: CachedTokenEstimator | None = None,
 ) -> BaseTool:
     """Create a task tool from pre-built subagent graphs.
 
@@ -383,12 +665,25 @@ def _build_task_tool(  # noqa: C901
         subagents: List of subagent specs containing name, description, and runnable.
         task_description: Custom description for the task tool. If `None`,
             uses default template. Supports `{available_agents}` placeholder.
+        scheduler: Optional scheduler bounding how many subagents run at once.
+        backend: Backend that large subagent results are written to.
+        result_token_limit: Results above this many tokens are saved to `backend` and
+            returned by file reference. `None` always returns results inline.
+        result_cache: Optional cache of subagent results.
+        token_estimator: Estimator used to measure results against `result_token_limit`.
 
     Returns:
         A StructuredTool that can invoke subagents by type.
     """
+    estimate_tokens = token_estimator or get_default_token_estimator()
     # Build the graphs dict and descriptions from the unified spec list
-    subagent_graphs: dict[str, Runnable] = {spec["name"]: spec["runnable"] for spec in subagents}
+    subagent_graphs: dict[str, Runnable] = {spec["name"]: spec["runnable"] for spec in subagents if "runnable" in spec}
+    subagent_builders: dict[str, Callable[[], Runnable]] = {spec["name"]: spec["build"] for spec in subagents if "build" in spec}
+    build_locks = {name: threading.Lock() for name in subagent_builders}
+    subagent_priorities: dict[str, int] = {spec["name"]: spec.get("priority", 0) for spec in subagents}
+    subagent_state_keys: dict[str, frozenset[str] | None] = {
+        spec["name"]: frozenset(spec["state_keys"]) if spec.get("state_keys") is not None else None for spec in subagents
+    }
     subagent_description_str = "\n".join(f"- {s['name']}: {s['description']}" for s in subagents)
 
     # Use custom description if provided, otherwise use default template
@@ -399,7 +694,7 @@ def _build_task_tool(  # noqa: C901
     else:
         description = task_description
 
-    def _return_command_with_state_update(result: dict, tool_call_id: str) -> Command:
+    def _result_text(result: dict) -> str:
         # Validate that the result contains a 'messages' key
         if "messages" not in result:
             error_msg = (
@@ -408,24 +703,138 @@ def _build_task_tool(  # noqa: C901
                 "in their state schema to communicate results back to the main agent."
             )
             raise ValueError(error_msg)
-
-        state_update = {k: v for k, v in result.items() if k not in _EXCLUDED_STATE_KEYS}
         # Strip trailing whitespace to prevent API errors with Anthropic
-        message_text = result["messages"][-1].text.rstrip() if result["messages"][-1].text else ""
+        return result["messages"][-1].text.rstrip() if result["messages"][-1].text else ""
+
+    def _resolve_backend(runtime: ToolRuntime) -> BackendProtocol | None:
+        if backend is None:
+            return None
+        return traced_backend(backend(runtime) if callable(backend) else backend)
+
+    def _record_trace(subagent_type: str, message_text: str | None, written: tuple[str, WriteResult] | None = None) -> None:
+        """Add subagent details to the trace of this `task` call, if it is traced."""
+        trace = current_trace()
+        if trace is None:
+            return
+        trace.extra.update(subagent_type=subagent_type, cache_hit=message_text is None)
+        if written is not None and not written[1].error:
+            trace.evicted = True
+            trace.result = message_text
+
+    def _result_file(message_text: str, runtime: ToolRuntime) -> tuple[BackendProtocol, str] | None:
+        """Return the backend and path to save the result to, or None to return it inline."""
+        if backend is None or result_token_limit is None or estimate_tokens(message_text) <= result_token_limit:
+            return None
+        return _resolve_backend(runtime), f"{SUBAGENT_RESULTS_DIR}/{sanitize_tool_call_id(runtime.tool_call_id)}.md"  # ty: ignore[invalid-return-type]
+
+    def _cache_key(subagent_type: str, description: str, runtime: ToolRuntime) -> str | None:
+        if result_cache is None:
+            return None
+        scope = result_cache.scope(runtime)
+        return None if scope is None else result_cache.key(subagent_type, description, scope)
+
+    def _use_cached(runtime: ToolRuntime) -> bool:
+        return not (runtime.config or {}).get("configurable", {}).get(BYPASS_CONFIG_KEY)
+
+    def _cached_command(cached: CachedSubAgentResult, tool_call_id: str) -> Command:
+        cache_metadata = {"hit": True, "age_seconds": round(time.time() - cached["created_at"], 3)}
+        message = ToolMessage(cached["message"], tool_call_id=tool_call_id, response_metadata={"subagent_cache": cache_metadata})
+        return Command(update={"messages": [message]})
+
+    def _inputs_unchanged(cached: CachedSubAgentResult, resolved_backend: BackendProtocol | None) -> bool:
+        if not cached["file_hashes"] and not cached["listing_hashes"]:
+            return True
+        return (
+            resolved_backend is not None
+            and file_hashes(resolved_backend, cached["file_hashes"]) == cached["file_hashes"]
+            and listing_hashes(resolved_backend, cached["listing_hashes"]) == cached["listing_hashes"]
+        )
+
+    async def _ainputs_unchanged(cached: CachedSubAgentResult, resolved_backend: BackendProtocol | None) -> bool:
+        if not cached["file_hashes"] and not cached["listing_hashes"]:
+            return True
+        return (
+            resolved_backend is not None
+            and await afile_hashes(resolved_backend, cached["file_hashes"]) == cached["file_hashes"]
+            and await alisting_hashes(resolved_backend, cached["listing_hashes"]) == cached["listing_hashes"]
+        )
+
+    def _cacheable(command: Command, recorder: _RunRecorder) -> bool:
+        """Whether a run only read inputs and those inputs can be fingerprinted."""
+        update = cast("dict[str, Any]", command.update)
+        has_inputs = bool(recorder.read_paths or recorder.listings)
+        return set(update) == {"messages"} and recorder.cacheable and (not has_inputs or backend is not None)
+
+    def _return_command_with_state_update(
+        result: dict,
+        tool_call_id: str,
+        subagent_state: dict,
+        message_text: str,
+        written: tuple[str, WriteResult] | None = None,
+    ) -> Command:
+        state_update = _state_delta(subagent_state, result)
+        response_metadata = {"subagent_cache": {"hit": False}} if result_cache is not None else {}
+        message = ToolMessage(message_text, tool_call_id=tool_call_id, response_metadata=response_metadata)
+        if written is not None and not written[1].error:
+            file_path, write_result = written
+            message = ToolMessage(
+                SUBAGENT_RESULT_FILE_MESSAGE.format(file_path=file_path, preview=_create_content_preview(message_text)),
+                tool_call_id=tool_call_id,
+                artifact={"file_path": file_path},
+                response_metadata=response_metadata,
+            )
+            if write_result.files_update:
+                state_update["files"] = {**state_update.get("files", {}), **write_result.files_update}
         return Command(
             update={
                 **state_update,
-                "messages": [ToolMessage(message_text, tool_call_id=tool_call_id)],
+                "messages": [message],
             }
         )
 
-    def _validate_and_prepare_state(subagent_type: str, description: str, runtime: ToolRuntime) -> tuple[Runnable, dict]:
+    def _get_subagent(subagent_type: str) -> Runnable:
+        """Return the subagent graph, compiling it on the first call for this subagent type."""
+        subagent = subagent_graphs.get(subagent_type)
+        if subagent is not None:
+            return subagent
+        # Concurrent first calls for the same type compile it once
+        with build_locks[subagent_type]:
+            subagent = subagent_graphs.get(subagent_type)
+            if subagent is None:
+                subagent = subagent_graphs[subagent_type] = subagent_builders[subagent_type]()
+        return subagent
+
+    async def _aget_subagent(subagent_type: str) -> Runnable:
+        """Async version of _get_subagent. Compiles in a worker thread to keep the event loop free."""
+        subagent = subagent_graphs.get(subagent_type)
+        if subagent is not None:
+            return subagent
+        return await asyncio.to_thread(_get_subagent, subagent_type)
+
+    def _prepare_state(subagent_type: str, description: str, runtime: ToolRuntime) -> dict:
         """Prepare state for invocation."""
-        subagent = subagent_graphs[subagent_type]
-        # Create a new state dict to avoid mutating the original
-        subagent_state = {k: v for k, v in runtime.state.items() if k not in _EXCLUDED_STATE_KEYS}
+        # Create a new state dict to avoid mutating the original. Values are shared, not copied.
+        state_keys = subagent_state_keys[subagent_type]
+        subagent_state = {k: v for k, v in runtime.state.items() if k not in _EXCLUDED_STATE_KEYS and (state_keys is None or k in state_keys)}
         subagent_state["messages"] = [HumanMessage(content=description)]
-        return subagent, subagent_state
+        return subagent_state
+
+    def _report(runtime: ToolRuntime, subagent_type: str, status: str, **extra: Any) -> None:
+        if runtime.stream_writer is not None:
+            runtime.stream_writer(
+                {"type": "subagent_task", "status": status, "tool_call_id": runtime.tool_call_id, "subagent_type": subagent_type, **extra}
+            )
+
+    def _on_queued(runtime: ToolRuntime, subagent_type: str) -> Callable[[int], None]:
+        return lambda position: _report(runtime, subagent_type, "queued", position=position)
+
+    def _on_progress(runtime: ToolRuntime, subagent_type: str, recorder: _RunRecorder) -> Callable[[dict[str, Any]], None]:
+        def forward(event: dict[str, Any]) -> None:
+            recorder.record(event)
+            if runtime.stream_writer is not None:
+                runtime.stream_writer({"type": "subagent_progress", "tool_call_id": runtime.tool_call_id, "subagent_type": subagent_type, **event})
+
+        return forward
 
     def task(
         description: Annotated[
@@ -435,15 +844,45 @@ def _build_task_tool(  # noqa: C901
         subagent_type: Annotated[str, "The type of subagent to use. Must be one of the available agent types listed in the tool description."],
         runtime: ToolRuntime,
     ) -> str | Command:
-        if subagent_type not in subagent_graphs:
-            allowed_types = ", ".join([f"`{k}`" for k in subagent_graphs])
+        if subagent_type not in subagent_priorities:
+            allowed_types = ", ".join([f"`{k}`" for k in subagent_priorities])
             return f"We cannot invoke subagent {subagent_type} because it does not exist, the only allowed types are {allowed_types}"
         if not runtime.tool_call_id:
             value_error_msg = "Tool call ID is required for subagent invocation"
             raise ValueError(value_error_msg)
-        subagent, subagent_state = _validate_and_prepare_state(subagent_type, description, runtime)
-        result = subagent.invoke(subagent_state)
-        return _return_command_with_state_update(result, runtime.tool_call_id)
+        cache_key = _cache_key(subagent_type, description, runtime)
+        if result_cache is not None and cache_key is not None and _use_cached(runtime):
+            cached = result_cache.get(cache_key)
+            resolved_backend = _resolve_backend(runtime)
+            if cached is not None and _inputs_unchanged(cached, resolved_backend):
+                record_cache_hit(resolved_backend, "subagent_result")
+                _record_trace(subagent_type, None)
+                return _cached_command(cached, runtime.tool_call_id)
+        subagent = _get_subagent(subagent_type)
+        subagent_state = _prepare_state(subagent_type, description, runtime)
+        recorder = _RunRecorder()
+        on_progress = _on_progress(runtime, subagent_type, recorder)
+        if scheduler is None:
+            result = _run_subagent(subagent, subagent_state, on_progress)
+        else:
+            with scheduler.slot(priority=subagent_priorities[subagent_type], on_queued=_on_queued(runtime, subagent_type)):
+                _report(runtime, subagent_type, "running")
+                result = _run_subagent(subagent, subagent_state, on_progress)
+            _report(runtime, subagent_type, "done")
+        message_text = _result_text(result)
+        result_file = _result_file(message_text, runtime)
+        written = None
+        if result_file is not None:
+            resolved_backend, file_path = result_file
+            written = (file_path, resolved_backend.write(file_path, message_text))
+        _record_trace(subagent_type, message_text, written)
+        command = _return_command_with_state_update(result, runtime.tool_call_id, subagent_state, message_text, written)
+        if result_cache is not None and cache_key is not None and _cacheable(command, recorder):
+            resolved_backend = _resolve_backend(runtime)
+            hashes = file_hashes(resolved_backend, recorder.read_paths) if recorder.read_paths else {}  # ty: ignore[invalid-argument-type]
+            listings = listing_hashes(resolved_backend, recorder.listings) if recorder.listings else {}  # ty: ignore[invalid-argument-type]
+            result_cache.put(cache_key, message_text, hashes, listings)
+        return command
 
     async def atask(
         description: Annotated[
@@ -453,15 +892,45 @@ def _build_task_tool(  # noqa: C901
         subagent_type: Annotated[str, "The type of subagent to use. Must be one of the available agent types listed in the tool description."],
         runtime: ToolRuntime,
     ) -> str | Command:
-        if subagent_type not in subagent_graphs:
-            allowed_types = ", ".join([f"`{k}`" for k in subagent_graphs])
+        if subagent_type not in subagent_priorities:
+            allowed_types = ", ".join([f"`{k}`" for k in subagent_priorities])
             return f"We cannot invoke subagent {subagent_type} because it does not exist, the only allowed types are {allowed_types}"
         if not runtime.tool_call_id:
             value_error_msg = "Tool call ID is required for subagent invocation"
             raise ValueError(value_error_msg)
-        subagent, subagent_state = _validate_and_prepare_state(subagent_type, description, runtime)
-        result = await subagent.ainvoke(subagent_state)
-        return _return_command_with_state_update(result, runtime.tool_call_id)
+        cache_key = _cache_key(subagent_type, description, runtime)
+        if result_cache is not None and cache_key is not None and _use_cached(runtime):
+            cached = await result_cache.aget(cache_key)
+            resolved_backend = _resolve_backend(runtime)
+            if cached is not None and await _ainputs_unchanged(cached, resolved_backend):
+                record_cache_hit(resolved_backend, "subagent_result")
+                _record_trace(subagent_type, None)
+                return _cached_command(cached, runtime.tool_call_id)
+        subagent = await _aget_subagent(subagent_type)
+        subagent_state = _prepare_state(subagent_type, description, runtime)
+        recorder = _RunRecorder()
+        on_progress = _on_progress(runtime, subagent_type, recorder)
+        if scheduler is None:
+            result = await _arun_subagent(subagent, subagent_state, on_progress)
+        else:
+            async with scheduler.aslot(priority=subagent_priorities[subagent_type], on_queued=_on_queued(runtime, subagent_type)):
+                _report(runtime, subagent_type, "running")
+                result = await _arun_subagent(subagent, subagent_state, on_progress)
+            _report(runtime, subagent_type, "done")
+        message_text = _result_text(result)
+        result_file = _result_file(message_text, runtime)
+        written = None
+        if result_file is not None:
+            resolved_backend, file_path = result_file
+            written = (file_path, await resolved_backend.awrite(file_path, message_text))
+        _record_trace(subagent_type, message_text, written)
+        command = _return_command_with_state_update(result, runtime.tool_call_id, subagent_state, message_text, written)
+        if result_cache is not None and cache_key is not None and _cacheable(command, recorder):
+            resolved_backend = _resolve_backend(runtime)
+            hashes = await afile_hashes(resolved_backend, recorder.read_paths) if recorder.read_paths else {}  # ty: ignore[invalid-argument-type]
+            listings = await alisting_hashes(resolved_backend, recorder.listings) if recorder.listings else {}  # ty: ignore[invalid-argument-type]
+            await result_cache.aput(cache_key, message_text, hashes, listings)
+        return command
 
     return StructuredTool.from_function(
         name="task",
@@ -496,10 +965,39 @@ class SubAgentMiddleware(AgentMiddleware[Any, ContextT, ResponseT]):
         backend: Backend for file operations and execution. Required for the new API.
         subagents: List of fully-specified subagent configs. Each SubAgent
             must specify `model` and `tools`. Optional `interrupt_on` on
-            individual subagents is respected.
+            individual subagents is respected. Their graphs are compiled on the
+            first `task` call.
         system_prompt: Instructions appended to main agent's system prompt
             about how to use the task tool.
         task_description: Custom description for the task tool.
+        scheduler: Optional `SubAgentScheduler` that bounds how many subagents run at
+            the same time, starts queued runs in priority order, and rate limits the
+            model calls of the subagents built by this middleware. Runs report their
+            progress as `subagent_task` custom stream events with a `status` of
+            `"queued"`, `"running"` or `"done"`.
+        result_token_limit: If set, subagent results longer than this many tokens are
+            saved to `backend` under `/subagent_results/` and the `task` tool returns
+            the file path with a short preview instead of the full text. Requires
+            `backend`.
+        result_cache: Optional `SubAgentResultCache`. Identical `task` calls in the same
+            cache scope reuse the previous result while the files and listings the
+            subagent read are unchanged. Returned
+            `ToolMessage`s report `{"subagent_cache": {"hit": ...}}` in their
+            `response_metadata`.
+        token_estimator: Estimator used to measure results against `result_token_limit`.
+
+            Defaults to the process-wide estimator from
+            `deepagents.tokens.get_default_token_estimator()`.
+        reuse_graphs: Whether to share compiled subagent graphs with other middleware
+            instances whose spec has the same fingerprint.
+
+            Shared graphs are kept in a process-wide cache that holds on to the
+            tools and middleware of the spec, so only enable this when those
+            objects outlive the agent anyway.
+
+    While a subagent built as a graph runs, its steps are forwarded as
+    `subagent_progress` custom stream events: `text` for model output, `tool_call`
+    and `tool_result` for tool use, and `todos` for todo list updates.
 
     Example:
         ```python
@@ -549,10 +1047,16 @@ class SubAgentMiddleware(AgentMiddleware[Any, ContextT, ResponseT]):
         subagents: list[SubAgent | CompiledSubAgent] | None = None,
         system_prompt: str | None = TASK_SYSTEM_PROMPT,
         task_description: str | None = None,
+        scheduler: SubAgentScheduler | None = None,
+        result_token_limit: int | None = None,
+        result_cache: SubAgentResultCache | None = None,
+        token_estimator: CachedTokenEstimator | None = None,
+        reuse_graphs: bool = False,
         **deprecated_kwargs: Unpack[_DeprecatedKwargs],
     ) -> None:
         """Initialize the `SubAgentMiddleware`."""
         super().__init__()
+        self._reuse_graphs = reuse_graphs
 
         # Validate that only known deprecated kwargs are passed
         unknown_kwargs = set(deprecated_kwargs.keys()) - self._VALID_DEPRECATED_KWARGS
@@ -582,6 +1086,8 @@ class SubAgentMiddleware(AgentMiddleware[Any, ContextT, ResponseT]):
                 stacklevel=2,
             )
 
+        self._scheduler = scheduler
+
         # Detect which API is being used
         using_new_api = backend is not None
         using_old_api = default_model is not None
@@ -607,7 +1113,15 @@ class SubAgentMiddleware(AgentMiddleware[Any, ContextT, ResponseT]):
             msg = "SubAgentMiddleware requires either `backend` (new API) or `default_model` (deprecated API)"
             raise ValueError(msg)
 
-        task_tool = _build_task_tool(subagent_specs, task_description)
+        task_tool = _build_task_tool(
+            subagent_specs,
+            task_description,
+            scheduler=scheduler,
+            backend=backend,
+            result_token_limit=result_token_limit,
+            result_cache=result_cache,
+            token_estimator=token_estimator,
+        )
 
         # Build system prompt with available agents
         if system_prompt and subagent_specs:
@@ -621,8 +1135,10 @@ class SubAgentMiddleware(AgentMiddleware[Any, ContextT, ResponseT]):
     def _get_subagents(self) -> list[_SubagentSpec]:
         """Create runnable agents from specs.
 
+        `SubAgent` specs are compiled lazily on their first `task` call.
+
         Returns:
-            List of subagent specs with name, description, and runnable.
+            List of subagent specs with name, description, and runnable or builder.
         """
         specs: list[_SubagentSpec] = []
 
@@ -630,7 +1146,15 @@ class SubAgentMiddleware(AgentMiddleware[Any, ContextT, ResponseT]):
             if "runnable" in spec:
                 # CompiledSubAgent - use as-is
                 compiled = cast("CompiledSubAgent", spec)
-                specs.append({"name": compiled["name"], "description": compiled["description"], "runnable": compiled["runnable"]})
+                specs.append(
+                    {
+                        "name": compiled["name"],
+                        "description": compiled["description"],
+                        "runnable": compiled["runnable"],
+                        "priority": compiled.get("priority", 0),
+                        "state_keys": compiled.get("state_keys"),
+                    }
+                )
                 continue
 
             # SubAgent - validate required fields
@@ -652,17 +1176,26 @@ class SubAgentMiddleware(AgentMiddleware[Any, ContextT, ResponseT]):
             interrupt_on = spec.get("interrupt_on")
             if interrupt_on:
                 middleware.append(HumanInTheLoopMiddleware(interrupt_on=interrupt_on))
-
+            if self._scheduler is not None and self._scheduler.rate_limits:
+                middleware.append(self._scheduler.rate_limit_middleware())
+
+            agent_kwargs: dict[str, Any] = {
+                "model": model,
+                "system_prompt": spec["system_prompt"],
+                "tools": spec["tools"],
+                "middleware": middleware,
+                "name": spec["name"],
+            }
             specs.append(
                 {
                     "name": spec["name"],
                     "description": spec["description"],
-                    "runnable": create_agent(
-                        model,
-                        system_prompt=spec["system_prompt"],
-                        tools=spec["tools"],
-                        middleware=middleware,
-                        name=spec["name"],
+                    "priority": spec.get("priority", 0),
+                    "state_keys": spec.get("state_keys"),
+                    "build": (
+                        functools.partial(_compile_subagent, fingerprint(agent_kwargs), agent_kwargs)
+                        if self._reuse_graphs
+                        else functools.partial(create_agent, **agent_kwargs)
                     ),
                 }
             )
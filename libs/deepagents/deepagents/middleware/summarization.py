@@ -56,6 +56,8 @@ from langgraph.config import get_config
 from langgraph.types import Command
 from typing_extensions import TypedDict
 
+from deepagents.tokens import CachedTokenEstimator, get_default_token_estimator, tool_schemas
+
 if TYPE_CHECKING:
     from collections.abc import Awaitable, Callable
 
@@ -174,6 +176,7 @@ class _DeepAgentsSummarizationMiddleware(AgentMiddleware):
         trim_tokens_to_summarize: int | None = _DEFAULT_TRIM_TOKEN_LIMIT,
         history_path_prefix: str = "/conversation_history",
         truncate_args_settings: TruncateArgsSettings | None = None,
+        token_estimator: CachedTokenEstimator | None = None,
         **deprecated_kwargs: Any,
     ) -> None:
         """Initialize summarization middleware with backend support.
@@ -205,6 +208,12 @@ class _DeepAgentsSummarizationMiddleware(AgentMiddleware):
                     # Truncate when 50% of context window reached, ignoring messages in last 10% of window
                     {"trigger": ("fraction", 0.5), "keep": ("fraction", 0.1), "max_length": 2000, "truncation_text": "...(truncated)"}
             history_path_prefix: Path prefix for storing conversation history.
+            token_estimator: Estimator used to count message tokens when `token_counter`
+                is left at its default.
+
+                Defaults to the process-wide estimator from
+                `deepagents.tokens.get_default_token_estimator()`. While that estimator
+                uses the built-in approximation, the model-aware approximate counter is kept.
 
         Example:
             ```python
@@ -219,6 +228,11 @@ class _DeepAgentsSummarizationMiddleware(AgentMiddleware):
             )
             ```
         """
+        if token_counter is count_tokens_approximately:
+            estimator = token_estimator or get_default_token_estimator()
+            if not estimator.is_approximate:
+                token_counter = estimator.count_messages
+
         # Initialize langchain helper for core summarization logic
         self._lc_helper = LCSummarizationMiddleware(
             model=model,
@@ -579,7 +593,7 @@ A condensed summary follows:
         """
         counted_messages = [system_message, *messages] if system_message is not None else messages
         try:
-            total_tokens = self.token_counter(counted_messages, tools=tools)  # ty: ignore[unknown-argument]
+            total_tokens = self.token_counter(counted_messages, tools=tool_schemas(tools))  # ty: ignore[unknown-argument]
         except TypeError:
             total_tokens = self.token_counter(counted_messages)
         if not self._should_truncate_args(messages, total_tokens):
@@ -800,7 +814,7 @@ A condensed summary follows:
         # Step 2: Check if summarization should happen
         counted_messages = [request.system_message, *truncated_messages] if request.system_message is not None else truncated_messages
         try:
-            total_tokens = self.token_counter(counted_messages, tools=request.tools)  # ty: ignore[unknown-argument]
+            total_tokens = self.token_counter(counted_messages, tools=tool_schemas(request.tools))  # ty: ignore[unknown-argument]
         except TypeError:
             total_tokens = self.token_counter(counted_messages)
         should_summarize = self._should_summarize(truncated_messages, total_tokens)
@@ -895,7 +909,7 @@ A condensed summary follows:
         # Step 2: Check if summarization should happen
         counted_messages = [request.system_message, *truncated_messages] if request.system_message is not None else truncated_messages
         try:
-            total_tokens = self.token_counter(counted_messages, tools=request.tools)  # ty: ignore[unknown-argument]
+            total_tokens = self.token_counter(counted_messages, tools=tool_schemas(request.tools))  # ty: ignore[unknown-argument]
         except TypeError:
             total_tokens = self.token_counter(counted_messages)
         should_summarize = self._should_summarize(truncated_messages, total_tokens)
@@ -0,0 +1,70 @@
+"""Memoized system prompt sections for middleware that injects prompt sections.
+
+Middleware such as `SkillsMiddleware` and `MemoryMiddleware` append a formatted
+section to the system message on every model call, although the section inputs
+(skills list, memory contents) rarely change between turns. `SystemPromptCache`
+keeps the formatted section so unchanged inputs skip re-formatting, and keeps the
+section text identical so provider-side prompt caching continues to hit.
+
+Appending the section to the system message is left to the caller: building a new
+`SystemMessage` costs about as much as validating a cached one would.
+"""
+
+import copy
+import threading
+from collections.abc import Callable
+from typing import Any
+
+_MISSING = object()
+
+
+class SystemPromptCache:
+    """Cache for a formatted system prompt section.
+
+    The section is rebuilt only when its inputs differ in value from a copy of the
+    previous inputs, so inputs mutated in place are detected.
+
+    Example:
+        ```python
+        cache = SystemPromptCache()
+        section = cache.section(skills, lambda: format_skills(skills))
+        system_message = append_to_system_message(request.system_message, section)
+        ```
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self._lock = threading.Lock()
+        self._section_inputs: Any = _MISSING
+        self._section_text = ""
+        self.section_builds = 0
+        """Number of times a section was formatted."""
+        self.hits = 0
+        """Number of sections served from the cache."""
+
+    def section(self, inputs: Any, build: Callable[[], str]) -> str:  # noqa: ANN401  # Inputs are compared, never inspected
+        """Return the formatted section for `inputs`, rebuilding only when they change.
+
+        Args:
+            inputs: Values the section is derived from. Compared by value with a copy
+                of the inputs the cached section was built from.
+            build: Formats the section from the current inputs.
+
+        Returns:
+            The formatted section text.
+        """
+        with self._lock:
+            previous = self._section_inputs
+            if previous is not _MISSING and previous == inputs:
+                self.hits += 1
+                return self._section_text
+        text = build()
+        snapshot = copy.deepcopy(inputs)
+        with self._lock:
+            self._section_inputs = snapshot
+            self._section_text = text
+            self.section_builds += 1
+        return text
+
+
+__all__ = ["SystemPromptCache"]
@@ -0,0 +1,248 @@
+"""Per-tool latency and result size tracing.
+
+`FilesystemMiddleware` traces every tool call it wraps, including the `task` tool
+of `SubAgentMiddleware`. For each call it records:
+
+- `duration`: wall-clock seconds spent in the tool and the middleware around it.
+- `backend_duration`: seconds spent in backend operations made for the call.
+    `overhead` is the rest.
+- `result_chars` and `result_tokens`: size of the result the tool produced.
+- `context_tokens`: estimated tokens the result adds to the conversation, after eviction.
+- `evicted`: whether the result was written to the backend and replaced with a preview.
+
+Each call is emitted as a `tool_trace` custom stream event, stored in the
+`response_metadata["tool_trace"]` of its `ToolMessage`, and added to the per-tool
+totals in the `tool_stats` state key before the next model call:
+
+```python
+for chunk in agent.stream({"messages": [...]}, stream_mode="custom"):
+    if chunk.get("type") == "tool_trace":
+        print(chunk["tool"], chunk["duration"], chunk["result_tokens"])
+
+stats = agent.get_state(config).values.get("tool_stats", {})
+```
+"""
+
+import time
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from langchain_core.messages import AnyMessage, ToolMessage
+from langgraph.types import Command
+from typing_extensions import TypedDict
+
+from deepagents.backends.instrumented import BackendOperation, InstrumentedBackend, MetricsSink, instrument
+from deepagents.backends.protocol import BackendProtocol
+
+TOOL_TRACE_KEY = "tool_trace"
+"""`response_metadata` key and custom stream event type of tool traces."""
+
+
+class ToolStats(TypedDict):
+    """Cumulative tracing totals for one tool in a thread."""
+
+    calls: int
+    """Number of traced calls."""
+
+    errors: int
+    """Calls whose `ToolMessage` has an error status."""
+
+    evictions: int
+    """Calls whose result was evicted to the backend."""
+
+    duration: float
+    """Total wall-clock seconds."""
+
+    backend_duration: float
+    """Total seconds spent in backend operations."""
+
+    result_chars: int
+    """Total characters of the results the tool produced."""
+
+    result_tokens: int
+    """Total estimated tokens of the results the tool produced."""
+
+    context_tokens: int
+    """Total estimated tokens added to the conversation, after eviction."""
+
+
+def _tool_stats_reducer(left: dict[str, ToolStats] | None, right: dict[str, ToolStats]) -> dict[str, ToolStats]:
+    """Add per-tool totals to the running totals."""
+    result = dict(left or {})
+    for tool, stats in right.items():
+        existing = result.get(tool)
+        result[tool] = stats if existing is None else ToolStats(**{key: existing[key] + stats[key] for key in ToolStats.__annotations__})  # ty: ignore[invalid-argument-type]
+    return result
+
+
+@dataclass
+class ToolTrace:
+    """A tool call being traced.
+
+    Tools can annotate the active trace through `current_trace`.
+
+    Attributes:
+        tool: Tool name.
+        tool_call_id: ID of the tool call.
+        start: `time.perf_counter()` value when the call started.
+        backend_duration: Seconds spent in backend operations so far.
+        evicted: Whether the result was evicted to the backend.
+        result: Full result text, for tools that already shortened their `ToolMessage`.
+            Defaults to the content of the `ToolMessage` the tool returned.
+        extra: Additional fields added to the stream event.
+    """
+
+    tool: str
+    tool_call_id: str | None
+    start: float = field(default_factory=time.perf_counter)
+    backend_duration: float = 0.0
+    evicted: bool = False
+    result: str | None = None
+    extra: dict[str, Any] = field(default_factory=dict)
+
+
+_current_trace: ContextVar[ToolTrace | None] = ContextVar("deepagents_tool_trace", default=None)
+
+
+def current_trace() -> ToolTrace | None:
+    """Return the trace of the tool call running in this context, if any."""
+    return _current_trace.get()
+
+
+@contextmanager
+def trace_tool_call(tool: str, tool_call_id: str | None) -> Iterator[ToolTrace]:
+    """Make a new trace the active trace for the duration of the block."""
+    trace = ToolTrace(tool=tool, tool_call_id=tool_call_id)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+class _BackendTimer(MetricsSink):
+    """Add the duration of backend operations to the active trace."""
+
+    def record(self, event: BackendOperation) -> None:
+        """Add the operation's duration to the active trace."""
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.backend_duration += event.duration
+
+
+_BACKEND_TIMER = _BackendTimer()
+
+
+def traced_backend(backend: BackendProtocol) -> BackendProtocol:
+    """Return `backend` timed into the active trace, or unchanged when no call is traced."""
+    if _current_trace.get() is None or isinstance(backend, InstrumentedBackend):
+        return backend
+    return instrument(backend, sinks=[_BACKEND_TIMER])
+
+
+def _content_text(message: ToolMessage) -> str:
+    content = message.content
+    if isinstance(content, list) and len(content) == 1 and isinstance(content[0], dict) and content[0].get("type") == "text":
+        return str(content[0].get("text", ""))
+    return content if isinstance(content, str) else str(content)
+
+
+def _tool_messages(result: ToolMessage | Command, tool_call_id: str | None) -> list[ToolMessage]:
+    if isinstance(result, ToolMessage):
+        return [result]
+    update = result.update if isinstance(result.update, dict) else {}
+    messages = [message for message in update.get("messages", []) if isinstance(message, ToolMessage)]
+    return [message for message in messages if message.tool_call_id == tool_call_id] or messages
+
+
+def finish_trace(
+    trace: ToolTrace,
+    raw_result: ToolMessage | Command,
+    result: ToolMessage | Command,
+    token_estimator: Callable[[str], int],
+    stream_writer: Callable[[Any], None] | None,
+) -> dict[str, Any]:
+    """Complete a trace, emit it and attach it to the result's `ToolMessage`.
+
+    Args:
+        trace: The trace to complete.
+        raw_result: What the tool returned.
+        result: What is returned to the agent, after any eviction.
+        token_estimator: Estimator used for token counts.
+        stream_writer: Custom stream writer the `tool_trace` event is sent to, if any.
+
+    Returns:
+        The trace as a JSON-serializable dict.
+    """
+    duration = time.perf_counter() - trace.start
+    raw_messages = _tool_messages(raw_result, trace.tool_call_id)
+    messages = _tool_messages(result, trace.tool_call_id)
+    result_text = trace.result if trace.result is not None else "".join(_content_text(message) for message in raw_messages)
+    backend_duration = min(trace.backend_duration, duration)
+    event = {
+        "tool": trace.tool,
+        "tool_call_id": trace.tool_call_id,
+        "duration": duration,
+        "backend_duration": backend_duration,
+        "overhead": duration - backend_duration,
+        "result_chars": len(result_text),
+        "result_tokens": token_estimator(result_text),
+        "context_tokens": sum(token_estimator(_content_text(message)) for message in messages),
+        "evicted": trace.evicted,
+        "error": any(message.status == "error" for message in messages),
+        **trace.extra,
+    }
+    for message in messages:
+        message.response_metadata[TOOL_TRACE_KEY] = event
+    if stream_writer is not None:
+        stream_writer({"type": TOOL_TRACE_KEY, **event})
+    return event
+
+
+def tool_stats_update(messages: Sequence[AnyMessage]) -> dict[str, ToolStats] | None:
+    """Sum the traces of the tool results added since the last model call.
+
+    Only the trailing run of tool messages is counted. Any other message ends it,
+    so results left at the end of a turn are not counted again once the next turn
+    appends its human message.
+
+    Args:
+        messages: Conversation messages.
+
+    Returns:
+        Per-tool totals of the new traces, or None if there are none.
+    """
+    totals: dict[str, ToolStats] = {}
+    for message in reversed(messages):
+        if not isinstance(message, ToolMessage):
+            break
+        trace = message.response_metadata.get(TOOL_TRACE_KEY)
+        if not trace:
+            continue
+        call = ToolStats(
+            calls=1,
+            errors=int(trace["error"]),
+            evictions=int(trace["evicted"]),
+            duration=trace["duration"],
+            backend_duration=trace["backend_duration"],
+            result_chars=trace["result_chars"],
+            result_tokens=trace["result_tokens"],
+            context_tokens=trace["context_tokens"],
+        )
+        totals = _tool_stats_reducer(totals, {trace["tool"]: call})
+    return totals or None
+
+
+__all__ = [
+    "TOOL_TRACE_KEY",
+    "ToolStats",
+    "ToolTrace",
+    "current_trace",
+    "finish_trace",
+    "tool_stats_update",
+    "trace_tool_call",
+    "traced_backend",
+]
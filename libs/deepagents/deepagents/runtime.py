@@ -0,0 +1,474 @@
+"""Serve many tenants and threads from one compiled deep agent.
+
+`DeepAgentRuntime` compiles a single graph and runs requests for any number of
+tenants and threads concurrently on one asyncio event loop:
+
+- Thread state is kept by the checkpointer under a tenant-scoped thread ID, so
+    tenants never see each other's conversations.
+- Backends are resolved per request: the graph's `BackendFactory` looks up the
+    tenant of the running request and returns that tenant's backend from a pool, so
+    expensive backends (sandboxes, remote stores) are connected once per tenant and
+    reused across requests. A tenant's backend is created in a worker thread before
+    its first request starts, so a slow `tenant_backend` never blocks the event loop
+    or other tenants.
+- `max_concurrency` bounds the requests running at once; further requests wait in
+    priority order. `TenantQuota` rejects requests over a tenant's concurrency or
+    rate limit with `QuotaExceededError`.
+
+```python
+from deepagents.backends import FilesystemBackend
+from deepagents.runtime import DeepAgentRuntime, TenantQuota
+
+runtime = DeepAgentRuntime(
+    model="anthropic:claude-sonnet-4-5-20250929",
+    tenant_backend=lambda tenant: FilesystemBackend(root_dir=f"/srv/workspaces/{tenant}", virtual_mode=True),
+    max_concurrency=64,
+    default_quota=TenantQuota(max_concurrent_requests=4, requests_per_minute=60),
+)
+
+result = await runtime.ainvoke("acme", "thread-1", {"messages": [{"role": "user", "content": "hi"}]})
+```
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterator, Callable, Mapping
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.config import get_config
+
+from deepagents.backends.protocol import BackendFactory, BackendProtocol
+from deepagents.graph import create_deep_agent
+from deepagents.middleware.subagent_scheduler import SubAgentScheduler
+
+if TYPE_CHECKING:
+    from langchain.tools import ToolRuntime
+    from langgraph.graph.state import CompiledStateGraph
+    from langgraph.types import Checkpointer
+
+logger = logging.getLogger(__name__)
+
+TENANT_CONFIG_KEY = "tenant_id"
+"""`configurable` key holding the tenant of a request."""
+
+TenantBackend = Callable[[str], BackendProtocol | BackendFactory]
+"""Return the backend (or per-call backend factory) of a tenant."""
+
+
+class QuotaExceededError(RuntimeError):
+    """A request was rejected because its tenant is over quota."""
+
+    def __init__(self, tenant_id: str, reason: str) -> None:
+        """Initialize the error.
+
+        Args:
+            tenant_id: Tenant whose request was rejected.
+            reason: Which quota was exceeded.
+        """
+        super().__init__(f"Tenant {tenant_id!r} is over quota: {reason}")
+        self.tenant_id = tenant_id
+        self.reason = reason
+
+
+@dataclass(frozen=True)
+class TenantQuota:
+    """Limits applied to the requests of one tenant.
+
+    Attributes:
+        max_concurrent_requests: Requests the tenant may have running or waiting at once.
+            `None` means unbounded.
+        requests_per_minute: Requests the tenant may start in any 60 second window.
+            `None` means unbounded.
+    """
+
+    max_concurrent_requests: int | None = None
+    requests_per_minute: int | None = None
+
+
+_RATE_WINDOW = 60.0
+"""Seconds covered by `TenantQuota.requests_per_minute`."""
+
+
+@dataclass
+class _TenantUsage:
+    active: int = 0
+    starts: deque[float] = field(default_factory=deque)
+
+
+def _expire_starts(usage: _TenantUsage, now: float) -> None:
+    while usage.starts and now - usage.starts[0] >= _RATE_WINDOW:
+        usage.starts.popleft()
+
+
+@dataclass(frozen=True)
+class RuntimeStats:
+    """Counters of a `DeepAgentRuntime`.
+
+    Attributes:
+        running: Requests currently running.
+        waiting: Requests waiting for a free slot.
+        completed: Requests that finished successfully.
+        failed: Requests that raised.
+        rejected: Requests rejected by a tenant quota.
+        pooled_backends: Tenant backends currently pooled.
+        active_by_tenant: Running and waiting requests per tenant.
+    """
+
+    running: int
+    waiting: int
+    completed: int
+    failed: int
+    rejected: int
+    pooled_backends: int
+    active_by_tenant: dict[str, int]
+
+
+class _PoolEntry:
+    __slots__ = ("backend", "closing", "leases", "lock")
+
+    def __init__(self) -> None:
+        self.backend: BackendProtocol | BackendFactory | None = None
+        self.leases = 0
+        self.closing = False
+        """Set by `clear` while leases are held: the entry is dropped when its last lease is released."""
+        self.lock = threading.Lock()
+        """Held while the tenant's backend is created."""
+
+
+class _BackendPool:
+    """Per-tenant backends, created on first use and kept while idle up to `max_size`.
+
+    Backends of tenants with running requests are never evicted. Evicted backends
+    with a `close()` method are closed. `clear` closes idle backends at once and
+    the backends of running requests when their last lease is released.
+    """
+
+    def __init__(self, factory: TenantBackend, max_size: int) -> None:
+        self._factory = factory
+        self._max_size = max_size
+        self._entries: OrderedDict[str, _PoolEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(1 for entry in self._entries.values() if entry.backend is not None)
+
+    def acquire(self, tenant_id: str) -> None:
+        with self._lock:
+            entry = self._entries.setdefault(tenant_id, _PoolEntry())
+            entry.leases += 1
+            self._entries.move_to_end(tenant_id)
+
+    def release(self, tenant_id: str) -> None:
+        with self._lock:
+            entry = self._entries.get(tenant_id)
+            evicted = []
+            if entry is not None:
+                entry.leases -= 1
+                if entry.leases == 0 and entry.closing:
+                    del self._entries[tenant_id]
+                    if entry.backend is not None:
+                        evicted.append(entry.backend)
+            evicted.extend(self._evict())
+        for backend in evicted:
+            _close(backend)
+
+    def get(self, tenant_id: str) -> BackendProtocol | BackendFactory:
+        with self._lock:
+            entry = self._entries.get(tenant_id)
+            if entry is None:
+                msg = f"No request of tenant {tenant_id!r} is running"
+                raise RuntimeError(msg)
+            if entry.backend is not None:
+                return entry.backend
+        # Created under the tenant's own lock, so a slow factory only delays requests of
+        # that tenant while concurrent tool calls of the tenant still share one backend.
+        # The caller holds a lease, so the entry is not evicted meanwhile.
+        with entry.lock:
+            if entry.backend is None:
+                entry.backend = self._factory(tenant_id)
+            return entry.backend
+
+    async def aget(self, tenant_id: str) -> BackendProtocol | BackendFactory:
+        with self._lock:
+            entry = self._entries.get(tenant_id)
+            if entry is not None and entry.backend is not None:
+                return entry.backend
+        return await asyncio.to_thread(self.get, tenant_id)
+
+    def _evict(self) -> list[BackendProtocol | BackendFactory]:
+        evicted = []
+        excess = len(self._entries) - self._max_size
+        for tenant_id, entry in list(self._entries.items()):
+            if excess <= 0:
+                break
+            if entry.leases == 0:
+                del self._entries[tenant_id]
+                excess -= 1
+                if entry.backend is not None:
+                    evicted.append(entry.backend)
+        return evicted
+
+    def clear(self) -> list[BackendProtocol | BackendFactory]:
+        """Drop all entries and return the idle backends to close.
+
+        Entries with leases are kept until their last lease is released, so running
+        requests finish on their backend.
+        """
+        with self._lock:
+            backends = []
+            for tenant_id, entry in list(self._entries.items()):
+                if entry.leases:
+                    entry.closing = True
+                    continue
+                del self._entries[tenant_id]
+                if entry.backend is not None:
+                    backends.append(entry.backend)
+        return backends
+
+
+def _thread_key(tenant_id: str, thread_id: str) -> str:
+    """Checkpointer thread ID of a tenant's thread, unambiguous for any tenant and thread IDs."""
+    return json.dumps([tenant_id, thread_id])
+
+
+def _close(backend: object) -> None:
+    close = getattr(backend, "close", None)
+    if not callable(close):
+        return
+    try:
+        close()
+    except Exception:
+        logger.warning("Failed to close pooled backend %r", backend, exc_info=True)
+
+
+class DeepAgentRuntime:
+    """Host one compiled deep agent and run requests for many tenants and threads.
+
+    Args:
+        tenant_backend: Return the backend of a tenant: a backend instance, pooled
+            and reused by all requests of the tenant, or a `BackendFactory` called for
+            every tool call (e.g. a `StoreBackend` with a tenant namespace). Defaults to
+            `StateBackend`, which keeps files in thread state.
+        checkpointer: Checkpointer holding thread state. Defaults to an `InMemorySaver`.
+        max_concurrency: Maximum requests running at once. Further requests wait and
+            start in priority order. `None` means unbounded.
+        default_quota: Quota applied to tenants without an entry in `quotas`.
+        quotas: Per-tenant quotas.
+        max_pooled_backends: Idle tenant backends kept in the pool.
+        **agent_kwargs: Passed to `create_deep_agent` (model, tools, subagents, ...).
+    """
+
+    def __init__(
+        self,
+        *,
+        tenant_backend: TenantBackend | None = None,
+        checkpointer: "Checkpointer | None" = None,
+        max_concurrency: int | None = None,
+        default_quota: TenantQuota | None = None,
+        quotas: Mapping[str, TenantQuota] | None = None,
+        max_pooled_backends: int = 128,
+        **agent_kwargs: Any,
+    ) -> None:
+        """Initialize the runtime and compile its graph."""
+        if "backend" in agent_kwargs:
+            msg = "Pass tenant_backend instead of backend: backends are resolved per tenant"
+            raise TypeError(msg)
+        self._pool = _BackendPool(tenant_backend, max_pooled_backends) if tenant_backend is not None else None
+        self._scheduler = SubAgentScheduler(max_concurrency=max_concurrency)
+        self.default_quota = default_quota or TenantQuota()
+        self.quotas: dict[str, TenantQuota] = dict(quotas or {})
+        self._usage: dict[str, _TenantUsage] = {}
+        self._usage_pruned_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        start = time.perf_counter()
+        self.graph: CompiledStateGraph = create_deep_agent(
+            backend=self._resolve_backend if self._pool is not None else None,
+            checkpointer=checkpointer if checkpointer is not None else InMemorySaver(),
+            **agent_kwargs,
+        )
+        logger.debug("Compiled runtime graph in %.1f ms", (time.perf_counter() - start) * 1000)
+
+    def _resolve_backend(self, runtime: "ToolRuntime") -> BackendProtocol:
+        """`BackendFactory` of the graph: return the pooled backend of the request's tenant."""
+        # Middleware hooks pass a `Runtime` without config, so read it from the run context
+        config = getattr(runtime, "config", None) or get_config()
+        tenant_id = config.get("configurable", {}).get(TENANT_CONFIG_KEY)
+        if tenant_id is None:
+            msg = "Runtime graphs must be invoked through DeepAgentRuntime, which sets the tenant of each request"
+            raise RuntimeError(msg)
+        backend = self._pool.get(tenant_id)  # ty: ignore[possibly-missing-attribute]
+        return backend(runtime) if callable(backend) else backend
+
+    def stats(self) -> RuntimeStats:
+        """Return request counters and pool size."""
+        with self._lock:
+            return RuntimeStats(
+                running=self._scheduler.running,
+                waiting=self._scheduler.queued,
+                completed=self._completed,
+                failed=self._failed,
+                rejected=self._rejected,
+                pooled_backends=len(self._pool) if self._pool is not None else 0,
+                active_by_tenant={tenant: usage.active for tenant, usage in self._usage.items() if usage.active},
+            )
+
+    def _admit(self, tenant_id: str) -> None:
+        """Count a new request against its tenant's quota, or raise `QuotaExceededError`."""
+        quota = self.quotas.get(tenant_id, self.default_quota)
+        now = time.monotonic()
+        with self._lock:
+            if now - self._usage_pruned_at >= _RATE_WINDOW:
+                self._prune_usage(now)
+            usage = self._usage.setdefault(tenant_id, _TenantUsage())
+            _expire_starts(usage, now)
+            reason = None
+            if quota.max_concurrent_requests is not None and usage.active >= quota.max_concurrent_requests:
+                reason = f"{usage.active} of {quota.max_concurrent_requests} concurrent requests in use"
+            elif quota.requests_per_minute is not None and len(usage.starts) >= quota.requests_per_minute:
+                reason = f"{quota.requests_per_minute} requests per minute"
+            if reason is not None:
+                self._rejected += 1
+                raise QuotaExceededError(tenant_id, reason)
+            usage.active += 1
+            if quota.requests_per_minute is not None:
+                usage.starts.append(now)
+
+    def _prune_usage(self, now: float) -> None:
+        """Drop the usage of tenants with no active requests and no starts in the rate window."""
+        for tenant_id, usage in list(self._usage.items()):
+            _expire_starts(usage, now)
+            if not usage.active and not usage.starts:
+                del self._usage[tenant_id]
+        self._usage_pruned_at = now
+
+    @asynccontextmanager
+    async def _request(self, tenant_id: str, thread_id: str, config: dict[str, Any] | None, priority: int) -> AsyncIterator[dict[str, Any]]:
+        """Admit a request, wait for a slot and yield its config."""
+        self._admit(tenant_id)
+        if self._pool is not None:
+            self._pool.acquire(tenant_id)
+        try:
+            async with self._scheduler.aslot(priority=priority):
+                config = dict(config or {})
+                config["configurable"] = {
+                    **config.get("configurable", {}),
+                    "thread_id": _thread_key(tenant_id, thread_id),
+                    TENANT_CONFIG_KEY: tenant_id,
+                }
+                try:
+                    if self._pool is not None:
+                        # Tool calls then find the backend ready instead of creating it on the event loop
+                        await self._pool.aget(tenant_id)
+                    yield config
+                except BaseException:
+                    with self._lock:
+                        self._failed += 1
+                    raise
+                with self._lock:
+                    self._completed += 1
+        finally:
+            if self._pool is not None:
+                self._pool.release(tenant_id)
+            with self._lock:
+                usage = self._usage[tenant_id]
+                usage.active -= 1
+                if not usage.active and not usage.starts:
+                    del self._usage[tenant_id]
+
+    async def ainvoke(
+        self,
+        tenant_id: str,
+        thread_id: str,
+        input: dict[str, Any] | None,  # noqa: A002  # Matches `Runnable.ainvoke`
+        *,
+        config: dict[str, Any] | None = None,
+        priority: int = 0,
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        """Run one request on a tenant's thread and return the final state.
+
+        Args:
+            tenant_id: Tenant making the request.
+            thread_id: Conversation thread, scoped to the tenant.
+            input: Graph input, e.g. `{"messages": [...]}`. `None` resumes the thread.
+            config: Extra run config. `thread_id` and the tenant are set by the runtime.
+            priority: Start priority while waiting for a slot. Higher values start first.
+            **kwargs: Passed to `ainvoke` of the graph (e.g. `context`).
+
+        Returns:
+            The final thread state.
+
+        Raises:
+            QuotaExceededError: If the tenant is over its quota.
+        """
+        async with self._request(tenant_id, thread_id, config, priority) as run_config:
+            return await self.graph.ainvoke(input, run_config, **kwargs)
+
+    async def astream(
+        self,
+        tenant_id: str,
+        thread_id: str,
+        input: dict[str, Any] | None,  # noqa: A002  # Matches `Runnable.astream`
+        *,
+        config: dict[str, Any] | None = None,
+        priority: int = 0,
+        **kwargs: Any,
+    ) -> AsyncIterator[Any]:
+        """Run one request on a tenant's thread and stream its output.
+
+        The request holds its slot until the stream is exhausted or closed.
+
+        Args:
+            tenant_id: Tenant making the request.
+            thread_id: Conversation thread, scoped to the tenant.
+            input: Graph input, e.g. `{"messages": [...]}`. `None` resumes the thread.
+            config: Extra run config. `thread_id` and the tenant are set by the runtime.
+            priority: Start priority while waiting for a slot. Higher values start first.
+            **kwargs: Passed to `astream` of the graph (e.g. `stream_mode`).
+
+        Yields:
+            Stream chunks of the graph.
+
+        Raises:
+            QuotaExceededError: If the tenant is over its quota.
+        """
+        async with self._request(tenant_id, thread_id, config, priority) as run_config:
+            async for chunk in self.graph.astream(input, run_config, **kwargs):
+                yield chunk
+
+    async def aget_state(self, tenant_id: str, thread_id: str) -> dict[str, Any]:
+        """Return the current state values of a tenant's thread."""
+        config = {"configurable": {"thread_id": _thread_key(tenant_id, thread_id), TENANT_CONFIG_KEY: tenant_id}}
+        snapshot = await self.graph.aget_state(config)
+        return snapshot.values
+
+    async def aclose(self) -> None:
+        """Close all pooled backends.
+
+        Backends of running requests are closed when those requests finish.
+        """
+        if self._pool is None:
+            return
+        for backend in self._pool.clear():
+            await asyncio.to_thread(_close, backend)
+
+
+__all__ = [
+    "TENANT_CONFIG_KEY",
+    "DeepAgentRuntime",
+    "QuotaExceededError",
+    "RuntimeStats",
+    "TenantBackend",
+    "TenantQuota",
+]
@@ -0,0 +1,275 @@
+"""Token estimation shared by tool result eviction, truncation, and summarization.
+
+By default tokens are approximated from the character count (4 characters per token).
+Code and JSON tokenize quite differently from prose, so a real tokenizer can be plugged in:
+
+```python
+import tiktoken
+
+from deepagents.tokens import CachedTokenEstimator, set_default_token_estimator
+
+encoding = tiktoken.get_encoding("o200k_base")
+set_default_token_estimator(CachedTokenEstimator(lambda text: len(encoding.encode(text))))
+```
+
+The default estimator is picked up by `FilesystemMiddleware`, `truncate_if_too_long`, and
+`SummarizationMiddleware`. Each of them also accepts an explicit `token_estimator`.
+"""
+
+import contextlib
+import json
+import math
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Sequence
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from langchain_core.messages import BaseMessage
+    from langchain_core.tools import BaseTool
+
+NUM_CHARS_PER_TOKEN = 4
+"""Approximate number of characters per token used by the default estimator."""
+
+_DEFAULT_EXTRA_TOKENS_PER_MESSAGE = 3
+
+
+def approximate_token_count(text: str) -> int:
+    """Approximate the number of tokens in `text` from its length.
+
+    Uses 4 characters per token, rounded up, which errs on the high side for prose.
+
+    Args:
+        text: Text to estimate.
+
+    Returns:
+        Estimated token count.
+    """
+    return -(-len(text) // NUM_CHARS_PER_TOKEN)
+
+
+class CachedTokenEstimator:
+    """Token estimator with an LRU cache and sampled estimates for very large strings.
+
+    Tool results and conversation messages are measured repeatedly across turns, so counts
+    are cached by content. Strings longer than `sample_threshold` characters are estimated
+    by tokenizing evenly spaced windows and extrapolating, which bounds the cost of a
+    tokenizer call regardless of input size.
+
+    Args:
+        count_tokens: Function returning the number of tokens in a string.
+
+            Defaults to `approximate_token_count` (4 characters per token). The default
+            is cheap enough that results are neither cached nor sampled.
+        max_cache_entries: Maximum number of cached counts.
+        sample_threshold: Strings longer than this many characters are estimated by sampling.
+
+            Set to `None` to always count the full string.
+        sample_count: Number of windows tokenized in sampled mode.
+        sample_length: Number of characters in each sampled window.
+    """
+
+    def __init__(
+        self,
+        count_tokens: Callable[[str], int] = approximate_token_count,
+        *,
+        max_cache_entries: int = 4096,
+        sample_threshold: int | None = 200_000,
+        sample_count: int = 16,
+        sample_length: int = 2048,
+    ) -> None:
+        """Initialize the estimator."""
+        if sample_count <= 0 or sample_length <= 0:
+            msg = f"sample_count and sample_length must be positive, got {sample_count} and {sample_length}"
+            raise ValueError(msg)
+        self._count_tokens = count_tokens
+        self._max_cache_entries = max_cache_entries
+        self._sample_threshold = sample_threshold
+        self._sample_count = sample_count
+        self._sample_length = sample_length
+        self._cache: OrderedDict[tuple[int, int], int] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        """Number of counts served from the cache."""
+        self.misses = 0
+        """Number of counts computed by calling the tokenizer."""
+
+    @property
+    def is_approximate(self) -> bool:
+        """Whether this estimator uses the built-in character-based approximation."""
+        return self._count_tokens is approximate_token_count
+
+    def __call__(self, text: str) -> int:
+        """Estimate the number of tokens in `text`.
+
+        Args:
+            text: Text to estimate.
+
+        Returns:
+            Estimated token count.
+        """
+        if self.is_approximate:
+            return approximate_token_count(text)
+
+        key = (len(text), hash(text))
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+
+        sampled = self._sample_threshold is not None and len(text) > self._sample_threshold
+        count = self._sampled_count(text) if sampled else self._count_tokens(text)
+
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = count
+            if len(self._cache) > self._max_cache_entries:
+                self._cache.popitem(last=False)
+        return count
+
+    def _sampled_count(self, text: str) -> int:
+        """Estimate tokens by tokenizing evenly spaced windows of `text`."""
+        stride = len(text) // self._sample_count
+        sampled_chars = 0
+        sampled_tokens = 0
+        for i in range(self._sample_count):
+            window = text[i * stride : i * stride + self._sample_length]
+            sampled_chars += len(window)
+            sampled_tokens += self._count_tokens(window)
+        return math.ceil(sampled_tokens * len(text) / sampled_chars)
+
+    def max_chars(self, text: str, token_limit: int) -> int:
+        """Return how many leading characters of `text` fit within `token_limit` tokens.
+
+        Assumes tokens are spread evenly across the string.
+
+        Args:
+            text: Text that may need truncating.
+            token_limit: Maximum number of tokens.
+
+        Returns:
+            Number of characters to keep.
+        """
+        if self.is_approximate:
+            return min(len(text), token_limit * NUM_CHARS_PER_TOKEN)
+        tokens = self(text)
+        if tokens <= token_limit:
+            return len(text)
+        return len(text) * token_limit // tokens
+
+    def count_messages(
+        self,
+        messages: "Iterable[BaseMessage]",
+        *,
+        tools: "Sequence[BaseTool | dict[str, Any]] | None" = None,
+    ) -> int:
+        """Count tokens across messages, usable as a summarization `token_counter`.
+
+        Args:
+            messages: Messages to count.
+            tools: Optional tool definitions bound to the model.
+
+        Returns:
+            Estimated token count.
+        """
+        # Deferred so backends can use the estimator without loading LangChain
+        from langchain_core.messages import AIMessage, convert_to_messages  # noqa: PLC0415
+        from langchain_core.messages.utils import count_tokens_approximately  # noqa: PLC0415
+
+        if self.is_approximate:
+            return count_tokens_approximately(messages, tools=tool_schemas(tools))
+
+        total = 0
+        for message in convert_to_messages(messages):
+            content = message.content if isinstance(message.content, str) else json.dumps(message.content, default=str)
+            total += self(content) + _DEFAULT_EXTRA_TOKENS_PER_MESSAGE
+            if isinstance(message, AIMessage) and message.tool_calls:
+                total += self(json.dumps(message.tool_calls, default=str))
+            if message.name:
+                total += self(message.name)
+        if tools:
+            total += self(json.dumps(tool_schemas(tools), default=str))
+        return total
+
+
+_TOOL_SCHEMAS: dict[int, tuple[weakref.ref[Any], dict[str, Any]]] = {}
+"""OpenAI-format schemas keyed by `id(tool)`. An entry is dropped when its tool is garbage collected."""
+
+
+def _forget_tool(key: int) -> Callable[[weakref.ref[Any]], None]:
+    def forget(ref: weakref.ref[Any]) -> None:
+        entry = _TOOL_SCHEMAS.get(key)
+        # The id may already belong to a newer tool
+        if entry is not None and entry[0] is ref:
+            _TOOL_SCHEMAS.pop(key, None)
+
+    return forget
+
+
+def tool_schemas(tools: "Sequence[BaseTool | dict[str, Any]] | None") -> list[dict[str, Any]] | None:
+    """Return `tools` in OpenAI tool format, converting each tool object only once.
+
+    Converting a `BaseTool` rebuilds its pydantic argument schema, which costs far more
+    than counting the tokens of a conversation. Token counters get the tools of every
+    model call, so conversions are cached by tool identity for as long as the tool is
+    alive. Tools are held by weak reference, so the cache never keeps one alive.
+
+    Args:
+        tools: Tools bound to the model, as objects or already-converted dicts.
+
+    Returns:
+        The tool schemas, or None if `tools` is None.
+    """
+    if tools is None:
+        return None
+    from langchain_core.utils.function_calling import convert_to_openai_tool  # noqa: PLC0415
+
+    schemas = []
+    for tool in tools:
+        if isinstance(tool, dict):
+            schemas.append(tool)
+            continue
+        key = id(tool)
+        cached = _TOOL_SCHEMAS.get(key)
+        if cached is not None and cached[0]() is tool:
+            schemas.append(cached[1])
+            continue
+        schema = convert_to_openai_tool(tool)
+        # Tools that are not weakly referenceable are converted on every call
+        with contextlib.suppress(TypeError):
+            _TOOL_SCHEMAS[key] = (weakref.ref(tool, _forget_tool(key)), schema)
+        schemas.append(schema)
+    return schemas
+
+
+_default_token_estimator = CachedTokenEstimator()
+
+
+def get_default_token_estimator() -> CachedTokenEstimator:
+    """Return the process-wide default token estimator."""
+    return _default_token_estimator
+
+
+def set_default_token_estimator(estimator: CachedTokenEstimator) -> None:
+    """Replace the process-wide default token estimator.
+
+    Middleware resolves the default when it is constructed, so set it before building agents.
+
+    Args:
+        estimator: Estimator to use wherever no explicit `token_estimator` is given.
+    """
+    global _default_token_estimator  # noqa: PLW0603
+    _default_token_estimator = estimator
+
+
+__all__ = [
+    "NUM_CHARS_PER_TOKEN",
+    "CachedTokenEstimator",
+    "approximate_token_count",
+    "get_default_token_estimator",
+    "set_default_token_estimator",
+    "tool_schemas",
+]
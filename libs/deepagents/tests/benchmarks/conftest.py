@@ -0,0 +1,78 @@
+"""Shared fixtures for benchmarks.
+
+Benchmarks report their measurements through the `benchmark_results` fixture.
+Every result is printed (visible with `-s`). When `DEEPAGENTS_BENCHMARK_RESULTS`
+is set, the results of the session are also written there as JSON, so runs can be
+compared over time::
+
+    DEEPAGENTS_BENCHMARK_RESULTS=results.json make benchmark
+
+The file holds one document per run::
+
+    {
+        "timestamp": "2026-01-01T00:00:00+00:00",
+        "python": "3.12.1",
+        "platform": "Linux-6.8.0-x86_64",
+        "deepagents": "0.4.1",
+        "results": [{"benchmark": "agent_turns", "metric": "turns_per_second", "value": 812.4, "unit": "1/s", "params": {"tool_rounds": 3}}],
+    }
+"""
+
+import json
+import os
+import platform
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+RESULTS_ENV = "DEEPAGENTS_BENCHMARK_RESULTS"
+
+
+class BenchmarkResults:
+    """Collects benchmark measurements for a test session."""
+
+    def __init__(self) -> None:
+        """Initialize an empty result set."""
+        self.results: list[dict[str, Any]] = []
+
+    def record(self, benchmark: str, metric: str, value: float, unit: str, **params: Any) -> None:
+        """Record and print one measurement.
+
+        Args:
+            benchmark: Benchmark name.
+            metric: Name of the measured quantity.
+            value: Measured value.
+            unit: Unit of `value`.
+            **params: Parameters the measurement was taken with.
+        """
+        self.results.append({"benchmark": benchmark, "metric": metric, "value": value, "unit": unit, "params": params})
+        details = ", ".join(f"{key}={value}" for key, value in params.items())
+        print(f"\n{benchmark} {metric}: {value:,.3f} {unit}" + (f" ({details})" if details else ""))  # noqa: T201  # Reported with `-s`
+
+    def document(self) -> dict[str, Any]:
+        """Return the results with run metadata."""
+        try:
+            package_version = version("deepagents")
+        except PackageNotFoundError:
+            package_version = None
+        return {
+            "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "deepagents": package_version,
+            "results": self.results,
+        }
+
+
+@pytest.fixture(scope="session")
+def benchmark_results() -> Iterator[BenchmarkResults]:
+    """Session-wide benchmark results, written to `DEEPAGENTS_BENCHMARK_RESULTS` at the end."""
+    results = BenchmarkResults()
+    yield results
+    path = os.environ.get(RESULTS_ENV)
+    if path and results.results:
+        Path(path).write_text(json.dumps(results.document(), indent=2) + "\n")
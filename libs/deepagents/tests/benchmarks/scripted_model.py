@@ -0,0 +1,112 @@
+"""Deterministic chat model for agent benchmarks.
+
+`ScriptedChatModel` computes each reply from the conversation it is given instead
+of consuming a fixed queue, so the same script works for a main agent and for
+subagents running in parallel threads, and every run makes exactly the same calls.
+"""
+
+import asyncio
+import threading
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models import LanguageModelInput
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import Runnable
+from langchain_core.tools import BaseTool
+from pydantic import PrivateAttr
+from typing_extensions import override
+
+Script = Callable[[list[BaseMessage]], AIMessage]
+"""Function returning the model reply for a conversation."""
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Chat model whose replies are computed by a script function.
+
+    Args:
+        script: Function called with the messages of each model call.
+        latency: Seconds each async call waits before replying, to simulate a provider.
+    """
+
+    script: Script
+    latency: float = 0.0
+
+    _calls: int = PrivateAttr(default=0)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def calls(self) -> int:
+        """Number of model calls made so far."""
+        return self._calls
+
+    def bind_tools(
+        self,
+        tools: Sequence[dict[str, Any] | type | Callable | BaseTool],  # Tools are ignored
+        **kwargs: Any,
+    ) -> Runnable[LanguageModelInput, AIMessage]:
+        """Return the model unchanged: scripts decide which tools to call."""
+        return self
+
+    @override
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: CallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        with self._lock:
+            self._calls += 1
+        return ChatResult(generations=[ChatGeneration(message=self.script(messages))])
+
+    @override
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: list[str] | None = None,
+        run_manager: AsyncCallbackManagerForLLMRun | None = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._generate(messages, stop, **kwargs)
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-chat-model"
+
+
+def tool_call(name: str, args: dict[str, Any], call_id: str) -> dict[str, Any]:
+    """Build a tool call for an `AIMessage`."""
+    return {"name": name, "args": args, "id": call_id, "type": "tool_call"}
+
+
+def last_human(messages: list[BaseMessage]) -> str:
+    """Return the text of the latest human message."""
+    return next((message.text for message in reversed(messages) if isinstance(message, HumanMessage)), "")
+
+
+def tool_rounds(messages: list[BaseMessage]) -> int:
+    """Count the tool call rounds since the latest human message."""
+    rounds = 0
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            break
+        if isinstance(message, AIMessage) and message.tool_calls:
+            rounds += 1
+    return rounds
+
+
+def tool_results(messages: list[BaseMessage]) -> list[ToolMessage]:
+    """Return the tool results since the latest human message."""
+    results: list[ToolMessage] = []
+    for message in reversed(messages):
+        if isinstance(message, HumanMessage):
+            break
+        if isinstance(message, ToolMessage):
+            results.append(message)
+    return results[::-1]
@@ -0,0 +1,233 @@
+"""Benchmarks for the deep agent loop, driven by a deterministic scripted model.
+
+The model replies instantly, so these numbers are the framework's own cost:
+graph execution, middleware, tools and backends. They cover:
+
+- Turns per second of a `create_deep_agent` graph.
+- Graph construction time, cold and from the graph cache.
+- Middleware overhead per model call, against a bare `create_agent` graph.
+- Filesystem tool latencies on each backend, split into backend time and the rest.
+- Summarization cost at several history sizes.
+- Subagent fan-out: one turn dispatching several `task` calls at once.
+
+Results are printed with `-s` and written as JSON when
+`DEEPAGENTS_BENCHMARK_RESULTS` is set (see `conftest.py`).
+
+Run with::
+
+    make benchmark          # uses the `benchmark` pytest marker
+    DEEPAGENTS_BENCHMARK_RESULTS=results.json uv run --group test pytest tests/benchmarks -m benchmark -v -s
+"""
+
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from langchain.agents import create_agent
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langgraph.store.memory import InMemoryStore
+
+from deepagents.backends.filesystem import FilesystemBackend
+from deepagents.backends.state import StateBackend
+from deepagents.backends.store import StoreBackend
+from deepagents.graph import clear_graph_cache, create_deep_agent
+from deepagents.middleware.filesystem import FilesystemMiddleware
+from deepagents.middleware.summarization import SummarizationMiddleware
+from deepagents.middleware.tool_stats import TOOL_TRACE_KEY
+from tests.benchmarks.conftest import BenchmarkResults
+from tests.benchmarks.scripted_model import Script, ScriptedChatModel, last_human, tool_call, tool_results, tool_rounds
+
+if TYPE_CHECKING:
+    from deepagents.backends.protocol import BACKEND_TYPES
+
+pytestmark = pytest.mark.benchmark
+
+NUM_RUNS = 20
+TOOL_ROUNDS = 3
+FILE_ROUNDS = 10
+HISTORY_SIZES = (50, 200, 800)
+FAN_OUT = (1, 4, 16)
+
+
+def _reply(text: str) -> Script:
+    return lambda _messages: AIMessage(content=text)
+
+
+def _looping_script(rounds: int) -> Script:
+    """Call `ls` `rounds` times, then answer."""
+
+    def script(messages: list[BaseMessage]) -> AIMessage:
+        done = tool_rounds(messages)
+        if done < rounds:
+            return AIMessage(content="", tool_calls=[tool_call("ls", {"path": "/"}, f"call_{done}")])
+        return AIMessage(content="done")
+
+    return script
+
+
+def _time_invocations(agent: Any, payload: dict[str, Any], runs: int, config: dict[str, Any] | None = None) -> float:  # noqa: ANN401  # Compiled graphs
+    """Return the mean seconds per invocation, after one warm-up run."""
+    agent.invoke(payload, config)
+    start = time.perf_counter()
+    for _ in range(runs):
+        agent.invoke(payload, config)
+    return (time.perf_counter() - start) / runs
+
+
+def test_agent_turns_per_second(benchmark_results: BenchmarkResults) -> None:
+    """Model calls per second of a deep agent looping over a cheap tool."""
+    model = ScriptedChatModel(script=_looping_script(TOOL_ROUNDS))
+    agent = create_deep_agent(model=model)
+
+    per_run = _time_invocations(agent, {"messages": [HumanMessage(content="go")]}, NUM_RUNS)
+
+    turns = TOOL_ROUNDS + 1
+    assert model.calls == (NUM_RUNS + 1) * turns
+    benchmark_results.record("agent_turns", "turns_per_second", turns / per_run, "1/s", tool_rounds=TOOL_ROUNDS)
+    benchmark_results.record("agent_turns", "invocations_per_second", 1 / per_run, "1/s", tool_rounds=TOOL_ROUNDS)
+
+
+def test_graph_construction(benchmark_results: BenchmarkResults) -> None:
+    """Time `create_deep_agent` building a graph and returning a cached one."""
+    model = ScriptedChatModel(script=_reply("hello"))
+    create_deep_agent(model=model, reuse_graph=False)
+
+    start = time.perf_counter()
+    for _ in range(NUM_RUNS):
+        create_deep_agent(model=model, reuse_graph=False)
+    cold = (time.perf_counter() - start) / NUM_RUNS
+
+    clear_graph_cache()
+    create_deep_agent(model=model, reuse_graph=True)
+    start = time.perf_counter()
+    for _ in range(NUM_RUNS):
+        create_deep_agent(model=model, reuse_graph=True)
+    cached = (time.perf_counter() - start) / NUM_RUNS
+
+    benchmark_results.record("graph_construction", "build_ms", cold * 1000, "ms")
+    benchmark_results.record("graph_construction", "cached_ms", cached * 1000, "ms")
+
+
+def test_middleware_overhead_per_model_call(benchmark_results: BenchmarkResults) -> None:
+    """Time a single-call turn on a bare agent and on a deep agent with its default middleware."""
+    payload = {"messages": [HumanMessage(content="hi")]}
+    bare = _time_invocations(create_agent(ScriptedChatModel(script=_reply("hello"))), payload, NUM_RUNS * 2)
+    deep = _time_invocations(create_deep_agent(model=ScriptedChatModel(script=_reply("hello"))), payload, NUM_RUNS * 2)
+
+    benchmark_results.record("middleware_overhead", "bare_ms_per_call", bare * 1000, "ms")
+    benchmark_results.record("middleware_overhead", "deep_ms_per_call", deep * 1000, "ms")
+    benchmark_results.record("middleware_overhead", "overhead_ms_per_call", (deep - bare) * 1000, "ms")
+
+
+_FILE_OPS = ("write_file", "read_file", "edit_file", "ls", "glob", "grep")
+
+
+def _file_op(index: int) -> dict[str, Any]:
+    name = _FILE_OPS[index % len(_FILE_OPS)]
+    path = f"/bench/file_{index // len(_FILE_OPS)}.txt"
+    args: dict[str, Any] = {
+        "write_file": {"file_path": path, "content": "\n".join(f"line {i}" for i in range(200))},
+        "read_file": {"file_path": path},
+        "edit_file": {"file_path": path, "old_string": "line 100", "new_string": "LINE 100"},
+        "ls": {"path": "/bench"},
+        "glob": {"pattern": "*.txt", "path": "/bench"},
+        "grep": {"pattern": "LINE 100", "path": "/bench"},
+    }[name]
+    return tool_call(name, args, f"call_{index}")
+
+
+def _file_ops_script(messages: list[BaseMessage]) -> AIMessage:
+    done = tool_rounds(messages)
+    if done < FILE_ROUNDS * len(_FILE_OPS):
+        return AIMessage(content="", tool_calls=[_file_op(done)])
+    return AIMessage(content="done")
+
+
+@pytest.mark.parametrize("backend_name", ["state", "store", "filesystem"])
+def test_filesystem_tool_latency_by_backend(backend_name: str, tmp_path: Path, benchmark_results: BenchmarkResults) -> None:
+    """Mean latency of each filesystem tool, from the tool traces of a scripted run."""
+    backends: dict[str, BACKEND_TYPES] = {
+        "state": StateBackend,
+        "store": lambda runtime: StoreBackend(runtime, namespace=lambda _ctx: ("benchmarks",)),
+        "filesystem": FilesystemBackend(root_dir=tmp_path, virtual_mode=True),
+    }
+    agent = create_agent(
+        ScriptedChatModel(script=_file_ops_script),
+        middleware=[FilesystemMiddleware(backend=backends[backend_name])],
+        store=InMemoryStore(),
+    )
+
+    traces: dict[str, list[dict[str, Any]]] = defaultdict(list)
+    for chunk in agent.stream({"messages": [HumanMessage(content="go")]}, stream_mode="custom"):
+        if chunk.get("type") == TOOL_TRACE_KEY:
+            traces[chunk["tool"]].append(chunk)
+
+    assert sorted(traces) == sorted(_FILE_OPS)
+    assert not any(trace["error"] for calls in traces.values() for trace in calls)
+    for tool, calls in traces.items():
+        mean = sum(trace["duration"] for trace in calls) / len(calls)
+        backend = sum(trace["backend_duration"] for trace in calls) / len(calls)
+        benchmark_results.record("filesystem_tools", f"{tool}_ms", mean * 1000, "ms", backend=backend_name)
+        benchmark_results.record("filesystem_tools", f"{tool}_backend_ms", backend * 1000, "ms", backend=backend_name)
+
+
+def _history(size: int) -> list[BaseMessage]:
+    filler = "Some earlier discussion about the project. " * 5
+    messages: list[BaseMessage] = []
+    for i in range(size // 2):
+        messages.append(HumanMessage(content=f"question {i}: {filler}"))
+        messages.append(AIMessage(content=f"answer {i}: {filler}"))
+    messages.append(HumanMessage(content="and now?"))
+    return messages
+
+
+@pytest.mark.parametrize("size", HISTORY_SIZES)
+def test_summarization_cost_by_history_size(size: int, tmp_path: Path, benchmark_results: BenchmarkResults) -> None:
+    """Time a turn that summarizes a history of `size` messages against one that does not."""
+    payload = {"messages": _history(size)}
+    config = {"configurable": {"thread_id": "benchmark"}}
+
+    def turn_seconds(trigger: int) -> float:
+        summarization = SummarizationMiddleware(
+            model=ScriptedChatModel(script=_reply("A short summary.")),
+            backend=FilesystemBackend(root_dir=tmp_path / str(trigger), virtual_mode=True),
+            trigger=("messages", trigger),
+            keep=("messages", 20),
+        )
+        agent = create_agent(ScriptedChatModel(script=_reply("done")), middleware=[summarization])
+        return _time_invocations(agent, payload, NUM_RUNS // 4, config)
+
+    baseline = turn_seconds(size * 10)
+    summarized = turn_seconds(size // 2)
+
+    benchmark_results.record("summarization", "baseline_ms", baseline * 1000, "ms", messages=size)
+    benchmark_results.record("summarization", "summarized_ms", summarized * 1000, "ms", messages=size)
+    benchmark_results.record("summarization", "cost_ms", (summarized - baseline) * 1000, "ms", messages=size)
+
+
+def _fan_out_script(messages: list[BaseMessage]) -> AIMessage:
+    """Main agent: dispatch `fan out N` subtasks at once. Subagents: answer immediately."""
+    request = last_human(messages)
+    if request.startswith("subtask"):
+        return AIMessage(content=f"result of {request}")
+    if tool_results(messages):
+        return AIMessage(content="done")
+    count = int(request.rsplit(maxsplit=1)[-1])
+    calls = [tool_call("task", {"description": f"subtask {i}", "subagent_type": "general-purpose"}, f"call_{i}") for i in range(count)]
+    return AIMessage(content="", tool_calls=calls)
+
+
+@pytest.mark.parametrize("count", FAN_OUT)
+def test_subagent_fan_out(count: int, benchmark_results: BenchmarkResults) -> None:
+    """Time a turn that runs `count` subagents in parallel."""
+    agent = create_deep_agent(model=ScriptedChatModel(script=_fan_out_script))
+    payload = {"messages": [HumanMessage(content=f"fan out {count}")]}
+
+    results = [message.text for message in agent.invoke(payload)["messages"] if isinstance(message, ToolMessage)]
+    assert sorted(results) == sorted(f"result of subtask {i}" for i in range(count))
+    per_run = _time_invocations(agent, payload, NUM_RUNS // 4)
+
+    benchmark_results.record("subagent_fan_out", "turn_ms", per_run * 1000, "ms", subagents=count)
+    benchmark_results.record("subagent_fan_out", "ms_per_subagent", per_run * 1000 / count, "ms", subagents=count)
@@ -0,0 +1,65 @@
+"""Load test of `DeepAgentRuntime` serving many tenants from one graph.
+
+The scripted model waits a fixed latency on every call, like a provider would, and
+each request makes one tool call and two model calls. With one graph shared by all
+requests, throughput should grow with `max_concurrency` until the event loop, not
+the model, is the bottleneck.
+
+Run with::
+
+    make benchmark          # uses the `benchmark` pytest marker
+    DEEPAGENTS_BENCHMARK_RESULTS=results.json uv run --group test pytest tests/benchmarks -m benchmark -v -s
+"""
+
+import asyncio
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+from deepagents.backends import StateBackend
+from deepagents.runtime import DeepAgentRuntime
+from tests.benchmarks.conftest import BenchmarkResults
+from tests.benchmarks.scripted_model import ScriptedChatModel, tool_call, tool_rounds
+
+pytestmark = pytest.mark.benchmark
+
+NUM_REQUESTS = 64
+NUM_TENANTS = 8
+MODEL_LATENCY = 0.02
+CONCURRENCY = (1, 8, 32)
+
+
+def _write_then_answer(messages: list[BaseMessage]) -> AIMessage:
+    if tool_rounds(messages) == 0:
+        return AIMessage(content="", tool_calls=[tool_call("write_file", {"file_path": "/notes.txt", "content": "hello"}, "call_write")])
+    return AIMessage(content="done")
+
+
+async def _serve(runtime: DeepAgentRuntime) -> float:
+    """Run `NUM_REQUESTS` requests spread over tenants and threads, returning requests per second."""
+
+    async def request(i: int) -> None:
+        await runtime.ainvoke(f"tenant-{i % NUM_TENANTS}", f"thread-{i}", {"messages": [HumanMessage(content="go")]})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(i) for i in range(NUM_REQUESTS)))
+    return NUM_REQUESTS / (time.perf_counter() - start)
+
+
+@pytest.mark.parametrize("concurrency", CONCURRENCY)
+async def test_runtime_requests_per_second(concurrency: int, benchmark_results: BenchmarkResults) -> None:
+    """Requests per second at a given concurrency limit."""
+    runtime = DeepAgentRuntime(
+        model=ScriptedChatModel(script=_write_then_answer, latency=MODEL_LATENCY),
+        tenant_backend=lambda _tenant: StateBackend,
+        max_concurrency=concurrency,
+    )
+
+    requests_per_second = await _serve(runtime)
+
+    stats = runtime.stats()
+    assert (stats.completed, stats.failed, stats.running) == (NUM_REQUESTS, 0, 0)
+    serial_limit = 1 / (2 * MODEL_LATENCY)
+    benchmark_results.record("runtime", "requests_per_second", requests_per_second, "1/s", concurrency=concurrency)
+    benchmark_results.record("runtime", "speedup_over_serial_model", requests_per_second / serial_limit, "x", concurrency=concurrency)
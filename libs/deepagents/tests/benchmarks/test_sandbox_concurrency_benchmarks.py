@@ -0,0 +1,114 @@
+"""Benchmarks for concurrent sandbox operations.
+
+Remote sandboxes spend most of each command waiting on the network. A sandbox
+that only implements the sync `execute` pays a worker thread per in-flight call
+through `asyncio.to_thread`, so concurrency is capped by the default executor.
+`AsyncBaseSandbox` subclasses await the call instead, so every in-flight command
+is just a coroutine.
+
+Both fake sandboxes below run commands with a local shell and add the same
+simulated round-trip latency, so the difference between them is only the
+execution model.
+
+Run with::
+
+    make benchmark          # uses the `benchmark` pytest marker
+    uv run --group test pytest tests/benchmarks -m benchmark -v -s
+"""
+
+import asyncio
+import os
+import shlex
+import subprocess
+import time
+from pathlib import Path
+
+import pytest
+
+from deepagents.backends.protocol import ExecuteResponse, FileDownloadResponse, FileUploadResponse
+from deepagents.backends.sandbox import AsyncBaseSandbox, BaseSandbox
+
+pytestmark = pytest.mark.benchmark
+
+LATENCY = 0.05
+NUM_CALLS = 128
+
+
+def _response(stdout: bytes, returncode: int) -> ExecuteResponse:
+    return ExecuteResponse(output=stdout.decode("utf-8", errors="replace"), exit_code=returncode, truncated=False)
+
+
+class LocalThreadedSandbox(BaseSandbox):
+    """Fake remote sandbox with a blocking client, running commands in a local shell."""
+
+    def __init__(self, latency: float) -> None:
+        self._latency = latency
+
+    @property
+    def id(self) -> str:
+        return "local-threaded"
+
+    def execute(self, command: str, *, timeout: int | None = None) -> ExecuteResponse:
+        time.sleep(self._latency)
+        result = subprocess.run(command, shell=True, capture_output=True, timeout=timeout, check=False)  # noqa: S602  # Fake sandbox runs trusted test commands
+        return _response(result.stdout + result.stderr, result.returncode)
+
+    def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        for path, content in files:
+            Path(path).write_bytes(content)
+        return [FileUploadResponse(path=path, error=None) for path, _ in files]
+
+    def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        return [FileDownloadResponse(path=path, content=Path(path).read_bytes(), error=None) for path in paths]
+
+
+class LocalAsyncSandbox(AsyncBaseSandbox):
+    """Fake remote sandbox with an async client, running commands in a local shell."""
+
+    def __init__(self, latency: float) -> None:
+        self._latency = latency
+
+    @property
+    def id(self) -> str:
+        return "local-async"
+
+    async def aexecute(self, command: str, *, timeout: int | None = None) -> ExecuteResponse:  # noqa: ASYNC109
+        await asyncio.sleep(self._latency)
+        process = await asyncio.create_subprocess_shell(command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT)
+        stdout, _ = await asyncio.wait_for(process.communicate(), timeout)
+        return _response(stdout, process.returncode or 0)
+
+    async def aupload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        for path, content in files:
+            await asyncio.to_thread(Path(path).write_bytes, content)
+        return [FileUploadResponse(path=path, error=None) for path, _ in files]
+
+    async def adownload_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        return [FileDownloadResponse(path=path, content=await asyncio.to_thread(Path(path).read_bytes), error=None) for path in paths]
+
+
+async def _time_concurrent_reads(sandbox: BaseSandbox, path: str) -> float:
+    # `cat` keeps local process startup small next to the simulated latency
+    command = f"cat {shlex.quote(path)}"
+    start = time.perf_counter()
+    results = await asyncio.gather(*(sandbox.aexecute(command) for _ in range(NUM_CALLS)))
+    elapsed = time.perf_counter() - start
+    assert all(result.output == "hello\n" for result in results)
+    return elapsed
+
+
+async def test_async_sandbox_scales_past_thread_pool(tmp_path: Path) -> None:
+    """Concurrent reads on an async sandbox should not queue behind the default executor.
+
+    The threaded sandbox runs at most `min(32, cpu_count + 4)` calls at once, so
+    `NUM_CALLS` reads take several latency rounds; the async sandbox overlaps all of them.
+    """
+    path = tmp_path / "notes.txt"
+    path.write_text("hello\n")
+
+    threaded = await _time_concurrent_reads(LocalThreadedSandbox(LATENCY), str(path))
+    native = await _time_concurrent_reads(LocalAsyncSandbox(LATENCY), str(path))
+
+    workers = min(32, (os.cpu_count() or 1) + 4)
+    print(f"\n{NUM_CALLS} concurrent reads, {LATENCY * 1000:.0f} ms latency, {workers} workers: threaded {threaded:.2f}s, async {native:.2f}s")  # noqa: T201  # Reported with `-s`
+    assert native < threaded, f"async sandbox took {native:.2f}s, threaded sandbox {threaded:.2f}s"
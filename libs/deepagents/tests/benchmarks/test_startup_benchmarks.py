@@ -0,0 +1,140 @@
+"""Benchmarks for import and deep agent construction time.
+
+Short-lived workers and CLI fast paths import `deepagents` without building an
+agent. The package exposes its public names lazily, so importing it (or a single
+backend) must not load LangChain, LangGraph or a model provider package; those
+load when `create_deep_agent` or a model is first used.
+
+`create_deep_agent` is called on every ACP session reset and by per-session agent
+factories, so construction has to stay cheap even with many subagents. Subagent
+graphs are compiled lazily on their first `task` call and shared between
+equivalent agents; these tests guard that construction does not start compiling
+them eagerly again.
+
+Run with::
+
+    make benchmark          # uses the `benchmark` pytest marker
+    uv run --group test pytest tests/benchmarks -m benchmark -v -s
+
+Import tests spawn a **fresh subprocess** so `sys.modules` is clean and measured
+times reflect a cold-start import. If an import isolation test fails, a module in
+`HEAVY_MODULES` is imported at the top of a module on that path: move the import
+into the function that needs it, or under `TYPE_CHECKING` if it is only used in
+annotations. Profile with `python -X importtime -c "import deepagents"`.
+"""
+
+import json
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+from langchain_anthropic import ChatAnthropic
+
+from deepagents.graph import create_deep_agent
+from deepagents.middleware.subagents import SubAgent
+
+pytestmark = pytest.mark.benchmark
+
+NUM_SUBAGENTS = 15
+
+# Modules that must not load until an agent or model is created
+HEAVY_MODULES = frozenset(
+    {
+        "langchain",
+        "langchain.agents",
+        "langchain.chat_models",
+        "langchain_core",
+        "langchain_core.messages",
+        "langchain_core.language_models",
+        "langchain_core.runnables",
+        "langgraph",
+        "langchain_anthropic",
+        "langchain_openai",
+        "anthropic",
+        "openai",
+        "yaml",
+    }
+)
+
+# Provider packages, which load only when a model is created
+PROVIDER_MODULES = frozenset({"langchain_anthropic", "langchain_openai", "anthropic", "openai"})
+
+
+def _run_python(code: str) -> subprocess.CompletedProcess[str]:
+    """Run `code` in a fresh Python interpreter and return the result."""
+    return subprocess.run(  # noqa: S603  # Runs our own snippets with the current interpreter
+        [sys.executable, "-c", textwrap.dedent(code)], capture_output=True, text=True, timeout=60, check=False
+    )
+
+
+def _import_in_subprocess(statement: str) -> tuple[float, set[str]]:
+    """Return the seconds `statement` takes in a fresh interpreter and the modules it loads."""
+    result = _run_python(f"""
+        import json, sys, time
+        start = time.perf_counter()
+        {statement}
+        elapsed = time.perf_counter() - start
+        print(json.dumps({{"elapsed": elapsed, "modules": sorted(sys.modules)}}))
+    """)
+    assert result.returncode == 0, f"Subprocess failed ({result.returncode}):\n{result.stderr}"
+    output = json.loads(result.stdout)
+    return output["elapsed"], set(output["modules"])
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "import deepagents",
+        "import deepagents.backends",
+        "import deepagents.middleware",
+        "from deepagents.backends import CompositeBackend, FilesystemBackend, LocalShellBackend, StateBackend",
+        "from deepagents.backends.protocol import BackendProtocol, SandboxBackendProtocol",
+    ],
+    ids=["package", "backends", "middleware", "local_backends", "protocol"],
+)
+def test_no_heavy_imports_on_lightweight_path(statement: str) -> None:
+    """Importing the package surface or local backends must not load LangChain or providers."""
+    elapsed, loaded = _import_in_subprocess(statement)
+    print(f"\n{statement}: {elapsed * 1000:.1f} ms")  # noqa: T201  # Reported with `-s`
+    leaked = HEAVY_MODULES & loaded
+    assert not leaked, f"Heavy modules loaded by `{statement}`: {sorted(leaked)}"
+
+
+def test_create_deep_agent_import_defers_providers() -> None:
+    """`create_deep_agent` needs LangChain, but provider packages load only with a model."""
+    elapsed, loaded = _import_in_subprocess("from deepagents import create_deep_agent")
+    print(f"\nfrom deepagents import create_deep_agent: {elapsed * 1000:.1f} ms")  # noqa: T201  # Reported with `-s`
+    assert "langchain.agents" in loaded
+    leaked = PROVIDER_MODULES & loaded
+    assert not leaked, f"Provider packages loaded before any model was created: {sorted(leaked)}"
+
+    _, loaded = _import_in_subprocess("from deepagents.graph import get_default_model; get_default_model()")
+    assert "langchain_anthropic" in loaded, "Creating the default model should load `langchain_anthropic`"
+
+
+def _subagents() -> list[SubAgent]:
+    return [
+        {"name": f"subagent-{i}", "description": f"Subagent number {i}.", "system_prompt": f"You are subagent {i}."}  # ty: ignore[missing-typed-dict-key]
+        for i in range(NUM_SUBAGENTS)
+    ]
+
+
+def _time_construction() -> float:
+    model = ChatAnthropic(model="claude-sonnet-4-5-20250929", api_key="test")
+    start = time.perf_counter()
+    create_deep_agent(model=model, subagents=_subagents(), reuse_graph=False)
+    return time.perf_counter() - start
+
+
+def test_construction_with_many_subagents() -> None:
+    """Building an agent with 15 subagents should not compile any subagent graph.
+
+    Eager compilation takes roughly 0.1 s per subagent; the threshold leaves ample
+    room for slow CI machines while still catching a return to eager compilation.
+    """
+    cold = _time_construction()
+    warm = min(_time_construction() for _ in range(3))
+    print(f"\ncreate_deep_agent with {NUM_SUBAGENTS} subagents: cold {cold * 1000:.1f} ms, warm {warm * 1000:.1f} ms")  # noqa: T201  # Reported with `-s`
+    assert warm < 1.0, f"create_deep_agent took {warm:.2f}s with {NUM_SUBAGENTS} subagents — expected < 1s"
@@ -0,0 +1,161 @@
+"""Tests for incremental directory sync, run against a local shell backend."""
+
+import json
+import os
+import stat
+import sys
+from pathlib import Path
+
+import pytest
+
+from deepagents.backends.directory_sync import DirectorySync
+from deepagents.backends.local_shell import LocalShellBackend
+from deepagents.backends.protocol import ExecuteResponse, FileUploadResponse
+from deepagents.backends.transfer import SandboxTransfer
+
+CHUNK_SIZE = 1024
+MAX_ARG_STRLEN = 128 * 1024
+
+
+class CountingBackend(LocalShellBackend):
+    """Local backend that records executed commands and uploaded paths."""
+
+    def __init__(self, root_dir: Path) -> None:
+        super().__init__(root_dir=root_dir, virtual_mode=False, inherit_env=True)
+        self.commands = 0
+        self.uploaded: list[str] = []
+
+    def execute(self, command: str, *, timeout: int | None = None) -> ExecuteResponse:
+        self.commands += 1
+        return super().execute(command, timeout=timeout)
+
+    def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        self.uploaded.extend(path for path, _ in files)
+        return super().upload_files(files)
+
+
+@pytest.fixture
+def backend(tmp_path: Path) -> CountingBackend:
+    return CountingBackend(tmp_path)
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    root = tmp_path / "project"
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "main.py").write_text("print('hello')\n")
+    (root / "README.md").write_text("# project\n")
+    (root / ".git").mkdir()
+    (root / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+    return root
+
+
+def _sync(backend: CountingBackend, project: Path, tmp_path: Path, **kwargs: object) -> DirectorySync:
+    transfer = SandboxTransfer(backend, chunk_size=CHUNK_SIZE, pack_threshold=256, retries=0, staging_dir=str(tmp_path / "staging"))
+    return DirectorySync(backend, project, str(tmp_path / "remote"), transfer=transfer, **kwargs)
+
+
+def test_push_uploads_only_changed_files(backend: CountingBackend, project: Path, tmp_path: Path) -> None:
+    sync = _sync(backend, project, tmp_path)
+
+    first = sync.push()
+    assert sorted(first.uploaded) == ["README.md", "src/main.py"]
+    assert (tmp_path / "remote" / "src" / "main.py").read_text() == "print('hello')\n"
+    assert not (tmp_path / "remote" / ".git").exists()
+
+    backend.commands = 0
+    second = sync.push()
+    assert second.uploaded == []
+    assert second.unchanged == 2
+    assert backend.commands == 1
+
+    (project / "src" / "main.py").write_text("print('changed')\n")
+    third = sync.push()
+    assert third.uploaded == ["src/main.py"]
+    assert (tmp_path / "remote" / "src" / "main.py").read_text() == "print('changed')\n"
+
+
+def test_push_reuses_unchanged_chunks_of_large_files(backend: CountingBackend, project: Path, tmp_path: Path) -> None:
+    content = bytearray(os.urandom(CHUNK_SIZE * 4))
+    (project / "data.bin").write_bytes(content)
+    sync = _sync(backend, project, tmp_path)
+    sync.push()
+
+    content[CHUNK_SIZE * 2] ^= 0xFF
+    (project / "data.bin").write_bytes(content)
+    backend.uploaded.clear()
+    result = sync.push()
+
+    assert result.uploaded == ["data.bin"]
+    assert result.reused_chunks == 3
+    assert len(backend.uploaded) == 1
+    assert (tmp_path / "remote" / "data.bin").read_bytes() == content
+
+
+def test_push_deletes_extraneous_files_only_when_enabled(backend: CountingBackend, project: Path, tmp_path: Path) -> None:
+    stale = tmp_path / "remote" / "stale.txt"
+    stale.parent.mkdir()
+    stale.write_text("old")
+
+    _sync(backend, project, tmp_path).push()
+    assert stale.exists()
+
+    result = _sync(backend, project, tmp_path, delete=True).push()
+    assert result.deleted == 1
+    assert not stale.exists()
+    assert (tmp_path / "remote" / "README.md").exists()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX file modes")
+def test_push_preserves_file_modes(backend: CountingBackend, project: Path, tmp_path: Path) -> None:
+    script = project / "run.sh"
+    script.write_text("#!/bin/sh\necho hi\n")
+    script.chmod(0o755)
+    data = project / "data.bin"
+    data.write_bytes(os.urandom(CHUNK_SIZE * 2))
+    data.chmod(0o600)
+    sync = _sync(backend, project, tmp_path)
+    remote = tmp_path / "remote"
+
+    sync.push()
+    assert stat.S_IMODE((remote / "run.sh").stat().st_mode) == 0o755
+    assert stat.S_IMODE((remote / "data.bin").stat().st_mode) == 0o600
+
+    script.chmod(0o644)
+    result = sync.push()
+    assert result.uploaded == ["run.sh"]
+    assert stat.S_IMODE((remote / "run.sh").stat().st_mode) == 0o644
+    assert sync.push().uploaded == []
+
+
+async def test_apush_matches_push(backend: CountingBackend, project: Path, tmp_path: Path) -> None:
+    sync = _sync(backend, project, tmp_path, exclude=(".git", "*.md"))
+
+    first = await sync.apush()
+    second = await sync.apush()
+
+    assert first.uploaded == ["src/main.py"]
+    assert second.uploaded == []
+    assert not (tmp_path / "remote" / "README.md").exists()
+
+
+def test_push_sends_large_manifests_as_a_file(backend: CountingBackend, project: Path, tmp_path: Path) -> None:
+    for i in range(1500):
+        (project / "src" / f"module_with_a_fairly_long_name_{i:04}.py").write_text(f"value = {i}\n")
+    sync = _sync(backend, project, tmp_path)
+    assert len(json.dumps(sync._diff_request(sync._scan()))) > MAX_ARG_STRLEN
+
+    first = sync.push()
+    assert first.errors == {}
+    assert len(first.uploaded) == 1502
+    assert (tmp_path / "remote" / "src" / "module_with_a_fairly_long_name_1499.py").read_text() == "value = 1499\n"
+
+    second = sync.push()
+    assert second.uploaded == []
+    assert second.unchanged == 1502
+    assert [path.name for path in (tmp_path / "staging").iterdir() if path.name.startswith("request-")] == []
+
+
+def test_rejects_relative_remote_dir(backend: CountingBackend, project: Path) -> None:
+    with pytest.raises(ValueError, match="absolute"):
+        DirectorySync(backend, project, "workspace")
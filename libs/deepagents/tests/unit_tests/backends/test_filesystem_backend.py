@@ -587,3 +587,70 @@ class TestWindowsPathHandling:
         infos = be.ls_info("/a/b/c/d")
         for info in infos:
             assert "\\" not in info["path"], f"Backslash in deep path: {info['path']}"
+
+
+def test_filesystem_edit_many_is_all_or_nothing(tmp_path: Path):
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=False)
+    target = tmp_path / "app.py"
+    write_file(target, "x = 1\ny = 1\n")
+
+    failed = be.edit_many(str(target), [("x = 1", "x = 2", False), ("z", "w", False)])
+    assert failed.error is not None
+    assert "Edit 2 of 2 failed" in failed.error
+    assert target.read_text() == "x = 1\ny = 1\n"
+
+    res = be.edit_many(str(target), [("x = 1", "x = 2", False), ("1", "3", True)])
+    assert isinstance(res, EditResult) and res.error is None
+    assert res.occurrences == 2
+    assert target.read_text() == "x = 2\ny = 3\n"
+
+
+@pytest.mark.parametrize("durability", ["none", "file", "dir"])
+def test_filesystem_writes_are_atomic(tmp_path: Path, durability: str):
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=False, durability=durability)
+    target = tmp_path / "script.sh"
+
+    assert be.write(str(target), "echo one\n").error is None
+    target.chmod(0o755)
+    assert be.edit(str(target), "one", "two").error is None
+    assert be.upload_files([(str(tmp_path / "data.bin"), b"\x00\x01")])[0].error is None
+
+    assert target.read_text() == "echo two\n"
+    assert target.stat().st_mode & 0o777 == 0o755
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["data.bin", "script.sh"]
+
+
+def test_filesystem_failed_write_keeps_original(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=False)
+    target = tmp_path / "notes.txt"
+    target.write_text("original")
+
+    def fail_replace(_self: Path, _target: Path) -> Path:
+        msg = "disk full"
+        raise OSError(msg)
+
+    monkeypatch.setattr(Path, "replace", fail_replace)
+    res = be.edit(str(target), "original", "changed")
+
+    assert res.error is not None and "disk full" in res.error
+    assert target.read_text() == "original"
+    assert [p.name for p in tmp_path.iterdir()] == ["notes.txt"]
+
+
+def test_filesystem_upload_refuses_symlink_target(tmp_path: Path):
+    be = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=False)
+    outside = tmp_path / "outside.txt"
+    outside.write_text("secret")
+    link = tmp_path / "link.txt"
+    link.symlink_to(outside)
+
+    (res,) = be.upload_files([(str(link), b"overwrite")])
+
+    assert res.error == "invalid_path"
+    assert outside.read_text() == "secret"
+    assert link.is_symlink()
+
+
+def test_filesystem_rejects_unknown_durability(tmp_path: Path):
+    with pytest.raises(ValueError, match="durability"):
+        FilesystemBackend(root_dir=str(tmp_path), virtual_mode=False, durability="always")  # type: ignore[arg-type]
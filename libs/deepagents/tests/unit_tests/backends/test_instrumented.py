@@ -0,0 +1,187 @@
+"""Tests for backend operation instrumentation."""
+
+import json
+import logging
+from pathlib import Path
+
+import pytest
+
+from deepagents.backends.composite import CompositeBackend
+from deepagents.backends.filesystem import FilesystemBackend
+from deepagents.backends.instrumented import (
+    BackendOperation,
+    InMemoryStats,
+    InstrumentedSandbox,
+    JsonLogSink,
+    MeterSink,
+    MetricsSink,
+    instrument,
+    mark_cache_hit,
+    record_cache_hit,
+)
+from deepagents.backends.local_shell import LocalShellBackend
+from deepagents.backends.protocol import SandboxBackendProtocol
+
+
+class ListSink(MetricsSink):
+    def __init__(self) -> None:
+        self.events: list[BackendOperation] = []
+
+    def record(self, event: BackendOperation) -> None:
+        self.events.append(event)
+
+
+class CachingBackend(FilesystemBackend):
+    """Filesystem backend that serves repeated reads from memory."""
+
+    def __init__(self, root_dir: Path) -> None:
+        super().__init__(root_dir=root_dir, virtual_mode=True)
+        self.cache: dict[str, str] = {}
+
+    def read(self, file_path: str, offset: int = 0, limit: int = 2000) -> str:
+        if file_path in self.cache:
+            mark_cache_hit()
+            return self.cache[file_path]
+        self.cache[file_path] = super().read(file_path, offset, limit)
+        return self.cache[file_path]
+
+
+def test_records_operations_bytes_and_errors(tmp_path: Path) -> None:
+    sink = ListSink()
+    backend = instrument(FilesystemBackend(root_dir=tmp_path, virtual_mode=True), sinks=[sink])
+
+    backend.write("/a.txt", "hello")
+    backend.edit("/a.txt", "hello", "world")
+    content = backend.read("/a.txt")
+    backend.read("/missing.txt")
+    backend.write("/a.txt", "again")
+
+    assert [event.operation for event in sink.events] == ["write", "edit", "read", "read", "write"]
+    write, edit, read, missing, rewrite = sink.events
+    assert write.backend == "FilesystemBackend"
+    assert write.bytes_in == 5
+    assert write.error is None
+    assert edit.bytes_in == 10
+    assert read.bytes_out == len(content.encode())
+    assert missing.error is not None
+    assert "already exists" in (rewrite.error or "")
+    assert all(event.duration >= 0 for event in sink.events)
+
+
+def test_composite_route_and_exceptions(tmp_path: Path) -> None:
+    sink = ListSink()
+    composite = CompositeBackend(
+        default=FilesystemBackend(root_dir=tmp_path / "default", virtual_mode=True),
+        routes={"/memories/": FilesystemBackend(root_dir=tmp_path / "memories", virtual_mode=True)},
+    )
+    backend = instrument(composite, sinks=[sink], name="agent")
+
+    backend.write("/notes.txt", "a")
+    backend.write("/memories/notes.txt", "b")
+    with pytest.raises(ValueError, match="traversal"):
+        backend.read("/../etc/passwd")
+
+    assert [(event.backend, event.route) for event in sink.events] == [("agent", None), ("agent", "/memories/"), ("agent", None)]
+    assert sink.events[-1].error == "ValueError"
+    # Unknown attributes fall through to the wrapped backend
+    assert backend.sorted_routes == composite.sorted_routes
+
+
+def test_cache_hits_and_in_memory_summary(tmp_path: Path) -> None:
+    stats = InMemoryStats()
+    backend = instrument(CachingBackend(tmp_path), sinks=[stats])
+    backend.write("/a.txt", "hello")
+    for _ in range(3):
+        backend.read("/a.txt")
+
+    read_stats = stats.snapshot()[("CachingBackend", None, "read")]
+    assert read_stats.count == 3
+    assert read_stats.cache_hits == 2
+    assert read_stats.errors == 0
+    assert 0 < read_stats.quantile(0.95) <= read_stats.max_duration
+
+    rows = {row["operation"]: row for row in stats.summary()}
+    assert rows.keys() == {"read", "write"}
+    json.dumps(rows)
+
+    stats.reset()
+    assert stats.summary() == []
+
+
+def test_record_cache_hit_for_calls_served_above_the_backend(tmp_path: Path) -> None:
+    sink = ListSink()
+    composite = CompositeBackend(
+        default=FilesystemBackend(root_dir=tmp_path / "default", virtual_mode=True),
+        routes={"/memories/": FilesystemBackend(root_dir=tmp_path / "memories", virtual_mode=True)},
+    )
+    backend = instrument(composite, sinks=[sink])
+
+    record_cache_hit(backend, "download_files", "/memories/skills")
+    record_cache_hit(composite, "download_files", "/memories/skills")
+
+    assert sink.events == [BackendOperation("download_files", "CompositeBackend", "/memories/", 0.0, cache_hit=True)]
+
+
+async def test_sandbox_execute_and_async_operations(tmp_path: Path) -> None:
+    sink = ListSink()
+    backend = instrument(LocalShellBackend(root_dir=tmp_path, virtual_mode=False, inherit_env=True), sinks=[sink])
+    assert isinstance(backend, InstrumentedSandbox)
+    assert isinstance(backend, SandboxBackendProtocol)
+
+    await backend.awrite(str(tmp_path / "a.txt"), "hello")
+    response = await backend.aexecute("cat a.txt")
+    backend.execute("exit 3")
+
+    assert response.output.startswith("hello")
+    assert [event.operation for event in sink.events] == ["write", "execute", "execute"]
+    assert sink.events[1].bytes_out == len(response.output.encode())
+    assert sink.events[2].error is None
+
+
+def test_meter_and_json_log_sinks(tmp_path: Path, caplog: pytest.LogCaptureFixture) -> None:
+    class Instrument:
+        def __init__(self, name: str, calls: list) -> None:
+            self.name = name
+            self.calls = calls
+
+        def record(self, value: float, attributes: dict) -> None:
+            self.calls.append((self.name, value, attributes))
+
+        add = record
+
+    class Meter:
+        def __init__(self) -> None:
+            self.calls: list = []
+
+        def create_histogram(self, name: str, **_: str) -> Instrument:
+            return Instrument(name, self.calls)
+
+        create_counter = create_histogram
+
+    meter = Meter()
+    backend = instrument(
+        FilesystemBackend(root_dir=tmp_path, virtual_mode=True),
+        sinks=[MeterSink(meter), JsonLogSink(logging.getLogger("metrics"))],
+    )
+    with caplog.at_level(logging.INFO, logger="metrics"):
+        backend.write("/a.txt", "hi")
+        backend.read("/missing.txt")
+
+    names = [name.removeprefix("deepagents.backend.") for name, _, _ in meter.calls]
+    assert names == ["duration", "bytes_in", "duration", "bytes_out", "errors"]
+    assert meter.calls[0][2] == {"backend": "FilesystemBackend", "route": "", "operation": "write"}
+    logged = [json.loads(record.getMessage()) for record in caplog.records]
+    assert [entry["operation"] for entry in logged] == ["write", "read"]
+
+
+def test_failing_sink_does_not_break_operations(tmp_path: Path) -> None:
+    class BrokenSink(MetricsSink):
+        def record(self, event: BackendOperation) -> None:
+            msg = f"cannot record {event.operation}"
+            raise RuntimeError(msg)
+
+    stats = InMemoryStats()
+    backend = instrument(FilesystemBackend(root_dir=tmp_path, virtual_mode=True), sinks=[BrokenSink(), stats])
+
+    assert backend.write("/a.txt", "hi").error is None
+    assert stats.summary()[0]["count"] == 1
@@ -1,11 +1,14 @@
 """Unit tests for LocalShellBackend."""
 
+import sys
 import tempfile
+import threading
+import time
 from pathlib import Path
 
 import pytest
 
-from deepagents.backends.local_shell import LocalShellBackend
+from deepagents.backends.local_shell import LocalShellBackend, _OutputCapture
 from deepagents.backends.protocol import ExecuteResponse
 
 
@@ -96,6 +99,34 @@ def test_local_shell_backend_execute_output_truncation() -> None:
         assert len(result.output) <= 150  # Some buffer for truncation message
 
 
+def test_local_shell_backend_truncation_keeps_head_and_tail() -> None:
+    """Test that truncated output keeps the beginning and end and reports dropped bytes."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        backend = LocalShellBackend(root_dir=tmpdir, max_output_bytes=100, inherit_env=True)
+
+        result = backend.execute("seq 1 1000; seq 1 1000 >&2")
+
+        assert result.truncated is True
+        lines = result.output.splitlines()
+        assert lines[0] == "1"
+        assert "1000" in lines
+        assert lines[-1] == "[stderr] 1000"
+        dropped = [int(line.split()[3]) for line in lines if "Output truncated" in line]
+        assert sum(dropped) == 2 * len("\n".join(str(i) for i in range(1, 1001)) + "\n") - 100
+
+
+def test_output_capture_memory_is_bounded() -> None:
+    """Test that the capture only retains a bounded amount of a large stream."""
+    capture = _OutputCapture(1000)
+    for _ in range(10_000):
+        capture.write(b"x" * 4096)
+
+    assert capture.total == 10_000 * 4096
+    assert len(capture._head) + len(capture._tail) <= 1500
+    head, tail, dropped = capture.render(1000)
+    assert (len(head), len(tail), dropped) == (500, 500, capture.total - 1000)
+
+
 def test_local_shell_backend_filesystem_operations() -> None:
     """Test that filesystem operations work (inherited from FilesystemBackend)."""
     with tempfile.TemporaryDirectory() as tmpdir:
@@ -297,3 +328,127 @@ async def test_local_shell_backend_async_filesystem_operations() -> None:
         # Verify
         content = await backend.aread("/async_test.txt")
         assert "modified content" in content
+
+
+async def test_local_shell_backend_async_execute_truncation_and_exit_code() -> None:
+    """Test that async execute streams bounded output and reports the exit code."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        backend = LocalShellBackend(root_dir=tmpdir, max_output_bytes=100, inherit_env=True)
+
+        result = await backend.aexecute("seq 1 1000; exit 3")
+
+        assert result.truncated is True
+        assert result.exit_code == 3
+        assert result.output.startswith("1\n2\n")
+        assert "Output truncated" in result.output
+        assert "1000" in result.output
+
+
+async def test_local_shell_backend_async_execute_timeout() -> None:
+    """Test that async execute kills commands that exceed the timeout."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        backend = LocalShellBackend(root_dir=tmpdir, inherit_env=True)
+
+        result = await backend.aexecute("sleep 5", timeout=1)
+
+        assert result.exit_code == 124
+        assert "timed out" in result.output
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+async def test_local_shell_backend_background_process_does_not_block(use_async: bool) -> None:  # noqa: FBT001
+    """Test that a background process holding the output pipes does not block until the timeout."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        backend = LocalShellBackend(root_dir=tmpdir, timeout=10, inherit_env=True)
+        command = "sleep 5 & echo started"
+
+        start = time.monotonic()
+        result = await backend.aexecute(command) if use_async else backend.execute(command)
+
+        assert result.exit_code == 0
+        assert result.output.strip() == "started"
+        assert time.monotonic() - start < 4
+
+
+def _open_fd_count() -> int:
+    return len(list(Path("/proc/self/fd").iterdir()))
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="Counts open file descriptors in /proc")
+@pytest.mark.parametrize("use_async", [False, True])
+async def test_background_process_does_not_leak_readers_or_pipes(use_async: bool) -> None:  # noqa: FBT001
+    """Test that pipes held open by a background process are closed and their readers stopped."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        backend = LocalShellBackend(root_dir=tmpdir, timeout=10, inherit_env=True)
+        command = "(sleep 3; echo late) & echo started"
+        threads = threading.active_count()
+        fds = _open_fd_count()
+
+        result = await backend.aexecute(command) if use_async else backend.execute(command)
+
+        assert result.output.strip() == "started"
+        assert threading.active_count() == threads
+        assert _open_fd_count() == fds
+
+
+def test_output_capture_snapshot_is_independent() -> None:
+    """Test that a snapshot doesn't change when the capture is written to afterwards."""
+    capture = _OutputCapture(100)
+    capture.write(b"before")
+
+    snapshot = capture.snapshot()
+    capture.write(b" after")
+
+    assert snapshot.total == 6
+    assert snapshot.render(100) == ("before", "", 0)
+
+
+def test_persistent_shell_keeps_state_between_commands() -> None:
+    """Test that a persistent shell keeps the working directory and environment."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        backend = LocalShellBackend(root_dir=tmpdir, inherit_env=True, persistent_shell=True)
+        try:
+            assert backend.execute("mkdir sub && cd sub && export GREETING=hi").exit_code == 0
+
+            result = backend.execute("pwd; printf '%s' \"$GREETING\"; echo oops >&2; false")
+
+            assert result.exit_code == 1
+            assert result.output.startswith(f"{Path(tmpdir).resolve() / 'sub'}\nhi")
+            assert "[stderr] oops" in result.output
+            # Quotes and heredocs are passed through unchanged
+            assert backend.execute("cat <<'EOF'\nit's $HOME\nEOF").output == "it's $HOME\n"
+        finally:
+            backend.close()
+
+
+def test_persistent_shell_restarts_after_timeout_and_exit() -> None:
+    """Test that the session is replaced after a timeout or after the shell exits."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        backend = LocalShellBackend(root_dir=tmpdir, inherit_env=True, persistent_shell=True)
+        try:
+            backend.execute("cd /")
+            timed_out = backend.execute("sleep 5", timeout=1)
+            assert timed_out.exit_code == 124
+
+            result = backend.execute("pwd")
+            assert result.output.startswith("[Shell session restarted")
+            assert result.output.endswith(f"{Path(tmpdir).resolve()}\n")
+
+            exited = backend.execute("exit 7")
+            assert exited.exit_code == 7
+            assert "Shell session ended" in exited.output
+            assert "restarted" in backend.execute("echo back").output
+        finally:
+            backend.close()
+
+
+async def test_persistent_shell_async_execute() -> None:
+    """Test that async execute runs in the persistent session."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        backend = LocalShellBackend(root_dir=tmpdir, inherit_env=True, persistent_shell=True)
+        try:
+            await backend.aexecute("export GREETING=hi")
+            result = await backend.aexecute("echo $GREETING")
+            assert result.output == "hi\n"
+        finally:
+            backend.close()
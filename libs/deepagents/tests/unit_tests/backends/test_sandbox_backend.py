@@ -8,9 +8,13 @@ The heredoc templates introduced in PR #872 contain {e} in exception handlers
 that need to be escaped as {{e}} for Python's .format() method.
 """
 
+import asyncio
 import base64
 import json
+import threading
+from pathlib import Path
 
+from deepagents.backends.local_shell import LocalShellBackend
 from deepagents.backends.protocol import (
     ExecuteResponse,
     FileDownloadResponse,
@@ -21,6 +25,7 @@ from deepagents.backends.sandbox import (
     _GLOB_COMMAND_TEMPLATE,
     _READ_COMMAND_TEMPLATE,
     _WRITE_COMMAND_TEMPLATE,
+    AsyncBaseSandbox,
     BaseSandbox,
 )
 
@@ -188,3 +193,100 @@ def test_sandbox_grep_literal_search() -> None:
     # Verify the command uses grep -rHnF for literal search (combined flags)
     assert sandbox.last_command is not None
     assert "grep -rHnF" in sandbox.last_command
+
+
+class MockAsyncSandbox(AsyncBaseSandbox):
+    """Minimal concrete implementation of AsyncBaseSandbox recording the thread each command runs on."""
+
+    def __init__(self) -> None:
+        self.commands: list[str] = []
+        self.threads: list[int] = []
+        self.files: dict[str, bytes] = {}
+
+    @property
+    def id(self) -> str:
+        return "mock-async-sandbox"
+
+    async def aexecute(self, command: str, *, timeout: int | None = None) -> ExecuteResponse:  # noqa: ASYNC109
+        await asyncio.sleep(0)
+        self.commands.append(command)
+        self.threads.append(threading.get_ident())
+        return ExecuteResponse(output="1", exit_code=0, truncated=False)
+
+    async def aupload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        self.files.update(files)
+        return [FileUploadResponse(path=path, error=None) for path, _ in files]
+
+    async def adownload_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        return [FileDownloadResponse(path=path, content=self.files.get(path), error=None) for path in paths]
+
+
+async def test_async_sandbox_file_operations_await_aexecute() -> None:
+    sandbox = MockAsyncSandbox()
+
+    results = await asyncio.gather(
+        sandbox.aread("/a.txt"),
+        sandbox.aedit("/a.txt", "old", "new"),
+        sandbox.agrep_raw("pattern", path="/"),
+        sandbox.awrite("/b.txt", "content"),
+    )
+
+    assert results[0] == "1"
+    assert results[1].occurrences == 1
+    assert len(sandbox.commands) == 4
+    # Every command ran on the caller's event loop rather than in a worker thread
+    assert set(sandbox.threads) == {threading.get_ident()}
+
+
+def test_async_sandbox_sync_methods_are_derived() -> None:
+    sandbox = MockAsyncSandbox()
+
+    assert sandbox.execute("echo hi").output == "1"
+    assert sandbox.write("/new.txt", "content").error is None
+    assert sandbox.upload_files([("/data.bin", b"data")])[0].error is None
+    assert sandbox.download_files(["/data.bin"])[0].content == b"data"
+    assert len(sandbox.commands) == 2
+
+
+async def test_async_sandbox_sync_methods_work_inside_running_loop() -> None:
+    sandbox = MockAsyncSandbox()
+
+    assert sandbox.read("/a.txt") == "1"
+
+
+async def test_sync_sandbox_async_file_operations_use_execute() -> None:
+    sandbox = MockSandbox()
+
+    result = await sandbox.awrite("/test/file.txt", "content")
+
+    assert result.error is None
+    assert sandbox.last_command is not None
+    assert "__DEEPAGENTS_EOF__" in sandbox.last_command
+
+
+def test_sandbox_edit_many_runs_batch_in_one_command(tmp_path: Path) -> None:
+    """Test that BaseSandbox.edit_many applies a batch with a single execute call."""
+    backend = LocalShellBackend(root_dir=tmp_path, virtual_mode=False, inherit_env=True)
+    calls: list[str] = []
+
+    class ShellSandbox(MockSandbox):
+        def execute(self, command: str, *, timeout: int | None = None) -> ExecuteResponse:
+            calls.append(command)
+            return backend.execute(command, timeout=timeout)
+
+    target = tmp_path / "file.txt"
+    target.write_text("one two two")
+    sandbox = ShellSandbox()
+
+    failed = sandbox.edit_many(str(target), [("one", "1", False), ("two", "2", False)])
+    assert (
+        failed.error
+        == "Error: Edit 2 of 2 failed, no edits were applied. String 'two' appears multiple times. Use replace_all=True to replace all occurrences."
+    )
+    assert target.read_text() == "one two two"
+
+    result = sandbox.edit_many(str(target), [("one", "1", False), ("two", "2", True)])
+    assert result.error is None
+    assert result.occurrences == 3
+    assert target.read_text() == "1 2 2"
+    assert len(calls) == 2
@@ -0,0 +1,132 @@
+"""Tests for the chunked sandbox transfer engine, run against a local shell backend."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from deepagents.backends.local_shell import LocalShellBackend
+from deepagents.backends.protocol import FileUploadResponse
+from deepagents.backends.transfer import SandboxTransfer
+
+CHUNK_SIZE = 1024
+
+
+class FlakyBackend(LocalShellBackend):
+    """Local backend that fails uploads to paths with a chosen suffix and counts requests."""
+
+    def __init__(self, root_dir: Path) -> None:
+        super().__init__(root_dir=root_dir, virtual_mode=False, inherit_env=True)
+        self.failing_suffix: str | None = None
+        self.uploaded: list[str] = []
+
+    def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        self.uploaded.extend(path for path, _ in files)
+        if self.failing_suffix is not None and any(path.endswith(self.failing_suffix) for path, _ in files):
+            return [FileUploadResponse(path=path, error="permission_denied") for path, _ in files]
+        return super().upload_files(files)
+
+
+def _transfer(backend: LocalShellBackend, tmp_path: Path) -> SandboxTransfer:
+    return SandboxTransfer(backend, chunk_size=CHUNK_SIZE, pack_threshold=256, retries=0, staging_dir=str(tmp_path / "staging"))
+
+
+@pytest.fixture
+def backend(tmp_path: Path) -> FlakyBackend:
+    return FlakyBackend(tmp_path)
+
+
+def test_upload_packs_small_files_and_chunks_large_ones(backend: FlakyBackend, tmp_path: Path) -> None:
+    large = os.urandom(CHUNK_SIZE * 3 + 17)
+    local = tmp_path / "local.bin"
+    local.write_bytes(large)
+    dest = tmp_path / "dest"
+    files: list[tuple[str, bytes | Path]] = [(str(dest / f"src/file_{i}.txt"), f"content {i}".encode()) for i in range(50)]
+    files.append((str(dest / "large.bin"), local))
+
+    results = _transfer(backend, tmp_path).upload(files)
+
+    assert [result.error for result in results] == [None] * 51
+    assert (dest / "src/file_7.txt").read_text() == "content 7"
+    assert (dest / "large.bin").read_bytes() == large
+    # 50 small files fit in one archive; the large file takes 4 chunks
+    assert len(backend.uploaded) == 5
+    assert list((tmp_path / "staging").iterdir()) == []
+
+
+def test_upload_resumes_after_partial_failure(backend: FlakyBackend, tmp_path: Path) -> None:
+    content = os.urandom(CHUNK_SIZE * 4)
+    dest = str(tmp_path / "dest.bin")
+    transfer = _transfer(backend, tmp_path)
+    backend.failing_suffix = "/2"
+
+    (first,) = transfer.upload([(dest, content)])
+    assert first.error == "incomplete"
+    assert not Path(dest).exists()
+
+    backend.failing_suffix = None
+    backend.uploaded.clear()
+    (second,) = transfer.upload([(dest, content)])
+
+    assert second.error is None
+    assert second.chunks_reused == 3
+    assert len(backend.uploaded) == 1
+    assert Path(dest).read_bytes() == content
+
+
+def test_upload_reports_invalid_and_missing_sources(backend: FlakyBackend, tmp_path: Path) -> None:
+    results = _transfer(backend, tmp_path).upload([("relative.txt", b"x"), (str(tmp_path / "out.txt"), tmp_path / "missing.txt")])
+
+    assert [result.error for result in results] == ["invalid_path", "file_not_found"]
+
+
+def test_upload_of_many_small_files_sends_the_commit_request_as_a_file(backend: FlakyBackend, tmp_path: Path) -> None:
+    dest = tmp_path / "dest"
+    files: list[tuple[str, bytes | Path]] = [
+        (str(dest / f"src/module_with_a_fairly_long_name_{i:04}.py"), f"value = {i}".encode()) for i in range(1500)
+    ]
+
+    results = _transfer(backend, tmp_path).upload(files)
+
+    assert [result.error for result in results] == [None] * len(files)
+    assert (dest / "src/module_with_a_fairly_long_name_1499.py").read_text() == "value = 1499"
+    assert any(path.endswith(".json") for path in backend.uploaded)
+    assert list((tmp_path / "staging").iterdir()) == []
+
+
+def test_upload_reports_incomplete_files_when_commit_fails(backend: FlakyBackend, tmp_path: Path) -> None:
+    dest = tmp_path / "dest"
+    files: list[tuple[str, bytes | Path]] = [(str(dest / f"src/module_with_a_fairly_long_name_{i:04}.py"), b"x") for i in range(1500)]
+    backend.failing_suffix = ".json"
+
+    results = _transfer(backend, tmp_path).upload(files)
+
+    assert {result.error for result in results} == {"incomplete"}
+    assert not dest.exists()
+
+
+def test_download_round_trip(backend: FlakyBackend, tmp_path: Path) -> None:
+    large = os.urandom(CHUNK_SIZE * 2 + 5)
+    (tmp_path / "large.bin").write_bytes(large)
+    (tmp_path / "small.txt").write_text("small")
+    (tmp_path / "folder").mkdir()
+    paths = [str(tmp_path / name) for name in ("large.bin", "small.txt", "missing.txt", "folder")]
+
+    results = _transfer(backend, tmp_path).download(paths)
+
+    assert results[0].content == large
+    assert results[1].content == b"small"
+    assert [result.error for result in results] == [None, None, "file_not_found", "is_directory"]
+    assert list((tmp_path / "staging").iterdir()) == []
+
+
+async def test_async_round_trip(backend: FlakyBackend, tmp_path: Path) -> None:
+    content = os.urandom(CHUNK_SIZE * 2 + 1)
+    transfer = _transfer(backend, tmp_path)
+    paths = [str(tmp_path / "a.bin"), str(tmp_path / "b.txt")]
+
+    uploaded = await transfer.aupload([(paths[0], content), (paths[1], b"b")])
+    downloaded = await transfer.adownload(paths)
+
+    assert [result.error for result in uploaded] == [None, None]
+    assert [result.content for result in downloaded] == [content, b"b"]
@@ -0,0 +1,104 @@
+"""Unit tests for prompt cache breakpoints and cache usage reporting."""
+
+from pathlib import Path
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from langchain.agents.middleware.types import ModelRequest
+from langchain_anthropic import ChatAnthropic
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from deepagents.backends.filesystem import FilesystemBackend
+from deepagents.graph import create_deep_agent
+from deepagents.middleware.prompt_caching import PromptCacheBreakpointMiddleware, PromptCacheUsageMiddleware
+from tests.unit_tests.chat_model import GenericFakeChatModel
+
+
+def _make_request(model: BaseChatModel, system_message: SystemMessage | None) -> ModelRequest:
+    return ModelRequest(
+        model=model,
+        messages=[HumanMessage(content="hi")],
+        system_message=system_message,
+        tools=[],
+        runtime=MagicMock(),
+        state={"messages": []},
+    )
+
+
+def _capture(request: ModelRequest) -> ModelRequest:
+    return request
+
+
+def test_breakpoint_marks_last_system_block_for_anthropic() -> None:
+    middleware = PromptCacheBreakpointMiddleware(tier="static")
+    model = ChatAnthropic(model="claude-sonnet-4-5-20250929", api_key="test")
+    system_message = SystemMessage(content_blocks=[{"type": "text", "text": "base"}, {"type": "text", "text": "static"}])
+
+    request = middleware.wrap_model_call(_make_request(model, system_message), _capture)
+
+    blocks = request.system_message.content_blocks
+    assert "cache_control" not in blocks[0]
+    assert blocks[1]["cache_control"] == {"type": "ephemeral", "ttl": "5m"}
+    assert request.system_message.text == system_message.text
+
+
+def test_breakpoint_ignores_other_models() -> None:
+    middleware = PromptCacheBreakpointMiddleware(tier="static")
+    system_message = SystemMessage(content="base")
+
+    request = middleware.wrap_model_call(_make_request(GenericFakeChatModel(messages=iter([])), system_message), _capture)
+
+    assert request.system_message is system_message
+
+
+def test_breakpoint_names_are_unique_per_tier() -> None:
+    assert PromptCacheBreakpointMiddleware(tier="static").name != PromptCacheBreakpointMiddleware(tier="context").name
+
+
+def test_usage_middleware_reports_cache_tokens() -> None:
+    events: list[dict[str, Any]] = []
+    runtime = MagicMock()
+    runtime.stream_writer = events.append
+    message = AIMessage(
+        content="done",
+        usage_metadata={
+            "input_tokens": 1200,
+            "output_tokens": 10,
+            "total_tokens": 1210,
+            "input_token_details": {"cache_read": 1000, "cache_creation": 150},
+        },
+    )
+
+    update = PromptCacheUsageMiddleware().after_model({"messages": [message]}, runtime)
+
+    expected = {"model_calls": 1, "input_tokens": 1200, "cache_read_tokens": 1000, "cache_write_tokens": 150}
+    assert update == {"prompt_cache_usage": expected}
+    assert events == [{"type": "prompt_cache_usage", **expected}]
+
+
+def test_usage_middleware_skips_messages_without_usage() -> None:
+    assert PromptCacheUsageMiddleware().after_model({"messages": [AIMessage(content="done")]}, MagicMock()) is None
+
+
+@pytest.mark.parametrize("layout", ["stack", "tiered"])
+def test_create_deep_agent_system_prompt_layout(tmp_path: Path, layout: str) -> None:
+    backend = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+    backend.upload_files([("/AGENTS.md", b"Always use type hints")])
+    usage = {"input_tokens": 100, "output_tokens": 5, "total_tokens": 105, "input_token_details": {"cache_read": 80}}
+    model = GenericFakeChatModel(messages=iter([AIMessage(content="hello!", usage_metadata=usage)]))
+
+    agent = create_deep_agent(model=model, backend=backend, memory=["/AGENTS.md"], system_prompt_layout=layout)
+    result = agent.invoke({"messages": [HumanMessage(content="hi")]})
+
+    system_message = next(m for m in model.call_history[0]["messages"] if isinstance(m, SystemMessage))
+    prompt = system_message.text
+    memory_index = prompt.index("<agent_memory>")
+    filesystem_index = prompt.index("## Following Conventions")
+    task_index = prompt.index("## `task` (subagent spawner)")
+    if layout == "tiered":
+        assert filesystem_index < task_index < memory_index
+    else:
+        assert memory_index < filesystem_index < task_index
+    assert result["prompt_cache_usage"] == {"model_calls": 1, "input_tokens": 100, "cache_read_tokens": 80, "cache_write_tokens": 0}
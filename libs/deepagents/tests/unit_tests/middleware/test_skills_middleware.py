@@ -4,6 +4,7 @@ This module tests the skills middleware and helper functions using temporary
 directories and the FilesystemBackend in normal (non-virtual) mode.
 """
 
+import os
 from datetime import UTC, datetime
 from pathlib import Path
 from types import SimpleNamespace
@@ -20,6 +21,7 @@ if TYPE_CHECKING:
 from langgraph.store.memory import InMemoryStore
 
 from deepagents.backends.filesystem import FilesystemBackend
+from deepagents.backends.instrumented import InMemoryStats, instrument
 from deepagents.backends.state import StateBackend
 from deepagents.backends.store import StoreBackend
 from deepagents.graph import create_deep_agent
@@ -29,6 +31,7 @@ from deepagents.middleware.skills import (
     MAX_SKILL_FILE_SIZE,
     SkillMetadata,
     SkillsMiddleware,
+    SkillsRegistry,
     _format_skill_annotations,
     _list_skills,
     _parse_skill_metadata,
@@ -1327,6 +1330,147 @@ def test_before_agent_skips_loading_if_metadata_present(tmp_path: Path) -> None:
     assert result["skills_metadata"][0]["name"] == "test-skill"
 
 
+class DownloadCountingBackend(FilesystemBackend):
+    """FilesystemBackend that records which paths are downloaded."""
+
+    def __init__(self, root_dir: str) -> None:
+        super().__init__(root_dir=root_dir, virtual_mode=False)
+        self.downloaded: list[str] = []
+
+    def download_files(self, paths: list[str]) -> list:
+        self.downloaded.extend(paths)
+        return super().download_files(paths)
+
+
+def test_skills_registry_reparses_only_changed_files(tmp_path: Path) -> None:
+    """Test that the registry picks up skill changes and only downloads changed files."""
+    backend = DownloadCountingBackend(root_dir=str(tmp_path))
+    skills_dir = tmp_path / "skills" / "user"
+    one = skills_dir / "skill-one" / "SKILL.md"
+    two = skills_dir / "skill-two" / "SKILL.md"
+    backend.upload_files(
+        [
+            (str(one), make_skill_content("skill-one", "First skill").encode("utf-8")),
+            (str(two), make_skill_content("skill-two", "Second skill").encode("utf-8")),
+            (str(skills_dir / "skill-two" / "docs" / "SKILL.md"), b"nested files are not skills"),
+        ]
+    )
+    registry = SkillsRegistry()
+
+    assert [s["name"] for s in registry.load(backend, [str(skills_dir)])] == ["skill-one", "skill-two"]
+    assert sorted(backend.downloaded) == [str(one), str(two)]
+
+    backend.downloaded.clear()
+    assert len(registry.load(backend, [str(skills_dir)])) == 2
+    assert backend.downloaded == []
+
+    one.write_text(make_skill_content("skill-one", "Edited skill"))
+    os.utime(one, (one.stat().st_atime, one.stat().st_mtime + 10))
+    three = skills_dir / "skill-three" / "SKILL.md"
+    backend.upload_files([(str(three), make_skill_content("skill-three", "Third skill").encode("utf-8"))])
+    two.unlink()
+
+    skills = registry.load(backend, [str(skills_dir)])
+
+    assert sorted(backend.downloaded) == [str(one), str(three)]
+    assert {s["name"]: s["description"] for s in skills} == {"skill-one": "Edited skill", "skill-three": "Third skill"}
+
+
+def test_skills_registry_revalidate_interval(tmp_path: Path) -> None:
+    """Test that revalidation is skipped within the interval until invalidated."""
+    backend = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=False)
+    skills_dir = tmp_path / "skills" / "user"
+    backend.upload_files([(str(skills_dir / "skill-one" / "SKILL.md"), make_skill_content("skill-one", "First").encode("utf-8"))])
+    registry = SkillsRegistry(revalidate_interval=None)
+    registry.load(backend, [str(skills_dir)])
+
+    backend.upload_files([(str(skills_dir / "skill-two" / "SKILL.md"), make_skill_content("skill-two", "Second").encode("utf-8"))])
+    assert len(registry.load(backend, [str(skills_dir)])) == 1
+
+    registry.invalidate()
+    assert len(registry.load(backend, [str(skills_dir)])) == 2
+
+
+def test_skills_registry_reports_cache_hits(tmp_path: Path) -> None:
+    """Test that skills served from the registry are reported as cache hits of an instrumented backend."""
+    stats = InMemoryStats()
+    backend = instrument(FilesystemBackend(root_dir=str(tmp_path), virtual_mode=False), sinks=[stats], name="skills")
+    skills_dir = tmp_path / "skills" / "user"
+    backend.upload_files([(str(skills_dir / "skill-one" / "SKILL.md"), make_skill_content("skill-one", "First").encode("utf-8"))])
+    registry = SkillsRegistry()
+
+    registry.load(backend, [str(skills_dir)])
+    downloads = stats.snapshot()[("skills", None, "download_files")]
+    assert (downloads.count, downloads.cache_hits) == (1, 0)
+
+    registry.load(backend, [str(skills_dir)])
+    downloads = stats.snapshot()[("skills", None, "download_files")]
+    assert (downloads.count, downloads.cache_hits) == (2, 1)
+
+
+async def test_before_agent_with_registry_refreshes_existing_thread(tmp_path: Path) -> None:
+    """Test that a registry makes new skills visible to threads that already loaded skills."""
+    backend = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=False)
+    skills_dir = tmp_path / "skills" / "user"
+    backend.upload_files([(str(skills_dir / "skill-one" / "SKILL.md"), make_skill_content("skill-one", "First").encode("utf-8"))])
+    registry = SkillsRegistry()
+    main = SkillsMiddleware(backend=backend, sources=[str(skills_dir)], registry=registry)
+    subagent = SkillsMiddleware(backend=backend, sources=[str(skills_dir)], registry=registry)
+
+    result = main.before_agent({}, None, {})  # type: ignore[arg-type]
+    assert result is not None
+    state = {"skills_metadata": result["skills_metadata"]}
+    assert main.before_agent(state, None, {}) is None  # type: ignore[arg-type]
+
+    backend.upload_files([(str(skills_dir / "skill-two" / "SKILL.md"), make_skill_content("skill-two", "Second").encode("utf-8"))])
+
+    result = await subagent.abefore_agent(state, None, {})  # type: ignore[arg-type]
+    assert result is not None
+    assert [s["name"] for s in result["skills_metadata"]] == ["skill-one", "skill-two"]
+
+
+def test_registry_keeps_state_backend_skills_per_thread() -> None:
+    """Test that a shared registry never returns skills read from another thread's state."""
+    timestamp = datetime.now(UTC).isoformat()
+
+    def state_with_skill(name: str) -> dict:
+        content = make_skill_content(name, f"Skill of {name}").split("\n")
+        return {"files": {f"/skills/user/{name}/SKILL.md": {"content": content, "created_at": timestamp, "modified_at": timestamp}}}
+
+    registry = SkillsRegistry(revalidate_interval=None)
+    middleware = SkillsMiddleware(backend=StateBackend, sources=["/skills/user"], registry=registry)
+    runtime = SimpleNamespace(context=None, stream_writer=None, store=None)
+
+    first = middleware.before_agent(state_with_skill("alpha"), runtime, {"configurable": {"thread_id": "a"}})  # type: ignore[arg-type]
+    second = middleware.before_agent(state_with_skill("beta"), runtime, {"configurable": {"thread_id": "b"}})  # type: ignore[arg-type]
+
+    assert first is not None
+    assert second is not None
+    assert [s["name"] for s in first["skills_metadata"]] == ["alpha"]
+    assert [s["name"] for s in second["skills_metadata"]] == ["beta"]
+
+
+def test_registry_evicts_least_recently_loaded_namespaces(tmp_path: Path) -> None:
+    """Test that the registry only keeps entries for the most recently loaded namespaces."""
+    backend = DownloadCountingBackend(root_dir=str(tmp_path))
+    skills_dir = tmp_path / "skills" / "user"
+    skill = str(skills_dir / "skill-one" / "SKILL.md")
+    backend.upload_files([(skill, make_skill_content("skill-one", "First").encode("utf-8"))])
+    registry = SkillsRegistry(max_namespaces=2)
+
+    for namespace in ("thread:a", "thread:b", "thread:a", "thread:c"):
+        registry.load(backend, [str(skills_dir)], namespace=namespace)
+    assert backend.downloaded == [skill, skill, skill]
+    assert {namespace for namespace, _ in registry._entries} == {"thread:a", "thread:c"}
+
+    backend.downloaded.clear()
+    registry.load(backend, [str(skills_dir)], namespace="thread:c")
+    assert backend.downloaded == []
+    registry.load(backend, [str(skills_dir)], namespace="thread:b")
+    assert backend.downloaded == [skill]
+    assert {namespace for namespace, _ in registry._checked_at} == {"thread:c", "thread:b"}
+
+
 def test_create_deep_agent_with_skills_and_filesystem_backend(tmp_path: Path) -> None:
     """Test end-to-end: create_deep_agent with skills parameter and FilesystemBackend."""
     # Create skill on filesystem
@@ -0,0 +1,273 @@
+"""Unit tests for the subagent result cache."""
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+from langchain.agents import create_agent
+from langchain.tools import ToolRuntime
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import tool
+from langgraph.graph import END, START, MessagesState, StateGraph
+from langgraph.store.memory import InMemoryStore
+
+from deepagents.backends.filesystem import FilesystemBackend
+from deepagents.backends.instrumented import InMemoryStats, instrument
+from deepagents.backends.protocol import BACKEND_TYPES
+from deepagents.backends.state import StateBackend
+from deepagents.middleware import subagent_cache
+from deepagents.middleware.filesystem import FilesystemMiddleware
+from deepagents.middleware.subagent_cache import SubAgentResultCache
+from deepagents.middleware.subagents import CompiledSubAgent, SubAgentMiddleware
+from tests.unit_tests.chat_model import GenericFakeChatModel
+
+
+def _runtime(tool_call_id: str, config: dict[str, Any] | None = None, thread_id: str = "thread-1") -> ToolRuntime:
+    config = config or {}
+    return ToolRuntime(
+        state={"messages": []},
+        context=None,
+        tool_call_id=tool_call_id,
+        store=None,
+        stream_writer=lambda _: None,
+        config={**config, "configurable": {"thread_id": thread_id, **config.get("configurable", {})}},
+    )
+
+
+def _counting_middleware(cache: SubAgentResultCache, backend: BACKEND_TYPES = StateBackend) -> tuple[SubAgentMiddleware, list[str]]:
+    calls: list[str] = []
+
+    def researcher(state: MessagesState) -> dict[str, Any]:
+        calls.append(state["messages"][0].content)
+        return {"messages": [AIMessage(content=f"answer {len(calls)}")]}
+
+    graph = StateGraph(MessagesState)
+    graph.add_node("researcher", researcher)
+    graph.add_edge(START, "researcher")
+    graph.add_edge("researcher", END)
+    middleware = SubAgentMiddleware(
+        backend=backend,
+        subagents=[CompiledSubAgent(name="researcher", description="Researches.", runnable=graph.compile())],
+        result_cache=cache,
+    )
+    return middleware, calls
+
+
+def _message(result: Any) -> ToolMessage:  # noqa: ANN401
+    return result.update["messages"][0]
+
+
+def test_identical_task_is_served_from_cache() -> None:
+    middleware, calls = _counting_middleware(SubAgentResultCache())
+    task = middleware.tools[0].func
+
+    first = _message(task(description="Find the answer", subagent_type="researcher", runtime=_runtime("call_1")))
+    second = _message(task(description="  Find   the answer\n", subagent_type="researcher", runtime=_runtime("call_2")))
+    other = _message(task(description="Find another answer", subagent_type="researcher", runtime=_runtime("call_3")))
+
+    assert len(calls) == 2
+    assert first.response_metadata == {"subagent_cache": {"hit": False}}
+    assert second.content == "answer 1"
+    assert second.tool_call_id == "call_2"
+    assert second.response_metadata["subagent_cache"]["hit"] is True
+    assert other.content == "answer 2"
+
+
+def test_cache_hits_are_reported_to_instrumented_backend(tmp_path: Path) -> None:
+    stats = InMemoryStats()
+    backend = instrument(FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True), sinks=[stats], name="files")
+    middleware, calls = _counting_middleware(SubAgentResultCache(), backend)
+    task = middleware.tools[0].func
+
+    task(description="Find", subagent_type="researcher", runtime=_runtime("call_1"))
+    assert ("files", None, "subagent_result") not in stats.snapshot()
+
+    task(description="Find", subagent_type="researcher", runtime=_runtime("call_2"))
+
+    assert len(calls) == 1
+    assert stats.snapshot()[("files", None, "subagent_result")].cache_hits == 1
+
+
+def test_cache_entries_expire(monkeypatch: pytest.MonkeyPatch) -> None:
+    middleware, calls = _counting_middleware(SubAgentResultCache(ttl=60))
+    task = middleware.tools[0].func
+    now = 1_000_000.0
+    monkeypatch.setattr(subagent_cache.time, "time", lambda: now)
+
+    task(description="Find", subagent_type="researcher", runtime=_runtime("call_1"))
+    now += 61
+    result = _message(task(description="Find", subagent_type="researcher", runtime=_runtime("call_2")))
+
+    assert len(calls) == 2
+    assert result.response_metadata == {"subagent_cache": {"hit": False}}
+
+
+def test_bypass_skips_lookup_and_refreshes_entry() -> None:
+    middleware, calls = _counting_middleware(SubAgentResultCache())
+    task = middleware.tools[0].func
+
+    task(description="Find", subagent_type="researcher", runtime=_runtime("call_1"))
+    bypassed = _message(
+        task(description="Find", subagent_type="researcher", runtime=_runtime("call_2", {"configurable": {"bypass_subagent_cache": True}}))
+    )
+    cached = _message(task(description="Find", subagent_type="researcher", runtime=_runtime("call_3")))
+
+    assert len(calls) == 2
+    assert bypassed.content == "answer 2"
+    assert cached.content == "answer 2"
+
+
+def test_store_backed_cache_is_shared() -> None:
+    store = InMemoryStore()
+    first, first_calls = _counting_middleware(SubAgentResultCache(store=store))
+    second, second_calls = _counting_middleware(SubAgentResultCache(store=store))
+
+    first.tools[0].func(description="Find", subagent_type="researcher", runtime=_runtime("call_1"))
+    result = _message(second.tools[0].func(description="Find", subagent_type="researcher", runtime=_runtime("call_2")))
+
+    assert (len(first_calls), len(second_calls)) == (1, 0)
+    assert result.response_metadata["subagent_cache"]["hit"] is True
+
+
+async def test_cache_is_invalidated_when_read_files_change(tmp_path: Path) -> None:
+    backend = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+    backend.upload_files([("/notes.md", b"version one")])
+    read_call = {"name": "read_file", "args": {"file_path": "/notes.md"}, "id": "call_read", "type": "tool_call"}
+    reader_model = GenericFakeChatModel(
+        messages=iter(
+            [
+                AIMessage(content="", tool_calls=[read_call]),
+                AIMessage(content="summary one"),
+                AIMessage(content="", tool_calls=[read_call]),
+                AIMessage(content="summary two"),
+            ]
+        )
+    )
+    reader = create_agent(reader_model, middleware=[FilesystemMiddleware(backend=backend)])
+    middleware = SubAgentMiddleware(
+        backend=backend,
+        subagents=[CompiledSubAgent(name="reader", description="Reads notes.", runnable=reader)],
+        result_cache=SubAgentResultCache(),
+    )
+    task = middleware.tools[0].coroutine
+
+    first = _message(await task(description="Summarize notes", subagent_type="reader", runtime=_runtime("call_1")))
+    cached = _message(await task(description="Summarize notes", subagent_type="reader", runtime=_runtime("call_2")))
+    (tmp_path / "notes.md").write_text("version two")
+    refreshed = _message(await task(description="Summarize notes", subagent_type="reader", runtime=_runtime("call_3")))
+
+    assert first.content == "summary one"
+    assert cached.content == "summary one"
+    assert cached.response_metadata["subagent_cache"]["hit"] is True
+    assert refreshed.content == "summary two"
+    assert refreshed.response_metadata == {"subagent_cache": {"hit": False}}
+
+
+def test_results_are_not_shared_across_threads() -> None:
+    middleware, calls = _counting_middleware(SubAgentResultCache())
+    task = middleware.tools[0].func
+
+    task(description="Find", subagent_type="researcher", runtime=_runtime("call_1", thread_id="a:b"))
+    other = _message(task(description="Find", subagent_type="researcher", runtime=_runtime("call_2", thread_id="a")))
+    scoped = SubAgentResultCache(scope=lambda _: "tenant")
+
+    assert len(calls) == 2
+    assert other.content == "answer 2"
+    assert scoped.key("researcher", "Find", "a") != scoped.key("researcher", "Find", "b")
+
+
+def test_runs_without_a_scope_are_not_cached() -> None:
+    middleware, calls = _counting_middleware(SubAgentResultCache())
+    task = middleware.tools[0].func
+    unscoped = {"configurable": {"thread_id": None}}
+
+    task(description="Find", subagent_type="researcher", runtime=_runtime("call_1", unscoped))
+    task(description="Find", subagent_type="researcher", runtime=_runtime("call_2", unscoped))
+
+    assert len(calls) == 2
+
+
+def test_runs_calling_other_tools_are_not_cached() -> None:
+    sent: list[str] = []
+
+    @tool
+    def send_email(to: str) -> str:
+        """Send an email."""
+        sent.append(to)
+        return "sent"
+
+    email_call = {"name": "send_email", "args": {"to": "team@example.com"}, "id": "call_email", "type": "tool_call"}
+    model = GenericFakeChatModel(
+        messages=iter(
+            [
+                AIMessage(content="", tool_calls=[email_call]),
+                AIMessage(content="Sent."),
+                AIMessage(content="", tool_calls=[email_call]),
+                AIMessage(content="Sent."),
+            ]
+        )
+    )
+    middleware = SubAgentMiddleware(
+        backend=StateBackend,
+        subagents=[CompiledSubAgent(name="mailer", description="Sends mail.", runnable=create_agent(model, tools=[send_email]))],
+        result_cache=SubAgentResultCache(),
+    )
+    task = middleware.tools[0].func
+
+    task(description="Email the team", subagent_type="mailer", runtime=_runtime("call_1"))
+    second = _message(task(description="Email the team", subagent_type="mailer", runtime=_runtime("call_2")))
+
+    assert sent == ["team@example.com", "team@example.com"]
+    assert second.response_metadata == {"subagent_cache": {"hit": False}}
+
+
+def test_runnables_without_progress_events_are_not_cached() -> None:
+    calls: list[str] = []
+
+    def researcher(state: dict[str, Any]) -> dict[str, Any]:
+        calls.append(state["messages"][0].content)
+        return {"messages": [AIMessage(content="answer")]}
+
+    middleware = SubAgentMiddleware(
+        backend=StateBackend,
+        subagents=[CompiledSubAgent(name="researcher", description="Researches.", runnable=RunnableLambda(researcher))],
+        result_cache=SubAgentResultCache(),
+    )
+    task = middleware.tools[0].func
+
+    task(description="Find", subagent_type="researcher", runtime=_runtime("call_1"))
+    task(description="Find", subagent_type="researcher", runtime=_runtime("call_2"))
+
+    assert len(calls) == 2
+
+
+async def test_cache_is_invalidated_when_search_results_change(tmp_path: Path) -> None:
+    backend = FilesystemBackend(root_dir=str(tmp_path), virtual_mode=True)
+    backend.upload_files([("/a.md", b"TODO: one")])
+    grep_call = {"name": "grep", "args": {"pattern": "TODO", "path": "/"}, "id": "call_grep", "type": "tool_call"}
+    searcher_model = GenericFakeChatModel(
+        messages=iter(
+            [
+                AIMessage(content="", tool_calls=[grep_call]),
+                AIMessage(content="one match"),
+                AIMessage(content="", tool_calls=[grep_call]),
+                AIMessage(content="two matches"),
+            ]
+        )
+    )
+    searcher = create_agent(searcher_model, middleware=[FilesystemMiddleware(backend=backend)])
+    middleware = SubAgentMiddleware(
+        backend=backend,
+        subagents=[CompiledSubAgent(name="searcher", description="Searches.", runnable=searcher)],
+        result_cache=SubAgentResultCache(),
+    )
+    task = middleware.tools[0].coroutine
+
+    await task(description="Count TODOs", subagent_type="searcher", runtime=_runtime("call_1"))
+    cached = _message(await task(description="Count TODOs", subagent_type="searcher", runtime=_runtime("call_2")))
+    (tmp_path / "b.md").write_text("TODO: two")
+    refreshed = _message(await task(description="Count TODOs", subagent_type="searcher", runtime=_runtime("call_3")))
+
+    assert cached.content == "one match"
+    assert refreshed.content == "two matches"
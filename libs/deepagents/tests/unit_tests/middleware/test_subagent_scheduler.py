@@ -0,0 +1,185 @@
+"""Unit tests for bounded subagent scheduling."""
+
+import asyncio
+import threading
+import time
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from langchain.agents.middleware.types import ModelRequest
+from langchain.tools import ToolRuntime
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.rate_limiters import BaseRateLimiter
+from langchain_core.runnables import RunnableLambda
+
+from deepagents.backends.state import StateBackend
+from deepagents.middleware.subagent_scheduler import SubAgentScheduler
+from deepagents.middleware.subagents import SubAgentMiddleware
+
+
+class CountingRateLimiter(BaseRateLimiter):
+    """Rate limiter that never blocks and counts acquisitions."""
+
+    def __init__(self) -> None:
+        self.acquired = 0
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        self.acquired += 1
+        return True
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        self.acquired += 1
+        return True
+
+
+def test_rejects_invalid_concurrency() -> None:
+    with pytest.raises(ValueError, match="max_concurrency"):
+        SubAgentScheduler(max_concurrency=0)
+
+
+async def test_queued_runs_start_in_priority_order() -> None:
+    scheduler = SubAgentScheduler(max_concurrency=1)
+    started: list[str] = []
+    positions: dict[str, int] = {}
+    release = asyncio.Event()
+
+    async def run(name: str, priority: int) -> None:
+        async with scheduler.aslot(priority=priority, on_queued=lambda position: positions.__setitem__(name, position)):
+            started.append(name)
+            if name == "first":
+                await release.wait()
+
+    first = asyncio.create_task(run("first", 0))
+    await asyncio.sleep(0)
+    others = [asyncio.create_task(run(name, priority)) for name, priority in [("low", 0), ("high", 5), ("mid", 1)]]
+    await asyncio.sleep(0)
+    assert scheduler.running == 1
+    assert scheduler.queued == 3
+    assert positions == {"low": 1, "high": 1, "mid": 2}
+
+    release.set()
+    await asyncio.gather(first, *others)
+
+    assert started == ["first", "high", "mid", "low"]
+    assert scheduler.running == 0
+
+
+async def test_cancelled_waiter_does_not_leak_slot() -> None:
+    scheduler = SubAgentScheduler(max_concurrency=1)
+    release = asyncio.Event()
+
+    async def hold() -> None:
+        async with scheduler.aslot():
+            await release.wait()
+
+    async def wait() -> None:
+        async with scheduler.aslot():
+            pass
+
+    holder = asyncio.create_task(hold())
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(wait())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    release.set()
+    await holder
+    assert scheduler.running == 0
+    assert scheduler.queued == 0
+
+
+def test_sync_slots_bound_concurrency() -> None:
+    scheduler = SubAgentScheduler(max_concurrency=2)
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def run() -> None:
+        nonlocal active, peak
+        with scheduler.slot():
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+
+    threads = [threading.Thread(target=run) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 2
+    assert scheduler.running == 0
+
+
+async def test_task_tool_reports_scheduling_events() -> None:
+    scheduler = SubAgentScheduler(max_concurrency=1)
+    active = 0
+    peak = 0
+
+    async def subagent(_: dict[str, Any]) -> dict[str, Any]:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return {"messages": [AIMessage(content="done")]}
+
+    middleware = SubAgentMiddleware(
+        backend=StateBackend,
+        subagents=[{"name": "worker", "description": "Does work", "runnable": RunnableLambda(subagent)}],
+        scheduler=scheduler,
+    )
+    task_tool = middleware.tools[0]
+    events: list[dict[str, Any]] = []
+
+    def call(tool_call_id: str) -> Any:  # noqa: ANN401
+        runtime = ToolRuntime(
+            state={"messages": [HumanMessage(content="go")]},
+            context=None,
+            tool_call_id=tool_call_id,
+            store=None,
+            stream_writer=events.append,
+            config={},
+        )
+        return task_tool.coroutine(description="work", subagent_type="worker", runtime=runtime)
+
+    results = await asyncio.gather(call("call_1"), call("call_2"))
+
+    assert peak == 1
+    assert [result.update["messages"][0].content for result in results] == ["done", "done"]
+    statuses = [(event["tool_call_id"], event["status"]) for event in events]
+    assert statuses == [
+        ("call_1", "running"),
+        ("call_2", "queued"),
+        ("call_1", "done"),
+        ("call_2", "running"),
+        ("call_2", "done"),
+    ]
+    assert events[1]["position"] == 1
+
+
+def test_rate_limit_middleware_uses_model_limiter() -> None:
+    limiter = CountingRateLimiter()
+    scheduler = SubAgentScheduler(rate_limits={"fast-model": limiter})
+    middleware = scheduler.rate_limit_middleware()
+
+    def request_for(model_name: str) -> ModelRequest:
+        return ModelRequest(
+            model=MagicMock(model_name=model_name),
+            messages=[],
+            system_message=None,
+            tools=[],
+            runtime=MagicMock(),
+            state={"messages": []},
+        )
+
+    middleware.wrap_model_call(request_for("fast-model"), lambda _: "response")
+    middleware.wrap_model_call(request_for("other-model"), lambda _: "response")
+
+    assert limiter.acquired == 1
@@ -0,0 +1,89 @@
+"""Unit tests for memoized system prompt assembly."""
+
+from typing import Any
+from unittest.mock import MagicMock
+
+from langchain.agents.middleware.types import ModelRequest
+from langchain_core.messages import SystemMessage
+
+from deepagents.backends.state import StateBackend
+from deepagents.middleware.memory import MemoryMiddleware
+from deepagents.middleware.skills import SkillsMiddleware
+from deepagents.middleware.system_prompt import SystemPromptCache
+
+
+def _make_request(state: dict[str, Any], system_message: SystemMessage | None) -> ModelRequest:
+    return ModelRequest(
+        model=MagicMock(),
+        messages=[],
+        system_message=system_message,
+        tools=[],
+        runtime=MagicMock(),
+        state=state,
+    )
+
+
+def test_section_rebuilds_only_when_inputs_change() -> None:
+    cache = SystemPromptCache()
+    calls: list[str] = []
+
+    def build(value: str) -> str:
+        calls.append(value)
+        return f"section {value}"
+
+    assert cache.section(["a"], lambda: build("a")) == "section a"
+    assert cache.section(["a"], lambda: build("a")) == "section a"
+    assert cache.section(["b"], lambda: build("b")) == "section b"
+
+    assert calls == ["a", "b"]
+    assert cache.section_builds == 2
+    assert cache.hits == 1
+
+
+def test_section_detects_inputs_mutated_in_place() -> None:
+    cache = SystemPromptCache()
+    inputs = ["a"]
+
+    assert cache.section(inputs, lambda: f"section {inputs}") == "section ['a']"
+    inputs.append("b")
+
+    assert cache.section(inputs, lambda: f"section {inputs}") == "section ['a', 'b']"
+    assert cache.section_builds == 2
+
+
+def test_memory_middleware_reuses_formatted_section() -> None:
+    middleware = MemoryMiddleware(backend=StateBackend, sources=["/AGENTS.md"])
+    base = SystemMessage(content="base")
+    state = {"messages": [], "memory_contents": {"/AGENTS.md": "remember this"}}
+
+    first = middleware.modify_request(_make_request(state, base)).system_message
+    second = middleware.modify_request(_make_request({**state, "memory_contents": {"/AGENTS.md": "remember this"}}, base)).system_message
+    changed = middleware.modify_request(_make_request({**state, "memory_contents": {"/AGENTS.md": "new memory"}}, base)).system_message
+
+    assert first == second
+    assert "remember this" in first.text
+    assert "new memory" in changed.text
+    assert middleware._prompt_cache.section_builds == 2
+
+
+def test_skills_middleware_reuses_formatted_section() -> None:
+    middleware = SkillsMiddleware(backend=StateBackend, sources=["/skills/"])
+    base = SystemMessage(content="base")
+    skills = [
+        {
+            "name": "web-research",
+            "description": "Research the web",
+            "path": "/skills/web-research/SKILL.md",
+            "license": None,
+            "compatibility": None,
+            "metadata": {},
+            "allowed_tools": [],
+        }
+    ]
+
+    first = middleware.modify_request(_make_request({"messages": [], "skills_metadata": skills}, base)).system_message
+    second = middleware.modify_request(_make_request({"messages": [], "skills_metadata": list(skills)}, base)).system_message
+
+    assert first == second
+    assert "web-research" in first.text
+    assert middleware._prompt_cache.section_builds == 1
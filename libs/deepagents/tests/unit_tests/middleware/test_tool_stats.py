@@ -0,0 +1,139 @@
+"""Unit tests for per-tool latency and result size tracing."""
+
+from pathlib import Path
+from typing import Any
+
+from langchain.agents import create_agent
+from langchain.tools import ToolRuntime
+from langchain.tools.tool_node import ToolCallRequest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableLambda
+from langgraph.types import Command
+
+from deepagents.backends.filesystem import FilesystemBackend
+from deepagents.backends.state import StateBackend
+from deepagents.middleware.filesystem import FilesystemMiddleware
+from deepagents.middleware.subagents import CompiledSubAgent, SubAgentMiddleware
+from deepagents.middleware.tool_stats import TOOL_TRACE_KEY, tool_stats_update
+from tests.unit_tests.chat_model import GenericFakeChatModel
+
+
+def _tool_call(name: str, args: dict[str, Any], call_id: str) -> dict[str, Any]:
+    return {"name": name, "args": args, "id": call_id, "type": "tool_call"}
+
+
+def _request(name: str, call_id: str, events: list[dict[str, Any]]) -> ToolCallRequest:
+    runtime = ToolRuntime(state={"messages": []}, context=None, tool_call_id=call_id, store=None, stream_writer=events.append, config={})
+    return ToolCallRequest(runtime=runtime, tool_call=_tool_call(name, {}, call_id), state=runtime.state, tool=None)
+
+
+def test_agent_traces_tool_calls_and_aggregates_stats(tmp_path: Path) -> None:
+    model = GenericFakeChatModel(
+        messages=iter(
+            [
+                AIMessage(content="", tool_calls=[_tool_call("write_file", {"file_path": "/a.txt", "content": "hello"}, "call_write")]),
+                AIMessage(content="", tool_calls=[_tool_call("read_file", {"file_path": "/a.txt"}, "call_read")]),
+                AIMessage(content="", tool_calls=[_tool_call("read_file", {"file_path": "/missing.txt"}, "call_missing")]),
+                AIMessage(content="done"),
+            ]
+        )
+    )
+    agent = create_agent(model, middleware=[FilesystemMiddleware(backend=FilesystemBackend(root_dir=tmp_path, virtual_mode=True))])
+
+    events = []
+    state: dict[str, Any] = {}
+    for mode, chunk in agent.stream({"messages": [HumanMessage(content="go")]}, stream_mode=["custom", "values"]):
+        if mode == "custom" and chunk.get("type") == TOOL_TRACE_KEY:
+            events.append(chunk)
+        elif mode == "values":
+            state = chunk
+
+    assert [event["tool"] for event in events] == ["write_file", "read_file", "read_file"]
+    for event in events:
+        assert 0 < event["backend_duration"] <= event["duration"]
+        assert event["overhead"] == event["duration"] - event["backend_duration"]
+        assert event["evicted"] is False
+    assert events[1]["result_chars"] > len("hello")
+    read_messages = [message for message in state["messages"] if isinstance(message, ToolMessage) and message.name == "read_file"]
+    assert read_messages[0].response_metadata[TOOL_TRACE_KEY]["tool_call_id"] == "call_read"
+
+    stats = state["tool_stats"]
+    assert stats.keys() == {"write_file", "read_file"}
+    assert stats["read_file"]["calls"] == 2
+    assert stats["write_file"]["calls"] == 1
+    assert stats["read_file"]["result_tokens"] == events[1]["result_tokens"] + events[2]["result_tokens"]
+
+
+def test_eviction_is_traced() -> None:
+    middleware = FilesystemMiddleware(tool_token_limit_before_evict=100)
+    events: list[dict[str, Any]] = []
+    large = ToolMessage(content="x" * 5000, tool_call_id="call_big")
+
+    result = middleware.wrap_tool_call(_request("custom_tool", "call_big", events), lambda _: large)
+
+    assert isinstance(result, Command)
+    (event,) = events
+    assert event["evicted"] is True
+    assert event["result_chars"] == 5000
+    assert event["context_tokens"] < event["result_tokens"]
+    assert result.update["messages"][0].response_metadata[TOOL_TRACE_KEY]["evicted"] is True
+
+
+async def test_task_tool_adds_subagent_details_to_trace() -> None:
+    subagent = RunnableLambda(lambda _: {"messages": [AIMessage(content="a long answer " * 200)]})
+    task_tool = SubAgentMiddleware(
+        backend=StateBackend,
+        subagents=[CompiledSubAgent(name="researcher", description="Researches.", runnable=subagent)],
+        result_token_limit=50,
+    ).tools[0]
+    middleware = FilesystemMiddleware(tool_token_limit_before_evict=None)
+    events: list[dict[str, Any]] = []
+    request = _request("task", "call_task", events)
+
+    async def handler(request: ToolCallRequest) -> ToolMessage | Command:
+        return await task_tool.coroutine(description="Research", subagent_type="researcher", runtime=request.runtime)
+
+    result = await middleware.awrap_tool_call(request, handler)
+
+    assert "/subagent_results/call_task.md" in result.update["files"]
+    (event,) = events
+    assert event["subagent_type"] == "researcher"
+    assert event["cache_hit"] is False
+    assert event["evicted"] is True
+    assert event["result_chars"] == len(("a long answer " * 200).rstrip())
+    assert event["backend_duration"] > 0
+
+
+def test_tool_stats_update_only_counts_results_since_last_model_call() -> None:
+    def traced(call_id: str, tool: str, *, error: bool = False) -> ToolMessage:
+        trace = {
+            "tool": tool,
+            "duration": 0.5,
+            "backend_duration": 0.25,
+            "result_chars": 40,
+            "result_tokens": 10,
+            "context_tokens": 10,
+            "evicted": False,
+            "error": error,
+        }
+        return ToolMessage(content="ok", tool_call_id=call_id, response_metadata={TOOL_TRACE_KEY: trace})
+
+    messages = [traced("old", "ls"), AIMessage(content=""), traced("a", "ls"), traced("b", "ls", error=True), traced("c", "grep")]
+
+    update = tool_stats_update(messages)
+
+    assert update is not None
+    assert update["ls"] == {
+        "calls": 2,
+        "errors": 1,
+        "evictions": 0,
+        "duration": 1.0,
+        "backend_duration": 0.5,
+        "result_chars": 80,
+        "result_tokens": 20,
+        "context_tokens": 20,
+    }
+    assert update["grep"]["calls"] == 1
+    assert tool_stats_update([*messages, AIMessage(content="done")]) is None
+    # Results left at the end of an interrupted turn are not counted again by the next turn
+    assert tool_stats_update([*messages, HumanMessage(content="next")]) is None
@@ -125,6 +125,74 @@ def test_edit_file_single_replacement() -> None:
     assert "hello world" not in full_content, "Old content should be replaced"
 
 
+def test_edit_file_applies_batched_edits() -> None:
+    """Verify that edit_file applies additional `edits` in order, and none of them when one fails."""
+    fake_model = GenericFakeChatModel(
+        messages=iter(
+            [
+                AIMessage(
+                    content="",
+                    tool_calls=[
+                        {
+                            "name": "write_file",
+                            "args": {"file_path": "/code.py", "content": "a = 1\nb = 2\nc = 3"},
+                            "id": "call_write_1",
+                            "type": "tool_call",
+                        },
+                    ],
+                ),
+                AIMessage(
+                    content="",
+                    tool_calls=[
+                        {
+                            "name": "edit_file",
+                            "args": {
+                                "file_path": "/code.py",
+                                "old_string": "a = 1",
+                                "new_string": "a = 10",
+                                "edits": [{"old_string": "missing", "new_string": "x"}],
+                            },
+                            "id": "call_edit_1",
+                            "type": "tool_call",
+                        },
+                    ],
+                ),
+                AIMessage(
+                    content="",
+                    tool_calls=[
+                        {
+                            "name": "edit_file",
+                            "args": {
+                                "file_path": "/code.py",
+                                "old_string": "a = 1",
+                                "new_string": "a = 10",
+                                "edits": [
+                                    {"old_string": "a = 10\nb = 2", "new_string": "a = 10\nb = 20"},
+                                    {"old_string": "c = 3", "new_string": "c = 30"},
+                                ],
+                            },
+                            "id": "call_edit_2",
+                            "type": "tool_call",
+                        },
+                    ],
+                ),
+                AIMessage(content="I have edited the file."),
+            ]
+        )
+    )
+
+    agent = create_deep_agent(model=fake_model, checkpointer=InMemorySaver())
+    result = agent.invoke(
+        {"messages": [HumanMessage(content="Edit the file")]},
+        config={"configurable": {"thread_id": "test_thread_edit_many"}},
+    )
+
+    tool_messages = [msg for msg in result["messages"] if isinstance(msg, ToolMessage) and msg.tool_call_id.startswith("call_edit")]
+    assert "Edit 2 of 2 failed" in tool_messages[0].content
+    assert "Successfully replaced 3 instance(s)" in tool_messages[1].content
+    assert result["files"]["/code.py"]["content"] == ["a = 10", "b = 20", "c = 30"]
+
+
 def test_edit_file_replace_all() -> None:
     """Verify that edit_file with replace_all replaces all occurrences of a string."""
     # Fake model will write a file with repeated content, then edit all occurrences
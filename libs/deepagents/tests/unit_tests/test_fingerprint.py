@@ -0,0 +1,80 @@
+import functools
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_anthropic import ChatAnthropic
+
+from deepagents._fingerprint import fingerprint
+from deepagents.backends import StateBackend
+from deepagents.middleware.filesystem import FilesystemMiddleware
+from deepagents.middleware.summarization import SummarizationMiddleware
+
+
+def _make_backend_factory(root_dir: str):
+    def factory(runtime: object) -> tuple[str, object]:
+        return root_dir, runtime
+
+    return factory
+
+
+def test_containers_compare_by_value() -> None:
+    assert fingerprint({"b": [1, 2], "a": ("x",)}) == fingerprint({"a": ("x",), "b": [1, 2]})
+    assert fingerprint([1, 2]) != fingerprint((1, 2))
+
+
+def test_models_compare_by_configuration() -> None:
+    def make_model(api_key: str = "key", temperature: float = 0.0) -> ChatAnthropic:
+        return ChatAnthropic(model="claude-sonnet-4-5-20250929", api_key=api_key, temperature=temperature)
+
+    assert fingerprint(make_model()) == fingerprint(make_model())
+    assert fingerprint(make_model()) != fingerprint(make_model(temperature=0.5))
+    assert fingerprint(make_model()) != fingerprint(make_model(api_key="other"))
+
+
+class _Recorder(AgentMiddleware):
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+
+def test_functions_compare_by_identity() -> None:
+    factory = _make_backend_factory("/repo")
+
+    assert fingerprint(factory) == fingerprint(factory)
+    assert fingerprint(_make_backend_factory("/repo")) != fingerprint(_make_backend_factory("/repo"))
+
+
+def test_partials_compare_by_function_and_arguments() -> None:
+    assert fingerprint(functools.partial(round, ndigits=2)) == fingerprint(functools.partial(round, ndigits=2))
+    assert fingerprint(functools.partial(round, ndigits=2)) != fingerprint(functools.partial(round, ndigits=3))
+    assert fingerprint(functools.partial(round, ndigits=2)) != fingerprint(functools.partial(abs))
+
+
+def test_summarization_middleware_compares_by_configuration() -> None:
+    model = ChatAnthropic(model_name="claude-sonnet-4-5-20250929", api_key="test")
+
+    def build(keep: int) -> SummarizationMiddleware:
+        return SummarizationMiddleware(model=model, backend=StateBackend, trigger=("tokens", 1000), keep=("messages", keep))
+
+    assert fingerprint(build(10)) == fingerprint(build(10))
+    assert fingerprint(build(10)) != fingerprint(build(20))
+
+
+def test_middleware_ignores_generated_tools_and_caches() -> None:
+    first = FilesystemMiddleware(backend=StateBackend)
+    second = FilesystemMiddleware(backend=StateBackend)
+    assert first.tools[0] is not second.tools[0]
+
+    assert fingerprint(first) == fingerprint(second)
+    assert fingerprint(first) != fingerprint(FilesystemMiddleware(backend=StateBackend, tool_token_limit_before_evict=1))
+
+
+def test_custom_middleware_compares_by_identity() -> None:
+    recorder = _Recorder()
+
+    assert fingerprint(recorder) == fingerprint(recorder)
+    assert fingerprint(_Recorder()) != fingerprint(_Recorder())
+
+
+def test_other_objects_compare_by_identity() -> None:
+    marker = object()
+    assert fingerprint([marker]) == fingerprint([marker])
+    assert fingerprint([marker]) != fingerprint([object()])
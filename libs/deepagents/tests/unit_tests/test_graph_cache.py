@@ -0,0 +1,100 @@
+"""Unit tests for reusing compiled graphs across `create_deep_agent` calls."""
+
+import gc
+import weakref
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_anthropic import ChatAnthropic
+from langchain_core.messages import SystemMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from deepagents.backends import FilesystemBackend, StateBackend
+from deepagents.graph import clear_graph_cache, create_deep_agent, graph_cache_info
+
+
+def _model(temperature: float = 0.0) -> ChatAnthropic:
+    return ChatAnthropic(model_name="claude-sonnet-4-5-20250929", api_key="test", temperature=temperature)
+
+
+def _make_backend_factory(root_dir: str):
+    def factory(_runtime: object) -> FilesystemBackend:
+        return FilesystemBackend(root_dir=root_dir, virtual_mode=True)
+
+    return factory
+
+
+class _Recorder(AgentMiddleware):
+    def __init__(self) -> None:
+        self.calls: list[str] = []
+
+
+def test_equivalent_calls_reuse_the_compiled_graph() -> None:
+    clear_graph_cache()
+    backend = _make_backend_factory("/repo")
+
+    first = create_deep_agent(model=_model(), system_prompt=SystemMessage(content="Be brief."), backend=backend, reuse_graph=True)
+    second = create_deep_agent(model=_model(), system_prompt=SystemMessage(content="Be brief."), backend=backend, reuse_graph=True)
+
+    assert second is first
+    info = graph_cache_info()
+    assert (info.hits, info.misses, info.size) == (1, 1, 1)
+    assert info.build_seconds == info.last_build_seconds > 0
+
+
+def test_different_arguments_build_new_graphs() -> None:
+    clear_graph_cache()
+    backend = _make_backend_factory("/repo")
+    graph = create_deep_agent(model=_model(), backend=backend, reuse_graph=True)
+
+    assert create_deep_agent(model=_model(temperature=0.5), backend=backend, reuse_graph=True) is not graph
+    assert create_deep_agent(model=_model(), backend=backend, interrupt_on={"execute": True}, reuse_graph=True) is not graph
+    assert graph_cache_info().misses == 3
+
+
+def test_backend_factories_compare_by_identity() -> None:
+    clear_graph_cache()
+    graph = create_deep_agent(model=_model(), backend=_make_backend_factory("/repo"), reuse_graph=True)
+
+    assert create_deep_agent(model=_model(), backend=_make_backend_factory("/repo"), reuse_graph=True) is not graph
+
+
+def test_custom_middleware_instances_are_not_shared() -> None:
+    clear_graph_cache()
+    recorder = _Recorder()
+    graph = create_deep_agent(model=_model(), backend=StateBackend, middleware=[recorder], reuse_graph=True)
+
+    assert create_deep_agent(model=_model(), backend=StateBackend, middleware=[recorder], reuse_graph=True) is graph
+    assert create_deep_agent(model=_model(), backend=StateBackend, middleware=[_Recorder()], reuse_graph=True) is not graph
+
+
+def test_backend_instances_compare_by_identity() -> None:
+    clear_graph_cache()
+    backend = FilesystemBackend(root_dir="/repo", virtual_mode=True)
+
+    graph = create_deep_agent(model=_model(), backend=backend, reuse_graph=True)
+
+    assert create_deep_agent(model=_model(), backend=backend, reuse_graph=True) is graph
+    assert create_deep_agent(model=_model(), backend=FilesystemBackend(root_dir="/repo", virtual_mode=True), reuse_graph=True) is not graph
+
+
+def test_reuse_graph_false_always_builds() -> None:
+    clear_graph_cache()
+    graph = create_deep_agent(model=_model(), backend=StateBackend, reuse_graph=True)
+
+    assert create_deep_agent(model=_model(), backend=StateBackend, reuse_graph=False) is not graph
+    info = graph_cache_info()
+    assert (info.hits, info.misses, info.size) == (0, 2, 1)
+
+
+def test_graphs_are_not_cached_by_default() -> None:
+    clear_graph_cache()
+    checkpointer = InMemorySaver()
+    collected = weakref.ref(checkpointer)
+
+    graph = create_deep_agent(model=_model(), backend=StateBackend, checkpointer=checkpointer)
+
+    assert create_deep_agent(model=_model(), backend=StateBackend, checkpointer=checkpointer) is not graph
+    assert graph_cache_info().size == 0
+    del graph, checkpointer
+    gc.collect()
+    assert collected() is None
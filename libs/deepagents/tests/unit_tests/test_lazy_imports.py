@@ -0,0 +1,29 @@
+"""Unit tests for the lazy public names of the `deepagents` packages."""
+
+import importlib
+
+import pytest
+
+import deepagents
+import deepagents.backends
+import deepagents.middleware
+
+
+@pytest.mark.parametrize("package", [deepagents, deepagents.backends, deepagents.middleware], ids=lambda package: package.__name__)
+def test_all_public_names_resolve(package: object) -> None:
+    for name in package.__all__:
+        assert getattr(package, name) is not None
+    assert set(package.__all__) <= set(dir(package))
+
+
+def test_lazy_names_are_the_submodule_objects() -> None:
+    graph = importlib.import_module("deepagents.graph")
+
+    assert deepagents.create_deep_agent is graph.create_deep_agent
+    assert "create_deep_agent" in vars(deepagents)
+    assert deepagents.backends.StateBackend is importlib.import_module("deepagents.backends.state").StateBackend
+
+
+def test_unknown_name_raises_attribute_error() -> None:
+    with pytest.raises(AttributeError, match="has no attribute 'missing'"):
+        _ = deepagents.backends.missing
@@ -1,3 +1,4 @@
+import hashlib
 import time
 from unittest.mock import patch
 
@@ -1179,6 +1180,111 @@ class TestFilesystemMiddleware:
         assert "'type': 'text'" in file_text
         assert "'type': 'image'" in file_text
 
+    def test_intercept_dedupe_uses_content_addressed_path(self):
+        """Test that deduplication stores results by content hash and records an alias."""
+        middleware = FilesystemMiddleware(tool_token_limit_before_evict=1000, dedupe_large_tool_results=True)
+        state = FilesystemState(messages=[], files={})
+        runtime = ToolRuntime(state=state, context=None, tool_call_id="call_a", store=None, stream_writer=lambda _: None, config={})
+
+        large_content = "x" * 5000
+        result = middleware._intercept_large_tool_result(ToolMessage(content=large_content, tool_call_id="call_a"), runtime)
+
+        expected_path = f"/large_tool_results/sha256_{hashlib.sha256(large_content.encode()).hexdigest()}"
+        assert isinstance(result, Command)
+        assert list(result.update["files"]) == [expected_path]
+        assert result.update["large_tool_result_aliases"] == {"call_a": expected_path}
+        assert expected_path in result.update["messages"][0].content
+
+    def test_intercept_dedupe_skips_write_for_known_content(self):
+        """Test that identical results evicted earlier in the thread are not written again."""
+        middleware = FilesystemMiddleware(tool_token_limit_before_evict=1000, dedupe_large_tool_results=True)
+        large_content = "x" * 5000
+        state = FilesystemState(messages=[], files={})
+        runtime = ToolRuntime(state=state, context=None, tool_call_id="call_a", store=None, stream_writer=lambda _: None, config={})
+        first = middleware._intercept_large_tool_result(ToolMessage(content=large_content, tool_call_id="call_a"), runtime)
+        content_path = first.update["large_tool_result_aliases"]["call_a"]
+
+        state = FilesystemState(messages=[], files=first.update["files"], large_tool_result_aliases=first.update["large_tool_result_aliases"])
+        runtime = ToolRuntime(state=state, context=None, tool_call_id="call_b", store=None, stream_writer=lambda _: None, config={})
+        second = middleware._intercept_large_tool_result(ToolMessage(content=large_content, tool_call_id="call_b"), runtime)
+
+        assert isinstance(second, Command)
+        assert "files" not in second.update
+        assert second.update["large_tool_result_aliases"] == {"call_b": content_path}
+        assert content_path in second.update["messages"][0].content
+
+    def test_intercept_dedupe_command_with_repeated_content(self):
+        """Test that repeated content within a single Command is written once."""
+        middleware = FilesystemMiddleware(tool_token_limit_before_evict=1000, dedupe_large_tool_results=True)
+        state = FilesystemState(messages=[], files={})
+        runtime = ToolRuntime(state=state, context=None, tool_call_id="call_a", store=None, stream_writer=lambda _: None, config={})
+
+        large_content = "y" * 5000
+        messages = [ToolMessage(content=large_content, tool_call_id="call_a"), ToolMessage(content=large_content, tool_call_id="call_b")]
+        result = middleware._intercept_large_tool_result(Command(update={"messages": messages}), runtime)
+
+        assert isinstance(result, Command)
+        assert len(result.update["files"]) == 1
+        aliases = result.update["large_tool_result_aliases"]
+        assert set(aliases) == {"call_a", "call_b"}
+        assert aliases["call_a"] == aliases["call_b"]
+
+    def test_after_agent_releases_unreferenced_results(self):
+        """Test that files are deleted only once no live tool call references them."""
+        middleware = FilesystemMiddleware(dedupe_large_tool_results=True)
+        file_data = FileData(content=["data"], created_at="2021-01-01", modified_at="2021-01-01")
+        state = FilesystemState(
+            messages=[ToolMessage(content="evicted", tool_call_id="call_live")],
+            files={"/large_tool_results/sha256_shared": file_data, "/large_tool_results/sha256_dead": file_data},
+            large_tool_result_aliases={
+                "call_live": "/large_tool_results/sha256_shared",
+                "call_gone": "/large_tool_results/sha256_shared",
+                "call_dead": "/large_tool_results/sha256_dead",
+            },
+        )
+
+        update = middleware.after_agent(state, None)
+
+        assert update == {
+            "large_tool_result_aliases": {"call_gone": None, "call_dead": None},
+            "files": {"/large_tool_results/sha256_dead": None},
+        }
+
+    def test_evicted_result_is_readable_after_summarization(self):
+        """Test that a summary mentioning an evicted result keeps it readable."""
+        middleware = FilesystemMiddleware(tool_token_limit_before_evict=1000, dedupe_large_tool_results=True)
+        runtime = ToolRuntime(
+            state=FilesystemState(messages=[], files={}), context=None, tool_call_id="call_a", store=None, stream_writer=lambda _: None, config={}
+        )
+        large_content = "\n".join(f"line {i}" for i in range(1000))
+        evicted = middleware._intercept_large_tool_result(ToolMessage(content=large_content, tool_call_id="call_a"), runtime)
+        path = evicted.update["large_tool_result_aliases"]["call_a"]
+
+        # Summarization replaced the tool messages with a summary that points at the file
+        summary = HumanMessage(content=f"Summary: the search results were saved to {path}.")
+        state = FilesystemState(
+            messages=[summary], files=evicted.update["files"], large_tool_result_aliases=evicted.update["large_tool_result_aliases"]
+        )
+        assert middleware.after_agent(state, None) is None
+
+        event_state = {**state, "messages": [], "_summarization_event": {"cutoff_index": 1, "summary_message": summary, "file_path": None}}
+        assert middleware.after_agent(event_state, None) is None
+
+        read_file_tool = next(tool for tool in middleware.tools if tool.name == "read_file")
+        read_runtime = ToolRuntime(state=state, context=None, tool_call_id="call_read", store=None, stream_writer=lambda _: None, config={})
+        result = read_file_tool.invoke({"file_path": path, "runtime": read_runtime, "limit": 5})
+        assert "line 0" in result
+
+    def test_after_agent_noop_without_dedupe(self):
+        """Test that cleanup does nothing when deduplication is disabled or nothing is stale."""
+        state = FilesystemState(
+            messages=[ToolMessage(content="evicted", tool_call_id="call_a")],
+            files={},
+            large_tool_result_aliases={"call_a": "/large_tool_results/sha256_a"},
+        )
+        assert FilesystemMiddleware().after_agent(state, None) is None
+        assert FilesystemMiddleware(dedupe_large_tool_results=True).after_agent(state, None) is None
+
     def test_read_file_image_returns_standard_image_content_block(self):
         """Test image reads return standard image blocks with base64 + mime_type."""
 
@@ -1521,15 +1627,7 @@ class TestPatchToolCallsMiddleware:
         ]
         middleware = PatchToolCallsMiddleware()
         state_update = middleware.before_agent({"messages": input_messages}, None)
-        assert state_update is not None
-        assert isinstance(state_update["messages"], Overwrite)
-        patched_messages = state_update["messages"].value
-        assert len(patched_messages) == 2
-        assert patched_messages[0].type == "system"
-        assert patched_messages[0].content == "You are a helpful assistant."
-        assert patched_messages[1].type == "human"
-        assert patched_messages[1].content == "Hello, how are you?"
-        assert patched_messages[1].id == "2"
+        assert state_update == {"_patch_tool_calls_watermark": {"index": 2, "message_id": "2"}}
 
     def test_missing_tool_call(self) -> None:
         input_messages = [
@@ -1577,23 +1675,7 @@ class TestPatchToolCallsMiddleware:
         ]
         middleware = PatchToolCallsMiddleware()
         state_update = middleware.before_agent({"messages": input_messages}, None)
-        assert state_update is not None
-        assert isinstance(state_update["messages"], Overwrite)
-        patched_messages = state_update["messages"].value
-        assert len(patched_messages) == 5
-        assert patched_messages[0].type == "system"
-        assert patched_messages[0].content == "You are a helpful assistant."
-        assert patched_messages[1].type == "human"
-        assert patched_messages[1].content == "Hello, how are you?"
-        assert patched_messages[2].type == "ai"
-        assert len(patched_messages[2].tool_calls) == 1
-        assert patched_messages[2].tool_calls[0]["id"] == "123"
-        assert patched_messages[2].tool_calls[0]["name"] == "get_events_for_days"
-        assert patched_messages[2].tool_calls[0]["args"] == {"date_str": "2025-01-01"}
-        assert patched_messages[3].type == "tool"
-        assert patched_messages[3].tool_call_id == "123"
-        assert patched_messages[4].type == "human"
-        assert patched_messages[4].content == "What is the weather in Tokyo?"
+        assert state_update == {"_patch_tool_calls_watermark": {"index": 5, "message_id": "5"}}
 
     def test_two_missing_tool_calls(self) -> None:
         input_messages = [
@@ -1643,6 +1725,51 @@ class TestPatchToolCallsMiddleware:
         assert patched_messages[7].type == "human"
         assert patched_messages[7].content == "What is the weather in Tokyo?"
 
+    def test_only_messages_after_watermark_are_checked(self) -> None:
+        dangling = AIMessage(content="", tool_calls=[ToolCall(id="old", name="ls", args={})], id="1")
+        input_messages = [dangling, HumanMessage(content="Hello", id="2")]
+        middleware = PatchToolCallsMiddleware()
+        watermark = {"index": 2, "message_id": "2"}
+
+        # Nothing was added since the last check
+        assert middleware.before_agent({"messages": input_messages, "_patch_tool_calls_watermark": watermark}, None) is None
+
+        # Messages before the watermark are not checked again
+        input_messages.append(HumanMessage(content="Still there?", id="3"))
+        state_update = middleware.before_agent({"messages": input_messages, "_patch_tool_calls_watermark": watermark}, None)
+        assert state_update == {"_patch_tool_calls_watermark": {"index": 3, "message_id": "3"}}
+
+    def test_rewritten_history_is_checked_again(self) -> None:
+        input_messages = [
+            AIMessage(content="", tool_calls=[ToolCall(id="123", name="ls", args={})], id="1"),
+            HumanMessage(content="Hello", id="2"),
+        ]
+        middleware = PatchToolCallsMiddleware()
+        watermark = {"index": 2, "message_id": "other"}
+
+        state_update = middleware.before_agent({"messages": input_messages, "_patch_tool_calls_watermark": watermark}, None)
+
+        assert state_update is not None
+        patched_messages = state_update["messages"].value
+        assert [msg.type for msg in patched_messages] == ["ai", "tool", "human"]
+        assert patched_messages[1].tool_call_id == "123"
+        assert state_update["_patch_tool_calls_watermark"] == {"index": 3, "message_id": "2"}
+
+    def test_watermark_is_kept_across_turns(self) -> None:
+        messages = [
+            AIMessage(content="", tool_calls=[ToolCall(id="123", name="ls", args={})], id="1"),
+            HumanMessage(content="Hello", id="2"),
+        ]
+        middleware = PatchToolCallsMiddleware()
+        state_update = middleware.before_agent({"messages": messages}, None)
+        assert state_update is not None
+        patched_messages = state_update["messages"].value
+        state = {"messages": [*patched_messages, HumanMessage(content="Next", id="3")], **{k: v for k, v in state_update.items() if k != "messages"}}
+
+        state_update = middleware.before_agent(state, None)
+
+        assert state_update == {"_patch_tool_calls_watermark": {"index": 4, "message_id": "3"}}
+
 
 class TestTruncation:
     def test_truncate_list_result_no_truncation(self):
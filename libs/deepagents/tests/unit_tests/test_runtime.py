@@ -0,0 +1,225 @@
+"""Unit tests for serving many tenants from one graph with `DeepAgentRuntime`."""
+
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+import pytest
+from langchain.agents.middleware import AgentMiddleware
+from langchain.agents.middleware.types import ModelRequest, ModelResponse
+from langchain_core.messages import AIMessage, HumanMessage
+
+from deepagents.backends import FilesystemBackend
+from deepagents.runtime import DeepAgentRuntime, QuotaExceededError, TenantQuota
+from tests.unit_tests.chat_model import GenericFakeChatModel
+
+
+def _write(content: str, call_id: str) -> AIMessage:
+    return AIMessage(
+        content="",
+        tool_calls=[{"name": "write_file", "args": {"file_path": f"/{call_id}.txt", "content": content}, "id": call_id, "type": "tool_call"}],
+    )
+
+
+def _replies(count: int) -> GenericFakeChatModel:
+    return GenericFakeChatModel(messages=iter([AIMessage(content="done")] * count))
+
+
+class PeakConcurrencyMiddleware(AgentMiddleware):
+    """Record the most model calls in flight at once."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.active = 0
+        self.peak = 0
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> ModelResponse:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(0.01)
+            return await handler(request)
+        finally:
+            self.active -= 1
+
+
+async def test_tenants_share_a_graph_with_isolated_threads_and_pooled_backends(tmp_path: Path) -> None:
+    created: list[str] = []
+
+    def tenant_backend(tenant: str) -> FilesystemBackend:
+        created.append(tenant)
+        return FilesystemBackend(root_dir=tmp_path / tenant, virtual_mode=True)
+
+    model = GenericFakeChatModel(
+        messages=iter(
+            [
+                _write("acme 1", "a1"),
+                AIMessage(content="ok"),
+                _write("globex", "g1"),
+                AIMessage(content="ok"),
+                _write("acme 2", "a2"),
+                AIMessage(content="ok"),
+            ]
+        )
+    )
+    runtime = DeepAgentRuntime(model=model, tenant_backend=tenant_backend)
+
+    await runtime.ainvoke("acme", "main", {"messages": [HumanMessage(content="first")]})
+    await runtime.ainvoke("globex", "main", {"messages": [HumanMessage(content="second")]})
+    await runtime.ainvoke("acme", "main", {"messages": [HumanMessage(content="third")]})
+
+    assert created == ["acme", "globex"]
+    assert (tmp_path / "acme" / "a1.txt").read_text() == "acme 1"
+    assert (tmp_path / "acme" / "a2.txt").read_text() == "acme 2"
+    assert sorted(path.name for path in (tmp_path / "globex").iterdir()) == ["g1.txt"]
+
+    acme = await runtime.aget_state("acme", "main")
+    globex = await runtime.aget_state("globex", "main")
+    assert [message.text for message in acme["messages"] if isinstance(message, HumanMessage)] == ["first", "third"]
+    assert [message.text for message in globex["messages"] if isinstance(message, HumanMessage)] == ["second"]
+    stats = runtime.stats()
+    assert (stats.completed, stats.pooled_backends, stats.active_by_tenant) == (3, 2, {})
+
+
+async def test_thread_ids_do_not_collide_across_tenants() -> None:
+    runtime = DeepAgentRuntime(model=_replies(2))
+
+    await runtime.ainvoke("a:b", "c", {"messages": [HumanMessage(content="first")]})
+    await runtime.ainvoke("a", "b:c", {"messages": [HumanMessage(content="second")]})
+
+    first = await runtime.aget_state("a:b", "c")
+    second = await runtime.aget_state("a", "b:c")
+    assert [message.text for message in first["messages"] if isinstance(message, HumanMessage)] == ["first"]
+    assert [message.text for message in second["messages"] if isinstance(message, HumanMessage)] == ["second"]
+
+
+async def test_slow_tenant_backend_does_not_block_other_tenants(tmp_path: Path) -> None:
+    release = threading.Event()
+    created: list[str] = []
+
+    def tenant_backend(tenant: str) -> FilesystemBackend:
+        if tenant == "slow":
+            release.wait(timeout=10)
+        created.append(tenant)
+        return FilesystemBackend(root_dir=tmp_path / tenant, virtual_mode=True)
+
+    runtime = DeepAgentRuntime(model=_replies(3), tenant_backend=tenant_backend)
+    payload: dict[str, Any] = {"messages": [HumanMessage(content="hi")]}
+
+    slow = asyncio.create_task(runtime.ainvoke("slow", "main", payload))
+    await asyncio.sleep(0.05)
+    await asyncio.wait_for(asyncio.gather(runtime.ainvoke("fast", "a", payload), runtime.ainvoke("fast", "b", payload)), timeout=5)
+    assert created == ["fast"]
+
+    release.set()
+    await slow
+    assert created == ["fast", "slow"]
+
+
+async def test_max_concurrency_bounds_running_requests() -> None:
+    peak = PeakConcurrencyMiddleware()
+    runtime = DeepAgentRuntime(model=_replies(6), middleware=[peak], max_concurrency=2)
+
+    await asyncio.gather(*(runtime.ainvoke(f"tenant-{i % 3}", f"thread-{i}", {"messages": [HumanMessage(content="hi")]}) for i in range(6)))
+
+    assert peak.peak == 2
+    assert runtime.stats().completed == 6
+
+
+async def test_quotas_reject_requests_over_the_tenant_limits() -> None:
+    runtime = DeepAgentRuntime(
+        model=_replies(4),
+        middleware=[PeakConcurrencyMiddleware()],
+        default_quota=TenantQuota(max_concurrent_requests=1),
+        quotas={"small": TenantQuota(requests_per_minute=1)},
+    )
+    payload: dict[str, Any] = {"messages": [HumanMessage(content="hi")]}
+
+    results = await asyncio.gather(runtime.ainvoke("acme", "a", payload), runtime.ainvoke("acme", "b", payload), return_exceptions=True)
+    assert isinstance(results[1], QuotaExceededError)
+    assert "concurrent requests" in results[1].reason
+
+    await runtime.ainvoke("small", "a", payload)
+    with pytest.raises(QuotaExceededError, match="requests per minute"):
+        await runtime.ainvoke("small", "b", payload)
+    # Other tenants keep their own quota
+    await runtime.ainvoke("acme", "c", payload)
+
+    stats = runtime.stats()
+    assert (stats.completed, stats.rejected) == (3, 2)
+
+
+class ClosingBackend(FilesystemBackend):
+    """FilesystemBackend that records when it is closed."""
+
+    def __init__(self, root_dir: Path) -> None:
+        super().__init__(root_dir=root_dir, virtual_mode=True)
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class GateMiddleware(AgentMiddleware):
+    """Hold model calls until `release` is set."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def awrap_model_call(
+        self,
+        request: ModelRequest,
+        handler: Callable[[ModelRequest], Awaitable[ModelResponse]],
+    ) -> ModelResponse:
+        self.started.set()
+        await self.release.wait()
+        return await handler(request)
+
+
+async def test_aclose_closes_backends_of_running_requests_when_they_finish(tmp_path: Path) -> None:
+    backends: dict[str, ClosingBackend] = {}
+
+    def tenant_backend(tenant: str) -> ClosingBackend:
+        backends[tenant] = ClosingBackend(tmp_path / tenant)
+        return backends[tenant]
+
+    gate = GateMiddleware()
+    runtime = DeepAgentRuntime(model=_replies(2), middleware=[gate], tenant_backend=tenant_backend)
+    payload: dict[str, Any] = {"messages": [HumanMessage(content="hi")]}
+    gate.release.set()
+    await runtime.ainvoke("idle", "main", payload)
+    gate.release.clear()
+
+    running = asyncio.create_task(runtime.ainvoke("busy", "main", payload))
+    await asyncio.wait_for(gate.started.wait(), timeout=5)
+    await runtime.aclose()
+    assert backends["idle"].closed
+    assert not backends["busy"].closed
+
+    gate.release.set()
+    await asyncio.wait_for(running, timeout=5)
+    assert backends["busy"].closed
+    assert runtime.stats().pooled_backends == 0
+
+
+async def test_usage_of_idle_tenants_is_dropped() -> None:
+    runtime = DeepAgentRuntime(model=_replies(3), quotas={"limited": TenantQuota(requests_per_minute=10)})
+    payload: dict[str, Any] = {"messages": [HumanMessage(content="hi")]}
+
+    await runtime.ainvoke("a", "main", payload)
+    await runtime.ainvoke("b", "main", payload)
+    await runtime.ainvoke("limited", "main", payload)
+    # Starts within the rate window are kept until they expire
+    assert set(runtime._usage) == {"limited"}
+
+    runtime._prune_usage(time.monotonic() + 60)
+    assert runtime._usage == {}
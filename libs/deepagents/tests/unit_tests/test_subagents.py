@@ -5,13 +5,18 @@ are invoked, how they return results, and how state is managed between parent
 and child agents.
 """
 
+import threading
+import time
 import warnings
+from collections import OrderedDict
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, TypedDict
 
 import pytest
 from langchain.agents import create_agent
-from langchain.agents.middleware import TodoListMiddleware
+from langchain.agents.middleware import AgentMiddleware, TodoListMiddleware
 from langchain.agents.structured_output import ToolStrategy
 from langchain.tools import ToolRuntime
 from langchain_core.messages import AIMessage, HumanMessage
@@ -19,12 +24,17 @@ from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langchain_core.tools import tool
 from langgraph.checkpoint.memory import InMemorySaver
 from langgraph.graph import END, START, StateGraph
+from langgraph.types import Interrupt
 from pydantic import BaseModel, Field
 
 from deepagents.backends.filesystem import FilesystemBackend
+from deepagents.backends.state import StateBackend
 from deepagents.graph import create_deep_agent
+from deepagents.middleware import subagents as subagents_module
 from deepagents.middleware.skills import SkillsMiddleware
+from deepagents.middleware.subagent_cache import SubAgentResultCache
 from deepagents.middleware.subagents import CompiledSubAgent, SubAgent, SubAgentMiddleware
+from deepagents.tokens import CachedTokenEstimator
 from tests.unit_tests.chat_model import GenericFakeChatModel
 
 
@@ -1550,6 +1560,361 @@ class TestSubAgents:
         subagent_state = captured_subagent_states[0]
         assert "skills_metadata" not in subagent_state, "Subagent without skills parameter should NOT have skills_metadata"
 
+    def test_subagent_returns_only_changed_state(self) -> None:
+        """Test that only the files and keys a subagent changed are merged back into the parent."""
+        kept = {"content": ["keep"], "created_at": "t0", "modified_at": "t0"}
+        removed = {"content": ["remove"], "created_at": "t0", "modified_at": "t0"}
+        created = {"content": ["new"], "created_at": "t1", "modified_at": "t1"}
+
+        def lambda_subagent(state: dict[str, Any]) -> dict[str, Any]:
+            files = {path: data for path, data in state["files"].items() if path != "/removed.txt"}
+            return {
+                "messages": [AIMessage(content="done")],
+                "files": {**files, "/created.txt": created},
+                "notes": state["notes"],
+                "status": "finished",
+            }
+
+        middleware = SubAgentMiddleware(
+            backend=StateBackend,
+            subagents=[CompiledSubAgent(name="writer", description="Writes files.", runnable=RunnableLambda(lambda_subagent))],
+        )
+        runtime = ToolRuntime(
+            state={
+                "messages": [HumanMessage(content="go")],
+                "files": {"/kept.txt": kept, "/removed.txt": removed},
+                "notes": ["unchanged"],
+            },
+            context=None,
+            tool_call_id="call_writer",
+            store=None,
+            stream_writer=lambda _: None,
+            config={},
+        )
+
+        result = middleware.tools[0].func(description="write", subagent_type="writer", runtime=runtime)
+
+        assert result.update["files"] == {"/created.txt": created, "/removed.txt": None}
+        assert result.update["status"] == "finished"
+        assert "notes" not in result.update
+
+    def test_subagent_state_keys_limit_input_state(self) -> None:
+        """Test that `state_keys` restricts the parent state handed to a subagent."""
+        received_states: list[dict[str, Any]] = []
+
+        def lambda_subagent(state: dict[str, Any]) -> dict[str, Any]:
+            received_states.append(state)
+            return {"messages": [AIMessage(content="done")]}
+
+        middleware = SubAgentMiddleware(
+            backend=StateBackend,
+            subagents=[
+                CompiledSubAgent(name="reader", description="Reads notes.", runnable=RunnableLambda(lambda_subagent), state_keys=["notes"]),
+            ],
+        )
+        runtime = ToolRuntime(
+            state={"messages": [], "files": {"/big.txt": {"content": ["x"], "created_at": "t0", "modified_at": "t0"}}, "notes": ["n"]},
+            context=None,
+            tool_call_id="call_reader",
+            store=None,
+            stream_writer=lambda _: None,
+            config={},
+        )
+
+        middleware.tools[0].func(description="read", subagent_type="reader", runtime=runtime)
+
+        assert set(received_states[0]) == {"messages", "notes"}
+
+    def test_subagent_graphs_compiled_lazily_and_shared(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that subagent graphs compile on the first task call and are reused by equivalent agents."""
+        compiled: list[str] = []
+        original_create_agent = subagents_module.create_agent
+
+        def counting_create_agent(**kwargs: Any) -> Any:  # noqa: ANN401
+            compiled.append(kwargs["name"])
+            return original_create_agent(**kwargs)
+
+        monkeypatch.setattr(subagents_module, "create_agent", counting_create_agent)
+        monkeypatch.setattr(subagents_module, "_COMPILED_SUBAGENTS", OrderedDict())
+
+        worker_model = GenericFakeChatModel(messages=iter([AIMessage(content="first"), AIMessage(content="second")]))
+        task_call = {"name": "task", "args": {"description": "Work", "subagent_type": "worker"}, "id": "call_worker", "type": "tool_call"}
+        main_model = GenericFakeChatModel(
+            messages=iter(
+                [
+                    AIMessage(content="", tool_calls=[task_call]),
+                    AIMessage(content="Done."),
+                    AIMessage(content="", tool_calls=[task_call]),
+                    AIMessage(content="Done again."),
+                ]
+            )
+        )
+        worker: SubAgent = {"name": "worker", "description": "Does work.", "system_prompt": "Work.", "model": worker_model}
+
+        first = create_deep_agent(model=main_model, subagents=[worker], reuse_graph=True)
+        second = create_deep_agent(model=main_model, subagents=[worker], checkpointer=InMemorySaver(), reuse_graph=True)
+        assert second is not first
+        assert compiled == []
+
+        first.invoke({"messages": [HumanMessage(content="Go")]})
+        assert compiled == ["worker"]
+
+        result = second.invoke({"messages": [HumanMessage(content="Go again")]}, {"configurable": {"thread_id": "second"}})
+
+        assert compiled == ["worker"]
+        assert result["messages"][2].content == "second"
+
+    def test_subagents_with_distinct_custom_middleware_are_not_shared(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that subagent specs with different custom middleware instances compile separately."""
+
+        class Recorder(AgentMiddleware):
+            def __init__(self) -> None:
+                self.calls: list[str] = []
+
+        monkeypatch.setattr(subagents_module, "_COMPILED_SUBAGENTS", OrderedDict())
+        model = GenericFakeChatModel(messages=iter([]))
+        shared = Recorder()
+
+        def build(recorder: Recorder) -> Any:  # noqa: ANN401
+            spec: SubAgent = {
+                "name": "worker",
+                "description": "Work.",
+                "system_prompt": "Work.",
+                "model": model,
+                "tools": [],
+                "middleware": [recorder],
+            }
+            return SubAgentMiddleware(backend=StateBackend, subagents=[spec], reuse_graphs=True)._get_subagents()[0]["build"]()
+
+        assert build(shared) is build(shared)
+        assert build(Recorder()) is not build(Recorder())
+
+    def test_subagent_graphs_are_not_shared_by_default(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that subagent graphs stay out of the process-wide cache unless reuse is enabled."""
+        cache: OrderedDict = OrderedDict()
+        monkeypatch.setattr(subagents_module, "_COMPILED_SUBAGENTS", cache)
+        spec: SubAgent = {
+            "name": "worker",
+            "description": "Work.",
+            "system_prompt": "Work.",
+            "model": GenericFakeChatModel(messages=iter([])),
+            "tools": [],
+        }
+        middleware = SubAgentMiddleware(backend=StateBackend, subagents=[spec])
+
+        build = middleware._get_subagents()[0]["build"]
+
+        assert build() is not build()
+        assert not cache
+
+    def test_concurrent_first_calls_compile_once(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that parallel first `task` calls for a subagent type share one compilation."""
+        compiled: list[str] = []
+        original_create_agent = subagents_module.create_agent
+
+        def slow_create_agent(**kwargs: Any) -> Any:  # noqa: ANN401
+            compiled.append(kwargs["name"])
+            time.sleep(0.05)
+            return original_create_agent(**kwargs)
+
+        monkeypatch.setattr(subagents_module, "create_agent", slow_create_agent)
+        model = GenericFakeChatModel(messages=iter([AIMessage(content=f"done {i}") for i in range(4)]))
+        spec: SubAgent = {"name": "worker", "description": "Work.", "system_prompt": "Work.", "model": model, "tools": []}
+        task = SubAgentMiddleware(backend=StateBackend, subagents=[spec]).tools[0].func
+
+        def run(i: int) -> Any:  # noqa: ANN401
+            runtime = ToolRuntime(state={"messages": []}, context=None, tool_call_id=f"call_{i}", store=None, stream_writer=None, config={})
+            return task(description="Work", subagent_type="worker", runtime=runtime)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(run, range(4)))
+
+        assert compiled == ["worker"]
+        assert len(results) == 4
+
+    async def test_async_task_compiles_off_the_event_loop(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that `atask` compiles a subagent in a worker thread."""
+        threads: list[int] = []
+        original_create_agent = subagents_module.create_agent
+
+        def recording_create_agent(**kwargs: Any) -> Any:  # noqa: ANN401
+            threads.append(threading.get_ident())
+            return original_create_agent(**kwargs)
+
+        monkeypatch.setattr(subagents_module, "create_agent", recording_create_agent)
+        model = GenericFakeChatModel(messages=iter([AIMessage(content="done")]))
+        spec: SubAgent = {"name": "worker", "description": "Work.", "system_prompt": "Work.", "model": model, "tools": []}
+        task = SubAgentMiddleware(backend=StateBackend, subagents=[spec]).tools[0].coroutine
+        runtime = ToolRuntime(state={"messages": []}, context=None, tool_call_id="call_1", store=None, stream_writer=None, config={})
+
+        result = await task(description="Work", subagent_type="worker", runtime=runtime)
+
+        assert result.update["messages"][0].content == "done"
+        assert len(threads) == 1
+        assert threads[0] != threading.get_ident()
+
+    def test_cache_hits_do_not_compile_the_subagent(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a `task` call served from the result cache skips compiling the subagent."""
+        compiled: list[str] = []
+        original_create_agent = subagents_module.create_agent
+
+        def counting_create_agent(**kwargs: Any) -> Any:  # noqa: ANN401
+            compiled.append(kwargs["name"])
+            return original_create_agent(**kwargs)
+
+        monkeypatch.setattr(subagents_module, "create_agent", counting_create_agent)
+        cache = SubAgentResultCache()
+        model = GenericFakeChatModel(messages=iter([AIMessage(content="answer")]))
+        spec: SubAgent = {"name": "worker", "description": "Work.", "system_prompt": "Work.", "model": model, "tools": []}
+
+        def run(tool_call_id: str) -> Any:  # noqa: ANN401
+            # A fresh middleware per call, as for a new agent sharing the cache
+            task = SubAgentMiddleware(backend=StateBackend, subagents=[spec], result_cache=cache).tools[0].func
+            runtime = ToolRuntime(
+                state={"messages": []},
+                context=None,
+                tool_call_id=tool_call_id,
+                store=None,
+                stream_writer=None,
+                config={"configurable": {"thread_id": "thread-1"}},
+            )
+            return task(description="Work", subagent_type="worker", runtime=runtime)
+
+        first = run("call_1")
+        second = run("call_2")
+
+        assert compiled == ["worker"]
+        assert second.update["messages"][0].content == first.update["messages"][0].content == "answer"
+        assert second.update["messages"][0].response_metadata["subagent_cache"]["hit"] is True
+
+    def test_task_streams_subagent_progress(self) -> None:
+        """Test that a running subagent's steps are forwarded as custom stream events."""
+
+        @tool
+        def lookup(query: str) -> str:
+            """Look up a query."""
+            return f"found {query}"
+
+        worker_model = GenericFakeChatModel(
+            messages=iter(
+                [
+                    AIMessage(
+                        content="Searching",
+                        tool_calls=[{"name": "lookup", "args": {"query": "x"}, "id": "call_lookup", "type": "tool_call"}],
+                    ),
+                    AIMessage(content="Found x"),
+                ]
+            )
+        )
+        middleware = SubAgentMiddleware(
+            backend=StateBackend,
+            subagents=[CompiledSubAgent(name="worker", description="Looks things up.", runnable=create_agent(worker_model, tools=[lookup]))],
+        )
+        events: list[dict[str, Any]] = []
+        runtime = ToolRuntime(
+            state={"messages": []},
+            context=None,
+            tool_call_id="call_task",
+            store=None,
+            stream_writer=events.append,
+            config={},
+        )
+
+        result = middleware.tools[0].func(description="Find x", subagent_type="worker", runtime=runtime)
+
+        assert result.update["messages"][0].content == "Found x"
+        assert all(event["type"] == "subagent_progress" and event["tool_call_id"] == "call_task" for event in events)
+        assert [(event["event"], event.get("text") or event.get("name")) for event in events] == [
+            ("text", "Searching"),
+            ("tool_call", "lookup"),
+            ("tool_result", "lookup"),
+            ("text", "Found x"),
+        ]
+
+    def test_run_subagent_without_values_chunk(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that a subagent stream without a `values` chunk keeps its interrupts or falls back to `invoke`."""
+        graph = create_agent(GenericFakeChatModel(messages=iter([])))
+        state = {"messages": [HumanMessage(content="hi")]}
+        interrupt = Interrupt(value="approve?")
+        fallback = {"messages": [AIMessage(content="done")]}
+        monkeypatch.setattr(graph, "invoke", lambda _state: fallback)
+
+        monkeypatch.setattr(graph, "stream", lambda *_args, **_kwargs: iter([("updates", {"__interrupt__": (interrupt,)})]))
+        assert subagents_module._run_subagent(graph, state, lambda _: None) == {"__interrupt__": [interrupt]}
+
+        monkeypatch.setattr(graph, "stream", lambda *_args, **_kwargs: iter([]))
+        assert subagents_module._run_subagent(graph, state, lambda _: None) is fallback
+
+    async def test_arun_subagent_without_values_chunk(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Test that the async run falls back to `ainvoke` when the stream yields no `values` chunk."""
+        graph = create_agent(GenericFakeChatModel(messages=iter([])))
+        fallback = {"messages": [AIMessage(content="done")]}
+
+        async def astream(*_args: Any, **_kwargs: Any) -> AsyncIterator[Any]:
+            return
+            yield
+
+        async def ainvoke(_state: dict[str, Any]) -> dict[str, Any]:
+            return fallback
+
+        monkeypatch.setattr(graph, "astream", astream)
+        monkeypatch.setattr(graph, "ainvoke", ainvoke)
+        assert await subagents_module._arun_subagent(graph, {"messages": [HumanMessage(content="hi")]}, lambda _: None) is fallback
+
+    def test_large_subagent_result_returned_by_file_reference(self) -> None:
+        """Test that results above `result_token_limit` are saved to the backend and referenced."""
+        report = "\n".join(f"finding {i}" for i in range(200))
+
+        def lambda_subagent(_: dict[str, Any]) -> dict[str, Any]:
+            return {"messages": [AIMessage(content=report)]}
+
+        middleware = SubAgentMiddleware(
+            backend=StateBackend,
+            subagents=[CompiledSubAgent(name="researcher", description="Researches.", runnable=RunnableLambda(lambda_subagent))],
+            result_token_limit=100,
+        )
+        runtime = ToolRuntime(
+            state={"messages": [], "files": {}},
+            context=None,
+            tool_call_id="call_research",
+            store=None,
+            stream_writer=lambda _: None,
+            config={},
+        )
+
+        result = middleware.tools[0].func(description="Research", subagent_type="researcher", runtime=runtime)
+
+        message = result.update["messages"][0]
+        assert "/subagent_results/call_research.md" in message.content
+        assert len(message.content) < len(report)
+        assert message.artifact == {"file_path": "/subagent_results/call_research.md"}
+        assert "\n".join(result.update["files"]["/subagent_results/call_research.md"]["content"]) == report
+
+    def test_result_file_uses_sanitized_tool_call_id_and_configured_estimator(self) -> None:
+        """Test that the result path is safe for any tool call ID and the configured estimator decides eviction."""
+
+        def lambda_subagent(_: dict[str, Any]) -> dict[str, Any]:
+            return {"messages": [AIMessage(content="short answer")]}
+
+        middleware = SubAgentMiddleware(
+            backend=StateBackend,
+            subagents=[CompiledSubAgent(name="researcher", description="Researches.", runnable=RunnableLambda(lambda_subagent))],
+            result_token_limit=100,
+            token_estimator=CachedTokenEstimator(lambda _: 1_000),
+        )
+        runtime = ToolRuntime(
+            state={"messages": [], "files": {}},
+            context=None,
+            tool_call_id="../call.research",
+            store=None,
+            stream_writer=lambda _: None,
+            config={},
+        )
+
+        result = middleware.tools[0].func(description="Research", subagent_type="researcher", runtime=runtime)
+
+        assert list(result.update["files"]) == ["/subagent_results/___call_research.md"]
+
 
 class TestSubAgentMiddlewareValidation:
     """Tests for SubAgentMiddleware initialization validation."""
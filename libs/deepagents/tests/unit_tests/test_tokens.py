@@ -0,0 +1,182 @@
+import gc
+from typing import Any
+
+import pytest
+from langchain.tools import ToolRuntime
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.tools import StructuredTool
+from langchain_core.utils import function_calling
+from langgraph.types import Command
+
+from deepagents import tokens
+from deepagents.backends import StateBackend
+from deepagents.backends.utils import TRUNCATION_GUIDANCE, truncate_if_too_long
+from deepagents.middleware.filesystem import FilesystemMiddleware, FilesystemState
+from deepagents.middleware.summarization import SummarizationMiddleware
+from deepagents.tokens import (
+    CachedTokenEstimator,
+    approximate_token_count,
+    get_default_token_estimator,
+    set_default_token_estimator,
+    tool_schemas,
+)
+from tests.unit_tests.chat_model import GenericFakeChatModel
+
+
+class CountingTokenizer:
+    """Tokenizer that counts one token per whitespace-separated word and records calls."""
+
+    def __init__(self) -> None:
+        self.calls: list[int] = []
+
+    def __call__(self, text: str) -> int:
+        self.calls.append(len(text))
+        return len(text.split())
+
+
+def test_approximate_token_count_rounds_up() -> None:
+    assert approximate_token_count("") == 0
+    assert approximate_token_count("abcd") == 1
+    assert approximate_token_count("abcde") == 2
+
+
+def test_default_estimator_is_approximate() -> None:
+    estimator = CachedTokenEstimator()
+    assert estimator.is_approximate
+    assert estimator("x" * 4001) == 1001
+    assert estimator.max_chars("x" * 100_000, 20_000) == 80_000
+    # The approximation is never cached
+    assert estimator.hits == 0
+    assert estimator.misses == 0
+
+
+def test_estimator_caches_counts() -> None:
+    tokenizer = CountingTokenizer()
+    estimator = CachedTokenEstimator(tokenizer)
+
+    assert estimator("one two three") == 3
+    assert estimator("one two three") == 3
+    assert len(tokenizer.calls) == 1
+    assert estimator.hits == 1
+    assert estimator.misses == 1
+
+
+def test_estimator_cache_is_bounded() -> None:
+    tokenizer = CountingTokenizer()
+    estimator = CachedTokenEstimator(tokenizer, max_cache_entries=2)
+
+    estimator("a")
+    estimator("a b")
+    estimator("a b c")
+    estimator("a")
+
+    assert len(tokenizer.calls) == 4
+
+
+def test_estimator_samples_large_strings() -> None:
+    tokenizer = CountingTokenizer()
+    estimator = CachedTokenEstimator(tokenizer, sample_threshold=10_000, sample_count=4, sample_length=100)
+    text = "word " * 10_000
+
+    estimate = estimator(text)
+
+    assert len(tokenizer.calls) == 4
+    assert max(tokenizer.calls) <= 100
+    assert abs(estimate - 10_000) <= 10_000 * 0.05
+
+
+def test_count_messages_uses_estimator() -> None:
+    estimator = CachedTokenEstimator(CountingTokenizer())
+    messages = [HumanMessage(content="hello there"), AIMessage(content="general kenobi")]
+
+    assert estimator.count_messages(messages) == 2 + 3 + 2 + 3
+
+
+def test_count_messages_approximate_matches_langchain() -> None:
+    messages = [HumanMessage(content="hello there"), AIMessage(content="general kenobi")]
+    assert CachedTokenEstimator().count_messages(messages) == count_tokens_approximately(messages)
+
+
+def test_tool_schemas_are_converted_once_and_count_the_same(monkeypatch: pytest.MonkeyPatch) -> None:
+    tools = FilesystemMiddleware().tools
+    messages = [HumanMessage(content="hello there")]
+    conversions: list[Any] = []
+    convert = function_calling.convert_to_openai_tool
+
+    def counting_convert(tool: Any) -> dict[str, Any]:  # noqa: ANN401
+        conversions.append(tool)
+        return convert(tool)
+
+    monkeypatch.setattr(function_calling, "convert_to_openai_tool", counting_convert)
+
+    first = tool_schemas(tools)
+    second = tool_schemas([*tools, {"type": "function", "function": {"name": "raw"}}])
+
+    assert first is not None
+    assert second is not None
+    assert conversions == tools
+    assert second[:-1] == first
+    assert second[-1] == {"type": "function", "function": {"name": "raw"}}
+    assert tool_schemas(None) is None
+    assert count_tokens_approximately(messages, tools=first) == count_tokens_approximately(messages, tools=tools)
+    assert CachedTokenEstimator().count_messages(messages, tools=tools) == count_tokens_approximately(messages, tools=tools)
+
+
+def test_tool_schemas_do_not_keep_tools_alive() -> None:
+    def lookup(query: str) -> str:
+        """Look something up."""
+        return query
+
+    tool = StructuredTool.from_function(lookup)
+    key = id(tool)
+    tool_schemas([tool])
+    assert key in tokens._TOOL_SCHEMAS
+
+    del tool
+    gc.collect()
+
+    assert key not in tokens._TOOL_SCHEMAS
+
+
+def test_truncate_if_too_long_uses_estimator() -> None:
+    content = "word " * 30_000
+    assert truncate_if_too_long(content).endswith(TRUNCATION_GUIDANCE)
+    # 30k words is 30k tokens, so two thirds of the string fits in the 20k token limit
+    result = truncate_if_too_long(content, token_estimator=CachedTokenEstimator(CountingTokenizer()))
+    assert result.endswith(TRUNCATION_GUIDANCE)
+    assert len(result) == len(content) * 20_000 // 30_000 + 1 + len(TRUNCATION_GUIDANCE)
+
+    short = "word " * 10_000
+    assert truncate_if_too_long(short, token_estimator=CachedTokenEstimator(CountingTokenizer())) == short
+
+
+def test_filesystem_eviction_uses_estimator() -> None:
+    # 2000 words is 10k chars: above the 4 chars/token threshold, below a one-token-per-word threshold
+    content = "word " * 2000
+    state = FilesystemState(messages=[], files={})
+    runtime = ToolRuntime(state=state, context=None, tool_call_id="call_1", store=None, stream_writer=lambda _: None, config={})
+
+    approximate = FilesystemMiddleware(tool_token_limit_before_evict=2000)
+    assert isinstance(approximate._intercept_large_tool_result(ToolMessage(content=content, tool_call_id="call_1"), runtime), Command)
+
+    tokenizer = FilesystemMiddleware(tool_token_limit_before_evict=2000, token_estimator=CachedTokenEstimator(CountingTokenizer()))
+    result = tokenizer._intercept_large_tool_result(ToolMessage(content=content, tool_call_id="call_1"), runtime)
+    assert isinstance(result, ToolMessage)
+    assert result.content == content
+
+
+def test_default_estimator_is_shared() -> None:
+    original = get_default_token_estimator()
+    estimator = CachedTokenEstimator(CountingTokenizer())
+    set_default_token_estimator(estimator)
+    try:
+        filesystem = FilesystemMiddleware()
+        summarization = SummarizationMiddleware(model=GenericFakeChatModel(messages=iter([])), backend=StateBackend)
+        assert filesystem._token_estimator is estimator
+        assert summarization.token_counter == estimator.count_messages
+    finally:
+        set_default_token_estimator(original)
+
+    summarization = SummarizationMiddleware(model=GenericFakeChatModel(messages=iter([])), backend=StateBackend)
+    assert summarization.token_counter != estimator.count_messages
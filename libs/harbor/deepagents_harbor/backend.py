@@ -4,8 +4,10 @@ import asyncio
 import base64
 import json
 import shlex
+from collections.abc import Sequence
 
 from deepagents.backends.protocol import (
+    EditOperation,
     EditResult,
     ExecuteResponse,
     FileInfo,
@@ -17,12 +19,47 @@ from harbor.environments.base import BaseEnvironment
 
 _SYNC_NOT_SUPPORTED = "This backend only supports async execution. Use the async variant instead."
 
-# Shell exit codes used by the aedit command script
+# Exit codes used by the aedit_many script
 _EXIT_NOT_FOUND = 1
 _EXIT_MULTIPLE_MATCHES = 2
 _EXIT_FILE_MISSING = 3
 _EXIT_DECODE_FAILED = 4
 
+# Applies a batch of edits in memory and writes the file once. On a failing
+# edit, prints its index and exits without touching the file.
+_EDIT_SCRIPT = """
+import base64, json, os, sys
+
+try:
+    data = json.loads(base64.b64decode(sys.stdin.read().strip()).decode('utf-8'))
+    file_path, edits = data['path'], data['edits']
+except Exception as e:
+    print(f'Error: Failed to decode edit payload: {e}', file=sys.stderr)
+    sys.exit(4)
+
+if not os.path.isfile(file_path):
+    sys.exit(3)
+
+with open(file_path) as f:
+    text = f.read()
+
+total = 0
+for index, (old, new, replace_all) in enumerate(edits):
+    count = text.count(old)
+    if count == 0:
+        print(index)
+        sys.exit(1)
+    if count > 1 and not replace_all:
+        print(index)
+        sys.exit(2)
+    text = text.replace(old, new) if replace_all else text.replace(old, new, 1)
+    total += count
+
+with open(file_path, 'w') as f:
+    f.write(text)
+print(total)
+"""
+
 # Default per-command timeout (5 minutes) - prevents hanging on stuck commands
 DEFAULT_COMMAND_TIMEOUT_SEC = 300
 
@@ -34,8 +71,8 @@ _GREP_FIELD_COUNT = 3  # minimum number of colon-separated fields in grep output
 class HarborSandbox(SandboxBackendProtocol):
     """A sandbox implementation using shell commands.
 
-    Note: The edit operation requires python3 for JSON parsing. Other operations
-    (read, write, ls, grep, glob) use only standard shell utilities.
+    Note: The edit operations require python3. Other operations (read, write,
+    ls, grep, glob) use only standard shell utilities.
     """
 
     def __init__(self, environment: BaseEnvironment) -> None:
@@ -227,66 +264,26 @@ fi
         new_string: str,
         replace_all: bool = False,
     ) -> EditResult:
-        """Edit a file by replacing string occurrences using shell commands."""
-        # Create JSON payload with old and new strings, then base64 encode
-        payload = json.dumps({"old": old_string, "new": new_string})
-        payload_b64 = base64.b64encode(payload.encode("utf-8")).decode("ascii")
-        safe_path = shlex.quote(file_path)
-        replace_all_str = "true" if replace_all else "false"
-
-        # Use heredoc to pass old/new strings via stdin to avoid ARG_MAX limits.
-        # ARG_MAX limits the total size of command-line arguments.
-        # Format: base64-encoded JSON with {{"old": str, "new": str}}.
-        # The heredoc feeds into the brace group { ... } which reads and processes stdin.
-        cmd = f"""
-if [ ! -f {safe_path} ]; then
-    exit 3
-fi
-
-{{
-    # Read entire heredoc content using cat (read only gets first line)
-    payload_b64=$(cat)
-    if [ -z "$payload_b64" ]; then
-        echo "Error: No payload received for edit operation" >&2
-        exit 4
-    fi
-
-    # Decode base64 payload
-    payload=$(echo "$payload_b64" | base64 -d) || {{
-        echo "Error: Failed to decode payload" >&2
-        exit 4
-    }}
-
-    # Extract old and new strings from JSON using python3
-    old=$(echo "$payload" | python3 -c "import sys, json; print(json.load(sys.stdin)['old'], end='')") || {{
-        echo "Error: Failed to parse JSON payload" >&2
-        exit 4
-    }}
-    new=$(echo "$payload" | python3 -c "import sys, json; print(json.load(sys.stdin)['new'], end='')") || {{
-        echo "Error: Failed to parse JSON payload" >&2
-        exit 4
-    }}
-
-    # Count occurrences using grep -F (fixed strings)
-    count=$(grep -o -F "$old" {safe_path} | wc -l)
-
-    if [ "$count" -eq 0 ]; then
-        exit 1
-    elif [ "$count" -gt 1 ] && [ "{replace_all_str}" = "false" ]; then
-        exit 2
-    fi
+        """Edit a file by replacing string occurrences."""
+        return await self.aedit_many(file_path, [(old_string, new_string, replace_all)])
 
-    # Use perl for reliable string replacement (handles special chars).
-    # Note: \\Q...\\E escapes the search pattern. The replacement string is not
-    # escaped, so Perl special sequences (\\U, $1, etc.) in new will be interpreted.
-    if [ "{replace_all_str}" = "true" ]; then
-        perl -i -pe 's/\\Q'"$old"'\\E/'"$new"'/g' {safe_path}
-    else
-        perl -i -pe 's/\\Q'"$old"'\\E/'"$new"'/' {safe_path}
-    fi
+    async def aedit_many(
+        self,
+        file_path: str,
+        edits: Sequence[EditOperation],
+    ) -> EditResult:
+        """Apply several string replacements to a file with a single python3 call.
 
-    echo "$count"
-}} <<'__DEEPAGENTS_EOF__'
+        Every edit is validated before the file is written, so the file is left
+        unchanged if any edit fails.
+        """
+        if not edits:
+            return EditResult(error="Error: No edits provided")
+        # Pass the path and edits via heredoc to avoid ARG_MAX limits.
+        # Format: base64-encoded JSON with {"path": str, "edits": [[old, new, replace_all], ...]}.
+        payload = json.dumps({"path": file_path, "edits": [list(edit) for edit in edits]})
+        payload_b64 = base64.b64encode(payload.encode("utf-8")).decode("ascii")
+        cmd = f"""python3 -c {shlex.quote(_EDIT_SCRIPT)} <<'__DEEPAGENTS_EOF__'
 {payload_b64}
 __DEEPAGENTS_EOF__
 """
@@ -295,12 +292,19 @@ __DEEPAGENTS_EOF__
         exit_code = result.exit_code
         output = result.output.strip()
 
-        if exit_code == _EXIT_NOT_FOUND:
-            return EditResult(error=f"Error: String not found in file: '{old_string}'")
-        if exit_code == _EXIT_MULTIPLE_MATCHES:
-            return EditResult(
-                error=f"Error: String '{old_string}' appears multiple times. Use replace_all=True to replace all occurrences."
-            )
+        if exit_code in {_EXIT_NOT_FOUND, _EXIT_MULTIPLE_MATCHES}:
+            first_line = output.split("\n", 1)[0].strip()
+            index = int(first_line) if first_line.isdigit() and int(first_line) < len(edits) else 0
+            old_string = edits[index][0]
+            if exit_code == _EXIT_NOT_FOUND:
+                reason = f"String not found in file: '{old_string}'"
+            else:
+                reason = f"String '{old_string}' appears multiple times. Use replace_all=True to replace all occurrences."
+            if len(edits) > 1:
+                return EditResult(
+                    error=f"Error: Edit {index + 1} of {len(edits)} failed, no edits were applied. {reason}"
+                )
+            return EditResult(error=f"Error: {reason}")
         if exit_code == _EXIT_FILE_MISSING:
             return EditResult(error=f"Error: File '{file_path}' not found")
         if exit_code == _EXIT_DECODE_FAILED:
@@ -313,7 +317,7 @@ __DEEPAGENTS_EOF__
         try:
             count = int(output.split("\n")[0])
         except (ValueError, IndexError):
-            count = 1
+            count = len(edits)
 
         return EditResult(path=file_path, files_update=None, occurrences=count)
 
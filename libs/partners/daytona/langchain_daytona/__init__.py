@@ -1,7 +1,8 @@
 """Daytona sandbox integration for Deep Agents."""
 
 from langchain_daytona.sandbox import (
+    AsyncDaytonaSandbox,
     DaytonaSandbox,
 )
 
-__all__ = ["DaytonaSandbox"]
+__all__ = ["AsyncDaytonaSandbox", "DaytonaSandbox"]
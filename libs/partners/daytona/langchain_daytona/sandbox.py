@@ -2,14 +2,120 @@
 
 from __future__ import annotations
 
+import asyncio
+from typing import TYPE_CHECKING, Any
+
 import daytona
-from daytona import FileDownloadRequest, FileUpload
+from daytona import DaytonaError, FileDownloadRequest, FileUpload
 from deepagents.backends.protocol import (
     ExecuteResponse,
     FileDownloadResponse,
     FileUploadResponse,
 )
-from deepagents.backends.sandbox import BaseSandbox
+from deepagents.backends.sandbox import AsyncBaseSandbox, BaseSandbox
+
+if TYPE_CHECKING:
+    from deepagents.backends.protocol import FileOperationError
+
+_STATUS_ERRORS: dict[int, FileOperationError] = {
+    400: "invalid_path",
+    403: "permission_denied",
+    404: "file_not_found",
+}
+"""File operation errors for the HTTP statuses Daytona reports per file."""
+
+
+def _download_requests(
+    paths: list[str],
+) -> tuple[list[FileDownloadResponse], list[FileDownloadRequest]]:
+    """Build Daytona download requests, rejecting relative paths up front."""
+    download_requests: list[FileDownloadRequest] = []
+    responses: list[FileDownloadResponse] = []
+
+    for path in paths:
+        if not path.startswith("/"):
+            responses.append(
+                FileDownloadResponse(path=path, content=None, error="invalid_path")
+            )
+            continue
+        download_requests.append(FileDownloadRequest(source=path))
+        responses.append(FileDownloadResponse(path=path, content=None, error=None))
+
+    return responses, download_requests
+
+
+def _merge_download_responses(
+    paths: list[str],
+    responses: list[FileDownloadResponse],
+    daytona_responses: list[Any],
+) -> list[FileDownloadResponse]:
+    """Fill in the responses for absolute paths from Daytona's results."""
+    mapped_responses: list[FileDownloadResponse] = []
+    for resp in daytona_responses:
+        content = resp.result
+        if content is None:
+            details = resp.error_details
+            status_code = (details.status_code if details is not None else None) or 0
+            mapped_responses.append(
+                FileDownloadResponse(
+                    path=resp.source,
+                    content=None,
+                    error=_STATUS_ERRORS.get(status_code, "file_not_found"),
+                )
+            )
+        else:
+            mapped_responses.append(
+                FileDownloadResponse(
+                    path=resp.source,
+                    content=content,
+                    error=None,
+                )
+            )
+
+    mapped_iter = iter(mapped_responses)
+    for i, path in enumerate(paths):
+        if not path.startswith("/"):
+            continue
+        responses[i] = next(
+            mapped_iter,
+            FileDownloadResponse(path=path, content=None, error="file_not_found"),
+        )
+
+    return responses
+
+
+def _upload_requests(
+    files: list[tuple[str, bytes]],
+) -> tuple[list[FileUploadResponse], list[FileUpload]]:
+    """Build Daytona upload requests, rejecting relative paths up front."""
+    upload_requests: list[FileUpload] = []
+    responses: list[FileUploadResponse] = []
+
+    for path, content in files:
+        if not path.startswith("/"):
+            responses.append(FileUploadResponse(path=path, error="invalid_path"))
+            continue
+        upload_requests.append(FileUpload(source=content, destination=path))
+        responses.append(FileUploadResponse(path=path, error=None))
+
+    return responses, upload_requests
+
+
+def _upload_error(path: str, error: DaytonaError) -> FileUploadResponse:
+    """Map a failed single-file upload to its error code, re-raising other failures."""
+    code = _STATUS_ERRORS.get(error.status_code or 0)
+    if code is None:
+        raise error
+    return FileUploadResponse(path=path, error=code)
+
+
+def _merge_upload_responses(
+    responses: list[FileUploadResponse],
+    upload_responses: list[FileUploadResponse],
+) -> list[FileUploadResponse]:
+    """Fill in the responses for absolute paths from the per-file upload results."""
+    uploaded = iter(upload_responses)
+    return [next(uploaded) if resp.error is None else resp for resp in responses]
 
 
 class DaytonaSandbox(BaseSandbox):
@@ -57,67 +163,113 @@ class DaytonaSandbox(BaseSandbox):
 
     def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
         """Download files from the sandbox."""
-        download_requests: list[FileDownloadRequest] = []
-        responses: list[FileDownloadResponse] = []
-
-        for path in paths:
-            if not path.startswith("/"):
-                responses.append(
-                    FileDownloadResponse(path=path, content=None, error="invalid_path")
-                )
-                continue
-            download_requests.append(FileDownloadRequest(source=path))
-            responses.append(FileDownloadResponse(path=path, content=None, error=None))
-
+        responses, download_requests = _download_requests(paths)
         if not download_requests:
             return responses
-
         daytona_responses = self._sandbox.fs.download_files(download_requests)
+        return _merge_download_responses(paths, responses, daytona_responses)
 
-        mapped_responses: list[FileDownloadResponse] = []
-        for resp in daytona_responses:
-            content = resp.result
-            if content is None:
-                mapped_responses.append(
-                    FileDownloadResponse(
-                        path=resp.source,
-                        content=None,
-                        error="file_not_found",
-                    )
-                )
-            else:
-                mapped_responses.append(
-                    FileDownloadResponse(
-                        path=resp.source,
-                        content=content,  # ty: ignore[invalid-argument-type]  # Daytona SDK returns bytes for file content
-                        error=None,
-                    )
-                )
+    def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
+        """Upload files into the sandbox.
 
-        mapped_iter = iter(mapped_responses)
-        for i, path in enumerate(paths):
-            if not path.startswith("/"):
-                continue
-            responses[i] = next(
-                mapped_iter,
-                FileDownloadResponse(path=path, content=None, error="file_not_found"),
+        Daytona rejects a batch as a whole, so when it fails the files are
+        uploaded one by one to report which of them could not be written.
+        """
+        responses, upload_requests = _upload_requests(files)
+        if not upload_requests:
+            return responses
+        try:
+            self._sandbox.fs.upload_files(upload_requests)
+        except DaytonaError:
+            return _merge_upload_responses(
+                responses, [self._upload_file(request) for request in upload_requests]
             )
-
         return responses
 
-    def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
-        """Upload files into the sandbox."""
-        upload_requests: list[FileUpload] = []
-        responses: list[FileUploadResponse] = []
-
-        for path, content in files:
-            if not path.startswith("/"):
-                responses.append(FileUploadResponse(path=path, error="invalid_path"))
-                continue
-            upload_requests.append(FileUpload(source=content, destination=path))
-            responses.append(FileUploadResponse(path=path, error=None))
-
-        if upload_requests:
-            self._sandbox.fs.upload_files(upload_requests)
+    def _upload_file(self, request: FileUpload) -> FileUploadResponse:
+        try:
+            self._sandbox.fs.upload_files([request])
+        except DaytonaError as e:
+            return _upload_error(request.destination, e)
+        return FileUploadResponse(path=request.destination, error=None)
+
+
+class AsyncDaytonaSandbox(AsyncBaseSandbox):
+    """Daytona sandbox implementation backed by Daytona's async client.
+
+    Commands and file transfers are awaited natively, so many agents can share
+    one event loop without a worker thread per in-flight command. The sync
+    methods are derived from the async ones.
+    """
+
+    def __init__(self, *, sandbox: daytona.AsyncSandbox) -> None:
+        """Create a backend wrapping an existing async Daytona sandbox."""
+        self._sandbox = sandbox
+        self._default_timeout: int = 30 * 60
+
+    @property
+    def id(self) -> str:
+        """Return the Daytona sandbox id."""
+        return self._sandbox.id
+
+    async def aexecute(
+        self,
+        command: str,
+        *,
+        timeout: int | None = None,  # noqa: ASYNC109
+    ) -> ExecuteResponse:
+        """Execute a shell command inside the sandbox.
+
+        Args:
+            command: Shell command string to execute.
+            timeout: Maximum time in seconds to wait for the command to complete.
+
+                If None, uses the backend's default timeout.
 
+                Note that in Daytona's implementation, a timeout of 0 means
+                "wait indefinitely".
+        """
+        effective_timeout = timeout if timeout is not None else self._default_timeout
+        result = await self._sandbox.process.exec(command, timeout=effective_timeout)
+
+        return ExecuteResponse(
+            output=result.result,
+            exit_code=result.exit_code,
+            truncated=False,
+        )
+
+    async def adownload_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        """Download files from the sandbox."""
+        responses, download_requests = _download_requests(paths)
+        if not download_requests:
+            return responses
+        daytona_responses = await self._sandbox.fs.download_files(download_requests)
+        return _merge_download_responses(paths, responses, daytona_responses)
+
+    async def aupload_files(
+        self, files: list[tuple[str, bytes]]
+    ) -> list[FileUploadResponse]:
+        """Upload files into the sandbox.
+
+        Daytona rejects a batch as a whole, so when it fails the files are
+        uploaded one by one, concurrently, to report which of them could not
+        be written.
+        """
+        responses, upload_requests = _upload_requests(files)
+        if not upload_requests:
+            return responses
+        try:
+            await self._sandbox.fs.upload_files(upload_requests)
+        except DaytonaError:
+            upload_responses = await asyncio.gather(
+                *(self._aupload_file(request) for request in upload_requests)
+            )
+            return _merge_upload_responses(responses, upload_responses)
         return responses
+
+    async def _aupload_file(self, request: FileUpload) -> FileUploadResponse:
+        try:
+            await self._sandbox.fs.upload_files([request])
+        except DaytonaError as e:
+            return _upload_error(request.destination, e)
+        return FileUploadResponse(path=request.destination, error=None)
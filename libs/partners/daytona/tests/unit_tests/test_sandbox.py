@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from daytona import DaytonaError, FileDownloadErrorDetails
+from daytona import FileDownloadResponse as DaytonaDownloadResponse
+
+from langchain_daytona import AsyncDaytonaSandbox
+
+
+def _sandbox() -> tuple[AsyncDaytonaSandbox, MagicMock]:
+    client = MagicMock()
+    client.id = "sbx_123"
+    client.fs.download_files = AsyncMock()
+    client.fs.upload_files = AsyncMock()
+    return AsyncDaytonaSandbox(sandbox=client), client
+
+
+async def test_adownload_files_reports_errors_per_file() -> None:
+    sandbox, client = _sandbox()
+    client.fs.download_files.return_value = [
+        DaytonaDownloadResponse(source="/ok.txt", result=b"hello"),
+        DaytonaDownloadResponse(source="/missing.txt", error="not found"),
+        DaytonaDownloadResponse(
+            source="/secret.txt",
+            error="denied",
+            error_details=FileDownloadErrorDetails(message="denied", status_code=403),
+        ),
+    ]
+
+    responses = await sandbox.adownload_files(
+        ["/ok.txt", "relative.txt", "/missing.txt", "/secret.txt"]
+    )
+
+    assert [(r.path, r.content, r.error) for r in responses] == [
+        ("/ok.txt", b"hello", None),
+        ("relative.txt", None, "invalid_path"),
+        ("/missing.txt", None, "file_not_found"),
+        ("/secret.txt", None, "permission_denied"),
+    ]
+
+
+async def test_aupload_files_uploads_in_one_batch() -> None:
+    sandbox, client = _sandbox()
+
+    responses = await sandbox.aupload_files([("/a.txt", b"a"), ("/b.txt", b"b")])
+
+    assert [(r.path, r.error) for r in responses] == [
+        ("/a.txt", None),
+        ("/b.txt", None),
+    ]
+    client.fs.upload_files.assert_awaited_once()
+
+
+async def test_aupload_files_reports_errors_per_file_when_batch_fails() -> None:
+    sandbox, client = _sandbox()
+
+    async def upload_files(requests: list) -> None:
+        if any(r.destination == "/readonly/b.txt" for r in requests):
+            msg = "403: denied"
+            raise DaytonaError(msg, status_code=403)
+
+    client.fs.upload_files.side_effect = upload_files
+
+    responses = await sandbox.aupload_files(
+        [("/a.txt", b"a"), ("relative.txt", b"r"), ("/readonly/b.txt", b"b")]
+    )
+
+    assert [(r.path, r.error) for r in responses] == [
+        ("/a.txt", None),
+        ("relative.txt", "invalid_path"),
+        ("/readonly/b.txt", "permission_denied"),
+    ]
+
+
+async def test_aupload_files_raises_non_file_errors() -> None:
+    sandbox, client = _sandbox()
+    client.fs.upload_files.side_effect = DaytonaError(
+        "502: bad gateway", status_code=502
+    )
+
+    with pytest.raises(DaytonaError, match="bad gateway"):
+        await sandbox.aupload_files([("/a.txt", b"a")])
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import asyncio
 import contextlib
 
 import modal
@@ -13,8 +14,34 @@ from deepagents.backends.protocol import (
 from deepagents.backends.sandbox import BaseSandbox
 
 
+def _combine_output(stdout: str | None, stderr: str | None) -> str:
+    output = stdout or ""
+    if stderr:
+        output += "\n" + stderr if output else stderr
+    return output
+
+
+def _as_bytes(content: bytes | memoryview | str) -> bytes:
+    if isinstance(content, memoryview):
+        return content.tobytes()
+    if isinstance(content, str):
+        return content.encode()
+    return content
+
+
+def _filesystem_error(error: modal.exception.FilesystemExecutionError) -> str:
+    return (
+        "is_directory" if "is a directory" in str(error).lower() else "file_not_found"
+    )
+
+
 class ModalSandbox(BaseSandbox):
-    """Modal sandbox implementation conforming to SandboxBackendProtocol."""
+    """Modal sandbox implementation conforming to SandboxBackendProtocol.
+
+    Both the sync and the async methods call Modal natively; the async file
+    operations inherited from BaseSandbox run through `aexecute` without
+    blocking a worker thread.
+    """
 
     def __init__(self, *, sandbox: modal.Sandbox) -> None:
         """Create a backend wrapping an existing Modal sandbox."""
@@ -25,9 +52,6 @@ class ModalSandbox(BaseSandbox):
         if not path.startswith("/"):
             return FileDownloadResponse(path=path, content=None, error="invalid_path")
 
-        error: str | None = None
-        content_bytes: bytes | None = None
-
         try:
             f = self._sandbox.open(path, "rb")
             try:
@@ -35,20 +59,34 @@ class ModalSandbox(BaseSandbox):
             finally:
                 with contextlib.suppress(Exception):
                     f.close()
+        except FileNotFoundError:
+            return FileDownloadResponse(path=path, content=None, error="file_not_found")
+        except modal.exception.FilesystemExecutionError as e:
+            return FileDownloadResponse(
+                path=path, content=None, error=_filesystem_error(e)
+            )
 
-            if isinstance(content, memoryview):
-                content_bytes = content.tobytes()
-            elif isinstance(content, str):
-                content_bytes = content.encode()
-            else:
-                content_bytes = content
+        return FileDownloadResponse(path=path, content=_as_bytes(content), error=None)
+
+    async def _aread_file(self, path: str) -> FileDownloadResponse:
+        if not path.startswith("/"):
+            return FileDownloadResponse(path=path, content=None, error="invalid_path")
+
+        try:
+            f = await self._sandbox.open.aio(path, "rb")
+            try:
+                content = await f.read.aio()
+            finally:
+                with contextlib.suppress(Exception):
+                    await f.close.aio()
         except FileNotFoundError:
-            error = "file_not_found"
+            return FileDownloadResponse(path=path, content=None, error="file_not_found")
         except modal.exception.FilesystemExecutionError as e:
-            msg = str(e).lower()
-            error = "is_directory" if "is a directory" in msg else "file_not_found"
+            return FileDownloadResponse(
+                path=path, content=None, error=_filesystem_error(e)
+            )
 
-        return FileDownloadResponse(path=path, content=content_bytes, error=error)
+        return FileDownloadResponse(path=path, content=_as_bytes(content), error=None)
 
     def _write_file(self, path: str, content: bytes) -> FileUploadResponse:
         if not path.startswith("/"):
@@ -67,6 +105,23 @@ class ModalSandbox(BaseSandbox):
         except FileNotFoundError:
             return FileUploadResponse(path=path, error="file_not_found")
 
+    async def _awrite_file(self, path: str, content: bytes) -> FileUploadResponse:
+        if not path.startswith("/"):
+            return FileUploadResponse(path=path, error="invalid_path")
+
+        try:
+            f = await self._sandbox.open.aio(path, "wb")
+            try:
+                await f.write.aio(content)
+            finally:
+                with contextlib.suppress(Exception):
+                    await f.close.aio()
+            return FileUploadResponse(path=path, error=None)
+        except PermissionError:
+            return FileUploadResponse(path=path, error="permission_denied")
+        except FileNotFoundError:
+            return FileUploadResponse(path=path, error="file_not_found")
+
     @property
     def id(self) -> str:
         """Return the sandbox id."""
@@ -91,15 +146,29 @@ class ModalSandbox(BaseSandbox):
         process = self._sandbox.exec("bash", "-c", command, timeout=effective_timeout)
         process.wait()
 
-        stdout = process.stdout.read()
-        stderr = process.stderr.read()
+        return ExecuteResponse(
+            output=_combine_output(process.stdout.read(), process.stderr.read()),
+            exit_code=process.returncode,
+            truncated=False,
+        )
 
-        output = stdout or ""
-        if stderr:
-            output += "\n" + stderr if output else stderr
+    async def aexecute(
+        self,
+        command: str,
+        *,
+        timeout: int | None = None,  # noqa: ASYNC109
+    ) -> ExecuteResponse:
+        """Async version of execute using Modal's native async client."""
+        effective_timeout = timeout if timeout is not None else self._default_timeout
+        process = await self._sandbox.exec.aio(
+            "bash", "-c", command, timeout=effective_timeout
+        )
+        await process.wait.aio()
 
+        stdout = await process.stdout.read.aio()
+        stderr = await process.stderr.read.aio()
         return ExecuteResponse(
-            output=output,
+            output=_combine_output(stdout, stderr),
             exit_code=process.returncode,
             truncated=False,
         )
@@ -108,6 +177,20 @@ class ModalSandbox(BaseSandbox):
         """Download files from the sandbox."""
         return [self._read_file(path) for path in paths]
 
+    async def adownload_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        """Download files from the sandbox concurrently."""
+        return list(await asyncio.gather(*(self._aread_file(path) for path in paths)))
+
     def upload_files(self, files: list[tuple[str, bytes]]) -> list[FileUploadResponse]:
         """Upload files into the sandbox."""
         return [self._write_file(path, content) for path, content in files]
+
+    async def aupload_files(
+        self, files: list[tuple[str, bytes]]
+    ) -> list[FileUploadResponse]:
+        """Upload files into the sandbox concurrently."""
+        return list(
+            await asyncio.gather(
+                *(self._awrite_file(path, content) for path, content in files)
+            )
+        )
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock
+
+from langchain_modal import ModalSandbox
+
+EXIT_CODE = 2
+
+
+def _file(content: bytes = b"") -> MagicMock:
+    f = MagicMock()
+    f.read.aio = AsyncMock(return_value=content)
+    f.write.aio = AsyncMock()
+    f.close.aio = AsyncMock()
+    return f
+
+
+def _sandbox() -> tuple[ModalSandbox, MagicMock]:
+    client = MagicMock()
+    client.open.aio = AsyncMock()
+    return ModalSandbox(sandbox=client), client
+
+
+async def test_adownload_files_reports_errors_per_file() -> None:
+    sandbox, client = _sandbox()
+    ok = _file(b"hello")
+
+    async def open_file(path: str, mode: str) -> MagicMock:
+        assert mode == "rb"
+        if path == "/missing.txt":
+            raise FileNotFoundError(path)
+        return ok
+
+    client.open.aio.side_effect = open_file
+
+    responses = await sandbox.adownload_files(
+        ["/ok.txt", "/missing.txt", "relative.txt"]
+    )
+
+    assert [(r.path, r.content, r.error) for r in responses] == [
+        ("/ok.txt", b"hello", None),
+        ("/missing.txt", None, "file_not_found"),
+        ("relative.txt", None, "invalid_path"),
+    ]
+    ok.close.aio.assert_awaited_once()
+
+
+async def test_aupload_files_reports_errors_per_file() -> None:
+    sandbox, client = _sandbox()
+    ok = _file()
+
+    async def open_file(path: str, mode: str) -> MagicMock:
+        assert mode == "wb"
+        if path == "/readonly/b.txt":
+            raise PermissionError(path)
+        return ok
+
+    client.open.aio.side_effect = open_file
+
+    responses = await sandbox.aupload_files(
+        [("/a.txt", b"a"), ("/readonly/b.txt", b"b")]
+    )
+
+    assert [(r.path, r.error) for r in responses] == [
+        ("/a.txt", None),
+        ("/readonly/b.txt", "permission_denied"),
+    ]
+    ok.write.aio.assert_awaited_once_with(b"a")
+
+
+async def test_aexecute_combines_output() -> None:
+    sandbox, client = _sandbox()
+    process = MagicMock(returncode=EXIT_CODE)
+    process.wait.aio = AsyncMock()
+    process.stdout.read.aio = AsyncMock(return_value="out")
+    process.stderr.read.aio = AsyncMock(return_value="err")
+    client.exec.aio = AsyncMock(return_value=process)
+
+    response = await sandbox.aexecute("ls", timeout=7)
+
+    client.exec.aio.assert_awaited_once_with("bash", "-c", "ls", timeout=7)
+    assert response.output == "out\nerr"
+    assert response.exit_code == EXIT_CODE
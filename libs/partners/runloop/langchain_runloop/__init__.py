@@ -1,5 +1,5 @@
 """Runloop sandbox integration for Deep Agents."""
 
-from langchain_runloop.sandbox import RunloopSandbox
+from langchain_runloop.sandbox import AsyncRunloopSandbox, RunloopSandbox
 
-__all__ = ["RunloopSandbox"]
+__all__ = ["AsyncRunloopSandbox", "RunloopSandbox"]
@@ -2,17 +2,43 @@
 
 from __future__ import annotations
 
+import asyncio
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-    from runloop_api_client.sdk import Devbox
+    from runloop_api_client.sdk import AsyncDevbox, Devbox
 
 from deepagents.backends.protocol import (
     ExecuteResponse,
     FileDownloadResponse,
     FileUploadResponse,
 )
-from deepagents.backends.sandbox import BaseSandbox
+from deepagents.backends.sandbox import AsyncBaseSandbox, BaseSandbox
+from runloop_api_client import (
+    BadRequestError,
+    NotFoundError,
+    PermissionDeniedError,
+)
+
+if TYPE_CHECKING:
+    from deepagents.backends.protocol import FileOperationError
+
+
+def _combine_output(stdout: str | None, stderr: str | None) -> str:
+    output = stdout or ""
+    if stderr:
+        output += "\n" + stderr if output else stderr
+    return output
+
+
+def _file_error(
+    error: BadRequestError | NotFoundError | PermissionDeniedError,
+) -> FileOperationError:
+    if isinstance(error, NotFoundError):
+        return "file_not_found"
+    if isinstance(error, PermissionDeniedError):
+        return "permission_denied"
+    return "invalid_path"
 
 
 class RunloopSandbox(BaseSandbox):
@@ -48,13 +74,8 @@ class RunloopSandbox(BaseSandbox):
         effective_timeout = timeout if timeout is not None else self._default_timeout
         result = self._devbox.cmd.exec(command, timeout=effective_timeout)
 
-        output = result.stdout() if result.stdout() is not None else ""
-        stderr = result.stderr() if result.stderr() is not None else ""
-        if stderr:
-            output += "\n" + stderr if output else stderr
-
         return ExecuteResponse(
-            output=output,
+            output=_combine_output(result.stdout(), result.stderr()),
             exit_code=result.exit_code,
             truncated=False,
         )
@@ -63,7 +84,13 @@ class RunloopSandbox(BaseSandbox):
         """Download files from the devbox."""
         responses: list[FileDownloadResponse] = []
         for path in paths:
-            content = self._devbox.file.download(path=path)
+            try:
+                content = self._devbox.file.download(path=path)
+            except (BadRequestError, NotFoundError, PermissionDeniedError) as e:
+                responses.append(
+                    FileDownloadResponse(path=path, content=None, error=_file_error(e))
+                )
+                continue
             responses.append(
                 FileDownloadResponse(path=path, content=content, error=None)
             )
@@ -73,6 +100,90 @@ class RunloopSandbox(BaseSandbox):
         """Upload files into the devbox."""
         responses: list[FileUploadResponse] = []
         for path, content in files:
-            self._devbox.file.upload(path=path, file=content)
+            try:
+                self._devbox.file.upload(path=path, file=content)
+            except (BadRequestError, NotFoundError, PermissionDeniedError) as e:
+                responses.append(FileUploadResponse(path=path, error=_file_error(e)))
+                continue
             responses.append(FileUploadResponse(path=path, error=None))
         return responses
+
+
+class AsyncRunloopSandbox(AsyncBaseSandbox):
+    """Sandbox backend that operates on a Runloop devbox through the async client.
+
+    Commands and file transfers are awaited natively, so many agents can share
+    one event loop without a worker thread per in-flight command. The sync
+    methods are derived from the async ones.
+    """
+
+    def __init__(
+        self,
+        *,
+        devbox: AsyncDevbox,
+    ) -> None:
+        """Create a sandbox backend connected to an existing async Runloop devbox."""
+        self._devbox = devbox
+        self._devbox_id = devbox.id
+        self._default_timeout = 30 * 60
+
+    @property
+    def id(self) -> str:
+        """Return the devbox id."""
+        return self._devbox_id
+
+    async def aexecute(
+        self,
+        command: str,
+        *,
+        timeout: int | None = None,  # noqa: ASYNC109
+    ) -> ExecuteResponse:
+        """Execute a shell command inside the devbox.
+
+        Args:
+            command: Shell command string to execute.
+            timeout: Maximum time in seconds to wait for this command.
+
+                If None, uses the backend's default timeout.
+
+        Returns:
+            ExecuteResponse containing output, exit code, and truncation flag.
+        """
+        effective_timeout = timeout if timeout is not None else self._default_timeout
+        result = await self._devbox.cmd.exec(command, timeout=effective_timeout)
+
+        return ExecuteResponse(
+            output=_combine_output(await result.stdout(), await result.stderr()),
+            exit_code=result.exit_code,
+            truncated=False,
+        )
+
+    async def _adownload_file(self, path: str) -> FileDownloadResponse:
+        try:
+            content = await self._devbox.file.download(path=path)
+        except (BadRequestError, NotFoundError, PermissionDeniedError) as e:
+            return FileDownloadResponse(path=path, content=None, error=_file_error(e))
+        return FileDownloadResponse(path=path, content=content, error=None)
+
+    async def _aupload_file(self, path: str, content: bytes) -> FileUploadResponse:
+        try:
+            await self._devbox.file.upload(path=path, file=content)
+        except (BadRequestError, NotFoundError, PermissionDeniedError) as e:
+            return FileUploadResponse(path=path, error=_file_error(e))
+        return FileUploadResponse(path=path, error=None)
+
+    async def adownload_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        """Download files from the devbox concurrently."""
+        return list(
+            await asyncio.gather(*(self._adownload_file(path) for path in paths))
+        )
+
+    async def aupload_files(
+        self, files: list[tuple[str, bytes]]
+    ) -> list[FileUploadResponse]:
+        """Upload files into the devbox concurrently."""
+        return list(
+            await asyncio.gather(
+                *(self._aupload_file(path, content) for path, content in files)
+            )
+        )
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock
+
+import httpx
+from runloop_api_client import NotFoundError, PermissionDeniedError
+
+from langchain_runloop import AsyncRunloopSandbox
+
+
+def _status_error(error_type: type[Exception], status_code: int) -> Exception:
+    request = httpx.Request("GET", "https://api.runloop.ai/files")
+    response = httpx.Response(status_code, request=request)
+    return error_type("failed", response=response, body=None)
+
+
+def _sandbox() -> tuple[AsyncRunloopSandbox, MagicMock]:
+    devbox = MagicMock()
+    devbox.id = "dbx_123"
+    devbox.file.download = AsyncMock()
+    devbox.file.upload = AsyncMock()
+    return AsyncRunloopSandbox(devbox=devbox), devbox
+
+
+async def test_adownload_files_reports_errors_per_file() -> None:
+    sandbox, devbox = _sandbox()
+    contents = {"/ok.txt": b"hello"}
+    errors = {
+        "/missing.txt": _status_error(NotFoundError, 404),
+        "/secret.txt": _status_error(PermissionDeniedError, 403),
+    }
+
+    async def download(*, path: str) -> bytes:
+        if path in errors:
+            raise errors[path]
+        return contents[path]
+
+    devbox.file.download.side_effect = download
+
+    responses = await sandbox.adownload_files(
+        ["/ok.txt", "/missing.txt", "/secret.txt"]
+    )
+
+    assert [(r.path, r.content, r.error) for r in responses] == [
+        ("/ok.txt", b"hello", None),
+        ("/missing.txt", None, "file_not_found"),
+        ("/secret.txt", None, "permission_denied"),
+    ]
+
+
+async def test_aupload_files_reports_errors_per_file() -> None:
+    sandbox, devbox = _sandbox()
+
+    async def upload(*, path: str, file: bytes) -> None:  # noqa: ARG001
+        if path == "/readonly/a.txt":
+            raise _status_error(PermissionDeniedError, 403)
+
+    devbox.file.upload.side_effect = upload
+
+    responses = await sandbox.aupload_files(
+        [("/workspace/a.txt", b"a"), ("/readonly/a.txt", b"b")]
+    )
+
+    assert [(r.path, r.error) for r in responses] == [
+        ("/workspace/a.txt", None),
+        ("/readonly/a.txt", "permission_denied"),
+    ]
+    assert len(devbox.file.upload.await_args_list) == len(responses)
+
+
+async def test_aexecute_combines_output() -> None:
+    sandbox, devbox = _sandbox()
+    result = MagicMock(exit_code=1)
+    result.stdout = AsyncMock(return_value="out")
+    result.stderr = AsyncMock(return_value="err")
+    devbox.cmd.exec = AsyncMock(return_value=result)
+
+    response = await sandbox.aexecute("make test", timeout=5)
+
+    devbox.cmd.exec.assert_awaited_once_with("make test", timeout=5)
+    assert response.output == "out\nerr"
+    assert response.exit_code == 1